@@ -56,21 +56,95 @@
 import sys
 import argparse
 import datetime
-import oci
 import gzip
 import os
+import re
 import csv
 import oracledb
+import configparser
 import time
 import base64
+import io
+import threading
+import concurrent.futures
 import json
-
-
-version = "26.05.01"
+import signal
+import queue
+import email.utils
+import http.server
+# only the OCI SDK modules used
+import oci.config
+import oci.signer
+import oci.auth.signers
+import oci.exceptions
+import oci.pagination
+import oci.identity
+import oci.object_storage
+import oci.secrets
+
+version = "26.10.19"
 work_report_dir = os.curdir + "/work_report_dir"
-
-# Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
-oracledb.init_oracle_client()
+focus_file_prefix = "FOCUS Reports/"
+
+# per file phase timing columns of OCI_FOCUS_LOAD_STATUS
+load_status_phase_columns = ['LIST_SECS', 'DOWNLOAD_SECS', 'DECOMPRESS_SECS', 'TRANSFORM_SECS', 'INSERT_SECS', 'COMMIT_SECS', 'TAG_MERGE_SECS', 'FILE_BYTES', 'DATA_BYTES', 'REJECTED_ROWS']
+
+# rows rejected by the database kept in OCI_FOCUS_LOAD_REJECTS per file
+reject_store_max = 1000
+
+# files failed in the run, rejected rows above -rejectpct, the file is
+# recorded FAILED in OCI_FOCUS_LOAD_STATUS and retried with --force
+files_failed = []
+
+# OpenMetrics textfile values, key = (name, labels)
+metrics_prefix = "focus2adw"
+metrics_values = {}
+metrics_lock = threading.Lock()
+
+# -eventport stop request, set by SIGTERM or SIGINT
+event_stop = threading.Event()
+metrics_help = {
+    'files_loaded': 'FOCUS files loaded in the run',
+    'rows_loaded': 'Rows inserted in the run',
+    'bytes_loaded': 'Compressed bytes downloaded in the run',
+    'data_bytes_loaded': 'Uncompressed bytes parsed in the run',
+    'load_seconds': 'Seconds spent loading files',
+    'rows_per_second': 'Rows inserted per second of file load',
+    'bytes_per_second': 'Compressed bytes per second of file load',
+    'phase_seconds': 'Seconds per load phase',
+    'merge_seconds': 'Seconds per post load merge step',
+    'api_calls': 'OCI API calls',
+    'data_lag_seconds': 'Seconds between now and the newest charge period start loaded',
+    'last_file_created_timestamp_seconds': 'Creation time of the last loaded file',
+    'last_update_timestamp_seconds': 'Time the metrics file was written',
+    'run_seconds': 'Run duration in seconds',
+    'run_success': 'Run completed without error (1) or failed (0)',
+    'retention_rows_deleted': 'Rows purged by retention per table',
+    'rows_rejected': 'Rows rejected by the database per file type',
+    'files_failed': 'FOCUS files failed with rejected rows above -rejectpct',
+    'retention_partitions_dropped': 'OCI_FOCUS partitions dropped by retention',
+    'retention_reclaimed_bytes': 'OCI_FOCUS segment bytes reclaimed by retention',
+    'stats_tables_gathered': 'Tables with optimizer statistics gathered after the load',
+    'stats_tables_skipped': 'Tables with changes below the statistics threshold',
+    'events_received': 'Object create events received',
+    'events_skipped': 'Object create events skipped per reason'
+}
+
+# database connection profile of -dbconf / -dbprofile, key: type
+db_profile_keys = {
+    'mode': str,
+    'sdu': int,
+    'stmtcachesize': int,
+    'arraysize': int,
+    'prefetchrows': int,
+    'expire_time': int,
+    'tcp_connect_timeout': float,
+    'config_dir': str,
+    'wallet_location': str,
+    'pool_min': int,
+    'pool_max': int
+}
+db_profile = {}
 
 # create the work dir if not  exist
 if not os.path.exists(work_report_dir):
@@ -130,6 +204,76 @@ def get_time_elapsed(start_time):
     return ", Process Time " + str('{:02d}:{:02d}:{:02d}'.format(round(et // 3600), (round(et % 3600 // 60)), round(et % 60)))
 
 
+##########################################################################
+# Run metrics written as OpenMetrics textfile (-metrics)
+##########################################################################
+def set_metric(name, value, labels=None, add=False):
+    key = (name, tuple(sorted((labels if labels else {}).items())))
+    with metrics_lock:
+        metrics_values[key] = (metrics_values.get(key, 0) + value) if add else value
+
+
+##########################################################################
+# Call api and count it for the metrics
+##########################################################################
+def counted_api_call(api_name, func):
+    def call(*args, **kwargs):
+        set_metric('api_calls', 1, {'api': api_name}, add=True)
+        return func(*args, **kwargs)
+    return call
+
+
+##########################################################################
+# Write metrics textfile, folder will write <prefix>_<tenant>.prom
+##########################################################################
+def write_metrics_file(metrics_file, tenant_name):
+    try:
+        if os.path.isdir(metrics_file):
+            metrics_file = os.path.join(metrics_file, metrics_prefix + "_" + "".join(c if c.isalnum() else "_" for c in tenant_name) + ".prom")
+
+        with metrics_lock:
+            values = dict(metrics_values)
+
+        # derived throughput gauges
+        load_seconds = values.get(('load_seconds', ()), 0)
+        if load_seconds:
+            values[('rows_per_second', ())] = round(values.get(('rows_loaded', ()), 0) / load_seconds, 3)
+            values[('bytes_per_second', ())] = round(values.get(('bytes_loaded', ()), 0) / load_seconds, 3)
+        values[('last_update_timestamp_seconds', ())] = round(time.time(), 3)
+
+        lines = []
+        for name in sorted(set(key[0] for key in values)):
+            lines.append("# HELP " + metrics_prefix + "_" + name + " " + metrics_help.get(name, name.replace("_", " ")))
+            lines.append("# TYPE " + metrics_prefix + "_" + name + " gauge")
+            for key in sorted(k for k in values if k[0] == name):
+                labels = (('tenant', tenant_name),) + key[1]
+                label_str = ",".join(label + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for label, value in labels)
+                lines.append(metrics_prefix + "_" + name + "{" + label_str + "} " + str(values[key]))
+        lines.append("# EOF")
+
+        # write to temp file and rename so the collector never reads a partial file
+        with open(metrics_file + ".tmp", 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(metrics_file + ".tmp", metrics_file)
+
+    except Exception as e:
+        print("\nwrite_metrics_file() - Error writing metrics file " + metrics_file + " - " + str(e))
+
+
+##########################################################################
+# Add loaded file to the metrics
+##########################################################################
+def record_file_metrics(phases, num_rows, start_time, file_time_created):
+    set_metric('files_loaded', 1, add=True)
+    set_metric('rows_loaded', num_rows, add=True)
+    set_metric('bytes_loaded', phases.get('file_bytes', 0), add=True)
+    set_metric('data_bytes_loaded', phases.get('data_bytes', 0), add=True)
+    set_metric('load_seconds', round(time.time() - start_time, 3), add=True)
+    for phase in ('download', 'decompress', 'transform', 'insert', 'commit', 'tag_merge'):
+        set_metric('phase_seconds', phases.get(phase + '_secs', 0), {'phase': phase}, add=True)
+    set_metric('last_file_created_timestamp_seconds', round(file_time_created.timestamp(), 3))
+
+
 ##########################################################################
 # Create signer
 ##########################################################################
@@ -180,7 +324,7 @@ def identity_read_compartments(identity, tenancy):
         all_compartments = []
         try:
             all_compartments = oci.pagination.list_call_get_all_results(
-                identity.list_compartments,
+                counted_api_call('list_compartments', identity.list_compartments),
                 tenancy.id,
                 compartment_id_in_subtree=True
             ).data
@@ -299,6 +443,89 @@ def get_secret_password(config, signer, proxy, secret_id):
         raise SystemExit
 
 
+##########################################################################
+# Database connection profile - section -dbprofile of the -dbconf ini file
+#   mode                 thick or thin driver
+#   sdu                  session data unit in bytes
+#   stmtcachesize        statements cached per session
+#   arraysize            default cursor fetch array size
+#   prefetchrows         default cursor prefetch rows
+#   expire_time          minutes between tcp keepalive probes
+#   tcp_connect_timeout  seconds to establish the connection
+#   config_dir           tnsnames.ora folder for thin mode
+#   wallet_location      ewallet.pem folder for thin mode
+#   pool_min, pool_max   session pool size
+# thick mode reads sdu and keepalive from sqlnet.ora
+##########################################################################
+def load_db_profile(db_conf, db_profile_name, default_mode):
+    global db_profile
+    db_profile = {'mode': default_mode}
+
+    if db_conf:
+        parser = configparser.ConfigParser()
+        if not parser.read(db_conf):
+            print("\nError reading database profile file " + db_conf + ", aborting")
+            raise SystemExit
+
+        if not parser.has_section(db_profile_name) and db_profile_name != configparser.DEFAULTSECT:
+            print("\nDatabase profile " + db_profile_name + " not found in " + db_conf + ", aborting")
+            raise SystemExit
+
+        section = parser[db_profile_name]
+        for key in section:
+            if key not in db_profile_keys:
+                print("   Database profile key " + key + " ignored")
+            elif section[key].strip():
+                try:
+                    db_profile[key] = db_profile_keys[key](section[key].strip())
+                except ValueError:
+                    print("\nDatabase profile key " + key + " value " + section[key] + " is not valid, aborting")
+                    raise SystemExit
+
+    if db_profile['mode'] not in ('thick', 'thin'):
+        print("\nDatabase profile mode must be thick or thin, aborting")
+        raise SystemExit
+
+    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
+    if db_profile['mode'] == 'thick':
+        oracledb.init_oracle_client()
+
+    if 'arraysize' in db_profile:
+        oracledb.defaults.arraysize = db_profile['arraysize']
+    if 'prefetchrows' in db_profile:
+        oracledb.defaults.prefetchrows = db_profile['prefetchrows']
+
+    if db_conf:
+        print("DB Profile   : " + db_profile_name + " - " + ", ".join(key + "=" + str(value) for key, value in db_profile.items()))
+
+
+##########################################################################
+# Connect parameters of the profile, parameters passed override it
+##########################################################################
+def get_db_connect_params(**kwargs):
+    params = {key: db_profile[key] for key in ('sdu', 'stmtcachesize', 'expire_time', 'tcp_connect_timeout', 'config_dir', 'wallet_location') if key in db_profile}
+    params.update({key: value for key, value in kwargs.items() if value})
+    return params
+
+
+##########################################################################
+# Create connection with the profile
+##########################################################################
+def create_db_connection(user, password, dsn, **kwargs):
+    return oracledb.connect(user=user, password=password, dsn=dsn, **get_db_connect_params(**kwargs))
+
+
+##########################################################################
+# Create session pool with the profile, pool_min and pool_max of the
+# profile override the defaults of the caller
+##########################################################################
+def create_db_pool(user, password, dsn, pool_min, pool_max, ping_interval=60):
+    pool_max = max(db_profile.get('pool_max', pool_max), 1)
+    pool_min = min(db_profile.get('pool_min', pool_min), pool_max)
+    increment = 0 if pool_min == pool_max else 1
+    return oracledb.create_pool(user=user, password=password, dsn=dsn, min=pool_min, max=pool_max, increment=increment, ping_interval=ping_interval, **get_db_connect_params())
+
+
 ##########################################################################
 # set parser
 ##########################################################################
@@ -322,16 +549,37 @@ def set_parser_arguments():
     parser.add_argument('-dn', default="", dest='dname', help='ADB Name')
     parser.add_argument('-ds', default="", dest='dsecret_id', help='ADB Secret Id')
     parser.add_argument('-dst', default="", dest='dsecret_profile', help='ADB Secret tenancy profile (local or blank = instant principle)')
-    parser.add_argument('--force', action='store_true', default=False, dest='force', help='Force Update without updated file')
+    parser.add_argument('-dlthreads', default=4, type=int, dest='download_threads', help='Number of parallel ranges to download large files (default=4, 1=disable)')
+    parser.add_argument('-dlpartmb', default=32, type=int, dest='download_part_mb', help='Download range size in MB (default=32)')
+    parser.add_argument('-dryrun', default="", dest='dry_run_folder', help='Dry run - load files to local folder instead of the database')
+    parser.add_argument('-dryrunformat', default="parquet", dest='dry_run_format', choices=['parquet', 'csv'], help='Dry run file format - parquet (requires pyarrow) or gzipped csv (default=parquet)')
+    parser.add_argument('-metrics', default="", dest='metrics_file', help='Write OpenMetrics textfile for node_exporter, folder writes focus2adw_<tenant>.prom')
+    parser.add_argument('-tagsjson', action='store_true', default=False, dest='tags_json', help='Load the Tags JSON to TAGS_JSON column with JSON search index')
+    parser.add_argument('-retainmonths', default=0, type=int, dest='retain_months', help='Purge charges of the tenant older than retain months (default=0, keep all)')
+    parser.add_argument('-retainbatch', default=100000, type=int, dest='retain_batch_rows', help='Rows per delete batch when purging (default=100000)')
+    parser.add_argument('-gatherstats', action='store_true', default=False, dest='gather_stats', help='Gather optimizer statistics of the changed tables after the load')
+    parser.add_argument('-gatherpct', default=10, type=int, dest='gather_stale_pct', help='Skip tables and partitions changed less than pct of their rows (default=10)')
+    parser.add_argument('-event', default="", dest='event_file', help='Load the objects of Object Storage create events from json file, - for stdin')
+    parser.add_argument('-eventport', default=0, type=int, dest='event_port', help='Listen for Object Storage create events posted to http port')
+    parser.add_argument('-eventhost', default="127.0.0.1", dest='event_host', help='Event listener address (default=127.0.0.1)')
+    parser.add_argument('--force', action='store_true', default=False, dest='force', help='Force Update without updated file, retry the files failed with rejected rows')
+    parser.add_argument('-rejectpct', default=0.0, type=float, dest='reject_pct', help='Rejected rows percent of a file allowed before the file fails, rejects kept in OCI_FOCUS_LOAD_REJECTS (default=0, any reject fails the file)')
+    parser.add_argument('-dbconf', default="", dest='db_conf', help='Database connection profile ini file - sdu, stmtcachesize, arraysize, prefetchrows, keepalive, mode, pool')
+    parser.add_argument('-dbprofile', default=configparser.DEFAULTSECT, dest='db_profile', help='Database connection profile section (default=DEFAULT)')
     parser.add_argument('--version', action='version', version='%(prog)s ' + version)
 
     result = parser.parse_args()
 
-    if not (result.duser and result.dsecret_id and result.dname):
+    if not (result.duser and result.dsecret_id and result.dname) and not result.dry_run_folder:
         parser.print_help()
         print_header("You must specify database credentials!!", 0)
         return None
 
+    if (result.event_file or result.event_port) and (result.dry_run_folder or (result.event_file and result.event_port)):
+        parser.print_help()
+        print_header("-event or -eventport cannot be used with -dryrun!!", 0)
+        return None
+
     return result
 
 
@@ -367,10 +615,15 @@ def check_database_index_structure(connection):
 #########################################################################
 # insert load stats
 ##########################################################################
-def insert_load_stats(connection, tenant_name, file_type, file_id, file_name, file_size_mb, file_time, num_rows, start_time_str, batch_id, batch_total):
+def insert_load_stats(connection, tenant_name, file_type, file_id, file_name, file_size_mb, file_time, num_rows, start_time_str, batch_id, batch_total, phases=None, file_status=None):
     try:
+        phases = phases if phases else {}
 
         with connection.cursor() as cursor:
+
+            # the row of a previous failed load of the file is replaced
+            cursor.execute("delete from OCI_FOCUS_LOAD_STATUS where SOURCE_TENANT_NAME=:tenant_name and FILE_NAME=:file_name and FILE_STATUS='FAILED'", tenant_name=tenant_name, file_name=file_name)
+
             sql = """INSERT INTO OCI_FOCUS_LOAD_STATUS
                 (
                     SOURCE_TENANT_NAME,
@@ -384,7 +637,18 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name, fi
                     LOAD_END_TIME,
                     AGENT_VERSION,
                     BATCH_ID,
-                    BATCH_TOTAL
+                    BATCH_TOTAL,
+                    LIST_SECS,
+                    DOWNLOAD_SECS,
+                    DECOMPRESS_SECS,
+                    TRANSFORM_SECS,
+                    INSERT_SECS,
+                    COMMIT_SECS,
+                    TAG_MERGE_SECS,
+                    FILE_BYTES,
+                    DATA_BYTES,
+                    REJECTED_ROWS,
+                    FILE_STATUS
                 ) VALUES (
                     :tenant_name,
                     :file_type,
@@ -397,7 +661,18 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name, fi
                     to_date(:load_end_time,'YYYY-MM-DD HH24:MI:SS'),
                     :agent_version,
                     :batch_id,
-                    :batch_total
+                    :batch_total,
+                    :list_secs,
+                    :download_secs,
+                    :decompress_secs,
+                    :transform_secs,
+                    :insert_secs,
+                    :commit_secs,
+                    :tag_merge_secs,
+                    :file_bytes,
+                    :data_bytes,
+                    :rejected_rows,
+                    :file_status
                     )"""
 
             cursor.execute(
@@ -413,7 +688,9 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name, fi
                 load_end_time=get_current_date_time(),
                 agent_version=version,
                 batch_id=batch_id,
-                batch_total=batch_total)
+                batch_total=batch_total,
+                file_status=file_status,
+                **{column.lower(): phases.get(column.lower()) for column in load_status_phase_columns})
 
             connection.commit()
 
@@ -425,6 +702,57 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name, fi
         raise SystemExit
 
 
+##########################################################################
+# executemany with batcherrors, the rows rejected by the database are
+# added to rejects as (line number, error code, error message, row)
+##########################################################################
+def execute_batch(cursor, sql, data, data_lines, rejects):
+    cursor.executemany(sql, data, batcherrors=True)
+    for error in cursor.getbatcherrors():
+        rejects.append((data_lines[error.offset], error.code, error.message, data[error.offset]))
+
+
+##########################################################################
+# Save rejected rows to OCI_FOCUS_LOAD_REJECTS, committed by the caller
+##########################################################################
+def save_load_rejects(connection, tenant_name, file_id, file_name_full, rejects):
+    try:
+        data = []
+        for line_number, error_code, error_message, row in rejects[0:reject_store_max]:
+            data.append((tenant_name, file_id, file_name_full, line_number, error_code, str(error_message)[0:1000], json.dumps(row, default=str)[0:4000], version))
+
+        with connection.cursor() as cursor:
+            cursor.execute("delete from OCI_FOCUS_LOAD_REJECTS where SOURCE_TENANT_NAME=:tenant_name and FILE_NAME=:file_name", tenant_name=tenant_name, file_name=file_name_full)
+            sql = """INSERT INTO OCI_FOCUS_LOAD_REJECTS (SOURCE_TENANT_NAME, FILE_ID, FILE_NAME, LINE_NUMBER, ERROR_CODE, ERROR_MESSAGE, ROW_DATA, AGENT_VERSION)
+                     VALUES (:1, :2, :3, :4, :5, :6, :7, :8)"""
+            cursor.executemany(sql, data)
+
+    except oracledb.DatabaseError as e:
+        print("\nsave_load_rejects() - Error manipulating database - " + str(e) + "\n")
+
+
+##########################################################################
+# Check the rejected rows of a file against -rejectpct, above it the rows
+# of the file are rolled back and True is returned, the file is recorded
+# as failed by the caller, the rejects are kept
+##########################################################################
+def check_file_rejects(connection, cmd, tenant_name, file_id, file_name_full, rejects, num_rows):
+    reject_pct = len(rejects) * 100 / num_rows if num_rows else 100
+    line_number, error_code, error_message, row = rejects[0]
+    print("   Rejected   " + str(len(rejects)) + " of " + str(num_rows) + " rows (" + str(round(reject_pct, 3)) + "%), first at line " + str(line_number) + " - " + str(error_message))
+    set_metric('rows_rejected', len(rejects), {'file_type': 'FOCUS'}, add=True)
+
+    if reject_pct > cmd.reject_pct:
+        connection.rollback()
+        save_load_rejects(connection, tenant_name, file_id, file_name_full, rejects)
+        connection.commit()
+        print("   Failed     file " + file_name_full + " rejected rows above -rejectpct " + str(cmd.reject_pct) + "%, rows rolled back, see OCI_FOCUS_LOAD_REJECTS, retry with --force")
+        return True
+
+    save_load_rejects(connection, tenant_name, file_id, file_name_full, rejects)
+    return False
+
+
 ##########################################################################
 # update_focus_stats
 ##########################################################################
@@ -505,7 +833,7 @@ def update_focus_stats(connection, tenant_name):
 ##########################################################################
 # update_cost_reference
 ##########################################################################
-def update_focus_reference(connection, tag_special_key1, tag_special_key2, tag_special_key3, tag_special_key4, tenant_name):
+def update_focus_reference(connection, tag_special_key1, tag_special_key2, tag_special_key3, tag_special_key4, tenant_name, rebuild=False):
     try:
         start_time = time.time()
 
@@ -515,6 +843,11 @@ def update_focus_reference(connection, tag_special_key1, tag_special_key2, tag_s
             print("\nMerging statistics into OCI_FOCUS_REFERENCE ...")
             print("   Merging statistics from OCI_FOCUS...")
 
+            # rebuild after retention purge, removed in the same transaction as the merge
+            if rebuild:
+                cursor.execute("delete from OCI_FOCUS_REFERENCE where Source_Tenant_Name = :Source_Tenant_Name and REF_TYPE not like 'TAG_SPECIAL_KEY%'", Source_Tenant_Name=tenant_name)
+                print("   Removed " + str(cursor.rowcount) + " references for rebuild")
+
             #######################################################
             # run merge to OCI_COST_REFERENCE
             #######################################################
@@ -600,7 +933,7 @@ def update_focus_reference(connection, tag_special_key1, tag_special_key2, tag_s
 ##########################################################################
 # Check Table Structure Cost
 ##########################################################################
-def check_database_table_structures(connection):
+def check_database_table_structures(connection, tags_json=False):
     try:
         # open cursor
         with connection.cursor() as cursor:
@@ -618,6 +951,76 @@ def check_database_table_structures(connection):
             else:
                 print("   FOCUS Tables exist")
 
+            # Add load status phase timing columns introduced after the initial table creation.
+            for column_name in load_status_phase_columns:
+                sql = """select count(*) from user_tab_columns
+                         where table_name = 'OCI_FOCUS_LOAD_STATUS'
+                         and column_name = :column_name"""
+                cursor.execute(sql, column_name=column_name)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    print("   Adding " + column_name + " column to OCI_FOCUS_LOAD_STATUS")
+                    cursor.execute("alter table OCI_FOCUS_LOAD_STATUS add " + column_name + " NUMBER")
+                    connection.commit()
+
+            # FAILED for files failed with rejected rows, null for loaded files
+            sql = "select count(*) from user_tab_columns where table_name = 'OCI_FOCUS_LOAD_STATUS' and column_name = 'FILE_STATUS'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+            if val == 0:
+                print("   Adding FILE_STATUS column to OCI_FOCUS_LOAD_STATUS")
+                cursor.execute("alter table OCI_FOCUS_LOAD_STATUS add FILE_STATUS VARCHAR2(20)")
+                connection.commit()
+
+            # Add the rejected rows table introduced after the initial table creation.
+            sql = "select count(*) from user_tables where table_name = 'OCI_FOCUS_LOAD_REJECTS'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+
+            if val == 0:
+                print("   Creating OCI_FOCUS_LOAD_REJECTS table")
+                sql = """create table OCI_FOCUS_LOAD_REJECTS (
+                    SOURCE_TENANT_NAME      VARCHAR2(100) NOT NULL,
+                    FILE_ID                 VARCHAR2(1000),
+                    FILE_NAME               VARCHAR2(1000) NOT NULL,
+                    LINE_NUMBER             NUMBER,
+                    ERROR_CODE              NUMBER,
+                    ERROR_MESSAGE           VARCHAR2(1000),
+                    ROW_DATA                VARCHAR2(4000),
+                    REJECT_TIME             DATE DEFAULT SYSDATE,
+                    AGENT_VERSION           VARCHAR2(30)
+                )"""
+                cursor.execute(sql)
+                cursor.execute("CREATE INDEX OCI_FOCUS_LOAD_REJECTS_1IX ON OCI_FOCUS_LOAD_REJECTS (SOURCE_TENANT_NAME, FILE_NAME)")
+
+            # Add the JSON tags column and its search index if -tagsjson specified
+            if tags_json:
+                sql = """select count(*) from user_tab_columns
+                         where table_name = 'OCI_FOCUS'
+                         and column_name = 'TAGS_JSON'"""
+                cursor.execute(sql)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    print("   Adding TAGS_JSON column to OCI_FOCUS")
+                    cursor.execute("alter table OCI_FOCUS add TAGS_JSON JSON")
+                    connection.commit()
+
+                sql = "select count(*) from user_indexes where table_name = 'OCI_FOCUS' and index_name = 'OCI_FOCUS_TAGS_JIX'"
+                cursor.execute(sql)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    # local index on partitioned OCI_FOCUS so partition drop keeps it usable
+                    cursor.execute("select count(*) from user_part_tables where table_name = 'OCI_FOCUS'")
+                    partitioned, = cursor.fetchone()
+
+                    print("   Creating JSON search index OCI_FOCUS_TAGS_JIX on OCI_FOCUS (TAGS_JSON)")
+                    sql = "CREATE SEARCH INDEX OCI_FOCUS_TAGS_JIX ON OCI_FOCUS (TAGS_JSON) FOR JSON " + ("LOCAL " if partitioned else "") + "PARAMETERS ('SYNC (ON COMMIT)')"
+                    cursor.execute(sql)
+                    print("   Index created.")
+
     except oracledb.DatabaseError as e:
         print("\nError manipulating database at check_database_table_structures() - " + str(e) + "\n")
         raise SystemExit
@@ -711,14 +1114,259 @@ def update_focus_rate_card(connection, tenant_name):
         raise Exception("\nError manipulating database at update_focus_rate_card() - " + str(e))
 
 
+##########################################################################
+# Download object in parallel byte ranges
+# fetch_range(start, end) returns the bytes chunks of the inclusive range,
+# completed ranges are recorded in <file>.parts to resume at range level
+##########################################################################
+def download_ranged(fetch_range, object_size, object_etag, path_filename, part_size, num_threads):
+    ranges = [(start, min(start + part_size, object_size) - 1) for start in range(0, object_size, part_size)]
+    part_filename = path_filename + ".part"
+    progress_filename = path_filename + ".parts"
+    signature = str(object_etag) + ":" + str(object_size) + ":" + str(part_size)
+    lock = threading.Lock()
+
+    # resume only if the previous attempt was for the same object version and part size
+    completed = set()
+    if os.path.exists(part_filename) and os.path.exists(progress_filename):
+        with open(progress_filename, 'r') as f:
+            lines = f.read().splitlines()
+        if lines and lines[0] == signature:
+            completed = set(int(line) for line in lines[1:] if line)
+
+    if not completed:
+        with open(part_filename, 'wb') as f:
+            f.truncate(object_size)
+        with open(progress_filename, 'w') as f:
+            f.write(signature + "\n")
+
+    def download_part(index):
+        start, end = ranges[index]
+        written = 0
+        with open(part_filename, 'r+b') as f:
+            f.seek(start)
+            for chunk in fetch_range(start, end):
+                f.write(chunk)
+                written += len(chunk)
+
+        if written != end - start + 1:
+            raise Exception("Range " + str(start) + "-" + str(end) + " returned " + str(written) + " bytes")
+
+        with lock:
+            with open(progress_filename, 'a') as f:
+                f.write(str(index) + "\n")
+
+    pending = [index for index in range(len(ranges)) if index not in completed]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for future in [executor.submit(download_part, index) for index in pending]:
+            future.result()
+
+    os.replace(part_filename, path_filename)
+    os.remove(progress_filename)
+    return len(pending), len(completed)
+
+
+##########################################################################
+# Raw reader measuring decompress time and uncompressed bytes
+##########################################################################
+class TimedReader(io.RawIOBase):
+    def __init__(self, raw):
+        self.raw = raw
+        self.seconds = 0.0
+        self.bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        start_time = time.perf_counter()
+        size = self.raw.readinto(buffer)
+        self.seconds += time.perf_counter() - start_time
+        self.bytes += size
+        return size
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+##########################################################################
+# Download object to file, large objects are downloaded by ranges
+##########################################################################
+def download_object(object_storage, namespace_name, bucket_name, object_file, path_filename, cmd):
+    part_size = cmd.download_part_mb * 1024 * 1024
+
+    if cmd.download_threads > 1 and object_file.size > part_size:
+
+        def fetch_range(start, end):
+            object_details = counted_api_call('get_object', object_storage.get_object)(namespace_name, bucket_name, object_file.name, range="bytes=" + str(start) + "-" + str(end), if_match=object_file.etag)
+            return object_details.data.raw.stream(1024 * 1024, decode_content=False)
+
+        downloaded, resumed = download_ranged(fetch_range, object_file.size, object_file.etag, path_filename, part_size, cmd.download_threads)
+        if resumed:
+            print("   Resumed    download, " + str(resumed) + " ranges already downloaded, " + str(downloaded) + " ranges downloaded")
+        return
+
+    object_details = counted_api_call('get_object', object_storage.get_object)(namespace_name, bucket_name, object_file.name)
+    with open(path_filename, 'wb') as f:
+        for chunk in object_details.data.raw.stream(1024 * 1024, decode_content=False):
+            f.write(chunk)
+
+
+##########################################################################
+# Get column names and types of the insert statement
+# types are taken from the bind expression - to_date, to_number or varchar
+##########################################################################
+def get_insert_layout(sql):
+    columns_sql, values_sql = re.split(r"\)\s*VALUES\s*\(", sql, maxsplit=1, flags=re.IGNORECASE)
+    columns = [col.strip() for col in columns_sql[columns_sql.index("(") + 1:].split(",")]
+    layout = []
+    for column, bind in zip(columns, re.findall(r"to_date\(:\d+,'[^']*'\)|to_number\(:\d+\)|:\d+", values_sql)):
+        if bind.startswith("to_date"):
+            layout.append((column, 'date', "%Y-%m-%d %H:%M" if "HH24" in bind else "%Y-%m-%d"))
+        elif bind.startswith("to_number"):
+            layout.append((column, 'number', ""))
+        else:
+            layout.append((column, 'varchar', ""))
+    return layout
+
+
+##########################################################################
+# Dry run connection - writes the rows of the main insert to local
+# parquet or gzipped csv files instead of the database, one output file
+# per report file, other statements are ignored
+##########################################################################
+class DryRunCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def execute(self, sql, *args, **kwargs):
+        self.rowcount = 0
+
+    def getbatcherrors(self):
+        return []
+
+    def executemany(self, sql, data, **kwargs):
+        self.rowcount = len(data)
+        if re.match(r"\s*INSERT\s+INTO\s+" + self.connection.table_name + r"\s*\(", sql, flags=re.IGNORECASE):
+            self.connection.write_rows(sql, data)
+
+
+class DryRunConnection(object):
+    def __init__(self, folder, file_format, table_name):
+        self.folder = folder
+        self.file_format = file_format
+        self.table_name = table_name
+        self.layout = None
+        self.path_filename = ""
+        self.writer = None
+        self.file_out = None
+        self.pending = []
+
+        if file_format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+                self.pyarrow = pyarrow
+                self.parquet = pyarrow.parquet
+            except ImportError:
+                print("\nDry run to parquet requires pyarrow, please install pyarrow (pip3 install pyarrow) or use -dryrunformat csv")
+                raise SystemExit
+
+        os.makedirs(folder, exist_ok=True)
+
+    def cursor(self):
+        return DryRunCursor(self)
+
+    def write_rows(self, sql, data):
+        if not data:
+            return
+        if not self.layout:
+            self.layout = get_insert_layout(sql)
+
+        # TAGS_JSON is bound as dict, written as json text
+        json_positions = [index for index, column in enumerate(self.layout) if column[0] == 'TAGS_JSON']
+        if json_positions:
+            data = [tuple(json.dumps(value) if index in json_positions and value is not None else value for index, value in enumerate(row)) for row in data]
+
+        # open output file for the report file of the rows (file id is the second column)
+        if not self.path_filename:
+            self.path_filename = os.path.join(self.folder, self.table_name.lower() + "_" + str(data[0][1]) + (".parquet" if self.file_format == "parquet" else ".csv.gz"))
+            if self.file_format == "csv":
+                self.file_out = gzip.open(self.path_filename + ".tmp", 'wt', newline='')
+                self.writer = csv.writer(self.file_out)
+                self.writer.writerow([col[0] for col in self.layout])
+
+        if self.file_format == "csv":
+            self.writer.writerows(data)
+        else:
+            self.pending.extend(data)
+            if len(self.pending) >= 100000:
+                self.flush_parquet()
+
+    def flush_parquet(self):
+        pa = self.pyarrow
+        if not self.writer:
+            types = {'date': pa.timestamp('s'), 'number': pa.float64(), 'varchar': pa.string()}
+            self.schema = pa.schema([(col[0], types[col[1]]) for col in self.layout])
+            self.writer = self.parquet.ParquetWriter(self.path_filename + ".tmp", self.schema, compression='zstd')
+
+        arrays = []
+        for index, (column, column_type, date_format) in enumerate(self.layout):
+            values = [row[index] for row in self.pending]
+            if column_type == 'date':
+                values = [datetime.datetime.strptime(v, date_format) if v else None for v in values]
+            elif column_type == 'number':
+                values = [float(v) if v not in ("", None) else None for v in values]
+            else:
+                values = [str(v) if v not in ("", None) else None for v in values]
+            arrays.append(pa.array(values, type=self.schema.field(index).type))
+
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.pending = []
+
+    # commit closes the current output file
+    def commit(self):
+        if not self.path_filename:
+            return
+        if self.file_format == "csv":
+            self.file_out.close()
+        else:
+            if self.pending or not self.writer:
+                self.flush_parquet()
+            self.writer.close()
+        os.replace(self.path_filename + ".tmp", self.path_filename)
+        print("   Dry Run    written " + self.path_filename)
+        self.path_filename = ""
+        self.writer = None
+        self.file_out = None
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
 #########################################################################
 # Load Cost File
 ##########################################################################
-def load_focus_file(connection, object_storage, object_file, max_file_name, cmd, tenancy, compartments, file_num, total_files, focus_namespace_name, focus_bucket_name):
+def load_focus_file(connection, object_storage, object_file, max_file_name, cmd, tenancy, compartments, file_num, total_files, focus_namespace_name, focus_bucket_name, list_secs=0):
     start_time = time.time()
     start_time_str = get_current_date_time()
     num_files = 0
     num_rows = 0
+    phases = {'list_secs': round(list_secs, 3), 'tag_merge_secs': 0, 'file_bytes': object_file.size}
 
     try:
         o = object_file
@@ -757,13 +1405,14 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
         print("\n   Processing file '" + file_name_full + "' - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files))
 
         # download file
-        object_details = object_storage.get_object(focus_namespace_name, focus_bucket_name, o.name)
-        with open(path_filename, 'wb') as f:
-            for chunk in object_details.data.raw.stream(1024 * 1024, decode_content=False):
-                f.write(chunk)
-
-        # Read file to variable
-        with gzip.open(path_filename, 'rt') as file_in:
+        phase_time = time.perf_counter()
+        download_object(object_storage, focus_namespace_name, focus_bucket_name, o, path_filename, cmd)
+        phases['download_secs'] = round(time.perf_counter() - phase_time, 3)
+
+        # Read file to variable, decompress time is measured by the raw reader
+        gzip_reader = TimedReader(gzip.GzipFile(path_filename, 'rb'))
+        insert_secs = 0.0
+        with io.TextIOWrapper(io.BufferedReader(gzip_reader)) as file_in:
             csv_reader = csv.DictReader(file_in)
 
             # Adjust the batch size to meet memory and performance requirements for cx_oracle
@@ -845,7 +1494,8 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
                 Tag_Special1                     ,
                 Tag_Special2                     ,
                 Tag_Special3                     ,
-                Tag_Special4
+                Tag_Special4""" + (""",
+                TAGS_JSON""" if cmd.tags_json else "") + """
             ) VALUES (
                 :1,
                 :2,
@@ -921,16 +1571,24 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
                 :72,
                 :73,
                 :74,
-                :75
+                :75""" + (""",
+                :76""" if cmd.tags_json else "") + """
             ) """
 
             # insert bulk to database
             with connection.cursor() as cursor:
 
-                # Predefine the memory areas to match the table definition
-                cursor.setinputsizes(None, array_size)
+                # Predefine the memory areas to match the table definition, TAGS_JSON is bound as JSON
+                input_sizes = [None, array_size]
+                if cmd.tags_json:
+                    tags_json_position = [column[0] for column in get_insert_layout(sql)].index('TAGS_JSON')
+                    input_sizes += [None] * (tags_json_position - len(input_sizes)) + [oracledb.DB_TYPE_JSON]
+                cursor.setinputsizes(*input_sizes)
 
+                phase_time = time.perf_counter()
                 data = []
+                data_lines = []
+                rejects = []
                 for row in csv_reader:
 
                     # find compartment path
@@ -947,6 +1605,7 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
                     tag_special3 = ""
                     tag_special4 = ""
                     tags_data = ""
+                    row_tags_json = None
 
                     row_tags_data = row['Tags']
                     if len(row_tags_data) > 0:
@@ -1164,19 +1823,46 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
                         Tag_Special3,
                         Tag_Special4,
                     )
+                    # Tags column of the file is already parsed, bound as JSON
+                    if cmd.tags_json:
+                        row_data += (row_tags_json if row_tags_json else None,)
                     data.append(row_data)
+                    data_lines.append(csv_reader.line_num)
                     num_rows += 1
 
                     # executemany every batch size
                     if len(data) % batch_size == 0:
-                        cursor.executemany(sql, data)
+                        insert_time = time.perf_counter()
+                        execute_batch(cursor, sql, data, data_lines, rejects)
+                        insert_secs += time.perf_counter() - insert_time
                         data = []
+                        data_lines = []
 
                 # if data exist final execute
                 if data:
-                    cursor.executemany(sql, data)
-
+                    insert_time = time.perf_counter()
+                    execute_batch(cursor, sql, data, data_lines, rejects)
+                    insert_secs += time.perf_counter() - insert_time
+
+                # rows rejected by the database, the file fails above -rejectpct
+                phases['rejected_rows'] = len(rejects)
+                if rejects and check_file_rejects(connection, cmd, str(tenancy.name), file_id, file_name_full, rejects, num_rows):
+                    os.remove(path_filename)
+                    insert_load_stats(connection, str(tenancy.name), 'FOCUS', file_id, file_name_full, file_size_mb, file_time, 0, start_time_str, file_num, total_files, phases, 'FAILED')
+                    files_failed.append(file_name_full)
+                    set_metric('files_failed', 1, add=True)
+                    return num_files
+                num_rows -= len(rejects)
+
+                read_secs = time.perf_counter() - phase_time
+                phases['decompress_secs'] = round(gzip_reader.seconds, 3)
+                phases['insert_secs'] = round(insert_secs, 3)
+                phases['transform_secs'] = round(max(0.0, read_secs - gzip_reader.seconds - insert_secs), 3)
+                phases['data_bytes'] = gzip_reader.bytes
+
+                phase_time = time.perf_counter()
                 connection.commit()
+                phases['commit_secs'] = round(time.perf_counter() - phase_time, 3)
                 print("   Completed  file '" + file_name_full + "' - " + str(num_rows) + " Rows Inserted" + get_time_elapsed(start_time), end="")
 
         num_files += 1
@@ -1193,6 +1879,7 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
             data.append(row_data)
 
         if data:
+            phase_time = time.perf_counter()
             with connection.cursor() as cursor:
                 sql = """INSERT INTO OCI_FOCUS_TAG_KEYS (SOURCE_TENANT_NAME , TAG_KEY)
                          SELECT :1, :2 FROM DUAL
@@ -1202,13 +1889,17 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
                 cursor.executemany(sql, data)
                 connection.commit()
                 print(", " + str(len(data)) + " Tags Merged.")
+            phases['tag_merge_secs'] = round(time.perf_counter() - phase_time, 3)
         else:
             print("")
 
+        print("   Phases     download " + str(phases['download_secs']) + "s, decompress " + str(phases['decompress_secs']) + "s, transform " + str(phases['transform_secs']) + "s, insert " + str(phases['insert_secs']) + "s, commit " + str(phases['commit_secs']) + "s")
+
         #######################################
         # insert load stats
         #######################################
-        insert_load_stats(connection, str(tenancy.name), 'FOCUS', file_id, file_name_full, file_size_mb, file_time, num_rows, start_time_str, file_num, total_files)
+        insert_load_stats(connection, str(tenancy.name), 'FOCUS', file_id, file_name_full, file_size_mb, file_time, num_rows, start_time_str, file_num, total_files, phases)
+        record_file_metrics(phases, num_rows, start_time, o.time_created)
         return num_files
 
     except oracledb.DatabaseError as e:
@@ -1220,6 +1911,546 @@ def load_focus_file(connection, object_storage, object_file, max_file_name, cmd,
         raise SystemExit
 
 
+##########################################################################
+# Dry run - list, download and transform FOCUS files to local files
+# files already written to the dry run folder are skipped
+##########################################################################
+def dry_run_process(cmd, config, signer, tenancy, compartments, focus_namespace_name, focus_bucket_name):
+    try:
+        print_header("Dry Run to " + cmd.dry_run_folder + " (" + cmd.dry_run_format + ")", 0)
+        connection = DryRunConnection(cmd.dry_run_folder, cmd.dry_run_format, "OCI_FOCUS")
+        extension = ".parquet" if cmd.dry_run_format == "parquet" else ".csv.gz"
+
+        object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
+        if cmd.proxy:
+            object_storage.base_client.session.proxies = {'https': cmd.proxy}
+
+        print("\nHandling FOCUS Report... started at " + get_current_date_time())
+        list_time = time.perf_counter()
+        objects = oci.pagination.list_call_get_all_results(
+            counted_api_call('list_objects', object_storage.list_objects),
+            focus_namespace_name,
+            focus_bucket_name,
+            fields="timeCreated,size,etag",
+            prefix="FOCUS Reports/"
+        ).data
+        list_secs = time.perf_counter() - list_time
+
+        total_files_loaded = 0
+        total_files = len(objects.objects)
+        print("Total " + str(total_files) + " FOCUS files found to scan...")
+        for index, object_file in enumerate(objects.objects, start=1):
+            file_id = object_file.name.rsplit('/', 1)[-1][:-7]
+            if os.path.exists(os.path.join(cmd.dry_run_folder, "oci_focus_" + file_id + extension)):
+                print("   Skipping   file '" + object_file.name + "', #" + str(index) + "/" + str(total_files) + ", already written to dry run folder")
+                continue
+            total_files_loaded += load_focus_file(connection, object_storage, object_file, "", cmd, tenancy, compartments, index, total_files, focus_namespace_name, focus_bucket_name, list_secs)
+
+        print("\nTotal " + str(total_files_loaded) + " FOCUS files written to " + cmd.dry_run_folder)
+
+    except oci.exceptions.ServiceError as e:
+        print("\ndry_run_process() - Error listing FOCUS files - " + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Run post load merge step and record its duration
+##########################################################################
+def run_timed_merge(step, func, *args):
+    start_time = time.time()
+    result = func(*args)
+    set_metric('merge_seconds', round(time.time() - start_time, 3), {'step': step})
+    return result
+
+
+##########################################################################
+# get segment size of table and its indexes in bytes
+##########################################################################
+def get_segment_bytes(cursor, table_name):
+    sql = """select nvl(sum(bytes),0) from user_segments
+             where segment_name = :table_name
+             or segment_name in (select index_name from user_indexes where table_name = :table_name)"""
+    cursor.execute(sql, table_name=table_name)
+    val, = cursor.fetchone()
+    return val
+
+
+##########################################################################
+# Retention - purge OCI_FOCUS older than retain months for the tenant
+# Drop monthly partitions owned only by the tenant, batched delete for
+# the rest, then clean OCI_FOCUS_STATS and OCI_FOCUS_LOAD_STATUS
+##########################################################################
+def apply_retention(connection, tenant_name, retain_months, batch_rows):
+    try:
+        start_time = time.time()
+        total_rows = 0
+
+        with connection.cursor() as cursor:
+
+            cursor.execute("select to_char(add_months(trunc(sysdate,'MM'), -:retain_months),'YYYY-MM-DD') from dual", retain_months=retain_months)
+            cutoff_date, = cursor.fetchone()
+            print("\nApplying retention of " + str(retain_months) + " months, purging charges before " + cutoff_date + "...")
+
+            bytes_before = get_segment_bytes(cursor, 'OCI_FOCUS')
+            binds = {'tenant_name': tenant_name, 'cutoff_date': cutoff_date}
+
+            ############################################
+            # drop partitions if OCI_FOCUS range partitioned by Charge_Period_Start
+            ############################################
+            sql = """select count(*) from user_part_tables t, user_part_key_columns c
+                     where t.table_name = 'OCI_FOCUS' and t.partitioning_type = 'RANGE'
+                     and c.name = t.table_name and c.object_type = 'TABLE' and c.column_position = 1 and c.column_name = 'CHARGE_PERIOD_START'"""
+            cursor.execute(sql)
+            partitioned, = cursor.fetchone()
+
+            partitions_dropped = 0
+            if partitioned:
+                sql = "select to_char(trunc(min(Charge_Period_Start),'MM'),'YYYY-MM-DD') from OCI_FOCUS where Source_Tenant_Name = :tenant_name and Charge_Period_Start < to_date(:cutoff_date,'YYYY-MM-DD')"
+                cursor.execute(sql, binds)
+                month, = cursor.fetchone()
+
+                while month and month < cutoff_date:
+                    # partition holds other tenants, keep for batched delete
+                    sql = """select count(*) from OCI_FOCUS
+                             where Charge_Period_Start >= to_date(:month,'YYYY-MM-DD') and Charge_Period_Start < add_months(to_date(:month,'YYYY-MM-DD'),1)
+                             and Source_Tenant_Name <> :tenant_name and rownum = 1"""
+                    cursor.execute(sql, month=month, tenant_name=tenant_name)
+                    other_tenants, = cursor.fetchone()
+
+                    if not other_tenants:
+                        try:
+                            cursor.execute("alter table OCI_FOCUS drop partition for (to_date('" + month + "','YYYY-MM-DD')) update indexes")
+                            partitions_dropped += 1
+                            print("   Dropped OCI_FOCUS partition for " + month[0:7])
+                        except oracledb.DatabaseError as e:
+                            print("   OCI_FOCUS partition for " + month[0:7] + " not dropped, will be deleted - " + str(e))
+
+                    next_month = datetime.datetime.strptime(month, "%Y-%m-%d") + datetime.timedelta(days=32)
+                    month = next_month.strftime("%Y-%m-01")
+
+                set_metric('retention_partitions_dropped', partitions_dropped)
+
+            ############################################
+            # batched delete for the remaining rows
+            ############################################
+            focus_rows = 0
+            sql = "delete from OCI_FOCUS where Source_Tenant_Name = :tenant_name and Charge_Period_Start < to_date(:cutoff_date,'YYYY-MM-DD') and rownum <= :batch_rows"
+            while True:
+                cursor.execute(sql, tenant_name=tenant_name, cutoff_date=cutoff_date, batch_rows=batch_rows)
+                deleted = cursor.rowcount
+                connection.commit()
+                focus_rows += deleted
+                if deleted:
+                    print("   Deleted " + str(focus_rows) + " rows from OCI_FOCUS" + get_time_elapsed(start_time))
+                if deleted < batch_rows:
+                    break
+
+            set_metric('retention_rows_deleted', focus_rows, {'table': 'OCI_FOCUS'})
+            total_rows += focus_rows
+
+            ############################################
+            # OCI_FOCUS_STATS
+            ############################################
+            sql = "delete from OCI_FOCUS_STATS where Source_Tenant_Name = :tenant_name and Charge_Period_Start < to_date(:cutoff_date,'YYYY-MM-DD')"
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_FOCUS_STATS")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_FOCUS_STATS'})
+            total_rows += cursor.rowcount
+
+            ############################################
+            # OCI_FOCUS_LOAD_STATUS - keep the last loaded file of each folder, it is the start point of the next load
+            ############################################
+            sql = """delete from OCI_FOCUS_LOAD_STATUS
+                     where Source_Tenant_Name = :tenant_name and FILE_DATE < to_date(:cutoff_date,'YYYY-MM-DD')
+                     and FILE_NAME not in (
+                        select max(FILE_NAME) from OCI_FOCUS_LOAD_STATUS where Source_Tenant_Name = :tenant_name and FILE_STATUS is null
+                        group by substr(FILE_NAME, 1, instr(FILE_NAME, '/', -1))
+                     )"""
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_FOCUS_LOAD_STATUS")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_FOCUS_LOAD_STATUS'})
+
+            ############################################
+            # OCI_FOCUS_LOAD_REJECTS
+            ############################################
+            sql = "delete from OCI_FOCUS_LOAD_REJECTS where Source_Tenant_Name = :tenant_name and REJECT_TIME < to_date(:cutoff_date,'YYYY-MM-DD')"
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_FOCUS_LOAD_REJECTS")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_FOCUS_LOAD_REJECTS'})
+            connection.commit()
+
+            bytes_after = get_segment_bytes(cursor, 'OCI_FOCUS')
+            reclaimed = max(0, bytes_before - bytes_after)
+            set_metric('retention_reclaimed_bytes', reclaimed)
+
+            print("   OCI_FOCUS segments " + str(round(bytes_before / 1024 / 1024, 1)) + " MB before, " + str(round(bytes_after / 1024 / 1024, 1)) + " MB after, " + str(round(reclaimed / 1024 / 1024, 1)) + " MB reclaimed")
+            if focus_rows:
+                print("   Space of deleted rows is reused by the next loads")
+            print("   Retention Completed, " + str(partitions_dropped) + " partitions dropped, " + str(total_rows) + " rows deleted" + get_time_elapsed(start_time))
+
+            return partitions_dropped + total_rows
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at apply_retention() - " + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        raise Exception("\nError manipulating database at apply_retention() - " + str(e))
+
+
+##########################################################################
+# Gather optimizer statistics of the tables changed by the run
+# Tables or partitions with DML below stale_pct percent of their rows
+# since the last gather are skipped, partitioned tables use incremental
+# statistics so only the changed partitions are scanned
+##########################################################################
+def gather_changed_stats(connection, tables, stale_pct):
+    try:
+        start_time = time.time()
+        print("\nGathering statistics of tables changed more than " + str(stale_pct) + "%...")
+
+        with connection.cursor() as cursor:
+
+            # flush the DML monitoring to user_tab_modifications
+            try:
+                cursor.execute("begin dbms_stats.flush_database_monitoring_info; end;")
+            except oracledb.DatabaseError as e:
+                print("   Monitoring info not flushed, using the last flushed changes - " + str(e))
+
+            # changes of the table and its partitions since the last gather
+            sql = """select s.partition_name, nvl(s.num_rows,0), s.last_analyzed,
+                            nvl(m.inserts + m.updates + m.deletes, 0), nvl(m.truncated,'NO')
+                     from user_tab_statistics s
+                     left join user_tab_modifications m on m.table_name = s.table_name and nvl(m.partition_name,'-') = nvl(s.partition_name,'-') and m.subpartition_name is null
+                     where s.table_name = :table_name and s.object_type in ('TABLE','PARTITION')"""
+
+            gathered = 0
+            skipped = 0
+            for table_name in tables:
+                cursor.execute(sql, table_name=table_name)
+                rows = cursor.fetchall()
+                partitions = [row for row in rows if row[0]]
+                segments = partitions if partitions else rows
+
+                changed = [row for row in segments if not row[2] or row[4] == 'YES' or row[3] * 100 >= row[1] * stale_pct]
+                changes = sum(row[3] for row in segments)
+                num_rows = sum(row[1] for row in segments)
+
+                if not changed:
+                    print("   " + table_name.ljust(22) + " skipped, " + str(changes) + " changes of " + str(num_rows) + " rows")
+                    skipped += 1
+                    continue
+
+                table_time = time.time()
+
+                # incremental statistics keep the partition synopses, the
+                # global statistics are derived without scanning the table
+                if partitions:
+                    cursor.execute("select dbms_stats.get_prefs('INCREMENTAL', user, :table_name), dbms_stats.get_prefs('STALE_PERCENT', user, :table_name) from dual", table_name=table_name)
+                    incremental, table_stale_pct = cursor.fetchone()
+                    if incremental != 'TRUE':
+                        cursor.execute("begin dbms_stats.set_table_prefs(user, :table_name, 'INCREMENTAL', 'TRUE'); end;", table_name=table_name)
+                    if table_stale_pct != str(stale_pct):
+                        cursor.execute("begin dbms_stats.set_table_prefs(user, :table_name, 'STALE_PERCENT', :stale_pct); end;", table_name=table_name, stale_pct=str(stale_pct))
+
+                sql_gather = """begin dbms_stats.gather_table_stats(ownname => user, tabname => :table_name,
+                                estimate_percent => dbms_stats.auto_sample_size, method_opt => 'FOR ALL COLUMNS SIZE 1',
+                                granularity => 'AUTO', cascade => TRUE, degree => dbms_stats.auto_degree); end;"""
+                cursor.execute(sql_gather, table_name=table_name)
+                gathered += 1
+
+                if partitions:
+                    print("   " + table_name.ljust(22) + " gathered, " + str(len(changed)) + " of " + str(len(partitions)) + " partitions changed" + get_time_elapsed(table_time))
+                else:
+                    print("   " + table_name.ljust(22) + " gathered, " + str(changes) + " changes of " + str(num_rows) + " rows" + get_time_elapsed(table_time))
+
+            set_metric('stats_tables_gathered', gathered)
+            set_metric('stats_tables_skipped', skipped)
+            print("   Statistics Completed, " + str(gathered) + " tables gathered, " + str(skipped) + " skipped" + get_time_elapsed(start_time))
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at gather_changed_stats() - " + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        raise Exception("\nError manipulating database at gather_changed_stats() - " + str(e))
+
+
+##########################################################################
+# Data lag - now minus newest charge period start loaded
+##########################################################################
+def get_data_lag_seconds(connection, tenant_name):
+    try:
+        with connection.cursor() as cursor:
+            sql = """select round((cast(sys_extract_utc(systimestamp) as date) - max(Charge_Period_Start)) * 86400)
+                     from OCI_FOCUS_STATS where Source_Tenant_Name = :tenant_name"""
+            cursor.execute(sql, tenant_name=tenant_name)
+            val, = cursor.fetchone()
+            return val if val is not None else 0
+
+    except oracledb.DatabaseError as e:
+        print("\nget_data_lag_seconds() - Error manipulating database - " + str(e) + "\n")
+        return 0
+
+
+##########################################################################
+# Merges from OCI_FOCUS of the loaded files
+##########################################################################
+def update_loaded_files_merges(connection, cmd, tenancy, files_loaded):
+
+    #############################
+    # Update oci_cost_stats if
+    # there were files
+    #############################
+    if files_loaded > 0 or cmd.force:
+        run_timed_merge('rate_card', update_focus_rate_card, connection, tenancy.name)
+        run_timed_merge('focus_stats', update_focus_stats, connection, tenancy.name)
+        run_timed_merge('focus_reference', update_focus_reference, connection, cmd.tagspecial1, cmd.tagspecial2, cmd.tagspecial3, cmd.tagspecial4, tenancy.name)
+
+
+##########################################################################
+# Retention and statistics after the merges
+##########################################################################
+def run_maintenance_steps(connection, cmd, tenancy):
+
+    #############################
+    # if -retainmonths specified
+    # purge old charges and rebuild
+    # the references
+    #############################
+    if cmd.retain_months > 0:
+        purged = run_timed_merge('retention', apply_retention, connection, tenancy.name, cmd.retain_months, cmd.retain_batch_rows)
+        if purged:
+            run_timed_merge('focus_reference', update_focus_reference, connection, cmd.tagspecial1, cmd.tagspecial2, cmd.tagspecial3, cmd.tagspecial4, tenancy.name, True)
+
+    #############################
+    # if -gatherstats specified
+    # gather the changed tables
+    #############################
+    if cmd.gather_stats:
+        stats_tables = ['OCI_FOCUS', 'OCI_FOCUS_STATS', 'OCI_FOCUS_REFERENCE', 'OCI_FOCUS_TAG_KEYS', 'OCI_FOCUS_RATE_CARD', 'OCI_FOCUS_LOAD_STATUS']
+        run_timed_merge('gather_stats', gather_changed_stats, connection, stats_tables, cmd.gather_stale_pct)
+
+
+##########################################################################
+# Parse Object Storage create events to objects to load
+# OCI Events - data.resourceName, data.additionalDetails namespace,
+# bucketName and eTag, or flat - namespace, bucket, object, size, etag,
+# timeCreated, payload can be an event or a list of events
+##########################################################################
+def parse_object_events(payload, focus_namespace_name, focus_bucket_name):
+    objects = []
+    for event in (payload if isinstance(payload, list) else [payload]):
+        if not isinstance(event, dict):
+            continue
+
+        event_type = str(event.get('eventType', event.get('type', '')))
+        if event_type and not event_type.endswith('createobject'):
+            set_metric('events_skipped', 1, {'reason': 'event_type'}, add=True)
+            continue
+
+        data = event.get('data') if isinstance(event.get('data'), dict) else event
+        details = data.get('additionalDetails') if isinstance(data.get('additionalDetails'), dict) else {}
+        name = data.get('resourceName', data.get('object', data.get('name', '')))
+        if not name:
+            set_metric('events_skipped', 1, {'reason': 'no_object'}, add=True)
+            continue
+
+        time_created = None
+        event_time = str(data.get('timeCreated', event.get('eventTime', event.get('time', ''))))
+        try:
+            time_created = datetime.datetime.strptime(event_time[0:19], "%Y-%m-%dT%H:%M:%S")
+        except ValueError:
+            pass
+
+        objects.append({
+            'namespace': details.get('namespace', data.get('namespace', focus_namespace_name)),
+            'bucket': details.get('bucketName', data.get('bucket', focus_bucket_name)),
+            'name': name,
+            'size': data.get('size'),
+            'etag': details.get('eTag', data.get('etag', '')),
+            'time_created': time_created
+        })
+    return objects
+
+
+##########################################################################
+# Read events from json file or stdin, json document or json lines
+##########################################################################
+def read_event_file(event_file):
+    if event_file == "-":
+        text = sys.stdin.read()
+    else:
+        with open(event_file, 'r') as f:
+            text = f.read()
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+##########################################################################
+# Event listener - POST of event json queued to the load, 202 returned
+##########################################################################
+class EventRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            self.server.event_queue.put(payload)
+            self.send_response(202)
+            self.end_headers()
+            self.wfile.write(b'{"status": "queued"}')
+
+        except Exception as e:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+
+    def log_message(self, format, *args):
+        print("   Event Listener " + self.address_string() + " - " + (format % args))
+
+
+##########################################################################
+# Load the objects of create events, duplicate events and objects
+# already in OCI_FOCUS_LOAD_STATUS are skipped, size and creation time missing
+# from the event are read with head_object
+##########################################################################
+def load_event_objects(connection, object_storage, events, loaded_events, cmd, tenancy, clients):
+    files_loaded = 0
+    for index, event in enumerate(events, start=1):
+        set_metric('events_received', 1, add=True)
+        event_key = (event['namespace'], event['bucket'], event['name'], event['etag'])
+
+        if event_key in loaded_events:
+            print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", Duplicate event")
+            set_metric('events_skipped', 1, {'reason': 'duplicate'}, add=True)
+            continue
+
+        if not event['name'].startswith(focus_file_prefix) or not event['name'].endswith(".csv.gz"):
+            print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", Not a FOCUS file")
+            set_metric('events_skipped', 1, {'reason': 'not_focus_file'}, add=True)
+            continue
+
+        with connection.cursor() as cursor:
+            # files failed with rejected rows are loaded again only with --force
+            sql = "select count(*) from OCI_FOCUS_LOAD_STATUS where SOURCE_TENANT_NAME=:tenant_name and FILE_NAME=:file_name"
+            if cmd.force:
+                sql += " and FILE_STATUS is null"
+            cursor.execute(sql, tenant_name=str(tenancy.name), file_name=event['name'])
+            already_loaded, = cursor.fetchone()
+
+        if already_loaded:
+            print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", File already loaded")
+            set_metric('events_skipped', 1, {'reason': 'loaded'}, add=True)
+            loaded_events.add(event_key)
+            continue
+
+        if event['size'] is None or event['time_created'] is None:
+            try:
+                headers = counted_api_call('head_object', object_storage.head_object)(event['namespace'], event['bucket'], event['name']).headers
+            except oci.exceptions.ServiceError as e:
+                print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", Object not found - " + str(e.status))
+                set_metric('events_skipped', 1, {'reason': 'not_found'}, add=True)
+                continue
+            event['size'] = int(headers['content-length'])
+            event['etag'] = event['etag'] or headers.get('etag', '')
+            event['time_created'] = email.utils.parsedate_to_datetime(headers['last-modified']).replace(tzinfo=None)
+
+        if clients['compartments'] is None:
+            clients['compartments'] = identity_read_compartments(clients['identity'], tenancy)
+            clients['compartments_time'] = time.time()
+
+        object_file = oci.object_storage.models.ObjectSummary(name=event['name'], size=int(event['size']), etag=event['etag'], time_created=event['time_created'])
+        loaded = load_focus_file(connection, object_storage, object_file, "", cmd, tenancy, clients['compartments'], index, len(events), event['namespace'], event['bucket'])
+        files_loaded += loaded
+        if loaded:
+            loaded_events.add(event_key)
+            if cmd.metrics_file:
+                write_metrics_file(cmd.metrics_file, str(tenancy.name))
+
+    return files_loaded
+
+
+##########################################################################
+# Event ingest - load exactly the objects of the create events from
+# -event file / stdin, or from -eventport listener until SIGTERM, the
+# merges run after each batch of events
+##########################################################################
+def event_process(connection, cmd, config, signer, tenancy, focus_namespace_name, focus_bucket_name, clients):
+
+    print("\nConnecting to Object Storage Service...")
+    object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
+    if cmd.proxy:
+        object_storage.base_client.session.proxies = {'https': cmd.proxy}
+    print("   Connected")
+
+    loaded_events = set()
+    total_files_loaded = 0
+
+    ############################################
+    # events from file or stdin - one batch
+    ############################################
+    if cmd.event_file:
+        print_header("Loading Object Create Events from " + ("stdin" if cmd.event_file == "-" else cmd.event_file), 0)
+        events = parse_object_events(read_event_file(cmd.event_file), focus_namespace_name, focus_bucket_name)
+        print("Total " + str(len(events)) + " object events to load...")
+
+        total_files_loaded = load_event_objects(connection, object_storage, events, loaded_events, cmd, tenancy, clients)
+        print("\n   Total " + str(total_files_loaded) + " FOCUS Files Loaded, completed at " + get_current_date_time())
+
+        check_database_index_structure(connection)
+        update_loaded_files_merges(connection, cmd, tenancy, total_files_loaded)
+        run_maintenance_steps(connection, cmd, tenancy)
+        return total_files_loaded
+
+    ############################################
+    # events from http listener
+    ############################################
+    def stop_handler(signum, frame):
+        print("\nSignal " + str(signum) + " received, stopping the event listener... at " + get_current_date_time())
+        event_stop.set()
+
+    signal.signal(signal.SIGTERM, stop_handler)
+    signal.signal(signal.SIGINT, stop_handler)
+
+    server = http.server.ThreadingHTTPServer((cmd.event_host, cmd.event_port), EventRequestHandler)
+    server.event_queue = queue.Queue()
+    listener = threading.Thread(target=server.serve_forever, daemon=True)
+    listener.start()
+    print_header("Listening for Object Create Events on http://" + cmd.event_host + ":" + str(cmd.event_port) + "/", 0)
+
+    try:
+        while not event_stop.is_set():
+            try:
+                payload = server.event_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            # batch all the events queued
+            events = parse_object_events(payload, focus_namespace_name, focus_bucket_name)
+            while not server.event_queue.empty():
+                events += parse_object_events(server.event_queue.get(), focus_namespace_name, focus_bucket_name)
+
+            print("\nReceived " + str(len(events)) + " object events at " + get_current_date_time())
+            batch_files = load_event_objects(connection, object_storage, events, loaded_events, cmd, tenancy, clients)
+            if batch_files:
+                check_database_index_structure(connection)
+                update_loaded_files_merges(connection, cmd, tenancy, batch_files)
+                if cmd.metrics_file:
+                    set_metric('data_lag_seconds', get_data_lag_seconds(connection, str(tenancy.name)))
+                    write_metrics_file(cmd.metrics_file, str(tenancy.name))
+            total_files_loaded += batch_files
+            print("   Total " + str(total_files_loaded) + " FOCUS Files Loaded since start, waiting for events...")
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return total_files_loaded
+
+
 ##########################################################################
 # Main
 ##########################################################################
@@ -1239,19 +2470,25 @@ def main_process():
     # Start
     ############################################
     print_header("Running Focus Load to ADW", 0)
+    run_start_time = time.time()
     print("Starts at " + get_current_date_time())
     print("Command Line : " + get_command_line())
 
     ############################################
     # Identity extract compartments
     ############################################
-    secret_config, secret_signer = create_secret_signer(cmd)
-    dbpass = get_secret_password(secret_config, secret_signer, cmd.proxy, cmd.dsecret_id)
+    dbpass = ""
+    if not cmd.dry_run_folder:
+        load_db_profile(cmd.db_conf, cmd.db_profile, "thick")
+        secret_config, secret_signer = create_secret_signer(cmd)
+        dbpass = get_secret_password(secret_config, secret_signer, cmd.proxy, cmd.dsecret_id)
 
     ############################################
-    # Identity extract compartments
+    # Identity tenancy and home region
+    # compartments are loaded only if there are files to load
     ############################################
-    compartments = []
+    compartments = None
+    identity = None
     tenancy = None
     try:
         print("\nConnecting to Identity Service...")
@@ -1283,20 +2520,27 @@ def main_process():
         signer.region = tenancy_home_region
         config['region'] = tenancy_home_region
 
-        # Extract compartments
-        compartments = identity_read_compartments(identity, tenancy)
-
     except Exception as e:
         print("\nError extracting compartments section - " + str(e) + "\n")
         raise SystemExit
 
+    ############################################
+    # dry run - load to local files
+    ############################################
+    if cmd.dry_run_folder:
+        compartments = identity_read_compartments(identity, tenancy)
+        dry_run_process(cmd, config, signer, tenancy, compartments, focus_namespace_name, focus_bucket_name)
+        print("\nCompleted at " + get_current_date_time())
+        return
+
     ############################################
     # connect to database
     ############################################
     max_focus_file_name = ""
+    run_success = 0
     try:
         print("\nConnecting to database " + cmd.dname)
-        with oracledb.connect(user=cmd.duser, password=dbpass, dsn=cmd.dname) as connection:
+        with create_db_connection(cmd.duser, dbpass, cmd.dname) as connection:
 
             # Open Cursor
             with connection.cursor() as cursor:
@@ -1304,7 +2548,7 @@ def main_process():
 
                 # Check tables structure
                 print("\nChecking Database Structure...")
-                check_database_table_structures(connection)
+                check_database_table_structures(connection, cmd.tags_json)
 
                 ###############################
                 # enable hints
@@ -1314,60 +2558,95 @@ def main_process():
                 sql = "ALTER SESSION SET OPTIMIZER_IGNORE_PARALLEL_HINTS=FALSE"
                 cursor.execute(sql)
 
-                ###############################
-                # fetch max file id processed
-                # for usage and cost
-                ###############################
-                print("\nChecking Last Loaded Files... started at " + get_current_date_time())
-
-                sql = "select nvl(max(file_name),'0') as max_file_name from OCI_FOCUS_LOAD_STATUS a where Source_Tenant_Name=:Source_Tenant_Name"
-                cursor.execute(sql, Source_Tenant_Name=str(tenancy.name))
-                max_focus_file_name, = cursor.fetchone()
-                print("   Max FOCUS File Name Processed = '" + str(max_focus_file_name) + "'")
-
-                print("Completed Checking at " + get_current_date_time())
-
             ############################################
-            # Download FOCUS files and insert to database
+            # event ingest - load the objects of the
+            # create events instead of the listing
             ############################################
-            print("\nConnecting to Object Storage Service...")
-
-            object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
-            if cmd.proxy:
-                object_storage.base_client.session.proxies = {'https': cmd.proxy}
-            print("   Connected")
-
-            #############################
-            # Handle FOCUS Files
-            #############################
-            print("\nHandling FOCUS Report... started at " + get_current_date_time())
-            objects = oci.pagination.list_call_get_all_results(
-                object_storage.list_objects,
-                focus_namespace_name,
-                focus_bucket_name,
-                fields="timeCreated,size",
-                prefix="FOCUS Reports/",
-                start=max_focus_file_name + "-next"
-            ).data
+            if cmd.event_file or cmd.event_port:
+                clients = {'identity': identity, 'object_storage': None, 'compartments': None, 'compartments_time': 0}
+                event_process(connection, cmd, config, signer, tenancy, focus_namespace_name, focus_bucket_name, clients)
 
-            cost_num = 0
-            total_files = len(objects.objects)
-            print("Total " + str(total_files) + " FOCUS files found to scan...")
-            for index, object_file in enumerate(objects.objects, start=1):
-                cost_num += load_focus_file(connection, object_storage, object_file, max_focus_file_name, cmd, tenancy, compartments, index, total_files, focus_namespace_name, focus_bucket_name)
-            print("\n   Total " + str(cost_num) + " Cost Files Loaded, completed at " + get_current_date_time())
-
-            # Handle Index structure if not exist
-            check_database_index_structure(connection)
-
-            #############################
-            # Update oci_cost_stats if
-            # there were files
-            #############################
-            if cost_num > 0 or cmd.force:
-                update_focus_rate_card(connection, tenancy.name)
-                update_focus_stats(connection, tenancy.name)
-                update_focus_reference(connection, cmd.tagspecial1, cmd.tagspecial2, cmd.tagspecial3, cmd.tagspecial4, tenancy.name)
+            else:
+                with connection.cursor() as cursor:
+
+                    ###############################
+                    # fetch max file id processed
+                    # for usage and cost
+                    ###############################
+                    print("\nChecking Last Loaded Files... started at " + get_current_date_time())
+
+                    sql = "select nvl(max(file_name),'0') as max_file_name from OCI_FOCUS_LOAD_STATUS a where Source_Tenant_Name=:Source_Tenant_Name and FILE_STATUS is null"
+                    cursor.execute(sql, Source_Tenant_Name=str(tenancy.name))
+                    max_focus_file_name, = cursor.fetchone()
+                    print("   Max FOCUS File Name Processed = '" + str(max_focus_file_name) + "'")
+
+                    # --force retries the files failed with rejected rows
+                    retry_files = set()
+                    if cmd.force:
+                        sql = "select FILE_NAME from OCI_FOCUS_LOAD_STATUS where Source_Tenant_Name=:Source_Tenant_Name and FILE_STATUS='FAILED'"
+                        cursor.execute(sql, Source_Tenant_Name=str(tenancy.name))
+                        retry_files = set(row[0] for row in cursor.fetchall())
+                        if retry_files:
+                            print("   " + str(len(retry_files)) + " failed files to retry with --force")
+
+                    print("Completed Checking at " + get_current_date_time())
+
+                ############################################
+                # Download FOCUS files and insert to database
+                ############################################
+                print("\nConnecting to Object Storage Service...")
+
+                object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
+                if cmd.proxy:
+                    object_storage.base_client.session.proxies = {'https': cmd.proxy}
+                print("   Connected")
+
+                #############################
+                # Handle FOCUS Files
+                #############################
+                print("\nHandling FOCUS Report... started at " + get_current_date_time())
+                list_time = time.perf_counter()
+                objects = oci.pagination.list_call_get_all_results(
+                    counted_api_call('list_objects', object_storage.list_objects),
+                    focus_namespace_name,
+                    focus_bucket_name,
+                    fields="timeCreated,size,etag",
+                    prefix=focus_file_prefix,
+                    start=min(retry_files) if retry_files else max_focus_file_name + "-next"
+                ).data
+                list_secs = time.perf_counter() - list_time
+                set_metric('phase_seconds', round(list_secs, 3), {'phase': 'list'}, add=True)
+
+                cost_num = 0
+                total_files = len(objects.objects)
+                print("Total " + str(total_files) + " FOCUS files found to scan...")
+
+                # no new files after the last loaded, skip the compartments load
+                if total_files:
+                    compartments = identity_read_compartments(identity, tenancy)
+                else:
+                    print("   No new FOCUS files after " + str(max_focus_file_name) + ", nothing to load")
+
+                for index, object_file in enumerate(objects.objects, start=1):
+                    loaded = load_focus_file(connection, object_storage, object_file, "" if object_file.name in retry_files else max_focus_file_name, cmd, tenancy, compartments, index, total_files, focus_namespace_name, focus_bucket_name, list_secs)
+                    cost_num += loaded
+                    if loaded and cmd.metrics_file:
+                        write_metrics_file(cmd.metrics_file, str(tenancy.name))
+                print("\n   Total " + str(cost_num) + " Cost Files Loaded, completed at " + get_current_date_time())
+                if files_failed:
+                    print("   Total " + str(len(files_failed)) + " FOCUS files failed with rejected rows, see OCI_FOCUS_LOAD_REJECTS, retry with --force:")
+                    for file_name in files_failed:
+                        print("      " + file_name)
+
+                # Handle Index structure if not exist
+                check_database_index_structure(connection)
+
+                update_loaded_files_merges(connection, cmd, tenancy, cost_num)
+                run_maintenance_steps(connection, cmd, tenancy)
+
+            if cmd.metrics_file:
+                set_metric('data_lag_seconds', get_data_lag_seconds(connection, str(tenancy.name)))
+            run_success = 1
 
     except oracledb.DatabaseError as e:
         print("\nError manipulating database - " + str(e) + "\n")
@@ -1375,6 +2654,12 @@ def main_process():
     except Exception as e:
         print("\nError appeared - " + str(e))
 
+    finally:
+        if cmd.metrics_file:
+            set_metric('run_success', run_success)
+            set_metric('run_seconds', round(time.time() - run_start_time, 3))
+            write_metrics_file(cmd.metrics_file, str(tenancy.name))
+
     ############################################
     # print completed
     ############################################
@@ -1384,4 +2669,5 @@ def main_process():
 ##########################################################################
 # Execute Main Process
 ##########################################################################
-main_process()
+if __name__ == "__main__":
+    main_process()
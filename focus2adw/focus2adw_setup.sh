@@ -37,7 +37,7 @@ export LD_LIBRARY_PATH=$CLIENT_HOME/lib
 export PATH=$PATH:$CLIENT_HOME/bin
 export TNS_ADMIN=$HOME/ADWCUSG
 export PYTHONUNBUFFERED=TRUE
-export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true
+export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=false
 export DATABASE_USER=FOCUS
 
 ###########################################
@@ -431,6 +431,12 @@ UpgradeApp()
    DownloadFileFromGit ${APPDIR} . run_sqlplus_focus.sh
    DownloadFileFromGit ${APPDIR} . run_table_size_info.sh
 
+   # the SDK lazy imports load only the OCI modules used by the loaders
+   if grep -q "OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true" $HOME/.bashrc; then
+      echo "   Enable OCI SDK lazy imports in .bashrc" | tee -a $LOG
+      sed -i 's/OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true/OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=false/' $HOME/.bashrc
+   fi
+
    ###########################################
    # Delete APEX App and import New App
    ###########################################
@@ -522,7 +528,7 @@ SetupApp()
    # Setup Crontab
    ###########################################
    echo "" | tee -a $LOG
-   echo "7. Setup Crontab to run every 4 hours and gather stats every week" | tee -a $LOG
+   echo "7. Setup Crontab to run every 4 hours" | tee -a $LOG
    echo " 
 ###############################################################################
 # Crontab to run every 4 hours
@@ -530,9 +536,10 @@ SetupApp()
 0 */4 * * * timeout 6h /home/opc/focus_reports_to_adw/run_multi_daily_focus2adw.sh > /home/opc/focus_reports_to_adw/log/run_multi_daily_focus2adw_crontab_run.txt 2>&1
 
 ###############################################################################
-# Gather stats every weekend
+# Full schema gather stats every weekend - not required, the load gathers the
+# changed tables with -gatherstats
 ###############################################################################
-30 0   * * 0 timeout 6h /home/opc/focus_reports_to_adw/run_gather_stats.sh > /home/opc/focus_reports_to_adw/log/run_gather_stats_run.txt 2>&1
+# 30 0   * * 0 timeout 6h /home/opc/focus_reports_to_adw/run_gather_stats.sh > /home/opc/focus_reports_to_adw/log/run_gather_stats_run.txt 2>&1
 
 " | crontab -
    echo "   Setup Crontab Completed" | tee -a $LOG
@@ -673,7 +680,8 @@ CreateTables()
       Tag_Special1                     VARCHAR2(4000),
       Tag_Special2                     VARCHAR2(4000),
       Tag_Special3                     VARCHAR2(4000),
-      Tag_Special4                     VARCHAR2(4000)
+      Tag_Special4                     VARCHAR2(4000),
+      TAGS_JSON                        JSON
    ) COMPRESS;
 
    CREATE INDEX OCI_FOCUS_1IX ON OCI_FOCUS(Source_Tenant_Name, Charge_Period_Start);
@@ -734,9 +742,39 @@ CreateTables()
       AGENT_VERSION      varchar2(100),
       BATCH_ID           number,
       BATCH_TOTAL        number,
+      LIST_SECS          number,
+      DOWNLOAD_SECS      number,
+      DECOMPRESS_SECS    number,
+      TRANSFORM_SECS     number,
+      INSERT_SECS        number,
+      COMMIT_SECS        number,
+      TAG_MERGE_SECS     number,
+      FILE_BYTES         number,
+      DATA_BYTES         number,
+      REJECTED_ROWS      number,
+      FILE_STATUS        varchar2(20),
       CONSTRAINT OCI_FOCUS_LOAD_STATUS_PK PRIMARY KEY (Source_Tenant_Name, FILE_NAME) USING INDEX ENABLE
    );
 
+   -------------------------------
+   -- OCI_FOCUS_LOAD_REJECTS
+   -------------------------------
+   prompt Creating Table OCI_FOCUS_LOAD_REJECTS
+
+   create table OCI_FOCUS_LOAD_REJECTS (
+      Source_Tenant_Name varchar2(100) NOT NULL,
+      FILE_ID            varchar2(1000),
+      FILE_NAME          varchar2(1000) NOT NULL,
+      LINE_NUMBER        number,
+      ERROR_CODE         number,
+      ERROR_MESSAGE      varchar2(1000),
+      ROW_DATA           varchar2(4000),
+      REJECT_TIME        DATE DEFAULT SYSDATE,
+      AGENT_VERSION      varchar2(30)
+   );
+
+   CREATE INDEX OCI_FOCUS_LOAD_REJECTS_1IX ON OCI_FOCUS_LOAD_REJECTS (Source_Tenant_Name, FILE_NAME);
+
    -------------------------------
    -- OCI_RESOURCES
    -------------------------------
@@ -825,6 +863,9 @@ DropTables()
    prompt Dropping Table OCI_FOCUS_LOAD_STATUS
    drop table OCI_FOCUS_LOAD_STATUS; 
 
+   prompt Dropping Table OCI_FOCUS_LOAD_REJECTS
+   drop table OCI_FOCUS_LOAD_REJECTS;
+
    prompt Dropping Table OCI_RESOURCES
    drop table OCI_RESOURCES;
 
@@ -886,6 +927,9 @@ TruncateTables()
    prompt Truncating Table OCI_FOCUS_LOAD_STATUS
    truncate table OCI_FOCUS_LOAD_STATUS; 
 
+   prompt Truncating Table OCI_FOCUS_LOAD_REJECTS
+   truncate table OCI_FOCUS_LOAD_REJECTS;
+
    prompt Truncating Table OCI_RESOURCES
    truncate table OCI_RESOURCES;
 
@@ -959,7 +1003,7 @@ SetupOL9Packages()
    echo "export PATH=$PATH:$CLIENT_HOME/bin" >>$HOME/.bashrc
    echo "export TNS_ADMIN=$HOME/ADWCUSG" >>$HOME/.bashrc
    echo "export PYTHONUNBUFFERED=TRUE" >>$HOME/.bashrc
-   echo "export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true" >>$HOME/.bashrc
+   echo "export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=false" >>$HOME/.bashrc
    echo "alias cdf='cd $HOME/focus_reports_to_adw'">>$HOME/.bashrc
    echo "alias cdu='cd $HOME/focus_reports_to_adw'">>$HOME/.bashrc
    echo "alias cdr='cd $HOME/showoci/report'">>$HOME/.bashrc
@@ -117,15 +117,32 @@ import argparse
 import datetime
 import csv
 import oracledb
+import configparser
 import time
 import os
 import oci
 import base64
 
-version = "25.05.08"
+version = "26.10.19"
 cmd = None
 file_num = 0
 
+# database connection profile of -dbconf / -dbprofile, key: type
+db_profile_keys = {
+    'mode': str,
+    'sdu': int,
+    'stmtcachesize': int,
+    'arraysize': int,
+    'prefetchrows': int,
+    'expire_time': int,
+    'tcp_connect_timeout': float,
+    'config_dir': str,
+    'wallet_location': str,
+    'pool_min': int,
+    'pool_max': int
+}
+db_profile = {}
+
 
 ##########################################################################
 # Create signer
@@ -255,6 +272,89 @@ def get_time_elapsed(start_time):
     return ", Process Time " + str('{:02d}:{:02d}:{:02d}'.format(round(et // 3600), (round(et % 3600 // 60)), round(et % 60)))
 
 
+##########################################################################
+# Database connection profile - section -dbprofile of the -dbconf ini file
+#   mode                 thick or thin driver
+#   sdu                  session data unit in bytes
+#   stmtcachesize        statements cached per session
+#   arraysize            default cursor fetch array size
+#   prefetchrows         default cursor prefetch rows
+#   expire_time          minutes between tcp keepalive probes
+#   tcp_connect_timeout  seconds to establish the connection
+#   config_dir           tnsnames.ora folder for thin mode
+#   wallet_location      ewallet.pem folder for thin mode
+#   pool_min, pool_max   session pool size
+# thick mode reads sdu and keepalive from sqlnet.ora
+##########################################################################
+def load_db_profile(db_conf, db_profile_name, default_mode):
+    global db_profile
+    db_profile = {'mode': default_mode}
+
+    if db_conf:
+        parser = configparser.ConfigParser()
+        if not parser.read(db_conf):
+            print("\nError reading database profile file " + db_conf + ", aborting")
+            raise SystemExit
+
+        if not parser.has_section(db_profile_name) and db_profile_name != configparser.DEFAULTSECT:
+            print("\nDatabase profile " + db_profile_name + " not found in " + db_conf + ", aborting")
+            raise SystemExit
+
+        section = parser[db_profile_name]
+        for key in section:
+            if key not in db_profile_keys:
+                print("   Database profile key " + key + " ignored")
+            elif section[key].strip():
+                try:
+                    db_profile[key] = db_profile_keys[key](section[key].strip())
+                except ValueError:
+                    print("\nDatabase profile key " + key + " value " + section[key] + " is not valid, aborting")
+                    raise SystemExit
+
+    if db_profile['mode'] not in ('thick', 'thin'):
+        print("\nDatabase profile mode must be thick or thin, aborting")
+        raise SystemExit
+
+    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
+    if db_profile['mode'] == 'thick':
+        oracledb.init_oracle_client()
+
+    if 'arraysize' in db_profile:
+        oracledb.defaults.arraysize = db_profile['arraysize']
+    if 'prefetchrows' in db_profile:
+        oracledb.defaults.prefetchrows = db_profile['prefetchrows']
+
+    if db_conf:
+        print("DB Profile   : " + db_profile_name + " - " + ", ".join(key + "=" + str(value) for key, value in db_profile.items()))
+
+
+##########################################################################
+# Connect parameters of the profile, parameters passed override it
+##########################################################################
+def get_db_connect_params(**kwargs):
+    params = {key: db_profile[key] for key in ('sdu', 'stmtcachesize', 'expire_time', 'tcp_connect_timeout', 'config_dir', 'wallet_location') if key in db_profile}
+    params.update({key: value for key, value in kwargs.items() if value})
+    return params
+
+
+##########################################################################
+# Create connection with the profile
+##########################################################################
+def create_db_connection(user, password, dsn, **kwargs):
+    return oracledb.connect(user=user, password=password, dsn=dsn, **get_db_connect_params(**kwargs))
+
+
+##########################################################################
+# Create session pool with the profile, pool_min and pool_max of the
+# profile override the defaults of the caller
+##########################################################################
+def create_db_pool(user, password, dsn, pool_min, pool_max, ping_interval=60):
+    pool_max = max(db_profile.get('pool_max', pool_max), 1)
+    pool_min = min(db_profile.get('pool_min', pool_min), pool_max)
+    increment = 0 if pool_min == pool_max else 1
+    return oracledb.create_pool(user=user, password=password, dsn=dsn, min=pool_min, max=pool_max, increment=increment, ping_interval=ping_interval, **get_db_connect_params())
+
+
 ##########################################################################
 # set parser
 ##########################################################################
@@ -278,6 +378,8 @@ def set_parser_arguments():
     parser.add_argument('-drop', action='store_true', default=False, dest='drop', help='Drop Tables before Load')
     parser.add_argument('-verbose', action='store_true', default=False, dest='verbose', help='Print more details')
 
+    parser.add_argument('-dbconf', default="", dest='db_conf', help='Database connection profile ini file - sdu, stmtcachesize, arraysize, prefetchrows, keepalive, mode, pool')
+    parser.add_argument('-dbprofile', default=configparser.DEFAULTSECT, dest='db_profile', help='Database connection profile section (default=DEFAULT)')
     parser.add_argument('--version', action='version', version='%(prog)s ' + version)
 
     result = parser.parse_args()
@@ -3536,12 +3638,9 @@ def main_process():
     print("Command Line : " + get_command_line())
     print("Version      : " + version)
 
-    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
-    if cmd.usethick:
-        oracledb.init_oracle_client()
-        print("OracleDB     : Thick Drivers")
-    else:
-        print("OracleDB     : Thin Drivers")
+    # Init the Oracle Thick Client Library if -usethick or thick profile
+    load_db_profile(cmd.db_conf, cmd.db_profile, "thick" if cmd.usethick else "thin")
+    print("OracleDB     : " + db_profile['mode'].capitalize() + " Drivers")
 
     dpass = get_secret_password(config, signer, cmd.proxy, cmd.dsecret)
 
@@ -3554,7 +3653,7 @@ def main_process():
     ############################################
     try:
         print("\nConnecting to database " + cmd.dname, end="")
-        with oracledb.connect(user=cmd.duser, password=dpass, dsn=cmd.dname, config_dir=cmd.wallet_location, wallet_location=cmd.wallet_location, wallet_password=wallet_password) as connection:
+        with create_db_connection(cmd.duser, dpass, cmd.dname, config_dir=cmd.wallet_location, wallet_location=cmd.wallet_location, wallet_password=wallet_password) as connection:
 
             print("...Connected\n")
 
@@ -7,6 +7,9 @@
 #
 # run_gather_stats for crontab use weekly run
 #
+# Full schema gather, the daily load gathers only the changed tables
+# and partitions with -gatherstats, use this script after bulk changes
+#
 # Amend variables below and database connectivity
 #
 # Crontab set:
@@ -0,0 +1,217 @@
+#!/bin/sh
+#############################################################################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# Author - Adi Zohar, Oct 19 2026
+#
+# run_summary_timing.sh
+#
+# Compare the APEX Cost Analysis queries on OCI_COST with the same queries on the OCI_COST_DAILY summary
+#
+# Usage: run_summary_timing.sh [tenant_name] [months]
+#    tenant_name - default first tenant in OCI_COST_DAILY
+#    months      - number of months to query, default 3
+#
+#############################################################################################################################
+# Env Variables based on yum instant client
+export CLIENT_HOME=/usr/lib/oracle/current/client64
+export PATH=$PATH:$CLIENT_HOME/bin
+
+# App dir
+export TNS_ADMIN=$HOME/ADWCUSG
+export APPDIR=$HOME/usage_reports_to_adw
+export CREDFILE=$APPDIR/config.user
+cd $APPDIR
+
+# database info
+export DATABASE_USER=`grep "^DATABASE_USER" $CREDFILE | sed -s 's/DATABASE_USER=//'`
+export DATABASE_NAME=`grep "^DATABASE_NAME" $CREDFILE | sed -s 's/DATABASE_NAME=//'`
+export DATABASE_SECRET_ID=`grep "^DATABASE_SECRET_ID" $CREDFILE | sed -s 's/DATABASE_SECRET_ID=//'`
+export DATABASE_SECRET_TENANT=`grep "^DATABASE_SECRET_TENANT" $CREDFILE | sed -s 's/DATABASE_SECRET_TENANT=//'`
+
+####################################################
+# Retrieve Database Password
+# From KMS Vault using Secret
+####################################################
+if [ -z "${DATABASE_SECRET_ID}" ]
+then
+    echo "Usage2ADW moved to Secret and DATABASE_SECRET_ID does not exist, abort ..."
+    exit 1
+fi
+
+if [ -z "${DATABASE_SECRET_TENANT}" ]
+then
+    export DATABASE_SECRET_TENANT=local
+fi
+
+# Retrieve Secret from KMS Vault
+log=/tmp/check_secret_$$.log
+python3 ${APPDIR}/usage2adw_retrieve_secret.py -t $DATABASE_SECRET_TENANT -secret $DATABASE_SECRET_ID -check | tee -a $log
+
+if (( `grep "Secret Okay" $log | wc -l` < 1 )); then
+    echo "Error retrieving Secret, Abort"
+    rm -f $log
+    exit 1
+fi
+rm -f $log
+export DATABASE_PASS=`python3 usage2adw_retrieve_secret.py -t $DATABASE_SECRET_TENANT -secret $DATABASE_SECRET_ID | grep "^Value=" | sed -s 's/Value=//'`
+
+# Parameters
+export TENANT_NAME=$1
+export MONTHS=${2:-3}
+
+# Fixed variables
+export DATE=`date '+%Y%m%d_%H%M'`
+export REPORT_DIR=${APPDIR}/report/timing
+export OUTPUT_FILE=${REPORT_DIR}/summary_timing_${DATE}.txt
+mkdir -p ${REPORT_DIR}
+
+echo "Running Summary Timing Comparison to $OUTPUT_FILE ..."
+
+##################################
+# run comparison
+# each report runs on OCI_COST and on OCI_COST_DAILY,
+# wrapped by count and sum so only the totals are printed
+##################################
+echo "
+connect ${DATABASE_USER}/${DATABASE_PASS}@${DATABASE_NAME}
+set pages 1000 lines 199 trimsp on echo off verify off feed off timing on
+col tenant_name new_value tenant_name
+col date_from new_value date_from
+col report for a40
+
+ALTER SESSION SET OPTIMIZER_IGNORE_HINTS=FALSE;
+ALTER SESSION SET OPTIMIZER_IGNORE_PARALLEL_HINTS=FALSE;
+
+set timing off
+select nvl('${TENANT_NAME}', min(tenant_name)) tenant_name, to_char(add_months(trunc(sysdate,'MM'), -${MONTHS}),'YYYY-MM-DD') date_from from oci_cost_daily;
+set timing on
+
+prompt
+prompt ########## Cost Per Day ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ to_char(USAGE_INTERVAL_START,'YYYY-MM-DD') as USAGE_DAY, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by to_char(USAGE_INTERVAL_START,'YYYY-MM-DD')
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select to_char(USAGE_DAY,'YYYY-MM-DD') as USAGE_DAY, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by to_char(USAGE_DAY,'YYYY-MM-DD')
+);
+
+prompt
+prompt ########## Cost Per Service ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ replace(nvl(prd_service,COST_PRODUCT_SKU),'_',' ') prd_service, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by replace(nvl(prd_service,COST_PRODUCT_SKU),'_',' ')
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select replace(nvl(prd_service,COST_PRODUCT_SKU),'_',' ') prd_service, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by replace(nvl(prd_service,COST_PRODUCT_SKU),'_',' ')
+);
+
+prompt
+prompt ########## Cost Per Product SKU ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ COST_PRODUCT_SKU || ' ' || min(replace(PRD_DESCRIPTION,COST_PRODUCT_SKU||' - ','')) prd_resource, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by COST_PRODUCT_SKU
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select COST_PRODUCT_SKU || ' ' || min(replace(PRD_DESCRIPTION,COST_PRODUCT_SKU||' - ','')) prd_resource, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by COST_PRODUCT_SKU
+);
+
+prompt
+prompt ########## Cost Per Top Compartment ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */
+        case when prd_compartment_path like '%/%' then substr(prd_compartment_path,1,instr(prd_compartment_path,' /')-1) else prd_compartment_path end as compartment, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by case when prd_compartment_path like '%/%' then substr(prd_compartment_path,1,instr(prd_compartment_path,' /')-1) else prd_compartment_path end
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select
+        case when prd_compartment_path like '%/%' then substr(prd_compartment_path,1,instr(prd_compartment_path,' /')-1) else prd_compartment_path end as compartment, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by case when prd_compartment_path like '%/%' then substr(prd_compartment_path,1,instr(prd_compartment_path,' /')-1) else prd_compartment_path end
+);
+
+prompt
+prompt ########## Cost Per Single Compartment ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ prd_compartment_name, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by prd_compartment_name
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select prd_compartment_name, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by prd_compartment_name
+);
+
+prompt
+prompt ########## Cost Per Region ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ prd_region, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by prd_region
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select prd_region, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by prd_region
+);
+
+prompt
+prompt ########## Cost Per Special Tag 1 ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ tag_special, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD')
+    group by tag_special
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select tag_special, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD')
+    group by tag_special
+);
+
+prompt
+prompt ########## Daily Cost Report per Service and Day ##########
+select 'OCI_COST' report, count(*) num_rows, round(sum(cost)) cost from (
+    select /*+ parallel(oci_cost,8) full(oci_cost) */ prd_service, to_char(USAGE_INTERVAL_START,'DD') usage_day, sum(COST_MY_COST) as COST
+    from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= trunc(sysdate,'MM')
+    group by prd_service, to_char(USAGE_INTERVAL_START,'DD')
+);
+select 'OCI_COST_DAILY' report, count(*) num_rows, round(sum(cost)) cost from (
+    select prd_service, to_char(USAGE_DAY,'DD') usage_day, sum(COST_MY_COST) as COST
+    from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= trunc(sysdate,'MM')
+    group by prd_service, to_char(USAGE_DAY,'DD')
+);
+
+prompt
+prompt ########## Table Sizes ##########
+set timing off
+select 'OCI_COST' report, count(*) num_rows from oci_cost where tenant_name = '&tenant_name' and USAGE_INTERVAL_START >= to_date('&date_from','YYYY-MM-DD');
+select 'OCI_COST_DAILY' report, count(*) num_rows from oci_cost_daily where tenant_name = '&tenant_name' and USAGE_DAY >= to_date('&date_from','YYYY-MM-DD');
+
+" | sqlplus -s /nolog > $OUTPUT_FILE
+
+# Check for errors
+if (( `grep ORA- $OUTPUT_FILE | wc -l` > 0 ))
+then
+    echo ""
+    echo "!!! Error running summary timing, check logfile $OUTPUT_FILE"
+    echo ""
+    grep ORA- $OUTPUT_FILE
+    exit 1
+fi
+
+cat $OUTPUT_FILE
+echo ""
+echo "Output written to $OUTPUT_FILE"
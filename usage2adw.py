@@ -58,9 +58,11 @@
 # Tables used:
 # - OCI_COST                - Raw data of the cost reports
 # - OCI_COST_STATS          - Summary Stats of the Cost Report for quick query if only filtered by tenant and date
+# - OCI_COST_DAILY          - Daily summary by service, region, compartment, sku and special tags for the APEX reports
 # - OCI_COST_TAG_KEYS       - Tag keys of the cost reports
 # - OCI_COST_REFERENCE      - Reference table of the cost filter keys - SERVICE, REGION, COMPARTMENT, PRODUCT, SUBSCRIPTION
 # - OCI_PRICE_LIST          - Hold the price list and the cost per product
+# - OCI_PUBLIC_RATE_CACHE   - Public rates per SKU and currency shared by all tenants
 # - OCI_LOAD_STATUS         - Load Statistics table
 # - OCI_TENANT              - tenant information
 # - OCI_SUBSCRIPTION        - Subscription and subscribed-service information
@@ -69,16 +71,37 @@
 import sys
 import argparse
 import datetime
-import oci
 import gzip
 import os
+import re
 import csv
 import oracledb
-import requests
+import configparser
 import time
 import base64
-
-version = "26.08.07"
+import io
+import json
+import hashlib
+import threading
+import concurrent.futures
+import signal
+import random
+import queue
+import email.utils
+import http.server
+import socket
+import contextlib
+# only the OCI SDK modules used, oci.onesubscription and requests are imported when used
+import oci.config
+import oci.signer
+import oci.auth.signers
+import oci.exceptions
+import oci.pagination
+import oci.identity
+import oci.object_storage
+import oci.secrets
+
+version = "26.10.19"
 work_report_dir = os.curdir + "/work_report_dir"
 customer_billing_namespace = 'bling'
 internal_billing_namespace = 'axvl7chrr9th'
@@ -86,10 +109,100 @@ internal_billing_namespace = 'axvl7chrr9th'
 customer_file_prefixes = ["reports/cost-csv/"]
 internal_file_prefixes = ["reports/cost-csv/00" , "reports/cost-csv/oc"]
 
+# per file phase timing columns of OCI_LOAD_STATUS
+load_status_phase_columns = ['LIST_SECS', 'DOWNLOAD_SECS', 'DECOMPRESS_SECS', 'TRANSFORM_SECS', 'INSERT_SECS', 'COMMIT_SECS', 'TAG_MERGE_SECS', 'FILE_BYTES', 'DATA_BYTES', 'REJECTED_ROWS']
+
+# rows rejected by the database kept in OCI_LOAD_REJECTS per file
+reject_store_max = 1000
+
+# files failed in the run, rejected rows above -rejectpct, the file is
+# recorded FAILED in OCI_LOAD_STATUS and retried with --force
+files_failed = []
+
+# earliest USAGE_INTERVAL_START loaded in the run, the merges from OCI_COST
+# are limited from this date to prune the partitions not touched by the load
+min_usage_loaded = ""
+
+# OCI_COST_DAILY created by this run, rebuilt from all the usage of the tenant
+cost_daily_rebuild = False
+
+# star schema - OCI_COST is a view over OCI_COST_FACT and the dimension tables
+# created by usage2adw_setup.sh -create_tables_star or -convert_star
+cost_star_schema = False
+cost_table = "OCI_COST"
+
+# star schema dimensions - table: (key column, natural key columns)
+star_dimensions = {
+    'OCI_DIM_COMPARTMENT': ('COMPARTMENT_KEY', ['PRD_COMPARTMENT_ID', 'PRD_COMPARTMENT_NAME', 'PRD_COMPARTMENT_PATH']),
+    'OCI_DIM_PRODUCT': ('PRODUCT_KEY', ['COST_PRODUCT_SKU', 'PRD_DESCRIPTION', 'COST_BILLING_UNIT']),
+    'OCI_DIM_RESOURCE': ('RESOURCE_KEY', ['USG_RESOURCE_ID']),
+    'OCI_DIM_TAGSET': ('TAGSET_KEY', ['TAGS_DATA'])
+}
+
+# dimension key cache of the run, key = (table, natural values)
+star_keys_cache = {}
+
+# -queue worker id of the claims in OCI_LOAD_QUEUE
+queue_worker = socket.gethostname() + ":" + str(os.getpid())
+
+# -daemon stop request, set by SIGTERM or SIGINT, the load stops after
+# the current file and the merges of the loaded files
+daemon_stop = threading.Event()
+
+# OpenMetrics textfile values, key = (name, labels)
+metrics_prefix = "usage2adw"
+metrics_values = {}
+metrics_lock = threading.Lock()
+metrics_help = {
+    'files_loaded': 'Cost files loaded in the run',
+    'rows_loaded': 'Rows inserted in the run',
+    'bytes_loaded': 'Compressed bytes downloaded in the run',
+    'data_bytes_loaded': 'Uncompressed bytes parsed in the run',
+    'load_seconds': 'Seconds spent loading files',
+    'rows_per_second': 'Rows inserted per second of file load',
+    'bytes_per_second': 'Compressed bytes per second of file load',
+    'phase_seconds': 'Seconds per load phase',
+    'merge_seconds': 'Seconds per post load merge step',
+    'api_calls': 'OCI and public rate API calls',
+    'data_lag_seconds': 'Seconds between now and the newest usage interval start loaded',
+    'last_file_created_timestamp_seconds': 'Creation time of the last loaded file',
+    'last_update_timestamp_seconds': 'Time the metrics file was written',
+    'run_seconds': 'Run duration in seconds',
+    'run_success': 'Run completed without error (1) or failed (0)',
+    'retention_rows_deleted': 'Rows purged by retention per table',
+    'rows_rejected': 'Rows rejected by the database per file type',
+    'files_failed': 'Cost files failed with rejected rows above -rejectpct',
+    'retention_partitions_dropped': 'OCI_COST partitions dropped by retention',
+    'retention_reclaimed_bytes': 'OCI_COST segment bytes reclaimed by retention',
+    'stats_tables_gathered': 'Tables with optimizer statistics gathered after the load',
+    'stats_tables_skipped': 'Tables with changes below the statistics threshold',
+    'daemon_cycles': 'Poll cycles completed since the daemon started',
+    'daemon_cycle_errors': 'Poll cycles failed since the daemon started',
+    'events_received': 'Object create events received',
+    'events_skipped': 'Object create events skipped per reason',
+    'queue_enqueued': 'Cost files added to OCI_LOAD_QUEUE by the listing',
+    'queue_claimed': 'Cost files claimed from OCI_LOAD_QUEUE per claim type',
+    'queue_completed': 'Cost files completed in OCI_LOAD_QUEUE per status',
+    'queue_claims_lost': 'Cost files claimed by another worker while loading'
+}
+
 DEBUG = False
 
-# Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
-oracledb.init_oracle_client()
+# database connection profile of -dbconf / -dbprofile, key: type
+db_profile_keys = {
+    'mode': str,
+    'sdu': int,
+    'stmtcachesize': int,
+    'arraysize': int,
+    'prefetchrows': int,
+    'expire_time': int,
+    'tcp_connect_timeout': float,
+    'config_dir': str,
+    'wallet_location': str,
+    'pool_min': int,
+    'pool_max': int
+}
+db_profile = {}
 
 # create the work dir if not  exist
 if not os.path.exists(work_report_dir):
@@ -149,6 +262,76 @@ def get_time_elapsed(start_time):
     return ", Process Time " + str('{:02d}:{:02d}:{:02d}'.format(round(et // 3600), (round(et % 3600 // 60)), round(et % 60)))
 
 
+##########################################################################
+# Run metrics written as OpenMetrics textfile (-metrics)
+##########################################################################
+def set_metric(name, value, labels=None, add=False):
+    key = (name, tuple(sorted((labels if labels else {}).items())))
+    with metrics_lock:
+        metrics_values[key] = (metrics_values.get(key, 0) + value) if add else value
+
+
+##########################################################################
+# Call api and count it for the metrics
+##########################################################################
+def counted_api_call(api_name, func):
+    def call(*args, **kwargs):
+        set_metric('api_calls', 1, {'api': api_name}, add=True)
+        return func(*args, **kwargs)
+    return call
+
+
+##########################################################################
+# Write metrics textfile, folder will write <prefix>_<tenant>.prom
+##########################################################################
+def write_metrics_file(metrics_file, tenant_name):
+    try:
+        if os.path.isdir(metrics_file):
+            metrics_file = os.path.join(metrics_file, metrics_prefix + "_" + "".join(c if c.isalnum() else "_" for c in tenant_name) + ".prom")
+
+        with metrics_lock:
+            values = dict(metrics_values)
+
+        # derived throughput gauges
+        load_seconds = values.get(('load_seconds', ()), 0)
+        if load_seconds:
+            values[('rows_per_second', ())] = round(values.get(('rows_loaded', ()), 0) / load_seconds, 3)
+            values[('bytes_per_second', ())] = round(values.get(('bytes_loaded', ()), 0) / load_seconds, 3)
+        values[('last_update_timestamp_seconds', ())] = round(time.time(), 3)
+
+        lines = []
+        for name in sorted(set(key[0] for key in values)):
+            lines.append("# HELP " + metrics_prefix + "_" + name + " " + metrics_help.get(name, name.replace("_", " ")))
+            lines.append("# TYPE " + metrics_prefix + "_" + name + " gauge")
+            for key in sorted(k for k in values if k[0] == name):
+                labels = (('tenant', tenant_name),) + key[1]
+                label_str = ",".join(label + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for label, value in labels)
+                lines.append(metrics_prefix + "_" + name + "{" + label_str + "} " + str(values[key]))
+        lines.append("# EOF")
+
+        # write to temp file and rename so the collector never reads a partial file
+        with open(metrics_file + ".tmp", 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(metrics_file + ".tmp", metrics_file)
+
+    except Exception as e:
+        print("\nwrite_metrics_file() - Error writing metrics file " + metrics_file + " - " + str(e))
+
+
+##########################################################################
+# Add loaded file to the metrics
+##########################################################################
+def record_file_metrics(phases, num_rows, start_time, file_time_created):
+    set_metric('files_loaded', 1, add=True)
+    set_metric('rows_loaded', num_rows, add=True)
+    set_metric('bytes_loaded', phases.get('file_bytes', 0), add=True)
+    set_metric('data_bytes_loaded', phases.get('data_bytes', 0), add=True)
+    set_metric('load_seconds', round(time.time() - start_time, 3), add=True)
+    for phase in ('download', 'decompress', 'transform', 'insert', 'commit', 'tag_merge'):
+        set_metric('phase_seconds', phases.get(phase + '_secs', 0), {'phase': phase}, add=True)
+    set_metric('last_file_created_timestamp_seconds', round(file_time_created.timestamp(), 3))
+
+
 ##########################################################################
 # Create signer
 ##########################################################################
@@ -199,7 +382,7 @@ def identity_read_compartments(identity, tenancy):
         all_compartments = []
         try:
             all_compartments = oci.pagination.list_call_get_all_results(
-                identity.list_compartments,
+                counted_api_call('list_compartments', identity.list_compartments),
                 tenancy.id,
                 compartment_id_in_subtree=True
             ).data
@@ -318,6 +501,89 @@ def get_secret_password(config, signer, proxy, secret_id):
         raise SystemExit
 
 
+##########################################################################
+# Database connection profile - section -dbprofile of the -dbconf ini file
+#   mode                 thick or thin driver
+#   sdu                  session data unit in bytes
+#   stmtcachesize        statements cached per session
+#   arraysize            default cursor fetch array size
+#   prefetchrows         default cursor prefetch rows
+#   expire_time          minutes between tcp keepalive probes
+#   tcp_connect_timeout  seconds to establish the connection
+#   config_dir           tnsnames.ora folder for thin mode
+#   wallet_location      ewallet.pem folder for thin mode
+#   pool_min, pool_max   session pool size
+# thick mode reads sdu and keepalive from sqlnet.ora
+##########################################################################
+def load_db_profile(db_conf, db_profile_name, default_mode):
+    global db_profile
+    db_profile = {'mode': default_mode}
+
+    if db_conf:
+        parser = configparser.ConfigParser()
+        if not parser.read(db_conf):
+            print("\nError reading database profile file " + db_conf + ", aborting")
+            raise SystemExit
+
+        if not parser.has_section(db_profile_name) and db_profile_name != configparser.DEFAULTSECT:
+            print("\nDatabase profile " + db_profile_name + " not found in " + db_conf + ", aborting")
+            raise SystemExit
+
+        section = parser[db_profile_name]
+        for key in section:
+            if key not in db_profile_keys:
+                print("   Database profile key " + key + " ignored")
+            elif section[key].strip():
+                try:
+                    db_profile[key] = db_profile_keys[key](section[key].strip())
+                except ValueError:
+                    print("\nDatabase profile key " + key + " value " + section[key] + " is not valid, aborting")
+                    raise SystemExit
+
+    if db_profile['mode'] not in ('thick', 'thin'):
+        print("\nDatabase profile mode must be thick or thin, aborting")
+        raise SystemExit
+
+    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
+    if db_profile['mode'] == 'thick':
+        oracledb.init_oracle_client()
+
+    if 'arraysize' in db_profile:
+        oracledb.defaults.arraysize = db_profile['arraysize']
+    if 'prefetchrows' in db_profile:
+        oracledb.defaults.prefetchrows = db_profile['prefetchrows']
+
+    if db_conf:
+        print("DB Profile   : " + db_profile_name + " - " + ", ".join(key + "=" + str(value) for key, value in db_profile.items()))
+
+
+##########################################################################
+# Connect parameters of the profile, parameters passed override it
+##########################################################################
+def get_db_connect_params(**kwargs):
+    params = {key: db_profile[key] for key in ('sdu', 'stmtcachesize', 'expire_time', 'tcp_connect_timeout', 'config_dir', 'wallet_location') if key in db_profile}
+    params.update({key: value for key, value in kwargs.items() if value})
+    return params
+
+
+##########################################################################
+# Create connection with the profile
+##########################################################################
+def create_db_connection(user, password, dsn, **kwargs):
+    return oracledb.connect(user=user, password=password, dsn=dsn, **get_db_connect_params(**kwargs))
+
+
+##########################################################################
+# Create session pool with the profile, pool_min and pool_max of the
+# profile override the defaults of the caller
+##########################################################################
+def create_db_pool(user, password, dsn, pool_min, pool_max, ping_interval=60):
+    pool_max = max(db_profile.get('pool_max', pool_max), 1)
+    pool_min = min(db_profile.get('pool_min', pool_min), pool_max)
+    increment = 0 if pool_min == pool_max else 1
+    return oracledb.create_pool(user=user, password=password, dsn=dsn, min=pool_min, max=pool_max, increment=increment, ping_interval=ping_interval, **get_db_connect_params())
+
+
 ##########################################################################
 # set parser
 ##########################################################################
@@ -340,36 +606,80 @@ def set_parser_arguments():
     parser.add_argument('-su', action='store_true', default=False, dest='skip_usage', help='Not in use, keeping for backward compatibility')
     parser.add_argument('-sc', action='store_true', default=False, dest='skip_cost', help='Skip Load Cost Files')
     parser.add_argument('-sr', action='store_true', default=False, dest='skip_rate', help='Skip Public Rate API')
+    parser.add_argument('-rcd', default=7, type=int, dest='rate_cache_days', help='Public Rate cache expiry in days (default=7)')
     parser.add_argument('-loadsub', action='store_true', default=False, dest='load_subscription', help='Load subscription and commitment information')
+    parser.add_argument('-subthreads', default=8, type=int, dest='sub_threads', help='Number of threads to fetch subscribed services and commitments (default=8)')
     parser.add_argument('-internal', action='store_true', default=False, dest='internal', help='Load Data from Internal Namespace')
     parser.add_argument('-ip', action='store_true', default=False, dest='instance_principals', help='Use Instance Principals for Authentication')
     parser.add_argument('-bn', default="", dest='bucket_name', help='Override Bucket Name for Cost and Usage Files')
     parser.add_argument('-ns', default=customer_billing_namespace, dest='namespace_name', help='Override Namespace Name for Cost and Usage Files (default=' + customer_billing_namespace + ')')
     parser.add_argument('-du', default="", dest='duser', help='ADB User')
     parser.add_argument('-dn', default="", dest='dname', help='ADB Name')
+    parser.add_argument('-dnmerge', default="", dest='dname_merge', help='ADB Name for the merges, retention and statistics (i.e. ADWCUSG_HIGH, default=-dn)')
     parser.add_argument('-ds', default="", dest='dsecret_id', help='ADB Secret Id')
     parser.add_argument('-dst', default="", dest='dsecret_profile', help='ADB Secret tenancy profile (local or blank = instant principle)')
-    parser.add_argument('--force', action='store_true', default=False, dest='force', help='Force Update without updated file')
+    parser.add_argument('-dlthreads', default=4, type=int, dest='download_threads', help='Number of parallel ranges to download large files (default=4, 1=disable)')
+    parser.add_argument('-dlpartmb', default=32, type=int, dest='download_part_mb', help='Download range size in MB (default=32)')
+    parser.add_argument('-dryrun', default="", dest='dry_run_folder', help='Dry run - load files to local folder instead of the database')
+    parser.add_argument('-dryrunformat', default="parquet", dest='dry_run_format', choices=['parquet', 'csv'], help='Dry run file format - parquet (requires pyarrow) or gzipped csv (default=parquet)')
+    parser.add_argument('-metrics', default="", dest='metrics_file', help='Write OpenMetrics textfile for node_exporter, folder writes usage2adw_<tenant>.prom')
+    parser.add_argument('-tagsjson', action='store_true', default=False, dest='tags_json', help='Load all the tags to TAGS_JSON column with JSON search index')
+    parser.add_argument('-retainmonths', default=0, type=int, dest='retain_months', help='Purge usage of the tenant older than retain months (default=0, keep all)')
+    parser.add_argument('-retainbatch', default=100000, type=int, dest='retain_batch_rows', help='Rows per delete batch when purging (default=100000)')
+    parser.add_argument('-gatherstats', action='store_true', default=False, dest='gather_stats', help='Gather optimizer statistics of the changed tables after the load')
+    parser.add_argument('-gatherpct', default=10, type=int, dest='gather_stale_pct', help='Skip tables and partitions changed less than pct of their rows (default=10)')
+    parser.add_argument('-daemon', action='store_true', default=False, dest='daemon', help='Run resident, poll the bucket every -pollsecs with the connections kept open')
+    parser.add_argument('-pollsecs', default=900, type=int, dest='poll_secs', help='Daemon poll interval in seconds (default=900)')
+    parser.add_argument('-polljitter', default=60, type=int, dest='poll_jitter', help='Daemon random jitter +/- seconds added to the poll interval (default=60)')
+    parser.add_argument('-compartmenthours', default=6, type=int, dest='compartment_hours', help='Daemon compartments cache refresh in hours (default=6)')
+    parser.add_argument('-maintenancehours', default=24, type=int, dest='maintenance_hours', help='Daemon -retainmonths, -loadsub and -gatherstats interval in hours (default=24)')
+    parser.add_argument('-statusfile', default="", dest='status_file', help='Daemon status file, folder writes usage2adw_daemon_<tenant>.json (default=' + work_report_dir + ')')
+    parser.add_argument('-queue', action='store_true', default=False, dest='load_queue', help='Share the load between hosts with OCI_LOAD_QUEUE, files are claimed with skip locked')
+    parser.add_argument('-queuelease', default=3600, type=int, dest='queue_lease_secs', help='Seconds a claimed file is leased before another worker can claim it (default=3600)')
+    parser.add_argument('-queueattempts', default=3, type=int, dest='queue_attempts', help='Claims of a file before it is marked FAILED (default=3)')
+    parser.add_argument('-event', default="", dest='event_file', help='Load the objects of Object Storage create events from json file, - for stdin')
+    parser.add_argument('-eventport', default=0, type=int, dest='event_port', help='Listen for Object Storage create events posted to http port')
+    parser.add_argument('-eventhost', default="127.0.0.1", dest='event_host', help='Event listener address (default=127.0.0.1)')
+    parser.add_argument('-rejectpct', default=0.0, type=float, dest='reject_pct', help='Rejected rows percent of a file allowed before the file fails, rejects kept in OCI_LOAD_REJECTS (default=0, any reject fails the file)')
+    parser.add_argument('-dbconf', default="", dest='db_conf', help='Database connection profile ini file - sdu, stmtcachesize, arraysize, prefetchrows, keepalive, mode, pool')
+    parser.add_argument('-dbprofile', default=configparser.DEFAULTSECT, dest='db_profile', help='Database connection profile section (default=DEFAULT)')
+    parser.add_argument('--force', action='store_true', default=False, dest='force', help='Force Update without updated file, retry the files failed with rejected rows')
     parser.add_argument('--version', action='version', version='%(prog)s ' + version)
 
     result = parser.parse_args()
 
-    if not (result.duser and result.dsecret_id and result.dname):
+    if not (result.duser and result.dsecret_id and result.dname) and not result.dry_run_folder:
         parser.print_help()
         print_header("You must specify database credentials!!", 0)
         return None
 
+    if result.daemon and (result.dry_run_folder or result.fileid):
+        parser.print_help()
+        print_header("-daemon cannot be used with -dryrun or -f!!", 0)
+        return None
+
+    if (result.event_file or result.event_port) and (result.daemon or result.dry_run_folder or (result.event_file and result.event_port)):
+        parser.print_help()
+        print_header("-event or -eventport cannot be used with -daemon or -dryrun!!", 0)
+        return None
+
     return result
 
 
 #########################################################################
 # insert load stats
 ##########################################################################
-def insert_load_stats(connection, tenant_name, file_type, file_id, file_name_full, file_size_mb, file_time, num_rows, start_time_str, batch_id, batch_total):
+def insert_load_stats(connection, tenant_name, file_type, file_id, file_name_full, file_size_mb, file_time, num_rows, start_time_str, batch_id, batch_total, phases=None, file_status=None, commit=True):
     try:
+        phases = phases if phases else {}
 
         with connection.cursor() as cursor:
-            sql = """INSERT INTO OCI_LOAD_STATUS (TENANT_NAME, FILE_TYPE, FILE_ID, FILE_NAME, FILE_SIZE, FILE_DATE, NUM_ROWS, LOAD_START_TIME, LOAD_END_TIME, AGENT_VERSION, BATCH_ID, BATCH_TOTAL)
+
+            # the row of a previous failed load of the file is replaced
+            cursor.execute("delete from OCI_LOAD_STATUS where TENANT_NAME=:tenant_name and FILE_NAME=:file_name and FILE_STATUS='FAILED'", tenant_name=tenant_name, file_name=file_name_full)
+
+            sql = """INSERT INTO OCI_LOAD_STATUS (TENANT_NAME, FILE_TYPE, FILE_ID, FILE_NAME, FILE_SIZE, FILE_DATE, NUM_ROWS, LOAD_START_TIME, LOAD_END_TIME, AGENT_VERSION, BATCH_ID, BATCH_TOTAL,
+                     LIST_SECS, DOWNLOAD_SECS, DECOMPRESS_SECS, TRANSFORM_SECS, INSERT_SECS, COMMIT_SECS, TAG_MERGE_SECS, FILE_BYTES, DATA_BYTES, REJECTED_ROWS, FILE_STATUS)
                      VALUES (
                      :tenant_name,
                      :file_type,
@@ -382,7 +692,18 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name_ful
                      to_date(:load_end_time,'YYYY-MM-DD HH24:MI:SS'),
                      :agent_version,
                      :batch_id,
-                     :batch_total
+                     :batch_total,
+                     :list_secs,
+                     :download_secs,
+                     :decompress_secs,
+                     :transform_secs,
+                     :insert_secs,
+                     :commit_secs,
+                     :tag_merge_secs,
+                     :file_bytes,
+                     :data_bytes,
+                     :rejected_rows,
+                     :file_status
                      )"""
 
             cursor.execute(
@@ -398,9 +719,12 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name_ful
                 load_end_time=get_current_date_time(),
                 agent_version=version,
                 batch_id=batch_id,
-                batch_total=batch_total)
+                batch_total=batch_total,
+                file_status=file_status,
+                **{column.lower(): phases.get(column.lower()) for column in load_status_phase_columns})
 
-            connection.commit()
+            if commit:
+                connection.commit()
 
     except oracledb.DatabaseError as e:
         print("\ninsert_load_stats() - Error manipulating database - " + str(e) + "\n")
@@ -410,16 +734,81 @@ def insert_load_stats(connection, tenant_name, file_type, file_id, file_name_ful
         raise SystemExit
 
 
+##########################################################################
+# executemany with batcherrors, the rows rejected by the database are
+# added to rejects as (line number, error code, error message, row)
+##########################################################################
+def execute_batch(cursor, sql, data, data_lines, rejects):
+    cursor.executemany(sql, data, batcherrors=True)
+    for error in cursor.getbatcherrors():
+        rejects.append((data_lines[error.offset], error.code, error.message, data[error.offset]))
+
+
+##########################################################################
+# Save rejected rows to OCI_LOAD_REJECTS, committed by the caller
+##########################################################################
+def save_load_rejects(connection, tenant_name, file_type, file_id, file_name_full, rejects):
+    try:
+        data = []
+        for line_number, error_code, error_message, row in rejects[0:reject_store_max]:
+            data.append((tenant_name, file_type, file_id, file_name_full, line_number, error_code, str(error_message)[0:1000], json.dumps(row, default=str)[0:4000], version))
+
+        with connection.cursor() as cursor:
+            cursor.execute("delete from OCI_LOAD_REJECTS where TENANT_NAME=:tenant_name and FILE_NAME=:file_name", tenant_name=tenant_name, file_name=file_name_full)
+            sql = """INSERT INTO OCI_LOAD_REJECTS (TENANT_NAME, FILE_TYPE, FILE_ID, FILE_NAME, LINE_NUMBER, ERROR_CODE, ERROR_MESSAGE, ROW_DATA, AGENT_VERSION)
+                     VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)"""
+            cursor.executemany(sql, data)
+
+    except oracledb.DatabaseError as e:
+        print("\nsave_load_rejects() - Error manipulating database - " + str(e) + "\n")
+
+
+##########################################################################
+# Check the rejected rows of a file against -rejectpct, above it the rows
+# of the file are rolled back and True is returned, the file is recorded
+# as failed by the caller, the rejects are kept
+##########################################################################
+def check_file_rejects(connection, cmd, tenant_name, file_type, file_id, file_name_full, rejects, num_rows):
+    reject_pct = len(rejects) * 100 / num_rows if num_rows else 100
+    line_number, error_code, error_message, row = rejects[0]
+    print("   Rejected   " + str(len(rejects)) + " of " + str(num_rows) + " rows (" + str(round(reject_pct, 3)) + "%), first at line " + str(line_number) + " - " + str(error_message))
+    set_metric('rows_rejected', len(rejects), {'file_type': file_type}, add=True)
+
+    if reject_pct > cmd.reject_pct:
+        connection.rollback()
+        save_load_rejects(connection, tenant_name, file_type, file_id, file_name_full, rejects)
+        connection.commit()
+        print("   Failed     file " + file_name_full + " rejected rows above -rejectpct " + str(cmd.reject_pct) + "%, rows rolled back, see OCI_LOAD_REJECTS, retry with --force")
+        return True
+
+    save_load_rejects(connection, tenant_name, file_type, file_id, file_name_full, rejects)
+    return False
+
+
+##########################################################################
+# OCI_COST filter from the earliest usage loaded, prune partitions
+##########################################################################
+def get_usage_filter(min_usage_date):
+    if not min_usage_date:
+        return ""
+    print("   Limited to usage from " + min_usage_date)
+    return " and USAGE_INTERVAL_START >= to_date(:min_usage_date,'YYYY-MM-DD HH24:MI')"
+
+
 ##########################################################################
 # update_cost_stats
 ##########################################################################
-def update_cost_stats(connection, tenant_name):
+def update_cost_stats(connection, tenant_name, min_usage_date=""):
     try:
         start_time = time.time()
         # open cursor
         with connection.cursor() as cursor:
 
             print("\nMerging statistics into OCI_COST_STATS...")
+            usage_filter = get_usage_filter(min_usage_date)
+            binds = {'version': version, 'tenant_name': tenant_name}
+            if usage_filter:
+                binds['min_usage_date'] = min_usage_date
 
             # run merge to oci_update_stats
             sql = """merge into OCI_COST_STATS a
@@ -436,7 +825,7 @@ def update_cost_stats(connection, tenant_name):
                 from
                     oci_cost
                 where
-                    tenant_name = :tenant_name
+                    tenant_name = :tenant_name """ + usage_filter + """
                 group by
                     tenant_name,
                     file_id,
@@ -450,7 +839,7 @@ def update_cost_stats(connection, tenant_name):
             values (b.TENANT_NAME,b.FILE_ID,b.USAGE_INTERVAL_START,b.NUM_ROWS,b.COST_MY_COST,sysdate,:version,b.COST_MY_COST_OVERAGE,b.COST_CURRENCY_CODE)
             """
 
-            cursor.execute(sql, version=version, tenant_name=tenant_name)
+            cursor.execute(sql, binds)
             connection.commit()
             print("   Merge Completed, " + str(cursor.rowcount) + " rows merged" + get_time_elapsed(start_time))
 
@@ -462,17 +851,105 @@ def update_cost_stats(connection, tenant_name):
         raise Exception("\nError manipulating database at update_cost_stats() - " + str(e))
 
 
+##########################################################################
+# update_cost_daily - daily summary for the APEX reports
+# Days from the earliest usage loaded are rebuilt in one transaction
+##########################################################################
+def update_cost_daily(connection, tenant_name, min_usage_date=""):
+    try:
+        start_time = time.time()
+        # open cursor
+        with connection.cursor() as cursor:
+
+            print("\nRefreshing daily summary OCI_COST_DAILY...")
+            binds = {'version': version, 'tenant_name': tenant_name}
+            day_filter = ""
+            usage_filter = ""
+            if min_usage_date:
+                print("   Refreshing days from " + min_usage_date[0:10])
+                binds['min_usage_date'] = min_usage_date
+                day_filter = " and USAGE_DAY >= trunc(to_date(:min_usage_date,'YYYY-MM-DD HH24:MI'))"
+                usage_filter = " and USAGE_INTERVAL_START >= trunc(to_date(:min_usage_date,'YYYY-MM-DD HH24:MI'))"
+
+            sql = "delete from OCI_COST_DAILY where TENANT_NAME = :tenant_name" + day_filter
+            cursor.execute(sql, {k: v for k, v in binds.items() if k != 'version'})
+            deleted = cursor.rowcount
+
+            sql = """insert into OCI_COST_DAILY (
+                TENANT_NAME, TENANT_ID, USAGE_DAY, PRD_SERVICE, PRD_REGION, PRD_COMPARTMENT_NAME, PRD_COMPARTMENT_PATH,
+                COST_PRODUCT_SKU, PRD_DESCRIPTION, COST_BILLING_UNIT, COST_CURRENCY_CODE,
+                TAG_SPECIAL, TAG_SPECIAL2, TAG_SPECIAL3, TAG_SPECIAL4,
+                NUM_ROWS, USG_BILLED_QUANTITY, COST_MY_COST, COST_MY_COST_OVERAGE, UPDATE_DATE, AGENT_VERSION
+            )
+            select /*+ parallel(oci_cost,8) full(oci_cost) */
+                TENANT_NAME,
+                TENANT_ID,
+                trunc(USAGE_INTERVAL_START) USAGE_DAY,
+                PRD_SERVICE,
+                PRD_REGION,
+                PRD_COMPARTMENT_NAME,
+                PRD_COMPARTMENT_PATH,
+                COST_PRODUCT_SKU,
+                min(PRD_DESCRIPTION) PRD_DESCRIPTION,
+                min(COST_BILLING_UNIT) COST_BILLING_UNIT,
+                min(COST_CURRENCY_CODE) COST_CURRENCY_CODE,
+                TAG_SPECIAL,
+                TAG_SPECIAL2,
+                TAG_SPECIAL3,
+                TAG_SPECIAL4,
+                count(*) NUM_ROWS,
+                sum(USG_BILLED_QUANTITY) USG_BILLED_QUANTITY,
+                sum(COST_MY_COST) COST_MY_COST,
+                sum(COST_MY_COST_OVERAGE) COST_MY_COST_OVERAGE,
+                sysdate,
+                :version
+            from
+                OCI_COST
+            where
+                TENANT_NAME = :tenant_name """ + usage_filter + """
+            group by
+                TENANT_NAME,
+                TENANT_ID,
+                trunc(USAGE_INTERVAL_START),
+                PRD_SERVICE,
+                PRD_REGION,
+                PRD_COMPARTMENT_NAME,
+                PRD_COMPARTMENT_PATH,
+                COST_PRODUCT_SKU,
+                TAG_SPECIAL,
+                TAG_SPECIAL2,
+                TAG_SPECIAL3,
+                TAG_SPECIAL4
+            """
+
+            cursor.execute(sql, binds)
+            connection.commit()
+            print("   Refresh Completed, " + str(deleted) + " rows removed, " + str(cursor.rowcount) + " rows inserted" + get_time_elapsed(start_time))
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at update_cost_daily() - " + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        raise Exception("\nError manipulating database at update_cost_daily() - " + str(e))
+
+
 ##########################################################################
 # update_price_list
 ##########################################################################
-def update_price_list(connection, tenant_name):
+def update_price_list(connection, tenant_name, min_usage_date=""):
     try:
         start_time = time.time()
 
         # open cursor
         with connection.cursor() as cursor:
 
+            # latest price per sku, skus not used from min_usage_date keep their price
             print("\nMerging statistics into OCI_PRICE_LIST...")
+            usage_filter = get_usage_filter(min_usage_date)
+            binds = {'tenant_name': tenant_name}
+            if usage_filter:
+                binds['min_usage_date'] = min_usage_date
 
             # run merge to oci_update_stats
             sql = """MERGE INTO OCI_PRICE_LIST A
@@ -495,7 +972,7 @@ def update_price_list(connection, tenant_name):
                         COST_CURRENCY_CODE,
                         COST_UNIT_PRICE,
                         ROW_NUMBER() OVER (PARTITION BY TENANT_NAME, TENANT_ID, COST_PRODUCT_SKU ORDER BY USAGE_INTERVAL_START DESC, COST_UNIT_PRICE DESC) RN
-                    FROM OCI_COST A where tenant_id is not null and tenant_name=:tenant_name
+                    FROM OCI_COST A where tenant_id is not null and tenant_name=:tenant_name """ + usage_filter + """
                 )
                 WHERE RN = 1
                 ORDER BY 1,2
@@ -506,7 +983,7 @@ def update_price_list(connection, tenant_name):
             VALUES (B.TENANT_NAME,B.TENANT_ID, B.COST_PRODUCT_SKU,B.PRD_DESCRIPTION,B.COST_CURRENCY_CODE,B.COST_UNIT_PRICE,SYSDATE)
             """
 
-            cursor.execute(sql, tenant_name=tenant_name)
+            cursor.execute(sql, binds)
             connection.commit()
             print("   Merge Completed, " + str(cursor.rowcount) + " rows merged" + get_time_elapsed(start_time))
 
@@ -521,13 +998,13 @@ def update_price_list(connection, tenant_name):
                     from (SELECT  /*+ parallel(a,8) full(a) */
                         COST_CURRENCY_CODE,
                         ROW_NUMBER() OVER (PARTITION BY TENANT_NAME ORDER BY USAGE_INTERVAL_START DESC) RN
-                    FROM OCI_COST A where COST_CURRENCY_CODE is not null and tenant_name=:tenant_name
+                    FROM OCI_COST A where COST_CURRENCY_CODE is not null and tenant_name=:tenant_name """ + usage_filter + """
                     ) where rn=1
                 )
                 where COST_CURRENCY_CODE is null and tenant_name=:tenant_name
                 """
 
-            cursor.execute(sql, tenant_name=tenant_name)
+            cursor.execute(sql, binds)
             connection.commit()
             print("   Merge Completed, " + str(cursor.rowcount) + " rows merged" + get_time_elapsed(start_time))
 
@@ -542,7 +1019,7 @@ def update_price_list(connection, tenant_name):
 ##########################################################################
 # update_cost_reference
 ##########################################################################
-def update_cost_reference(connection, tag_special_key1, tag_special_key2, tag_special_key3, tag_special_key4, tag_special_key5, tag_special_key6, tag_special_key7, tag_special_key8, tenant_name):
+def update_cost_reference(connection, tag_special_key1, tag_special_key2, tag_special_key3, tag_special_key4, tag_special_key5, tag_special_key6, tag_special_key7, tag_special_key8, tenant_name, min_usage_date="", rebuild=False):
     try:
         start_time = time.time()
 
@@ -551,6 +1028,15 @@ def update_cost_reference(connection, tag_special_key1, tag_special_key2, tag_sp
 
             print("\nMerging statistics into OCI_COST_REFERENCE ...")
             print("   Merging statistics from OCI_COST...")
+            usage_filter = get_usage_filter(min_usage_date)
+            binds = {'tenant_name': tenant_name}
+            if usage_filter:
+                binds['min_usage_date'] = min_usage_date
+
+            # rebuild after retention purge, removed in the same transaction as the merge
+            if rebuild:
+                cursor.execute("delete from OCI_COST_REFERENCE where TENANT_NAME = :tenant_name and REF_TYPE not like 'TAG_SPECIAL_KEY%'", tenant_name=tenant_name)
+                print("   Removed " + str(cursor.rowcount) + " references for rebuild")
 
             #######################################################
             # run merge to OCI_COST_REFERENCE
@@ -601,7 +1087,10 @@ def update_cost_reference(connection, tag_special_key1, tag_special_key2, tag_sp
             values (b.TENANT_NAME,b.REF_TYPE,b.REF_NAME)
             """
 
-            cursor.execute(sql, tenant_name=tenant_name)
+            # every branch reads OCI_COST of the tenant, limit each one from the earliest usage loaded
+            sql = sql.replace(":tenant_name = TENANT_NAME", ":tenant_name = TENANT_NAME" + usage_filter)
+
+            cursor.execute(sql, binds)
             connection.commit()
             print("   Merge Completed, " + str(cursor.rowcount) + " rows merged" + get_time_elapsed(start_time))
 
@@ -647,89 +1136,141 @@ def update_cost_reference(connection, tag_special_key1, tag_special_key2, tag_sp
 
 
 ##########################################################################
-# update_public_rates
+# fetch_public_rate
 # Example: https://apexapps.oracle.com/pls/apex/cetools/api/v1/products/?partNumber=B95634&currencyCode=USD
 ##########################################################################
-def update_public_rates(connection, tenant_name):
+def fetch_public_rate(api_url, cost_product_sku, currency_code):
+    import requests
+    rate_description = ""
+    rate_unit_full = []
+    rate_price = None
+
+    set_metric('api_calls', 1, {'api': 'public_rate'}, add=True)
+    resp = requests.get(api_url + "partNumber=" + cost_product_sku + "&currencyCode=" + currency_code, timeout=60)
+
+    # failed calls (429, 5xx) raise and are not cached, an answer without items is cached as no price
+    resp.raise_for_status()
+    resp_json = resp.json()
+    if not isinstance(resp_json, dict) or 'items' not in resp_json:
+        raise Exception("Public Rate API answer without items for " + cost_product_sku + " " + currency_code)
+
+    for item in resp_json['items'] or []:
+        rate_description = item["displayName"]
+        rate_unit_full = item.get("currencyCodeLocalizations", [])
+        if 'currencyCodeLocalizations' in item:
+            for currency in item['currencyCodeLocalizations']:
+                if 'prices' in currency:
+                    for price in currency['prices']:
+                        if price['model'] == 'PAY_AS_YOU_GO':
+                            rate_price = price['value']
+
+    return rate_description, rate_unit_full, rate_price
+
+
+##########################################################################
+# update_public_rates
+# OCI_PUBLIC_RATE_CACHE is shared by all the tenants loaded to the schema,
+# the API is called only for SKU/Currency missing or expired in the cache
+##########################################################################
+def update_public_rates(connection, tenant_name, rate_cache_days):
+    import requests
     api_url = "https://apexapps.oracle.com/pls/apex/cetools/api/v1/products/?"
     try:
         start_time = time.time()
-        num_rows = 0
+        num_calls = 0
 
         # open cursor
         with connection.cursor() as cursor:
 
-            print("\nMerging Public Rates into OCI_RATE_CARD...")
+            print("\nMerging Public Rates into OCI_PUBLIC_RATE_CACHE...")
 
-            # retrieve the SKUS to query
-            sql = "select distinct COST_PRODUCT_SKU, COST_CURRENCY_CODE from OCI_PRICE_LIST where tenant_name=:tenant_name"
+            # retrieve the SKUS which are not in the cache or expired
+            sql = """select distinct a.COST_PRODUCT_SKU, a.COST_CURRENCY_CODE
+                from OCI_PRICE_LIST a
+                where a.tenant_name=:tenant_name and a.COST_CURRENCY_CODE is not null
+                and not exists (
+                    select 1 from OCI_PUBLIC_RATE_CACHE b
+                    where b.COST_PRODUCT_SKU = a.COST_PRODUCT_SKU
+                    and b.COST_CURRENCY_CODE = a.COST_CURRENCY_CODE
+                    and b.FETCH_DATE > sysdate - :rate_cache_days
+                )"""
 
-            cursor.execute(sql, tenant_name=tenant_name)
+            cursor.execute(sql, tenant_name=tenant_name, rate_cache_days=rate_cache_days)
             rows = cursor.fetchall()
+            print("   " + str(len(rows)) + " SKUs missing or expired in the cache, calling Public Rate API...")
+
+            data = []
+            for row in rows:
+
+                #######################################
+                # Call API to fetch the SKU Data
+                #######################################
+                cost_product_sku = str(row[0])
+                currency_code = str(row[1])
+                try:
+                    rate_description, rate_unit_full, rate_price = fetch_public_rate(api_url, cost_product_sku, currency_code)
+                    num_calls += 1
+                    time.sleep(0.2)
+
+                except Exception as e:
+                    print("\nWarning  Calling REST API for Public Rate at update_public_rates() - " + str(e))
+                    time.sleep(2)
+                    continue
+
+                # SKUs answered without paygo price are cached as well to avoid calling the API on every run
+                data.append({
+                    "cost_product_sku": cost_product_sku,
+                    "currency_code": currency_code,
+                    "rate_description": rate_description,
+                    "rate_unit_full": rate_unit_full,
+                    "rate_price": rate_price
+                })
+
+            if data:
+                sql = """merge into OCI_PUBLIC_RATE_CACHE a
+                using (select :cost_product_sku as COST_PRODUCT_SKU, :currency_code as COST_CURRENCY_CODE from dual) b
+                on (a.COST_PRODUCT_SKU = b.COST_PRODUCT_SKU and a.COST_CURRENCY_CODE = b.COST_CURRENCY_CODE)
+                when matched then update set
+                    a.RATE_DESCRIPTION=:rate_description,
+                    a.RATE_UNIT_FULL=:rate_unit_full,
+                    a.RATE_PAYGO_PRICE=:rate_price,
+                    a.FETCH_DATE=sysdate
+                when not matched then insert (COST_PRODUCT_SKU, COST_CURRENCY_CODE, RATE_DESCRIPTION, RATE_UNIT_FULL, RATE_PAYGO_PRICE, FETCH_DATE)
+                values (b.COST_PRODUCT_SKU, b.COST_CURRENCY_CODE, :rate_description, :rate_unit_full, :rate_price, sysdate)
+                """
 
-            if rows:
-                for row in rows:
-
-                    rate_description = ""
-                    rate_unit_full = []
-                    rate_price = None
-                    resp = None
-
-                    #######################################
-                    # Call API to fetch the SKU Data
-                    #######################################
-                    try:
-                        cost_product_sku = str(row[0])
-                        country_code = str(row[1])
-                        resp = requests.get(api_url + "partNumber=" + cost_product_sku + "&currencyCode=" + country_code)
-                        time.sleep(0.2)
-
-                    except Exception as e:
-                        print("\nWarning  Calling REST API for Public Rate at update_public_rates() - " + str(e))
-                        time.sleep(2)
-                        continue
-
-                    if not resp or not resp.json() or 'items' not in resp.json() or not resp.json()['items']:
-                        continue
-
-                    for item in resp.json()['items']:
-                        rate_description = item["displayName"]
-                        rate_unit_full = item.get("currencyCodeLocalizations", [])
-                        if 'currencyCodeLocalizations' in item:
-                            for currency in item['currencyCodeLocalizations']:
-                                if 'prices' in currency:
-                                    for price in currency['prices']:
-                                        if price['model'] == 'PAY_AS_YOU_GO':
-                                            rate_price = price['value']
-
-                    if rate_price is not None:
-                        # update database
-                        sql = """update OCI_PRICE_LIST set
-                        RATE_DESCRIPTION=:rate_description,
-                        RATE_UNIT_FULL=:rate_unit_full,
-                        RATE_PAYGO_PRICE=:rate_price,
-                        RATE_MONTHLY_FLEX_PRICE=:rate_price,
-                        RATE_UPDATE_DATE=sysdate
-                        where TENANT_NAME=:tenant_name and COST_PRODUCT_SKU=:cost_product_sku
-                        """
-
-                        # only apply paygo cost after 7/13 oracle change rate
-                        sql_variables = {
-                            "rate_description": rate_description,
-                            "rate_unit_full": rate_unit_full,
-                            "rate_price": rate_price,
-                            "tenant_name": tenant_name,
-                            "cost_product_sku": cost_product_sku
-                        }
-
-                        cursor.setinputsizes(rate_unit_full=oracledb.DB_TYPE_JSON)
-                        cursor.execute(sql, sql_variables)
-                        num_rows += 1
-
-                # Commit
+                cursor.setinputsizes(rate_unit_full=oracledb.DB_TYPE_JSON)
+                cursor.executemany(sql, data)
                 connection.commit()
 
-            print("   Update Completed, " + str(num_rows) + " rows updated." + get_time_elapsed(start_time))
+            print("   Cache Completed, " + str(num_calls) + " API calls, " + str(len(data)) + " rows cached" + get_time_elapsed(start_time))
+
+            #######################################
+            # Update the price list from the cache
+            #######################################
+            start_time = time.time()
+            print("\nMerging Public Rates into OCI_PRICE_LIST...")
+
+            # only apply paygo cost after 7/13 oracle change rate
+            sql = """merge into OCI_PRICE_LIST a
+            using
+            (
+                select COST_PRODUCT_SKU, COST_CURRENCY_CODE, RATE_DESCRIPTION, RATE_UNIT_FULL, RATE_PAYGO_PRICE
+                from OCI_PUBLIC_RATE_CACHE
+                where RATE_PAYGO_PRICE is not null
+            ) b
+            on (a.TENANT_NAME = :tenant_name and a.COST_PRODUCT_SKU = b.COST_PRODUCT_SKU and a.COST_CURRENCY_CODE = b.COST_CURRENCY_CODE)
+            when matched then update set
+                a.RATE_DESCRIPTION=b.RATE_DESCRIPTION,
+                a.RATE_UNIT_FULL=b.RATE_UNIT_FULL,
+                a.RATE_PAYGO_PRICE=b.RATE_PAYGO_PRICE,
+                a.RATE_MONTHLY_FLEX_PRICE=b.RATE_PAYGO_PRICE,
+                a.RATE_UPDATE_DATE=sysdate
+            """
+
+            cursor.execute(sql, tenant_name=tenant_name)
+            connection.commit()
+            print("   Update Completed, " + str(cursor.rowcount) + " rows updated." + get_time_elapsed(start_time))
 
     except oracledb.DatabaseError as e:
         print("\nError manipulating database at update_public_rates() - " + str(e) + "\n")
@@ -781,13 +1322,17 @@ def update_oci_tenant_with_tenant_ids(connection, tenant_name, short_tenant_id):
 ##########################################################################
 # Check Table Structure Cost
 ##########################################################################
-def check_database_table_structure(connection, load_subscription=False):
+def check_database_table_structure(connection, load_subscription=False, tags_json=False, load_queue=False):
+    global cost_daily_rebuild
+    global cost_star_schema
+    global cost_table
     try:
         # open cursor
         with connection.cursor() as cursor:
 
             # check if OCI_TENANT table exist, if not create
-            sql = "select count(*) from user_tables where table_name in ('OCI_TENANT','OCI_COST','OCI_COST_TAG_KEYS','OCI_COST_STATS','OCI_COST_REFERENCE','OCI_PRICE_LIST','OCI_LOAD_STATUS','OCI_RESOURCES')"
+            # OCI_COST is a view in star schema mode
+            sql = "select count(*) from user_objects where object_type in ('TABLE','VIEW') and object_name in ('OCI_TENANT','OCI_COST','OCI_COST_TAG_KEYS','OCI_COST_STATS','OCI_COST_REFERENCE','OCI_PRICE_LIST','OCI_LOAD_STATUS','OCI_RESOURCES')"
             cursor.execute(sql)
             val, = cursor.fetchone()
 
@@ -799,6 +1344,23 @@ def check_database_table_structure(connection, load_subscription=False):
             else:
                 print("   Cost Tables exist")
 
+            # star schema - OCI_COST view over OCI_COST_FACT and the dimensions
+            sql = "select count(*) from user_views where view_name = 'OCI_COST'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+
+            if val > 0:
+                sql = "select count(*) from user_tables where table_name in ('OCI_COST_FACT','OCI_DIM_COMPARTMENT','OCI_DIM_PRODUCT','OCI_DIM_RESOURCE','OCI_DIM_TAGSET')"
+                cursor.execute(sql)
+                val, = cursor.fetchone()
+                if val < 5:
+                    print("   OCI_COST is a view but the star schema tables are missing, please run usage2adw_setup.sh -convert_star !")
+                    print("   Aborting !")
+                    raise SystemExit
+                cost_star_schema = True
+                cost_table = "OCI_COST_FACT"
+                print("   Star schema mode, loading to OCI_COST_FACT")
+
             if load_subscription:
                 sql = "select count(*) from user_tables where table_name in ('OCI_SUBSCRIPTION','OCI_SUBSCRIPTION_COMMIT')"
                 cursor.execute(sql)
@@ -821,8 +1383,133 @@ def check_database_table_structure(connection, load_subscription=False):
                 cursor.execute("alter table OCI_PRICE_LIST add RATE_UNIT_FULL JSON")
                 connection.commit()
 
+            # Add the shared public rate cache introduced after the initial table creation.
+            sql = "select count(*) from user_tables where table_name = 'OCI_PUBLIC_RATE_CACHE'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+
+            if val == 0:
+                print("   Creating OCI_PUBLIC_RATE_CACHE table")
+                sql = """create table OCI_PUBLIC_RATE_CACHE (
+                    COST_PRODUCT_SKU        VARCHAR2(10) NOT NULL,
+                    COST_CURRENCY_CODE      VARCHAR2(10) NOT NULL,
+                    RATE_DESCRIPTION        VARCHAR2(1000),
+                    RATE_PAYGO_PRICE        NUMBER,
+                    RATE_UNIT_FULL          JSON,
+                    FETCH_DATE              DATE,
+                    CONSTRAINT OCI_PUBLIC_RATE_CACHE_PK PRIMARY KEY (COST_PRODUCT_SKU, COST_CURRENCY_CODE) USING INDEX
+                )"""
+                cursor.execute(sql)
+
+            # Add the daily summary used by the APEX reports introduced after the initial table creation.
+            sql = "select count(*) from user_tables where table_name = 'OCI_COST_DAILY'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+
+            if val == 0:
+                print("   Creating OCI_COST_DAILY table, it is populated with the full usage at the end of the run")
+                sql = """create table OCI_COST_DAILY (
+                    TENANT_NAME             VARCHAR2(100),
+                    TENANT_ID               VARCHAR2(100),
+                    USAGE_DAY               DATE,
+                    PRD_SERVICE             VARCHAR2(100),
+                    PRD_REGION              VARCHAR2(100),
+                    PRD_COMPARTMENT_NAME    VARCHAR2(100),
+                    PRD_COMPARTMENT_PATH    VARCHAR2(1000),
+                    COST_PRODUCT_SKU        VARCHAR2(10),
+                    PRD_DESCRIPTION         VARCHAR2(1000),
+                    COST_BILLING_UNIT       VARCHAR2(1000),
+                    COST_CURRENCY_CODE      VARCHAR2(10),
+                    TAG_SPECIAL             VARCHAR2(4000),
+                    TAG_SPECIAL2            VARCHAR2(4000),
+                    TAG_SPECIAL3            VARCHAR2(4000),
+                    TAG_SPECIAL4            VARCHAR2(4000),
+                    NUM_ROWS                NUMBER,
+                    USG_BILLED_QUANTITY     NUMBER,
+                    COST_MY_COST            NUMBER,
+                    COST_MY_COST_OVERAGE    NUMBER,
+                    UPDATE_DATE             DATE,
+                    AGENT_VERSION           VARCHAR2(30)
+                ) COMPRESS"""
+                cursor.execute(sql)
+                cursor.execute("CREATE INDEX OCI_COST_DAILY_1IX ON OCI_COST_DAILY (TENANT_NAME, USAGE_DAY)")
+                cost_daily_rebuild = True
+
+            # Add the rejected rows table introduced after the initial table creation.
+            sql = "select count(*) from user_tables where table_name = 'OCI_LOAD_REJECTS'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+
+            if val == 0:
+                print("   Creating OCI_LOAD_REJECTS table")
+                sql = """create table OCI_LOAD_REJECTS (
+                    TENANT_NAME             VARCHAR2(100) NOT NULL,
+                    FILE_TYPE               VARCHAR2(100),
+                    FILE_ID                 VARCHAR2(1000),
+                    FILE_NAME               VARCHAR2(1000) NOT NULL,
+                    LINE_NUMBER             NUMBER,
+                    ERROR_CODE              NUMBER,
+                    ERROR_MESSAGE           VARCHAR2(1000),
+                    ROW_DATA                VARCHAR2(4000),
+                    REJECT_TIME             DATE DEFAULT SYSDATE,
+                    AGENT_VERSION           VARCHAR2(30)
+                )"""
+                cursor.execute(sql)
+                cursor.execute("CREATE INDEX OCI_LOAD_REJECTS_1IX ON OCI_LOAD_REJECTS (TENANT_NAME, FILE_NAME)")
+
+            # Add the load queue of -queue introduced after the initial table creation.
+            if load_queue:
+                sql = "select count(*) from user_tables where table_name = 'OCI_LOAD_QUEUE'"
+                cursor.execute(sql)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    print("   Creating OCI_LOAD_QUEUE table")
+                    sql = """create table OCI_LOAD_QUEUE (
+                        TENANT_NAME             VARCHAR2(100) NOT NULL,
+                        FILE_NAME               VARCHAR2(1000) NOT NULL,
+                        NAMESPACE_NAME          VARCHAR2(100),
+                        BUCKET_NAME             VARCHAR2(200),
+                        FILE_SIZE               NUMBER,
+                        FILE_ETAG               VARCHAR2(200),
+                        FILE_TIME_CREATED       DATE,
+                        STATUS                  VARCHAR2(20) DEFAULT 'NEW' NOT NULL,
+                        CLAIMED_BY              VARCHAR2(200),
+                        CLAIM_EXPIRES           DATE,
+                        ATTEMPTS                NUMBER DEFAULT 0,
+                        ENQUEUED_TIME           DATE DEFAULT SYSDATE,
+                        COMPLETED_TIME          DATE,
+                        LAST_ERROR              VARCHAR2(1000),
+                        CONSTRAINT OCI_LOAD_QUEUE_PK PRIMARY KEY (TENANT_NAME, FILE_NAME) USING INDEX
+                    )"""
+                    cursor.execute(sql)
+                    cursor.execute("CREATE INDEX OCI_LOAD_QUEUE_1IX ON OCI_LOAD_QUEUE (TENANT_NAME, STATUS, CLAIM_EXPIRES)")
+
+            # Add load status phase timing columns introduced after the initial table creation.
+            for column_name in load_status_phase_columns:
+                sql = """select count(*) from user_tab_columns
+                         where table_name = 'OCI_LOAD_STATUS'
+                         and column_name = :column_name"""
+                cursor.execute(sql, column_name=column_name)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    print("   Adding " + column_name + " column to OCI_LOAD_STATUS")
+                    cursor.execute("alter table OCI_LOAD_STATUS add " + column_name + " NUMBER")
+                    connection.commit()
+
+            # FAILED for files failed with rejected rows, null for loaded files
+            sql = "select count(*) from user_tab_columns where table_name = 'OCI_LOAD_STATUS' and column_name = 'FILE_STATUS'"
+            cursor.execute(sql)
+            val, = cursor.fetchone()
+            if val == 0:
+                print("   Adding FILE_STATUS column to OCI_LOAD_STATUS")
+                cursor.execute("alter table OCI_LOAD_STATUS add FILE_STATUS VARCHAR2(20)")
+                connection.commit()
+
             # Add special-tag columns introduced after the initial table creation.
-            for column_name in ('TAG_SPECIAL5', 'TAG_SPECIAL6', 'TAG_SPECIAL7', 'TAG_SPECIAL8'):
+            # star schema tables created with all the columns
+            for column_name in (() if cost_star_schema else ('TAG_SPECIAL5', 'TAG_SPECIAL6', 'TAG_SPECIAL7', 'TAG_SPECIAL8')):
                 sql = """select count(*) from user_tab_columns
                          where table_name = 'OCI_COST'
                          and column_name = :column_name"""
@@ -834,6 +1521,36 @@ def check_database_table_structure(connection, load_subscription=False):
                     cursor.execute("alter table OCI_COST add " + column_name + " VARCHAR2(4000)")
                     connection.commit()
 
+            # Add the JSON tags column and its search index if -tagsjson specified
+            if tags_json and cost_star_schema:
+                print("   -tagsjson is not supported with the star schema, TAGS_JSON will not be loaded")
+
+            elif tags_json:
+                sql = """select count(*) from user_tab_columns
+                         where table_name = 'OCI_COST'
+                         and column_name = 'TAGS_JSON'"""
+                cursor.execute(sql)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    print("   Adding TAGS_JSON column to OCI_COST")
+                    cursor.execute("alter table OCI_COST add TAGS_JSON JSON")
+                    connection.commit()
+
+                sql = "select count(*) from user_indexes where table_name = 'OCI_COST' and index_name = 'OCI_COST_TAGS_JIX'"
+                cursor.execute(sql)
+                val, = cursor.fetchone()
+
+                if val == 0:
+                    # local index on partitioned OCI_COST so partition drop keeps it usable
+                    cursor.execute("select count(*) from user_part_tables where table_name = 'OCI_COST'")
+                    partitioned, = cursor.fetchone()
+
+                    print("   Creating JSON search index OCI_COST_TAGS_JIX on OCI_COST (TAGS_JSON)")
+                    sql = "CREATE SEARCH INDEX OCI_COST_TAGS_JIX ON OCI_COST (TAGS_JSON) FOR JSON " + ("LOCAL " if partitioned else "") + "PARAMETERS ('SYNC (ON COMMIT)')"
+                    cursor.execute(sql)
+                    print("   Index created.")
+
     except oracledb.DatabaseError as e:
         print("\nError manipulating database at check_database_table_structures() - " + str(e) + "\n")
         raise SystemExit
@@ -842,6 +1559,30 @@ def check_database_table_structure(connection, load_subscription=False):
         raise Exception("\nError manipulating database at check_database_table_structures() - " + str(e))
 
 
+##########################################################################
+# Build keyed merge for the subscription tables
+# Only rows with changed values are updated
+##########################################################################
+def get_subscription_merge_sql(table_name, columns, keys):
+
+    def bind_value(column, kind):
+        return "cast(:" + column + " as date)" if kind == 'date' else ":" + column
+
+    using_columns = ", ".join(bind_value(col, kind) + " as " + col for col, kind in columns)
+    on_columns = " and ".join("a." + col + " = b." + col for col in keys)
+    update_columns = [col for col, kind in columns if col not in keys]
+
+    sql = "merge into " + table_name + " a using (select " + using_columns + " from dual) b "
+    sql += "on (" + on_columns + ") "
+    sql += "when matched then update set "
+    sql += ", ".join("a." + col + " = b." + col for col in update_columns)
+    sql += ", a.LAST_LOADED = SYSDATE, a.AGENT_VERSION = :agent_version "
+    sql += "where " + " or ".join("decode(a." + col + ", b." + col + ", 0, 1) = 1" for col in update_columns) + " "
+    sql += "when not matched then insert (" + ", ".join(col for col, kind in columns) + ", LAST_LOADED, AGENT_VERSION) "
+    sql += "values (" + ", ".join("b." + col for col, kind in columns) + ", SYSDATE, :agent_version)"
+    return sql
+
+
 ##########################################################################
 # Load subscriptions and commitments
 ##########################################################################
@@ -853,14 +1594,58 @@ def load_subscription_data(connection, config, signer, cmd, tenancy):
     tenant_name = str(tenancy.name)
     tenant_id = str(tenancy.id)[-6:]
 
+    subscription_columns = [
+        ('tenant_id', 'str'), ('tenant_name', 'str'), ('subscription_id', 'str'), ('service_name', 'str'), ('currency', 'str'),
+        ('subscription_time_start', 'date'), ('subscription_time_end', 'date'), ('subscription_status', 'str'), ('subscription_total_value', 'number'),
+        ('subscribed_service_id', 'str'), ('service_status', 'str'), ('service_time_start', 'date'), ('service_time_end', 'date'), ('term_value', 'number'),
+        ('admin_email', 'str'), ('buyer_email', 'str'), ('agreement_id', 'str'), ('agreement_name', 'str'), ('agreement_time_end', 'date'),
+        ('bill_to_customer', 'str'), ('end_user_customer', 'str'), ('service_to_customer', 'str'), ('billing_frequency', 'str'), ('csi', 'str'),
+        ('operation_type', 'str'), ('order_type', 'str'), ('order_number', 'str'), ('payment_method', 'str'), ('payment_number', 'str'), ('pricing_model', 'str'),
+        ('product_number', 'str'), ('product_name', 'str'), ('is_payg', 'str'), ('is_having_usage', 'str'), ('is_variable_commitment', 'str'),
+        ('original_promo_amount', 'number'), ('funded_allocation_value', 'number'), ('line_net_amount', 'number'), ('total_value', 'number'),
+        ('used_amount', 'number'), ('available_amount', 'number')
+    ]
+    subscription_keys = ['tenant_id', 'subscribed_service_id']
+
+    commit_columns = [
+        ('tenant_id', 'str'), ('tenant_name', 'str'), ('subscribed_service_id', 'str'), ('time_start', 'date'), ('time_end', 'date'),
+        ('funded_allocation_value', 'number'), ('quantity', 'number'), ('used_amount', 'number'), ('available_amount', 'number')
+    ]
+    commit_keys = ['tenant_id', 'subscribed_service_id', 'time_start', 'time_end']
+
     def numeric_value(value):
         return None if value is None or str(value).lower() == 'null' else value
 
+    # DATE columns do not keep time zone or fractions, compare keys as strings
+    def date_key(value):
+        return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+    def fetch_subscribed_services(sub):
+        services = oci.pagination.list_call_get_all_results(
+            counted_api_call('list_subscribed_services', subscribed_service_client.list_subscribed_services),
+            tenancy.id,
+            sub.id
+        ).data
+        return sub, services
+
+    def fetch_commitments(service):
+        try:
+            commits = oci.pagination.list_call_get_all_results(
+                counted_api_call('list_commitments', commitment_client.list_commitments),
+                service.id,
+                compartment_id=tenancy.id
+            ).data
+            return service, commits
+        except oci.exceptions.ServiceError as e:
+            print("   Unable to load commitments for " + str(service.id) + ": " + str(e.code))
+            return service, []
+
     try:
         print("\nLoading Subscription and Commitment Information...")
-        organization_client = oci.onesubscription.OrganizationSubscriptionClient(config, signer=signer)
-        subscribed_service_client = oci.onesubscription.SubscribedServiceClient(config, signer=signer)
-        commitment_client = oci.onesubscription.CommitmentClient(config, signer=signer)
+        from oci import onesubscription
+        organization_client = onesubscription.OrganizationSubscriptionClient(config, signer=signer)
+        subscribed_service_client = onesubscription.SubscribedServiceClient(config, signer=signer)
+        commitment_client = onesubscription.CommitmentClient(config, signer=signer)
 
         if cmd.proxy:
             proxies = {'https': cmd.proxy}
@@ -868,187 +1653,528 @@ def load_subscription_data(connection, config, signer, cmd, tenancy):
             subscribed_service_client.base_client.session.proxies = proxies
             commitment_client.base_client.session.proxies = proxies
 
-        subscriptions = organization_client.list_organization_subscriptions(tenancy.id).data
+        subscriptions = oci.pagination.list_call_get_all_results(
+            counted_api_call('list_organization_subscriptions', organization_client.list_organization_subscriptions),
+            tenancy.id
+        ).data
         subscriptions = [sub for sub in subscriptions if 'Universal' in str(sub.service_name)]
 
-        for sub in subscriptions:
-            services = subscribed_service_client.list_subscribed_services(tenancy.id, sub.id).data
-            for service in services:
-                # if service.status != 'ACTIVE':
-                #    continue
-
-                product = service.product
-                subscription_rows.append({
-                    'tenant_id': tenant_id,
-                    'tenant_name': tenant_name,
-                    'subscription_id': sub.id,
-                    'service_name': sub.service_name,
-                    'currency': sub.currency.iso_code if sub.currency else None,
-                    'subscription_time_start': sub.time_start,
-                    'subscription_time_end': sub.time_end,
-                    'subscription_status': sub.status,
-                    'subscription_total_value': numeric_value(sub.total_value),
-                    'subscribed_service_id': service.id,
-                    'service_status': service.status,
-                    'service_time_start': service.time_start,
-                    'service_time_end': service.time_end,
-                    'term_value': numeric_value(service.term_value),
-                    'admin_email': service.admin_email,
-                    'buyer_email': service.buyer_email,
-                    'agreement_id': service.agreement_id,
-                    'agreement_name': service.agreement_name,
-                    'agreement_time_end': service.time_agreement_end,
-                    'bill_to_customer': service.bill_to_customer.name if service.bill_to_customer else None,
-                    'end_user_customer': service.end_user_customer.name if service.end_user_customer else None,
-                    'service_to_customer': service.service_to_customer.name if service.service_to_customer else None,
-                    'billing_frequency': service.billing_frequency,
-                    'csi': service.csi,
-                    'operation_type': service.operation_type,
-                    'order_type': service.order_type,
-                    'order_number': service.order_number,
-                    'payment_method': service.payment_method,
-                    'payment_number': service.payment_number,
-                    'pricing_model': service.pricing_model,
-                    'product_number': product.part_number if product else None,
-                    'product_name': product.name if product else None,
-                    'is_payg': str(service.is_payg) if service.is_payg is not None else None,
-                    'is_having_usage': str(service.is_having_usage) if service.is_having_usage is not None else None,
-                    'is_variable_commitment': str(service.is_variable_commitment) if service.is_variable_commitment is not None else None,
-                    'original_promo_amount': numeric_value(service.original_promo_amount),
-                    'funded_allocation_value': numeric_value(service.funded_allocation_value),
-                    'line_net_amount': numeric_value(service.line_net_amount),
-                    'total_value': numeric_value(service.total_value),
-                    'used_amount': numeric_value(service.used_amount),
-                    'available_amount': numeric_value(service.available_amount),
-                    'agent_version': version
-                })
-
-                try:
-                    commits = commitment_client.list_commitments(service.id, compartment_id=tenancy.id).data
-                    for commit in commits:
-                        commit_rows.append({
-                            'tenant_id': tenant_id,
-                            'tenant_name': tenant_name,
-                            'subscribed_service_id': service.id,
-                            'time_start': commit.time_start,
-                            'time_end': commit.time_end,
-                            'funded_allocation_value': numeric_value(commit.funded_allocation_value),
-                            'quantity': numeric_value(commit.quantity),
-                            'used_amount': numeric_value(commit.used_amount),
-                            'available_amount': numeric_value(commit.available_amount),
-                            'agent_version': version
-                        })
-                except oci.exceptions.ServiceError as e:
-                    print("   Unable to load commitments for " + str(service.id) + ": " + str(e.code))
-
-        subscription_sql = """INSERT INTO OCI_SUBSCRIPTION (
-            TENANT_ID, TENANT_NAME, SUBSCRIPTION_ID, SERVICE_NAME, CURRENCY,
-            SUBSCRIPTION_TIME_START, SUBSCRIPTION_TIME_END, SUBSCRIPTION_STATUS, SUBSCRIPTION_TOTAL_VALUE,
-            SUBSCRIBED_SERVICE_ID, SERVICE_STATUS, SERVICE_TIME_START, SERVICE_TIME_END, TERM_VALUE,
-            ADMIN_EMAIL, BUYER_EMAIL, AGREEMENT_ID, AGREEMENT_NAME, AGREEMENT_TIME_END,
-            BILL_TO_CUSTOMER, END_USER_CUSTOMER, SERVICE_TO_CUSTOMER, BILLING_FREQUENCY, CSI,
-            OPERATION_TYPE, ORDER_TYPE, ORDER_NUMBER, PAYMENT_METHOD, PAYMENT_NUMBER, PRICING_MODEL,
-            PRODUCT_NUMBER, PRODUCT_NAME, IS_PAYG, IS_HAVING_USAGE, IS_VARIABLE_COMMITMENT,
-            ORIGINAL_PROMO_AMOUNT, FUNDED_ALLOCATION_VALUE, LINE_NET_AMOUNT, TOTAL_VALUE,
-            USED_AMOUNT, AVAILABLE_AMOUNT, LAST_LOADED, AGENT_VERSION)
-            VALUES (
-            :tenant_id, :tenant_name, :subscription_id, :service_name, :currency,
-            :subscription_time_start, :subscription_time_end, :subscription_status, :subscription_total_value,
-            :subscribed_service_id, :service_status, :service_time_start, :service_time_end, :term_value,
-            :admin_email, :buyer_email, :agreement_id, :agreement_name, :agreement_time_end,
-            :bill_to_customer, :end_user_customer, :service_to_customer, :billing_frequency, :csi,
-            :operation_type, :order_type, :order_number, :payment_method, :payment_number, :pricing_model,
-            :product_number, :product_name, :is_payg, :is_having_usage, :is_variable_commitment,
-            :original_promo_amount, :funded_allocation_value, :line_net_amount, :total_value,
-            :used_amount, :available_amount, SYSDATE, :agent_version)"""
-
-        commit_sql = """INSERT INTO OCI_SUBSCRIPTION_COMMIT (
-            TENANT_ID, TENANT_NAME, SUBSCRIBED_SERVICE_ID, TIME_START, TIME_END, FUNDED_ALLOCATION_VALUE,
-            QUANTITY, USED_AMOUNT, AVAILABLE_AMOUNT, LAST_LOADED, AGENT_VERSION)
-            VALUES (:tenant_id, :tenant_name, :subscribed_service_id, :time_start, :time_end, :funded_allocation_value,
-            :quantity, :used_amount, :available_amount, SYSDATE, :agent_version)"""
+        # fetch subscribed services and commitments concurrently, map keeps the api order
+        services = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=cmd.sub_threads) as executor:
+            for sub, sub_services in executor.map(fetch_subscribed_services, subscriptions):
+                for service in sub_services:
+                    # if service.status != 'ACTIVE':
+                    #    continue
+
+                    services.append(service)
+                    product = service.product
+                    subscription_rows.append({
+                        'tenant_id': tenant_id,
+                        'tenant_name': tenant_name,
+                        'subscription_id': sub.id,
+                        'service_name': sub.service_name,
+                        'currency': sub.currency.iso_code if sub.currency else None,
+                        'subscription_time_start': sub.time_start,
+                        'subscription_time_end': sub.time_end,
+                        'subscription_status': sub.status,
+                        'subscription_total_value': numeric_value(sub.total_value),
+                        'subscribed_service_id': service.id,
+                        'service_status': service.status,
+                        'service_time_start': service.time_start,
+                        'service_time_end': service.time_end,
+                        'term_value': numeric_value(service.term_value),
+                        'admin_email': service.admin_email,
+                        'buyer_email': service.buyer_email,
+                        'agreement_id': service.agreement_id,
+                        'agreement_name': service.agreement_name,
+                        'agreement_time_end': service.time_agreement_end,
+                        'bill_to_customer': service.bill_to_customer.name if service.bill_to_customer else None,
+                        'end_user_customer': service.end_user_customer.name if service.end_user_customer else None,
+                        'service_to_customer': service.service_to_customer.name if service.service_to_customer else None,
+                        'billing_frequency': service.billing_frequency,
+                        'csi': service.csi,
+                        'operation_type': service.operation_type,
+                        'order_type': service.order_type,
+                        'order_number': service.order_number,
+                        'payment_method': service.payment_method,
+                        'payment_number': service.payment_number,
+                        'pricing_model': service.pricing_model,
+                        'product_number': product.part_number if product else None,
+                        'product_name': product.name if product else None,
+                        'is_payg': str(service.is_payg) if service.is_payg is not None else None,
+                        'is_having_usage': str(service.is_having_usage) if service.is_having_usage is not None else None,
+                        'is_variable_commitment': str(service.is_variable_commitment) if service.is_variable_commitment is not None else None,
+                        'original_promo_amount': numeric_value(service.original_promo_amount),
+                        'funded_allocation_value': numeric_value(service.funded_allocation_value),
+                        'line_net_amount': numeric_value(service.line_net_amount),
+                        'total_value': numeric_value(service.total_value),
+                        'used_amount': numeric_value(service.used_amount),
+                        'available_amount': numeric_value(service.available_amount),
+                        'agent_version': version
+                    })
+
+            for service, commits in executor.map(fetch_commitments, services):
+                for commit in commits:
+                    commit_rows.append({
+                        'tenant_id': tenant_id,
+                        'tenant_name': tenant_name,
+                        'subscribed_service_id': service.id,
+                        'time_start': commit.time_start,
+                        'time_end': commit.time_end,
+                        'funded_allocation_value': numeric_value(commit.funded_allocation_value),
+                        'quantity': numeric_value(commit.quantity),
+                        'used_amount': numeric_value(commit.used_amount),
+                        'available_amount': numeric_value(commit.available_amount),
+                        'agent_version': version
+                    })
+
+        print("   Fetched " + str(len(subscription_rows)) + " subscribed services and " + str(len(commit_rows)) + " commitments" + get_time_elapsed(start_time))
+
+        subscription_sql = get_subscription_merge_sql("OCI_SUBSCRIPTION", subscription_columns, subscription_keys)
+        commit_sql = get_subscription_merge_sql("OCI_SUBSCRIPTION_COMMIT", commit_columns, commit_keys)
+
+        # keys fetched from the api, used to remove rows which no longer exist
+        subscription_fetched = set((row['tenant_id'], row['subscribed_service_id']) for row in subscription_rows)
+        commit_fetched = set((row['tenant_id'], row['subscribed_service_id'], date_key(row['time_start']), date_key(row['time_end'])) for row in commit_rows)
 
         with connection.cursor() as cursor:
-            tenant_values = {
-                'tenant_id': tenant_id,
-                'full_tenant_id': str(tenancy.id),
-                'tenant_name': tenant_name
-            }
-            cursor.execute(
-                """DELETE FROM OCI_SUBSCRIPTION_COMMIT
-                   WHERE TENANT_ID=:full_tenant_id
-                      OR (TENANT_ID=:tenant_id AND (TENANT_NAME=:tenant_name OR TENANT_NAME IS NULL))""",
-                tenant_values
-            )
-            cursor.execute(
-                """DELETE FROM OCI_SUBSCRIPTION
-                   WHERE TENANT_NAME=:tenant_name
-                     AND TENANT_ID IN (:tenant_id, :full_tenant_id)""",
-                tenant_values
-            )
+
+            # remove rows loaded by older versions with the full tenant ocid
+            cursor.execute("DELETE FROM OCI_SUBSCRIPTION_COMMIT WHERE TENANT_ID=:full_tenant_id", full_tenant_id=str(tenancy.id))
+            cursor.execute("DELETE FROM OCI_SUBSCRIPTION WHERE TENANT_NAME=:tenant_name AND TENANT_ID=:full_tenant_id", full_tenant_id=str(tenancy.id), tenant_name=tenant_name)
+
+            # merge only changed or new rows
+            subscription_merged = 0
+            commit_merged = 0
             if subscription_rows:
                 cursor.executemany(subscription_sql, subscription_rows)
+                subscription_merged = cursor.rowcount
             if commit_rows:
                 cursor.executemany(commit_sql, commit_rows)
+                commit_merged = cursor.rowcount
+
+            # remove commitments and subscribed services which no longer returned by the api
+            cursor.execute(
+                """SELECT TENANT_ID, SUBSCRIBED_SERVICE_ID, to_char(TIME_START,'YYYY-MM-DD HH24:MI:SS'), to_char(TIME_END,'YYYY-MM-DD HH24:MI:SS')
+                   FROM OCI_SUBSCRIPTION_COMMIT
+                   WHERE TENANT_ID=:tenant_id AND (TENANT_NAME=:tenant_name OR TENANT_NAME IS NULL)""",
+                tenant_id=tenant_id,
+                tenant_name=tenant_name
+            )
+            commit_stale = [row for row in cursor.fetchall() if tuple(row) not in commit_fetched]
+            if commit_stale:
+                cursor.executemany(
+                    """DELETE FROM OCI_SUBSCRIPTION_COMMIT
+                       WHERE TENANT_ID=:1 AND SUBSCRIBED_SERVICE_ID=:2
+                       AND TIME_START=to_date(:3,'YYYY-MM-DD HH24:MI:SS') AND TIME_END=to_date(:4,'YYYY-MM-DD HH24:MI:SS')""",
+                    commit_stale
+                )
+
+            cursor.execute(
+                "SELECT TENANT_ID, SUBSCRIBED_SERVICE_ID FROM OCI_SUBSCRIPTION WHERE TENANT_NAME=:tenant_name AND TENANT_ID=:tenant_id",
+                tenant_id=tenant_id,
+                tenant_name=tenant_name
+            )
+            subscription_stale = [row for row in cursor.fetchall() if tuple(row) not in subscription_fetched]
+            if subscription_stale:
+                cursor.executemany("DELETE FROM OCI_SUBSCRIPTION WHERE TENANT_ID=:1 AND SUBSCRIBED_SERVICE_ID=:2", subscription_stale)
+
         connection.commit()
-        print("   Loaded " + str(len(subscription_rows)) + " subscriptions and " + str(len(commit_rows)) + " commitments" + get_time_elapsed(start_time))
+        print("   Merged " + str(subscription_merged) + " changed subscriptions and " + str(commit_merged) + " changed commitments, removed " + str(len(subscription_stale)) + " subscriptions and " + str(len(commit_stale)) + " commitments" + get_time_elapsed(start_time))
 
     except Exception as e:
         connection.rollback()
         raise Exception("Error loading subscription information: " + str(e))
 
 
-#########################################################################
-# Load Cost File
 ##########################################################################
-def load_cost_file(connection, object_storage, object_file, max_file_name, cmd, tenancy, compartments, file_num, total_files, costusage_namespace_name, costusage_bucket_name):
-    start_time = time.time()
-    start_time_str = get_current_date_time()
-    num_files = 0
-    num_rows = 0
+# Download object in parallel byte ranges
+# fetch_range(start, end) returns the bytes chunks of the inclusive range,
+# completed ranges are recorded in <file>.parts to resume at range level
+##########################################################################
+def download_ranged(fetch_range, object_size, object_etag, path_filename, part_size, num_threads):
+    ranges = [(start, min(start + part_size, object_size) - 1) for start in range(0, object_size, part_size)]
+    part_filename = path_filename + ".part"
+    progress_filename = path_filename + ".parts"
+    signature = str(object_etag) + ":" + str(object_size) + ":" + str(part_size)
+    lock = threading.Lock()
+
+    # resume only if the previous attempt was for the same object version and part size
+    completed = set()
+    if os.path.exists(part_filename) and os.path.exists(progress_filename):
+        with open(progress_filename, 'r') as f:
+            lines = f.read().splitlines()
+        if lines and lines[0] == signature:
+            completed = set(int(line) for line in lines[1:] if line)
+
+    if not completed:
+        with open(part_filename, 'wb') as f:
+            f.truncate(object_size)
+        with open(progress_filename, 'w') as f:
+            f.write(signature + "\n")
+
+    def download_part(index):
+        start, end = ranges[index]
+        written = 0
+        with open(part_filename, 'r+b') as f:
+            f.seek(start)
+            for chunk in fetch_range(start, end):
+                f.write(chunk)
+                written += len(chunk)
 
-    try:
-        o = object_file
+        if written != end - start + 1:
+            raise Exception("Range " + str(start) + "-" + str(end) + " returned " + str(written) + " bytes")
 
-        # keep tag keys per file
-        tags_keys = []
+        with lock:
+            with open(progress_filename, 'a') as f:
+                f.write(str(index) + "\n")
 
-        # get file name
-        filename = o.name.rsplit('/', 1)[-1]
-        file_size_mb = round(o.size / 1024 / 1024)
-        file_name_full = o.name
-        file_id = filename[:-7]
-        file_time = str(o.time_created)[0:16]
+    pending = [index for index in range(len(ranges)) if index not in completed]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for future in [executor.submit(download_part, index) for index in pending]:
+            future.result()
 
-        # if file already loaded, skip (check if < max_file_name)
-        if max_file_name:
-            if file_name_full <= max_file_name:
-                print("   Skipping   file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files) + ", File already loaded")
-                return num_files
+    os.replace(part_filename, path_filename)
+    os.remove(progress_filename)
+    return len(pending), len(completed)
 
-        # if file id enabled, check
-        if cmd.fileid:
-            if file_id != cmd.fileid:
-                print("   Skipping   file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files) + ", File Id " + cmd.fileid + " filter specified")
-                return num_files
 
-        # check file date
-        if cmd.filedate:
-            if file_time <= cmd.filedate:
-                print("   Skipping   file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files) + ", Less then specified date " + cmd.filedate)
-                return num_files
+##########################################################################
+# Download object to file, large objects are downloaded by ranges
+##########################################################################
+def download_object(object_storage, namespace_name, bucket_name, object_file, path_filename, cmd):
+    part_size = cmd.download_part_mb * 1024 * 1024
+
+    if cmd.download_threads > 1 and object_file.size > part_size:
+
+        def fetch_range(start, end):
+            object_details = counted_api_call('get_object', object_storage.get_object)(namespace_name, bucket_name, object_file.name, range="bytes=" + str(start) + "-" + str(end), if_match=object_file.etag)
+            return object_details.data.raw.stream(1024 * 1024, decode_content=False)
+
+        downloaded, resumed = download_ranged(fetch_range, object_file.size, object_file.etag, path_filename, part_size, cmd.download_threads)
+        if resumed:
+            print("   Resumed    download, " + str(resumed) + " ranges already downloaded, " + str(downloaded) + " ranges downloaded")
+        return
+
+    object_details = counted_api_call('get_object', object_storage.get_object)(namespace_name, bucket_name, object_file.name)
+    with open(path_filename, 'wb') as f:
+        for chunk in object_details.data.raw.stream(1024 * 1024, decode_content=False):
+            f.write(chunk)
+
+
+##########################################################################
+# Raw reader measuring decompress time and uncompressed bytes
+##########################################################################
+class TimedReader(io.RawIOBase):
+    def __init__(self, raw):
+        self.raw = raw
+        self.seconds = 0.0
+        self.bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        start_time = time.perf_counter()
+        size = self.raw.readinto(buffer)
+        self.seconds += time.perf_counter() - start_time
+        self.bytes += size
+        return size
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+##########################################################################
+# Get column names and types of the insert statement
+# types are taken from the bind expression - to_date, to_number or varchar
+##########################################################################
+def get_insert_layout(sql):
+    columns_sql, values_sql = re.split(r"\)\s*VALUES\s*\(", sql, maxsplit=1, flags=re.IGNORECASE)
+    columns = [col.strip() for col in columns_sql[columns_sql.index("(") + 1:].split(",")]
+    layout = []
+    for column, bind in zip(columns, re.findall(r"to_date\(:\d+,'[^']*'\)|to_number\(:\d+\)|:\d+", values_sql)):
+        if bind.startswith("to_date"):
+            layout.append((column, 'date', "%Y-%m-%d %H:%M" if "HH24" in bind else "%Y-%m-%d"))
+        elif bind.startswith("to_number"):
+            layout.append((column, 'number', ""))
+        else:
+            layout.append((column, 'varchar', ""))
+    return layout
+
+
+##########################################################################
+# Star schema dimension key
+# first 15 hex digits of SHA1 over the natural values separated by chr(31)
+# same as usage2adw_setup.sh -convert_star:
+#   to_number(substr(rawtohex(standard_hash(a||chr(31)||b,'SHA1')),1,15),'XXXXXXXXXXXXXXX')
+# all values empty = null key
+##########################################################################
+def get_star_key(values):
+    natural = chr(31).join(values)
+    if not natural.replace(chr(31), ""):
+        return None
+    return int(hashlib.sha1(natural.encode('utf-8')).hexdigest()[0:15], 16)
+
+
+##########################################################################
+# Star schema rows - convert the OCI_COST insert rows to OCI_COST_FACT
+# rows with the dimension keys, new dimension members are kept and
+# inserted before the commit of the file
+##########################################################################
+class StarSchemaRows(object):
+    def __init__(self, cost_sql):
+        layout = get_insert_layout(cost_sql)
+        columns = [column[0] for column in layout]
+        natural_columns = [c for key_column, natural in star_dimensions.values() for c in natural]
+
+        self.dimensions = []
+        for table, (key_column, natural) in star_dimensions.items():
+            self.dimensions.append((table, key_column, [columns.index(c) for c in natural]))
+        self.fact_positions = [i for i, c in enumerate(columns) if c not in natural_columns]
+        self.new_members = {table: [] for table in star_dimensions}
+
+        # fact insert keeps the bind expressions of the OCI_COST insert
+        fact_columns = []
+        fact_binds = []
+        for index, column in enumerate([layout[i] for i in self.fact_positions] + [(d[1], 'number', "") for d in self.dimensions], start=1):
+            fact_columns.append(column[0])
+            if column[1] == 'date':
+                fact_binds.append("to_date(:" + str(index) + ",'" + ("YYYY-MM-DD HH24:MI" if "%H" in column[2] else "YYYY-MM-DD") + "')")
+            elif column[1] == 'number':
+                fact_binds.append("to_number(:" + str(index) + ")")
+            else:
+                fact_binds.append(":" + str(index))
+        self.sql = "INSERT INTO OCI_COST_FACT (" + ", ".join(fact_columns) + ") VALUES (" + ", ".join(fact_binds) + ")"
+
+    def fact_row(self, row_data):
+        keys = []
+        for table, key_column, positions in self.dimensions:
+            values = tuple(str(row_data[i] or "") for i in positions)
+            cache_key = (table, values)
+            if cache_key in star_keys_cache:
+                keys.append(star_keys_cache[cache_key])
+                continue
+            key = get_star_key(values)
+            star_keys_cache[cache_key] = key
+            if key is not None:
+                self.new_members[table].append((key,) + values)
+            keys.append(key)
+        return tuple(row_data[i] for i in self.fact_positions) + tuple(keys)
+
+    def insert_new_members(self, connection):
+        num_members = 0
+        with connection.cursor() as cursor:
+            for table, key_column, positions in self.dimensions:
+                rows = self.new_members[table]
+                if not rows:
+                    continue
+                natural = star_dimensions[table][1]
+                sql = "insert /*+ ignore_row_on_dupkey_index(" + table + ", " + table + "_PK) */ into " + table + " (" + key_column + ", " + ", ".join(natural) + ") "
+                sql += "values (" + ", ".join(":" + str(i) for i in range(1, len(natural) + 2)) + ")"
+                cursor.executemany(sql, rows)
+                num_members += len(rows)
+                self.new_members[table] = []
+        return num_members
+
+    # file rolled back - new members were not inserted, remove their keys from the cache
+    def discard_new_members(self):
+        for table, members in self.new_members.items():
+            for member in members:
+                star_keys_cache.pop((table, tuple(member[1:])), None)
+            self.new_members[table] = []
+
+
+##########################################################################
+# Dry run connection - writes the rows of the main insert to local
+# parquet or gzipped csv files instead of the database, one output file
+# per report file, other statements are ignored
+##########################################################################
+class DryRunCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def execute(self, sql, *args, **kwargs):
+        self.rowcount = 0
+
+    def getbatcherrors(self):
+        return []
+
+    def executemany(self, sql, data, **kwargs):
+        self.rowcount = len(data)
+        if re.match(r"\s*INSERT\s+INTO\s+" + self.connection.table_name + r"\s*\(", sql, flags=re.IGNORECASE):
+            self.connection.write_rows(sql, data)
+
+
+class DryRunConnection(object):
+    def __init__(self, folder, file_format, table_name):
+        self.folder = folder
+        self.file_format = file_format
+        self.table_name = table_name
+        self.layout = None
+        self.path_filename = ""
+        self.writer = None
+        self.file_out = None
+        self.pending = []
+
+        if file_format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+                self.pyarrow = pyarrow
+                self.parquet = pyarrow.parquet
+            except ImportError:
+                print("\nDry run to parquet requires pyarrow, please install pyarrow (pip3 install pyarrow) or use -dryrunformat csv")
+                raise SystemExit
+
+        os.makedirs(folder, exist_ok=True)
+
+    def cursor(self):
+        return DryRunCursor(self)
+
+    def write_rows(self, sql, data):
+        if not data:
+            return
+        if not self.layout:
+            self.layout = get_insert_layout(sql)
+
+        # TAGS_JSON is bound as dict, written as json text
+        json_positions = [index for index, column in enumerate(self.layout) if column[0] == 'TAGS_JSON']
+        if json_positions:
+            data = [tuple(json.dumps(value) if index in json_positions and value is not None else value for index, value in enumerate(row)) for row in data]
+
+        # open output file for the report file of the rows (file id is the second column)
+        if not self.path_filename:
+            self.path_filename = os.path.join(self.folder, self.table_name.lower() + "_" + str(data[0][1]) + (".parquet" if self.file_format == "parquet" else ".csv.gz"))
+            if self.file_format == "csv":
+                self.file_out = gzip.open(self.path_filename + ".tmp", 'wt', newline='')
+                self.writer = csv.writer(self.file_out)
+                self.writer.writerow([col[0] for col in self.layout])
+
+        if self.file_format == "csv":
+            self.writer.writerows(data)
+        else:
+            self.pending.extend(data)
+            if len(self.pending) >= 100000:
+                self.flush_parquet()
+
+    def flush_parquet(self):
+        pa = self.pyarrow
+        if not self.writer:
+            types = {'date': pa.timestamp('s'), 'number': pa.float64(), 'varchar': pa.string()}
+            self.schema = pa.schema([(col[0], types[col[1]]) for col in self.layout])
+            self.writer = self.parquet.ParquetWriter(self.path_filename + ".tmp", self.schema, compression='zstd')
+
+        arrays = []
+        for index, (column, column_type, date_format) in enumerate(self.layout):
+            values = [row[index] for row in self.pending]
+            if column_type == 'date':
+                values = [datetime.datetime.strptime(v, date_format) if v else None for v in values]
+            elif column_type == 'number':
+                values = [float(v) if v not in ("", None) else None for v in values]
+            else:
+                values = [str(v) if v not in ("", None) else None for v in values]
+            arrays.append(pa.array(values, type=self.schema.field(index).type))
+
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.pending = []
+
+    # commit closes the current output file
+    def commit(self):
+        if not self.path_filename:
+            return
+        if self.file_format == "csv":
+            self.file_out.close()
+        else:
+            if self.pending or not self.writer:
+                self.flush_parquet()
+            self.writer.close()
+        os.replace(self.path_filename + ".tmp", self.path_filename)
+        print("   Dry Run    written " + self.path_filename)
+        self.path_filename = ""
+        self.writer = None
+        self.file_out = None
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+#########################################################################
+# Load Cost File
+##########################################################################
+def load_cost_file(connection, object_storage, object_file, max_file_name, cmd, tenancy, compartments, file_num, total_files, costusage_namespace_name, costusage_bucket_name, list_secs=0, queued=False):
+    global min_usage_loaded
+    start_time = time.time()
+    start_time_str = get_current_date_time()
+    num_files = 0
+    num_rows = 0
+    phases = {'list_secs': round(list_secs, 3), 'tag_merge_secs': 0, 'file_bytes': object_file.size}
+
+    try:
+        o = object_file
+
+        # keep tag keys per file
+        tags_keys = []
+
+        # get file name
+        filename = o.name.rsplit('/', 1)[-1]
+        file_size_mb = round(o.size / 1024 / 1024)
+        file_name_full = o.name
+        file_id = filename[:-7]
+        file_time = str(o.time_created)[0:16]
+
+        # if file already loaded, skip (check if < max_file_name)
+        if max_file_name:
+            if file_name_full <= max_file_name:
+                print("   Skipping   file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files) + ", File already loaded")
+                return num_files
+
+        # if file id enabled, check
+        if cmd.fileid:
+            if file_id != cmd.fileid:
+                print("   Skipping   file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files) + ", File Id " + cmd.fileid + " filter specified")
+                return num_files
+
+        # check file date
+        if cmd.filedate:
+            if file_time <= cmd.filedate:
+                print("   Skipping   file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files) + ", Less then specified date " + cmd.filedate)
+                return num_files
 
         path_filename = work_report_dir + '/' + filename
         print("\n   Processing file " + file_name_full + " - " + str(file_size_mb) + " MB, " + file_time + ", #" + str(file_num) + "/" + str(total_files))
 
         # download file
-        object_details = object_storage.get_object(costusage_namespace_name, costusage_bucket_name, o.name)
-        with open(path_filename, 'wb') as f:
-            for chunk in object_details.data.raw.stream(1024 * 1024, decode_content=False):
-                f.write(chunk)
+        phase_time = time.perf_counter()
+        download_object(object_storage, costusage_namespace_name, costusage_bucket_name, o, path_filename, cmd)
+        phases['download_secs'] = round(time.perf_counter() - phase_time, 3)
+
+        # queue mode - renew the lease after the download, and while loading
+        if queued:
+            if not renew_queued_claim(connection, str(tenancy.name), file_name_full, cmd.queue_lease_secs):
+                return skip_lost_claim(connection, file_name_full, path_filename)
+            connection.commit()
+            claim_renew_time = time.time()
 
-        # Read file to variable
-        with gzip.open(path_filename, 'rt') as file_in:
+        # Read file to variable, decompress time is measured by the raw reader
+        gzip_reader = TimedReader(gzip.GzipFile(path_filename, 'rb'))
+        insert_secs = 0.0
+        with io.TextIOWrapper(io.BufferedReader(gzip_reader)) as file_in:
             csv_reader = csv.DictReader(file_in)
 
             # Adjust the batch size to meet memory and performance requirements for cx_oracle
@@ -1091,22 +2217,37 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
             TAG_SPECIAL5,
             TAG_SPECIAL6,
             TAG_SPECIAL7,
-            TAG_SPECIAL8
+            TAG_SPECIAL8""" + (""",
+            TAGS_JSON""" if cmd.tags_json else "") + """
             ) VALUES (
             :1, :2, to_date(:3,'YYYY-MM-DD HH24:MI'), to_date(:4,'YYYY-MM-DD HH24:MI'), :5,
             :6, :7, :8, :9, :10,
             :11, to_number(:12), to_number(:13) ,:14, :15,
             :16, to_number(:17), to_number(:18), to_number(:19), to_number(:20), to_number(:21), to_number(:22),
-            :23, :24, :25, :26, :27, :28, :29, :30, :31, :32, :33, :34, :35, :36
+            :23, :24, :25, :26, :27, :28, :29, :30, :31, :32, :33, :34, :35, :36""" + (", :37" if cmd.tags_json else "") + """
             ) """
 
+            # star schema - insert to OCI_COST_FACT with the dimension keys
+            star_rows = None
+            if cost_star_schema:
+                star_rows = StarSchemaRows(sql)
+                sql = star_rows.sql
+
             # insert bulk to database
             with connection.cursor() as cursor:
 
-                # Predefine the memory areas to match the table definition
-                cursor.setinputsizes(None, array_size)
+                # Predefine the memory areas to match the table definition, TAGS_JSON is bound as JSON
+                input_sizes = [None, array_size]
+                if cmd.tags_json:
+                    tags_json_position = [column[0] for column in get_insert_layout(sql)].index('TAGS_JSON')
+                    input_sizes += [None] * (tags_json_position - len(input_sizes)) + [oracledb.DB_TYPE_JSON]
+                cursor.setinputsizes(*input_sizes)
 
+                phase_time = time.perf_counter()
+                file_min_usage = ""
                 data = []
+                data_lines = []
+                rejects = []
                 for row in csv_reader:
 
                     # find compartment path
@@ -1125,9 +2266,14 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
                     tag_special7 = ""
                     tag_special8 = ""
                     tags_data = ""
+                    tags_json = {}
                     for (key, value) in row.items():
                         if 'tags' in key and len(value) > 0:
 
+                            # full key and value, not limited by the TAGS_DATA size
+                            if cmd.tags_json:
+                                tags_json[str(key).replace("tags/", "")] = value
+
                             # remove # and = from the tags keys and value
                             keyadj = str(key).replace("tags/", "").replace("#", "").replace("=", "")
                             valueadj = str(value).replace("#", "").replace("=", "")
@@ -1213,11 +2359,16 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
                         product_Description = "Oracle Identity Cloud - Basic - Consumer User"
                         cost_billingUnitReadable = "Active User per Hour"
 
+                    # keep earliest usage of the file
+                    usage_start = lineItem_intervalUsageStart[0:10] + " " + lineItem_intervalUsageStart[11:16]
+                    if usage_start.strip() and (not file_min_usage or usage_start < file_min_usage):
+                        file_min_usage = usage_start
+
                     # create array
                     row_data = (
                         str(tenancy.name),
                         file_id,
-                        lineItem_intervalUsageStart[0:10] + " " + lineItem_intervalUsageStart[11:16],
+                        usage_start,
                         lineItem_intervalUsageEnd[0:10] + " " + lineItem_intervalUsageEnd[11:16],
                         product_service,
                         product_compartmentId,
@@ -1252,22 +2403,58 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
                         tag_special7,
                         tag_special8
                     )
+                    if cmd.tags_json:
+                        row_data += (tags_json if tags_json else None,)
+                    if star_rows:
+                        row_data = star_rows.fact_row(row_data)
                     data.append(row_data)
+                    data_lines.append(csv_reader.line_num)
                     num_rows += 1
 
                     # executemany every batch size
                     if len(data) % batch_size == 0:
-                        cursor.executemany(sql, data)
+                        insert_time = time.perf_counter()
+                        execute_batch(cursor, sql, data, data_lines, rejects)
+                        insert_secs += time.perf_counter() - insert_time
                         data = []
+                        data_lines = []
+
+                        if queued and time.time() - claim_renew_time > cmd.queue_lease_secs / 4:
+                            if not renew_queued_claim(connection, str(tenancy.name), file_name_full, cmd.queue_lease_secs):
+                                return skip_lost_claim(connection, file_name_full, path_filename)
+                            claim_renew_time = time.time()
 
                 # if data exist final execute
                 if data:
-                    cursor.executemany(sql, data)
-
-                connection.commit()
-                print("   Completed  file " + file_name_full + " - " + str(num_rows) + " Rows Inserted" + get_time_elapsed(start_time), end="")
-
-        num_files += 1
+                    insert_time = time.perf_counter()
+                    execute_batch(cursor, sql, data, data_lines, rejects)
+                    insert_secs += time.perf_counter() - insert_time
+
+                # rows rejected by the database, the file fails above -rejectpct
+                phases['rejected_rows'] = len(rejects)
+                if rejects and check_file_rejects(connection, cmd, str(tenancy.name), 'COST', file_id, file_name_full, rejects, num_rows):
+                    if star_rows:
+                        star_rows.discard_new_members()
+                    os.remove(path_filename)
+                    insert_load_stats(connection, str(tenancy.name), 'COST', file_id, file_name_full, file_size_mb, file_time, 0, start_time_str, file_num, total_files, phases, 'FAILED')
+                    files_failed.append(file_name_full)
+                    set_metric('files_failed', 1, add=True)
+                    return num_files
+                num_rows -= len(rejects)
+
+                # new dimension members, committed with the fact rows
+                if star_rows:
+                    insert_time = time.perf_counter()
+                    num_members = star_rows.insert_new_members(connection)
+                    insert_secs += time.perf_counter() - insert_time
+                    if num_members:
+                        print("   Star schema " + str(num_members) + " new dimension members")
+
+                read_secs = time.perf_counter() - phase_time
+                phases['decompress_secs'] = round(gzip_reader.seconds, 3)
+                phases['insert_secs'] = round(insert_secs, 3)
+                phases['transform_secs'] = round(max(0.0, read_secs - gzip_reader.seconds - insert_secs), 3)
+                phases['data_bytes'] = gzip_reader.bytes
 
         # remove file
         os.remove(path_filename)
@@ -1281,6 +2468,7 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
             data.append(row_data)
 
         if data:
+            phase_time = time.perf_counter()
             with connection.cursor() as cursor:
                 sql = """INSERT INTO OCI_COST_TAG_KEYS (TENANT_NAME , TAG_KEY)
                          SELECT :1, :2 FROM DUAL
@@ -1288,15 +2476,34 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
                       )"""
 
                 cursor.executemany(sql, data)
-                connection.commit()
-                print(", " + str(len(data)) + " Tags Merged.")
-        else:
-            print("")
+            phases['tag_merge_secs'] = round(time.perf_counter() - phase_time, 3)
 
         #######################################
-        # insert load stats
+        # insert load stats, committed with the
+        # rows and the tags of the file
         #######################################
-        insert_load_stats(connection, str(tenancy.name), 'COST', file_id, file_name_full, file_size_mb, file_time, num_rows, start_time_str, file_num, total_files)
+        insert_load_stats(connection, str(tenancy.name), 'COST', file_id, file_name_full, file_size_mb, file_time, num_rows, start_time_str, file_num, total_files, phases, commit=False)
+
+        # queue mode - the file is committed only by the owner of the claim
+        if queued and not renew_queued_claim(connection, str(tenancy.name), file_name_full, cmd.queue_lease_secs):
+            return skip_lost_claim(connection, file_name_full, path_filename)
+
+        phase_time = time.perf_counter()
+        connection.commit()
+        phases['commit_secs'] = round(time.perf_counter() - phase_time, 3)
+
+        # commit time is known after the commit of the load stats row
+        with connection.cursor() as cursor:
+            cursor.execute("update OCI_LOAD_STATUS set COMMIT_SECS=:commit_secs where TENANT_NAME=:tenant_name and FILE_NAME=:file_name", commit_secs=phases['commit_secs'], tenant_name=str(tenancy.name), file_name=file_name_full)
+        connection.commit()
+
+        num_files += 1
+        if file_min_usage and (not min_usage_loaded or file_min_usage < min_usage_loaded):
+            min_usage_loaded = file_min_usage
+
+        print("   Completed  file " + file_name_full + " - " + str(num_rows) + " Rows Inserted" + get_time_elapsed(start_time) + (", " + str(len(data)) + " Tags Merged." if data else ""))
+        print("   Phases     download " + str(phases['download_secs']) + "s, decompress " + str(phases['decompress_secs']) + "s, transform " + str(phases['transform_secs']) + "s, insert " + str(phases['insert_secs']) + "s, commit " + str(phases['commit_secs']) + "s")
+        record_file_metrics(phases, num_rows, start_time, o.time_created)
         return num_files
 
     except oracledb.DatabaseError as e:
@@ -1308,6 +2515,1125 @@ def load_cost_file(connection, object_storage, object_file, max_file_name, cmd,
         raise SystemExit
 
 
+##########################################################################
+# Dry run - list, download and transform cost files to local files
+# files already written to the dry run folder are skipped
+##########################################################################
+def dry_run_process(cmd, config, signer, tenancy, compartments, file_run_prefixes, costusage_namespace_name, costusage_bucket_name):
+    try:
+        print_header("Dry Run to " + cmd.dry_run_folder + " (" + cmd.dry_run_format + ")", 0)
+        connection = DryRunConnection(cmd.dry_run_folder, cmd.dry_run_format, "OCI_COST")
+        extension = ".parquet" if cmd.dry_run_format == "parquet" else ".csv.gz"
+
+        object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
+        if cmd.proxy:
+            object_storage.base_client.session.proxies = {'https': cmd.proxy}
+
+        total_files_loaded = 0
+        for prefix in file_run_prefixes:
+            print("\nHandling Cost Report with Prefix: '" + prefix + "'... started at " + get_current_date_time())
+            list_time = time.perf_counter()
+            objects = oci.pagination.list_call_get_all_results(
+                counted_api_call('list_objects', object_storage.list_objects),
+                costusage_namespace_name,
+                costusage_bucket_name,
+                fields="timeCreated,size,etag",
+                prefix=prefix
+            ).data
+            list_secs = time.perf_counter() - list_time
+
+            total_files = len(objects.objects)
+            print("Total " + str(total_files) + " cost files found to scan...")
+            for index, object_file in enumerate(objects.objects, start=1):
+                file_id = object_file.name.rsplit('/', 1)[-1][:-7]
+                if os.path.exists(os.path.join(cmd.dry_run_folder, "oci_cost_" + file_id + extension)):
+                    print("   Skipping   file " + object_file.name + ", #" + str(index) + "/" + str(total_files) + ", already written to dry run folder")
+                    continue
+                total_files_loaded += load_cost_file(connection, object_storage, object_file, "", cmd, tenancy, compartments, index, total_files, costusage_namespace_name, costusage_bucket_name, list_secs)
+
+        print("\nTotal " + str(total_files_loaded) + " cost files written to " + cmd.dry_run_folder)
+
+    except oci.exceptions.ServiceError as e:
+        print("\ndry_run_process() - Error listing cost files - " + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Run post load merge step and record its duration
+##########################################################################
+def run_timed_merge(step, func, *args):
+    start_time = time.time()
+    result = func(*args)
+    set_metric('merge_seconds', round(time.time() - start_time, 3), {'step': step})
+    return result
+
+
+##########################################################################
+# get segment size of table and its indexes in bytes
+##########################################################################
+def get_segment_bytes(cursor, table_name):
+    sql = """select nvl(sum(bytes),0) from user_segments
+             where segment_name = :table_name
+             or segment_name in (select index_name from user_indexes where table_name = :table_name)"""
+    cursor.execute(sql, table_name=table_name)
+    val, = cursor.fetchone()
+    return val
+
+
+##########################################################################
+# Retention - purge OCI_COST older than retain months for the tenant
+# Drop monthly partitions owned only by the tenant, batched delete for
+# the rest, then clean OCI_COST_STATS, OCI_COST_DAILY and OCI_LOAD_STATUS
+##########################################################################
+def apply_retention(connection, tenant_name, retain_months, batch_rows):
+    try:
+        start_time = time.time()
+        total_rows = 0
+
+        with connection.cursor() as cursor:
+
+            cursor.execute("select to_char(add_months(trunc(sysdate,'MM'), -:retain_months),'YYYY-MM-DD') from dual", retain_months=retain_months)
+            cutoff_date, = cursor.fetchone()
+            print("\nApplying retention of " + str(retain_months) + " months, purging usage before " + cutoff_date + "...")
+
+            bytes_before = get_segment_bytes(cursor, cost_table)
+            binds = {'tenant_name': tenant_name, 'cutoff_date': cutoff_date}
+
+            ############################################
+            # drop partitions if OCI_COST range partitioned by USAGE_INTERVAL_START
+            ############################################
+            sql = """select count(*) from user_part_tables t, user_part_key_columns c
+                     where t.table_name = :cost_table and t.partitioning_type = 'RANGE'
+                     and c.name = t.table_name and c.object_type = 'TABLE' and c.column_position = 1 and c.column_name = 'USAGE_INTERVAL_START'"""
+            cursor.execute(sql, cost_table=cost_table)
+            partitioned, = cursor.fetchone()
+
+            partitions_dropped = 0
+            if partitioned:
+                sql = "select to_char(trunc(min(USAGE_INTERVAL_START),'MM'),'YYYY-MM-DD') from " + cost_table + " where TENANT_NAME = :tenant_name and USAGE_INTERVAL_START < to_date(:cutoff_date,'YYYY-MM-DD')"
+                cursor.execute(sql, binds)
+                month, = cursor.fetchone()
+
+                while month and month < cutoff_date:
+                    # partition holds other tenants, keep for batched delete
+                    sql = """select count(*) from """ + cost_table + """
+                             where USAGE_INTERVAL_START >= to_date(:month,'YYYY-MM-DD') and USAGE_INTERVAL_START < add_months(to_date(:month,'YYYY-MM-DD'),1)
+                             and TENANT_NAME <> :tenant_name and rownum = 1"""
+                    cursor.execute(sql, month=month, tenant_name=tenant_name)
+                    other_tenants, = cursor.fetchone()
+
+                    if not other_tenants:
+                        try:
+                            cursor.execute("alter table " + cost_table + " drop partition for (to_date('" + month + "','YYYY-MM-DD')) update indexes")
+                            partitions_dropped += 1
+                            print("   Dropped " + cost_table + " partition for " + month[0:7])
+                        except oracledb.DatabaseError as e:
+                            print("   " + cost_table + " partition for " + month[0:7] + " not dropped, will be deleted - " + str(e))
+
+                    next_month = datetime.datetime.strptime(month, "%Y-%m-%d") + datetime.timedelta(days=32)
+                    month = next_month.strftime("%Y-%m-01")
+
+                set_metric('retention_partitions_dropped', partitions_dropped)
+
+            ############################################
+            # batched delete for the remaining rows
+            ############################################
+            cost_rows = 0
+            sql = "delete from " + cost_table + " where TENANT_NAME = :tenant_name and USAGE_INTERVAL_START < to_date(:cutoff_date,'YYYY-MM-DD') and rownum <= :batch_rows"
+            while True:
+                cursor.execute(sql, tenant_name=tenant_name, cutoff_date=cutoff_date, batch_rows=batch_rows)
+                deleted = cursor.rowcount
+                connection.commit()
+                cost_rows += deleted
+                if deleted:
+                    print("   Deleted " + str(cost_rows) + " rows from " + cost_table + get_time_elapsed(start_time))
+                if deleted < batch_rows:
+                    break
+
+            set_metric('retention_rows_deleted', cost_rows, {'table': cost_table})
+            total_rows += cost_rows
+
+            ############################################
+            # OCI_COST_STATS
+            ############################################
+            sql = "delete from OCI_COST_STATS where TENANT_NAME = :tenant_name and USAGE_INTERVAL_START < to_date(:cutoff_date,'YYYY-MM-DD')"
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_COST_STATS")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_COST_STATS'})
+            total_rows += cursor.rowcount
+
+            ############################################
+            # OCI_COST_DAILY
+            ############################################
+            sql = "delete from OCI_COST_DAILY where TENANT_NAME = :tenant_name and USAGE_DAY < to_date(:cutoff_date,'YYYY-MM-DD')"
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_COST_DAILY")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_COST_DAILY'})
+
+            ############################################
+            # OCI_LOAD_STATUS - keep the last loaded file of each folder, it is the start point of the next load
+            ############################################
+            sql = """delete from OCI_LOAD_STATUS
+                     where TENANT_NAME = :tenant_name and FILE_DATE < to_date(:cutoff_date,'YYYY-MM-DD')
+                     and FILE_NAME not in (
+                        select max(FILE_NAME) from OCI_LOAD_STATUS where TENANT_NAME = :tenant_name and FILE_STATUS is null
+                        group by substr(FILE_NAME, 1, instr(FILE_NAME, '/', -1))
+                     )"""
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_LOAD_STATUS")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_LOAD_STATUS'})
+
+            ############################################
+            # OCI_LOAD_REJECTS
+            ############################################
+            sql = "delete from OCI_LOAD_REJECTS where TENANT_NAME = :tenant_name and REJECT_TIME < to_date(:cutoff_date,'YYYY-MM-DD')"
+            cursor.execute(sql, binds)
+            print("   Deleted " + str(cursor.rowcount) + " rows from OCI_LOAD_REJECTS")
+            set_metric('retention_rows_deleted', cursor.rowcount, {'table': 'OCI_LOAD_REJECTS'})
+            connection.commit()
+
+            bytes_after = get_segment_bytes(cursor, cost_table)
+            reclaimed = max(0, bytes_before - bytes_after)
+            set_metric('retention_reclaimed_bytes', reclaimed)
+
+            print("   " + cost_table + " segments " + str(round(bytes_before / 1024 / 1024, 1)) + " MB before, " + str(round(bytes_after / 1024 / 1024, 1)) + " MB after, " + str(round(reclaimed / 1024 / 1024, 1)) + " MB reclaimed")
+            if cost_rows:
+                print("   Space of deleted rows is reused by the next loads")
+            print("   Retention Completed, " + str(partitions_dropped) + " partitions dropped, " + str(total_rows) + " rows deleted" + get_time_elapsed(start_time))
+
+            return partitions_dropped + total_rows
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at apply_retention() - " + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        raise Exception("\nError manipulating database at apply_retention() - " + str(e))
+
+
+##########################################################################
+# Gather optimizer statistics of the tables changed by the run
+# Tables or partitions with DML below stale_pct percent of their rows
+# since the last gather are skipped, partitioned tables use incremental
+# statistics so only the changed partitions are scanned
+##########################################################################
+def gather_changed_stats(connection, tables, stale_pct):
+    try:
+        start_time = time.time()
+        print("\nGathering statistics of tables changed more than " + str(stale_pct) + "%...")
+
+        with connection.cursor() as cursor:
+
+            # flush the DML monitoring to user_tab_modifications
+            try:
+                cursor.execute("begin dbms_stats.flush_database_monitoring_info; end;")
+            except oracledb.DatabaseError as e:
+                print("   Monitoring info not flushed, using the last flushed changes - " + str(e))
+
+            # changes of the table and its partitions since the last gather
+            sql = """select s.partition_name, nvl(s.num_rows,0), s.last_analyzed,
+                            nvl(m.inserts + m.updates + m.deletes, 0), nvl(m.truncated,'NO')
+                     from user_tab_statistics s
+                     left join user_tab_modifications m on m.table_name = s.table_name and nvl(m.partition_name,'-') = nvl(s.partition_name,'-') and m.subpartition_name is null
+                     where s.table_name = :table_name and s.object_type in ('TABLE','PARTITION')"""
+
+            gathered = 0
+            skipped = 0
+            for table_name in tables:
+                cursor.execute(sql, table_name=table_name)
+                rows = cursor.fetchall()
+                partitions = [row for row in rows if row[0]]
+                segments = partitions if partitions else rows
+
+                changed = [row for row in segments if not row[2] or row[4] == 'YES' or row[3] * 100 >= row[1] * stale_pct]
+                changes = sum(row[3] for row in segments)
+                num_rows = sum(row[1] for row in segments)
+
+                if not changed:
+                    print("   " + table_name.ljust(22) + " skipped, " + str(changes) + " changes of " + str(num_rows) + " rows")
+                    skipped += 1
+                    continue
+
+                table_time = time.time()
+
+                # incremental statistics keep the partition synopses, the
+                # global statistics are derived without scanning the table
+                if partitions:
+                    cursor.execute("select dbms_stats.get_prefs('INCREMENTAL', user, :table_name), dbms_stats.get_prefs('STALE_PERCENT', user, :table_name) from dual", table_name=table_name)
+                    incremental, table_stale_pct = cursor.fetchone()
+                    if incremental != 'TRUE':
+                        cursor.execute("begin dbms_stats.set_table_prefs(user, :table_name, 'INCREMENTAL', 'TRUE'); end;", table_name=table_name)
+                    if table_stale_pct != str(stale_pct):
+                        cursor.execute("begin dbms_stats.set_table_prefs(user, :table_name, 'STALE_PERCENT', :stale_pct); end;", table_name=table_name, stale_pct=str(stale_pct))
+
+                sql_gather = """begin dbms_stats.gather_table_stats(ownname => user, tabname => :table_name,
+                                estimate_percent => dbms_stats.auto_sample_size, method_opt => 'FOR ALL COLUMNS SIZE 1',
+                                granularity => 'AUTO', cascade => TRUE, degree => dbms_stats.auto_degree); end;"""
+                cursor.execute(sql_gather, table_name=table_name)
+                gathered += 1
+
+                if partitions:
+                    print("   " + table_name.ljust(22) + " gathered, " + str(len(changed)) + " of " + str(len(partitions)) + " partitions changed" + get_time_elapsed(table_time))
+                else:
+                    print("   " + table_name.ljust(22) + " gathered, " + str(changes) + " changes of " + str(num_rows) + " rows" + get_time_elapsed(table_time))
+
+            set_metric('stats_tables_gathered', gathered)
+            set_metric('stats_tables_skipped', skipped)
+            print("   Statistics Completed, " + str(gathered) + " tables gathered, " + str(skipped) + " skipped" + get_time_elapsed(start_time))
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at gather_changed_stats() - " + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        raise Exception("\nError manipulating database at gather_changed_stats() - " + str(e))
+
+
+##########################################################################
+# Data lag - now minus newest usage interval start loaded
+##########################################################################
+def get_data_lag_seconds(connection, tenant_name):
+    try:
+        with connection.cursor() as cursor:
+            sql = """select round((cast(sys_extract_utc(systimestamp) as date) - max(USAGE_INTERVAL_START)) * 86400)
+                     from OCI_COST_STATS where TENANT_NAME = :tenant_name"""
+            cursor.execute(sql, tenant_name=tenant_name)
+            val, = cursor.fetchone()
+            return val if val is not None else 0
+
+    except oracledb.DatabaseError as e:
+        print("\nget_data_lag_seconds() - Error manipulating database - " + str(e) + "\n")
+        return 0
+
+
+##########################################################################
+# Session settings per phase - the load uses the -dn service and the
+# merges the -dnmerge service, module and action show the phase in
+# v$session and the ADB performance hub
+##########################################################################
+def set_session_phase(connection, phase):
+    connection.module = "usage2adw"
+    connection.action = phase
+    with connection.cursor() as cursor:
+
+        ###############################
+        # enable hints
+        ###############################
+        sql = "ALTER SESSION SET OPTIMIZER_IGNORE_HINTS=FALSE"
+        cursor.execute(sql)
+        sql = "ALTER SESSION SET OPTIMIZER_IGNORE_PARALLEL_HINTS=FALSE"
+        cursor.execute(sql)
+
+
+##########################################################################
+# Load queue - add the listed files to OCI_LOAD_QUEUE, files listed by
+# another host are ignored by the primary key
+##########################################################################
+def enqueue_cost_files(connection, tenant_name, objects, namespace_name, bucket_name):
+    data = []
+    for o in objects:
+        data.append((tenant_name, o.name, namespace_name, bucket_name, o.size, o.etag, str(o.time_created)[0:19]))
+
+    if not data:
+        return 0
+
+    with connection.cursor() as cursor:
+        sql = """insert /*+ ignore_row_on_dupkey_index(OCI_LOAD_QUEUE, OCI_LOAD_QUEUE_PK) */ into OCI_LOAD_QUEUE
+                 (TENANT_NAME, FILE_NAME, NAMESPACE_NAME, BUCKET_NAME, FILE_SIZE, FILE_ETAG, FILE_TIME_CREATED, STATUS, ATTEMPTS, ENQUEUED_TIME)
+                 values (:1, :2, :3, :4, :5, :6, to_date(:7,'YYYY-MM-DD HH24:MI:SS'), 'NEW', 0, sysdate)"""
+        cursor.executemany(sql, data)
+        enqueued = cursor.rowcount
+        connection.commit()
+
+    set_metric('queue_enqueued', enqueued, add=True)
+    return enqueued
+
+
+##########################################################################
+# Load queue - claim the next file of the prefix, new or with expired
+# lease, rows locked by other workers are skipped, the claim is
+# committed with the lease expiry so a crashed worker releases it
+##########################################################################
+def claim_queued_file(connection, tenant_name, prefix, lease_secs):
+    with connection.cursor() as cursor:
+
+        # skip locked locks the rows when fetched, fetch one row only
+        cursor.arraysize = 1
+        cursor.prefetchrows = 1
+        sql = """select rowid, FILE_NAME, NAMESPACE_NAME, BUCKET_NAME, FILE_SIZE, FILE_ETAG, FILE_TIME_CREATED, STATUS, ATTEMPTS
+                 from OCI_LOAD_QUEUE
+                 where TENANT_NAME = :tenant_name and FILE_NAME like :prefix
+                 and (STATUS = 'NEW' or (STATUS = 'CLAIMED' and CLAIM_EXPIRES < sysdate))
+                 order by FILE_NAME
+                 for update skip locked"""
+        cursor.execute(sql, tenant_name=tenant_name, prefix=prefix + "%")
+        row = cursor.fetchone()
+        if row is None:
+            connection.rollback()
+            return None
+
+        row_id, file_name, namespace_name, bucket_name, file_size, file_etag, file_time_created, status, attempts = row
+        sql = """update OCI_LOAD_QUEUE set STATUS = 'CLAIMED', CLAIMED_BY = :worker, CLAIM_EXPIRES = sysdate + :lease_secs / 86400, ATTEMPTS = ATTEMPTS + 1
+                 where rowid = :row_id"""
+        cursor.execute(sql, worker=queue_worker, lease_secs=lease_secs, row_id=row_id)
+        connection.commit()
+
+    set_metric('queue_claimed', 1, {'claim': 'expired' if status == 'CLAIMED' else 'new'}, add=True)
+    return {
+        'object_file': oci.object_storage.models.ObjectSummary(name=file_name, size=int(file_size), etag=file_etag, time_created=file_time_created),
+        'namespace': namespace_name,
+        'bucket': bucket_name,
+        'attempts': attempts + 1,
+        'expired': status == 'CLAIMED'
+    }
+
+
+##########################################################################
+# Load queue - complete the claim, DONE, SKIPPED, NEW to retry or FAILED
+##########################################################################
+def complete_queued_file(connection, tenant_name, file_name, status, error=""):
+    with connection.cursor() as cursor:
+        sql = """update OCI_LOAD_QUEUE set STATUS = :status, COMPLETED_TIME = case when :status in ('DONE','SKIPPED','FAILED') then sysdate end,
+                 CLAIM_EXPIRES = null, LAST_ERROR = substr(:error, 1, 1000)
+                 where TENANT_NAME = :tenant_name and FILE_NAME = :file_name and CLAIMED_BY = :worker"""
+        cursor.execute(sql, status=status, error=error, tenant_name=tenant_name, file_name=file_name, worker=queue_worker)
+        completed = cursor.rowcount
+        connection.commit()
+
+    # a claim lost to another worker is completed by the other worker
+    if completed:
+        set_metric('queue_completed', 1, {'status': status}, add=True)
+
+
+##########################################################################
+# Load queue - renew the lease of the claim while the file loads, False
+# if the claim was taken by another worker after an expired lease, the
+# update is committed with the rows of the file and locks the queue row
+# until then, the claim query skips the locked rows
+##########################################################################
+def renew_queued_claim(connection, tenant_name, file_name, lease_secs):
+    with connection.cursor() as cursor:
+        sql = """update OCI_LOAD_QUEUE set CLAIM_EXPIRES = sysdate + :lease_secs / 86400
+                 where TENANT_NAME = :tenant_name and FILE_NAME = :file_name and CLAIMED_BY = :worker and STATUS = 'CLAIMED'"""
+        cursor.execute(sql, lease_secs=lease_secs, tenant_name=tenant_name, file_name=file_name, worker=queue_worker)
+        return cursor.rowcount == 1
+
+
+##########################################################################
+# Load queue - the claim was lost, the open rows of the file are rolled
+# back and the file is left to the worker owning the claim, the star
+# schema cache is cleared so the rolled back dimension members are
+# inserted again
+##########################################################################
+def skip_lost_claim(connection, file_name_full, path_filename):
+    connection.rollback()
+    star_keys_cache.clear()
+    if os.path.exists(path_filename):
+        os.remove(path_filename)
+    print("   Skipping   file " + file_name_full + ", Claim lost to another worker after the lease expired, file left to the other worker")
+    set_metric('queue_claims_lost', 1, add=True)
+    return 0
+
+
+##########################################################################
+# Load queue - the merges of a tenant are serialized between the hosts
+# with a DBMS_LOCK user lock, it is kept across the commits of the merges
+# and released by the database if the session of the host dies
+##########################################################################
+def request_merge_lock(connection, tenant_name, timeout_secs):
+    with connection.cursor() as cursor:
+        lock_handle = cursor.var(str)
+        result = cursor.var(int)
+        sql = """declare
+                     l_handle varchar2(128);
+                 begin
+                     dbms_lock.allocate_unique(:lock_name, l_handle);
+                     :result := dbms_lock.request(l_handle, dbms_lock.x_mode, :timeout_secs, false);
+                     :lock_handle := l_handle;
+                 end;"""
+        cursor.execute(sql, lock_name="USAGE2ADW_MERGE_" + tenant_name, result=result, timeout_secs=timeout_secs, lock_handle=lock_handle)
+
+    # 0 = granted, 4 = already owned by the session
+    if result.getvalue() not in (0, 4):
+        raise Exception("Merge lock of tenant " + tenant_name + " not granted after " + str(timeout_secs) + " seconds, dbms_lock.request returned " + str(result.getvalue()))
+    return lock_handle.getvalue()
+
+
+def release_merge_lock(connection, lock_handle):
+    with connection.cursor() as cursor:
+        cursor.execute("declare l_result integer; begin l_result := dbms_lock.release(:lock_handle); end;", lock_handle=lock_handle)
+
+
+##########################################################################
+# Load queue - claim and load the files of the prefix until the queue
+# is empty, a file claimed again after an expired lease or a failed
+# attempt is checked in OCI_LOAD_STATUS and its partial rows are removed
+# before the load
+##########################################################################
+def load_queued_files(connection, object_storage, cmd, tenancy, clients, prefix, total_files, list_secs):
+    tenant_name = str(tenancy.name)
+    files_loaded = 0
+    file_num = 0
+
+    while not daemon_stop.is_set():
+        claim = claim_queued_file(connection, tenant_name, prefix, cmd.queue_lease_secs)
+        if claim is None:
+            break
+
+        file_num += 1
+        o = claim['object_file']
+
+        if claim['expired'] or claim['attempts'] > 1:
+            with connection.cursor() as cursor:
+                cursor.execute("select count(*) from OCI_LOAD_STATUS where TENANT_NAME=:tenant_name and FILE_NAME=:file_name and FILE_STATUS is null", tenant_name=tenant_name, file_name=o.name)
+                already_loaded, = cursor.fetchone()
+                if already_loaded:
+                    print("   Skipping   file " + o.name + ", #" + str(file_num) + "/" + str(total_files) + ", Claimed again and file already loaded")
+                    complete_queued_file(connection, tenant_name, o.name, 'DONE')
+                    continue
+
+                file_id = o.name.rsplit('/', 1)[-1][:-7]
+                cursor.execute("delete from " + cost_table + " where TENANT_NAME=:tenant_name and FILE_ID=:file_id", tenant_name=tenant_name, file_id=file_id)
+                if cursor.rowcount:
+                    print("   Removed " + str(cursor.rowcount) + " rows of file " + o.name + " left by " + ("expired claim" if claim['expired'] else "failed attempt"))
+                connection.commit()
+
+        if clients['compartments'] is None:
+            clients['compartments'] = identity_read_compartments(clients['identity'], tenancy)
+            clients['compartments_time'] = time.time()
+
+        # files complete out of order between the workers, the last loaded
+        # file is not a skip point in queue mode
+        try:
+            loaded = load_cost_file(connection, object_storage, o, "", cmd, tenancy, clients['compartments'], file_num, total_files, claim['namespace'], claim['bucket'], list_secs, queued=True)
+
+        # database errors raise SystemExit, the claim is retried until the
+        # attempts, the rows of the file are rolled back before the claim
+        # is completed, the star schema cache is cleared so the rolled back
+        # dimension members are inserted again
+        except (Exception, SystemExit) as e:
+            error = str(e) if str(e) else type(e).__name__
+            connection.rollback()
+            star_keys_cache.clear()
+            complete_queued_file(connection, tenant_name, o.name, 'FAILED' if claim['attempts'] >= cmd.queue_attempts else 'NEW', error)
+            raise
+
+        if o.name in files_failed:
+            complete_queued_file(connection, tenant_name, o.name, 'FAILED', "Rejected rows above -rejectpct, see OCI_LOAD_REJECTS")
+        else:
+            complete_queued_file(connection, tenant_name, o.name, 'DONE' if loaded else 'SKIPPED')
+        files_loaded += loaded
+        if loaded and cmd.metrics_file:
+            write_metrics_file(cmd.metrics_file, tenant_name)
+
+    return files_loaded
+
+
+##########################################################################
+# Load the new cost files of all the prefixes and run the post load
+# merges, clients keeps identity, object storage and the compartments
+# between the cycles of -daemon
+##########################################################################
+def load_tenant_files(connection, merge_connection, cmd, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients):
+    max_cost_file_name = ""
+    total_files_loaded = 0
+    files_failed.clear()
+
+    # Loop on prefixes, internal may have 2 or more prefixes to scan for cost files
+    for prefix in file_run_prefixes:
+        if daemon_stop.is_set():
+            break
+        print_header("Running on Billing File with Prefix: '" + prefix + "'", 0)
+
+        # Open Cursor
+        set_session_phase(connection, 'load')
+        with connection.cursor() as cursor:
+
+            ###############################
+            # fetch max file id processed
+            ###############################
+            print("\nChecking Last Loaded Files... started at " + get_current_date_time() + " for prefix: '" + prefix + "'")
+
+            sql = "select nvl(max(file_name),'0') as max_file_name from OCI_LOAD_STATUS a where TENANT_NAME=:tenant_name and FILE_STATUS is null and file_name like '" + prefix + "%'"
+
+            # queue mode lists after the last file queued by any host
+            if cmd.load_queue:
+                sql = "select greatest((" + sql + "), (select nvl(max(file_name),'0') from OCI_LOAD_QUEUE where TENANT_NAME=:tenant_name and file_name like '" + prefix + "%')) from dual"
+
+            if DEBUG:
+                print("   DEBUG SQL = " + sql)
+
+            cursor.execute(sql, tenant_name=str(tenancy.name))
+            max_cost_file_name, = cursor.fetchone()
+            print("   Max Cost File Name " + ("Queued" if cmd.load_queue else "Processed") + " = " + str(max_cost_file_name))
+
+            # --force retries the files failed with rejected rows
+            retry_files = set()
+            if cmd.force:
+                sql = "select FILE_NAME from OCI_LOAD_STATUS where TENANT_NAME=:tenant_name and FILE_STATUS='FAILED' and file_name like '" + prefix + "%'"
+                cursor.execute(sql, tenant_name=str(tenancy.name))
+                retry_files = set(row[0] for row in cursor.fetchall())
+                if retry_files:
+                    print("   " + str(len(retry_files)) + " failed files to retry with --force")
+
+                # queue mode - failed files are queued again
+                if cmd.load_queue:
+                    sql = """update OCI_LOAD_QUEUE set STATUS = 'NEW', ATTEMPTS = 0, CLAIMED_BY = null, CLAIM_EXPIRES = null
+                             where TENANT_NAME = :tenant_name and STATUS = 'FAILED' and file_name like '""" + prefix + "%'"
+                    cursor.execute(sql, tenant_name=str(tenancy.name))
+                    if cursor.rowcount:
+                        print("   " + str(cursor.rowcount) + " failed files queued again with --force")
+                    connection.commit()
+
+            print("Completed Checking at " + get_current_date_time())
+
+        ############################################
+        # Download Cost Files and insert to database
+        ############################################
+
+        if clients['object_storage'] is None:
+            print("\nConnecting to Object Storage Service...")
+            clients['object_storage'] = oci.object_storage.ObjectStorageClient(config, signer=signer)
+            if cmd.proxy:
+                clients['object_storage'].base_client.session.proxies = {'https': cmd.proxy}
+            print("   Connected")
+        object_storage = clients['object_storage']
+
+        #############################
+        # Handle Cost Files
+        #############################
+        cost_num = 0
+        if not cmd.skip_cost:
+            print("\nHandling Cost Report... started at " + get_current_date_time())
+            list_time = time.perf_counter()
+            objects = oci.pagination.list_call_get_all_results(
+                counted_api_call('list_objects', object_storage.list_objects),
+                costusage_namespace_name,
+                costusage_bucket_name,
+                fields="timeCreated,size,etag",
+                prefix=prefix,
+                start=min(retry_files) if retry_files and not cmd.load_queue else max_cost_file_name + "-next"
+            ).data
+
+            list_secs = time.perf_counter() - list_time
+            set_metric('phase_seconds', round(list_secs, 3), {'phase': 'list'}, add=True)
+
+            total_files = len(objects.objects)
+            print("Total " + str(total_files) + " cost files found to scan...")
+
+            # queue mode - enqueue the listed files and load the files claimed
+            if cmd.load_queue:
+                enqueued = enqueue_cost_files(connection, str(tenancy.name), objects.objects, costusage_namespace_name, costusage_bucket_name)
+                print("   " + str(enqueued) + " files added to OCI_LOAD_QUEUE, claiming files as " + queue_worker + "...")
+                cost_num = load_queued_files(connection, object_storage, cmd, tenancy, clients, prefix, total_files, list_secs)
+                print("\n   Total " + str(cost_num) + " Cost Files Loaded from queue, completed at " + get_current_date_time())
+                total_files_loaded += cost_num
+                continue
+
+            # no new files after the last loaded, skip the compartments load
+            if total_files and clients['compartments'] is None:
+                clients['compartments'] = identity_read_compartments(clients['identity'], tenancy)
+                clients['compartments_time'] = time.time()
+            elif not total_files:
+                print("   No new cost files after " + str(max_cost_file_name) + ", nothing to load")
+
+            for index, object_file in enumerate(objects.objects, start=1):
+                if daemon_stop.is_set():
+                    print("\n   Stop requested, the remaining files will be loaded by the next run")
+                    break
+                loaded = load_cost_file(connection, object_storage, object_file, "" if object_file.name in retry_files else max_cost_file_name, cmd, tenancy, clients['compartments'], index, total_files, costusage_namespace_name, costusage_bucket_name, list_secs)
+                cost_num += loaded
+                if loaded and cmd.metrics_file:
+                    write_metrics_file(cmd.metrics_file, str(tenancy.name))
+            print("\n   Total " + str(cost_num) + " Cost Files Loaded, completed at " + get_current_date_time())
+
+            total_files_loaded += cost_num
+
+    # end of prefix loop
+    print("Total overall " + str(total_files_loaded) + " cost files loaded...")
+    if files_failed:
+        print("Total overall " + str(len(files_failed)) + " cost files failed with rejected rows, see OCI_LOAD_REJECTS, retry with --force:")
+        for file_name in files_failed:
+            print("   " + file_name)
+
+    update_loaded_files_merges(merge_connection, cmd, tenancy, short_tenant_id, total_files_loaded)
+
+    # -daemon runs the merges every cycle and the maintenance once per -maintenancehours
+    if not cmd.daemon or time.time() - clients['maintenance_time'] >= cmd.maintenance_hours * 3600:
+        run_maintenance_steps(merge_connection, cmd, config, signer, tenancy)
+        clients['maintenance_time'] = time.time()
+    elif cmd.retain_months > 0 or cmd.load_subscription or cmd.gather_stats:
+        print("\nMaintenance steps skipped, next run after " + datetime.datetime.fromtimestamp(clients['maintenance_time'] + cmd.maintenance_hours * 3600).strftime("%Y-%m-%d %H:%M:%S"))
+
+    return total_files_loaded
+
+
+##########################################################################
+# Merges from OCI_COST of the loaded files
+##########################################################################
+def update_loaded_files_merges(connection, cmd, tenancy, short_tenant_id, total_files_loaded):
+    set_session_phase(connection, 'merge')
+
+    # queue mode - the hosts of the queue merge the same tenant, the delete
+    # and insert of OCI_COST_DAILY would duplicate rows if run concurrently
+    if cmd.load_queue and (total_files_loaded > 0 or cmd.force or cost_daily_rebuild):
+        print("\nWaiting for the merge lock of tenant " + str(tenancy.name) + "... started at " + get_current_date_time())
+        lock_handle = request_merge_lock(connection, str(tenancy.name), cmd.queue_lease_secs)
+        try:
+            run_loaded_files_merges(connection, cmd, tenancy, short_tenant_id, total_files_loaded)
+        finally:
+            release_merge_lock(connection, lock_handle)
+    else:
+        run_loaded_files_merges(connection, cmd, tenancy, short_tenant_id, total_files_loaded)
+
+
+def run_loaded_files_merges(connection, cmd, tenancy, short_tenant_id, total_files_loaded):
+    global cost_daily_rebuild
+
+    #############################
+    # Update oci_cost_stats if
+    # there were files
+    #############################
+    if total_files_loaded > 0 or cmd.force:
+        # --force rebuilds from all the usage of the tenant
+        min_usage_date = "" if cmd.force else min_usage_loaded
+        run_timed_merge('cost_stats', update_cost_stats, connection, tenancy.name, min_usage_date)
+        run_timed_merge('cost_daily', update_cost_daily, connection, tenancy.name, "" if cost_daily_rebuild else min_usage_date)
+        run_timed_merge('price_list', update_price_list, connection, tenancy.name, min_usage_date)
+        run_timed_merge('cost_reference', update_cost_reference, connection, cmd.tagspecial, cmd.tagspecial2, cmd.tagspecial3, cmd.tagspecial4, cmd.tagspecial5, cmd.tagspecial6, cmd.tagspecial7, cmd.tagspecial8, tenancy.name, min_usage_date)
+        run_timed_merge('tenant', update_oci_tenant_with_tenant_ids, connection, tenancy.name, short_tenant_id)
+        if not cmd.skip_rate:
+            run_timed_merge('public_rates', update_public_rates, connection, tenancy.name, cmd.rate_cache_days)
+
+    elif cost_daily_rebuild:
+        run_timed_merge('cost_daily', update_cost_daily, connection, tenancy.name, "")
+
+    # OCI_COST_DAILY rebuilt, the next daemon cycles merge from the loaded dates
+    cost_daily_rebuild = False
+
+
+##########################################################################
+# Retention, subscription and statistics after the merges
+##########################################################################
+def run_maintenance_steps(connection, cmd, config, signer, tenancy):
+    set_session_phase(connection, 'maintenance')
+
+    #############################
+    # if -retainmonths specified
+    # purge old usage and rebuild
+    # the references
+    #############################
+    if cmd.retain_months > 0:
+        purged = run_timed_merge('retention', apply_retention, connection, tenancy.name, cmd.retain_months, cmd.retain_batch_rows)
+        if purged:
+            run_timed_merge('cost_reference', update_cost_reference, connection, cmd.tagspecial, cmd.tagspecial2, cmd.tagspecial3, cmd.tagspecial4, cmd.tagspecial5, cmd.tagspecial6, cmd.tagspecial7, cmd.tagspecial8, tenancy.name, "", True)
+
+    #############################
+    # if -loadsub specified
+    # load_subscription
+    #############################
+    if cmd.load_subscription:
+        run_timed_merge('subscription', load_subscription_data, connection, config, signer, cmd, tenancy)
+
+    #############################
+    # if -gatherstats specified
+    # gather the changed tables
+    #############################
+    if cmd.gather_stats:
+        stats_tables = [cost_table, 'OCI_COST_STATS', 'OCI_COST_DAILY', 'OCI_COST_REFERENCE', 'OCI_COST_TAG_KEYS', 'OCI_PRICE_LIST', 'OCI_LOAD_STATUS']
+        if cost_star_schema:
+            stats_tables += list(star_dimensions)
+        if cmd.load_subscription:
+            stats_tables += ['OCI_SUBSCRIPTION', 'OCI_SUBSCRIPTION_COMMIT']
+        run_timed_merge('gather_stats', gather_changed_stats, connection, stats_tables, cmd.gather_stale_pct)
+
+
+##########################################################################
+# Parse Object Storage create events to objects to load
+# OCI Events - data.resourceName, data.additionalDetails namespace,
+# bucketName and eTag, or flat - namespace, bucket, object, size, etag,
+# timeCreated, payload can be an event or a list of events
+##########################################################################
+def parse_object_events(payload, costusage_namespace_name, costusage_bucket_name):
+    objects = []
+    for event in (payload if isinstance(payload, list) else [payload]):
+        if not isinstance(event, dict):
+            continue
+
+        event_type = str(event.get('eventType', event.get('type', '')))
+        if event_type and not event_type.endswith('createobject'):
+            set_metric('events_skipped', 1, {'reason': 'event_type'}, add=True)
+            continue
+
+        data = event.get('data') if isinstance(event.get('data'), dict) else event
+        details = data.get('additionalDetails') if isinstance(data.get('additionalDetails'), dict) else {}
+        name = data.get('resourceName', data.get('object', data.get('name', '')))
+        if not name:
+            set_metric('events_skipped', 1, {'reason': 'no_object'}, add=True)
+            continue
+
+        time_created = None
+        event_time = str(data.get('timeCreated', event.get('eventTime', event.get('time', ''))))
+        try:
+            time_created = datetime.datetime.strptime(event_time[0:19], "%Y-%m-%dT%H:%M:%S")
+        except ValueError:
+            pass
+
+        objects.append({
+            'namespace': details.get('namespace', data.get('namespace', costusage_namespace_name)),
+            'bucket': details.get('bucketName', data.get('bucket', costusage_bucket_name)),
+            'name': name,
+            'size': data.get('size'),
+            'etag': details.get('eTag', data.get('etag', '')),
+            'time_created': time_created
+        })
+    return objects
+
+
+##########################################################################
+# Read events from json file or stdin, json document or json lines
+##########################################################################
+def read_event_file(event_file):
+    if event_file == "-":
+        text = sys.stdin.read()
+    else:
+        with open(event_file, 'r') as f:
+            text = f.read()
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+##########################################################################
+# Event listener - POST of event json queued to the load, 202 returned
+##########################################################################
+class EventRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            self.server.event_queue.put(payload)
+            self.send_response(202)
+            self.end_headers()
+            self.wfile.write(b'{"status": "queued"}')
+
+        except Exception as e:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+
+    def log_message(self, format, *args):
+        print("   Event Listener " + self.address_string() + " - " + (format % args))
+
+
+##########################################################################
+# Load the objects of create events, duplicate events and objects
+# already in OCI_LOAD_STATUS are skipped, size and creation time missing
+# from the event are read with head_object
+##########################################################################
+def load_event_objects(connection, object_storage, events, loaded_events, cmd, tenancy, file_run_prefixes, clients):
+    files_loaded = 0
+    for index, event in enumerate(events, start=1):
+        set_metric('events_received', 1, add=True)
+        event_key = (event['namespace'], event['bucket'], event['name'], event['etag'])
+
+        if event_key in loaded_events:
+            print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", Duplicate event")
+            set_metric('events_skipped', 1, {'reason': 'duplicate'}, add=True)
+            continue
+
+        if not any(event['name'].startswith(prefix) for prefix in file_run_prefixes) or not event['name'].endswith(".csv.gz"):
+            print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", Not a cost file")
+            set_metric('events_skipped', 1, {'reason': 'not_cost_file'}, add=True)
+            continue
+
+        with connection.cursor() as cursor:
+            # files failed with rejected rows are loaded again only with --force
+            sql = "select count(*) from OCI_LOAD_STATUS where TENANT_NAME=:tenant_name and FILE_NAME=:file_name"
+            if cmd.force:
+                sql += " and FILE_STATUS is null"
+            cursor.execute(sql, tenant_name=str(tenancy.name), file_name=event['name'])
+            already_loaded, = cursor.fetchone()
+
+        if already_loaded:
+            print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", File already loaded")
+            set_metric('events_skipped', 1, {'reason': 'loaded'}, add=True)
+            loaded_events.add(event_key)
+            continue
+
+        if event['size'] is None or event['time_created'] is None:
+            try:
+                headers = counted_api_call('head_object', object_storage.head_object)(event['namespace'], event['bucket'], event['name']).headers
+            except oci.exceptions.ServiceError as e:
+                print("   Skipping   event " + event['name'] + ", #" + str(index) + "/" + str(len(events)) + ", Object not found - " + str(e.status))
+                set_metric('events_skipped', 1, {'reason': 'not_found'}, add=True)
+                continue
+            event['size'] = int(headers['content-length'])
+            event['etag'] = event['etag'] or headers.get('etag', '')
+            event['time_created'] = email.utils.parsedate_to_datetime(headers['last-modified']).replace(tzinfo=None)
+
+        if clients['compartments'] is None:
+            clients['compartments'] = identity_read_compartments(clients['identity'], tenancy)
+            clients['compartments_time'] = time.time()
+
+        object_file = oci.object_storage.models.ObjectSummary(name=event['name'], size=int(event['size']), etag=event['etag'], time_created=event['time_created'])
+        loaded = load_cost_file(connection, object_storage, object_file, "", cmd, tenancy, clients['compartments'], index, len(events), event['namespace'], event['bucket'])
+        files_loaded += loaded
+        if loaded:
+            loaded_events.add(event_key)
+            if cmd.metrics_file:
+                write_metrics_file(cmd.metrics_file, str(tenancy.name))
+
+    return files_loaded
+
+
+##########################################################################
+# Event ingest - load exactly the objects of the create events from
+# -event file / stdin, or from -eventport listener until SIGTERM, the
+# merges run after each batch of events
+##########################################################################
+def event_process(connection, merge_connection, cmd, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients):
+    global min_usage_loaded
+
+    print("\nConnecting to Object Storage Service...")
+    object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
+    if cmd.proxy:
+        object_storage.base_client.session.proxies = {'https': cmd.proxy}
+    print("   Connected")
+
+    set_session_phase(connection, 'load')
+    loaded_events = set()
+    total_files_loaded = 0
+
+    ############################################
+    # events from file or stdin - one batch
+    ############################################
+    if cmd.event_file:
+        print_header("Loading Object Create Events from " + ("stdin" if cmd.event_file == "-" else cmd.event_file), 0)
+        events = parse_object_events(read_event_file(cmd.event_file), costusage_namespace_name, costusage_bucket_name)
+        print("Total " + str(len(events)) + " object events to load...")
+
+        total_files_loaded = load_event_objects(connection, object_storage, events, loaded_events, cmd, tenancy, file_run_prefixes, clients)
+        print("\n   Total " + str(total_files_loaded) + " Cost Files Loaded, completed at " + get_current_date_time())
+
+        update_loaded_files_merges(merge_connection, cmd, tenancy, short_tenant_id, total_files_loaded)
+        run_maintenance_steps(merge_connection, cmd, config, signer, tenancy)
+        return total_files_loaded
+
+    ############################################
+    # events from http listener
+    ############################################
+    def stop_handler(signum, frame):
+        print("\nSignal " + str(signum) + " received, stopping the event listener... at " + get_current_date_time())
+        daemon_stop.set()
+
+    signal.signal(signal.SIGTERM, stop_handler)
+    signal.signal(signal.SIGINT, stop_handler)
+
+    server = http.server.ThreadingHTTPServer((cmd.event_host, cmd.event_port), EventRequestHandler)
+    server.event_queue = queue.Queue()
+    listener = threading.Thread(target=server.serve_forever, daemon=True)
+    listener.start()
+    print_header("Listening for Object Create Events on http://" + cmd.event_host + ":" + str(cmd.event_port) + "/", 0)
+
+    try:
+        while not daemon_stop.is_set():
+            try:
+                payload = server.event_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            # batch all the events queued
+            events = parse_object_events(payload, costusage_namespace_name, costusage_bucket_name)
+            while not server.event_queue.empty():
+                events += parse_object_events(server.event_queue.get(), costusage_namespace_name, costusage_bucket_name)
+
+            print("\nReceived " + str(len(events)) + " object events at " + get_current_date_time())
+            min_usage_loaded = ""
+            set_session_phase(connection, 'load')
+            batch_files = load_event_objects(connection, object_storage, events, loaded_events, cmd, tenancy, file_run_prefixes, clients)
+            if batch_files:
+                update_loaded_files_merges(merge_connection, cmd, tenancy, short_tenant_id, batch_files)
+                if cmd.metrics_file:
+                    set_metric('data_lag_seconds', get_data_lag_seconds(connection, str(tenancy.name)))
+                    write_metrics_file(cmd.metrics_file, str(tenancy.name))
+            total_files_loaded += batch_files
+            print("   Total " + str(total_files_loaded) + " Cost Files Loaded since start, waiting for events...")
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return total_files_loaded
+
+
+##########################################################################
+# Write the daemon status file, temp file and rename so the health check
+# never reads a partial file
+##########################################################################
+def write_daemon_status(status_file, status):
+    try:
+        with open(status_file + ".tmp", 'w') as f:
+            json.dump(status, f, indent=2)
+        os.replace(status_file + ".tmp", status_file)
+
+    except Exception as e:
+        print("\nwrite_daemon_status() - Error writing status file " + status_file + " - " + str(e))
+
+
+##########################################################################
+# Daemon - stay resident and poll the billing bucket every -pollsecs
+# with random -polljitter, the database pool, the OCI clients and the
+# compartments are kept between the cycles, SIGTERM or SIGINT stop
+# after the current file and the merges of the loaded files
+##########################################################################
+def daemon_process(cmd, dbpass, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients):
+    global min_usage_loaded
+
+    tenant_name = str(tenancy.name)
+    status_file = cmd.status_file if cmd.status_file else work_report_dir
+    if os.path.isdir(status_file):
+        status_file = os.path.join(status_file, "usage2adw_daemon_" + "".join(c if c.isalnum() else "_" for c in tenant_name) + ".json")
+
+    def stop_handler(signum, frame):
+        print("\nSignal " + str(signum) + " received, stopping after the current file... at " + get_current_date_time())
+        daemon_stop.set()
+
+    signal.signal(signal.SIGTERM, stop_handler)
+    signal.signal(signal.SIGINT, stop_handler)
+
+    status = {
+        'tenant_name': tenant_name,
+        'pid': os.getpid(),
+        'version': version,
+        'state': 'starting',
+        'started': get_current_date_time(),
+        'poll_secs': cmd.poll_secs,
+        'cycles': 0,
+        'cycle_errors': 0,
+        'files_loaded': 0,
+        'last_cycle_start': "",
+        'last_cycle_end': "",
+        'last_cycle_files': 0,
+        'last_cycle_secs': 0,
+        'last_success': "",
+        'last_error': "",
+        'next_poll': "",
+        'heartbeat': get_current_date_time()
+    }
+    write_daemon_status(status_file, status)
+
+    print_header("Running as Daemon, poll every " + str(cmd.poll_secs) + " +/- " + str(cmd.poll_jitter) + " seconds", 0)
+    print("   Status File  : " + status_file)
+
+    pool = None
+    merge_pool = None
+    try:
+        print("\nCreating database pool to " + cmd.dname)
+        pool = create_db_pool(cmd.duser, dbpass, cmd.dname, 1, 1)
+        print("   Created")
+
+        # merges on their own service, sessions released between the cycles
+        if cmd.dname_merge:
+            print("\nCreating database pool to " + cmd.dname_merge + " for the merges")
+            merge_pool = create_db_pool(cmd.duser, dbpass, cmd.dname_merge, 0, 1)
+            print("   Created")
+
+        with pool.acquire() as connection:
+            print("\nChecking Database Structure...")
+            check_database_table_structure(connection, cmd.load_subscription, cmd.tags_json, cmd.load_queue)
+            if cost_star_schema:
+                cmd.tags_json = False
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database - " + str(e) + "\n")
+        status['state'] = 'failed'
+        status['last_error'] = str(e)
+        write_daemon_status(status_file, status)
+        for p in (pool, merge_pool):
+            if p is not None:
+                p.close(force=True)
+        raise SystemExit
+
+    while not daemon_stop.is_set():
+        cycle_start_time = time.time()
+        run_success = 0
+
+        print_header("Daemon Cycle " + str(status['cycles'] + status['cycle_errors'] + 1) + " started at " + get_current_date_time(), 0)
+        status['state'] = 'loading'
+        status['last_cycle_start'] = get_current_date_time()
+        status['heartbeat'] = status['last_cycle_start']
+        write_daemon_status(status_file, status)
+
+        # per cycle state, metrics hold the last cycle with the daemon totals
+        min_usage_loaded = ""
+        star_keys_cache.clear()
+        with metrics_lock:
+            metrics_values.clear()
+
+        # refresh the compartments cache, loaded again when there are files
+        if clients['compartments'] is not None and time.time() - clients['compartments_time'] > cmd.compartment_hours * 3600:
+            print("\nCompartments cache older than " + str(cmd.compartment_hours) + " hours, will be reloaded")
+            clients['compartments'] = None
+
+        try:
+            with pool.acquire() as connection, (merge_pool.acquire() if merge_pool else contextlib.nullcontext(connection)) as merge_connection:
+                files_loaded = load_tenant_files(connection, merge_connection, cmd, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients)
+                if cmd.metrics_file:
+                    set_metric('data_lag_seconds', get_data_lag_seconds(connection, tenant_name))
+
+            # --force applies to the first cycle only
+            cmd.force = False
+            run_success = 1
+            status['cycles'] += 1
+            status['files_loaded'] += files_loaded
+            status['last_cycle_files'] = files_loaded
+            status['last_success'] = get_current_date_time()
+            status['last_error'] = ""
+
+        # database and api errors raise SystemExit, the daemon continues
+        # with the next cycle
+        except (Exception, SystemExit) as e:
+            error = str(e) if str(e) else type(e).__name__
+            print("\nError in daemon cycle - " + error + ", will retry at the next poll")
+            status['cycle_errors'] += 1
+            status['last_cycle_files'] = 0
+            status['last_error'] = get_current_date_time() + " - " + error
+
+        if cmd.metrics_file:
+            set_metric('run_success', run_success)
+            set_metric('run_seconds', round(time.time() - cycle_start_time, 3))
+            set_metric('daemon_cycles', status['cycles'])
+            set_metric('daemon_cycle_errors', status['cycle_errors'])
+            write_metrics_file(cmd.metrics_file, tenant_name)
+
+        sleep_secs = max(cmd.poll_secs + random.uniform(-cmd.poll_jitter, cmd.poll_jitter), 1)
+        status['state'] = 'sleeping'
+        status['last_cycle_end'] = get_current_date_time()
+        status['last_cycle_secs'] = round(time.time() - cycle_start_time, 3)
+        status['next_poll'] = str((datetime.datetime.now() + datetime.timedelta(seconds=sleep_secs)).strftime("%Y-%m-%d %H:%M:%S"))
+        status['heartbeat'] = status['last_cycle_end']
+        write_daemon_status(status_file, status)
+
+        print("\nDaemon Cycle completed" + get_time_elapsed(cycle_start_time) + ", next poll at " + status['next_poll'])
+        daemon_stop.wait(sleep_secs)
+
+    ############################################
+    # graceful stop
+    ############################################
+    print("\nStopping Daemon, closing the database pool...")
+    pool.close(force=True)
+    if merge_pool is not None:
+        merge_pool.close(force=True)
+    status['state'] = 'stopped'
+    status['next_poll'] = ""
+    status['heartbeat'] = get_current_date_time()
+    write_daemon_status(status_file, status)
+    print("   Stopped")
+
+
 ##########################################################################
 # Main
 ##########################################################################
@@ -1334,19 +3660,24 @@ def main_process():
     # Start
     ############################################
     print_header("Running Usage Load to ADW", 0)
+    run_start_time = time.time()
     print("Starts at " + get_current_date_time())
     print("Command Line : " + get_command_line())
 
     ############################################
     # Identity extract compartments
     ############################################
-    secret_config, secret_signer = create_secret_signer(cmd)
-    dbpass = get_secret_password(secret_config, secret_signer, cmd.proxy, cmd.dsecret_id)
+    dbpass = ""
+    if not cmd.dry_run_folder:
+        load_db_profile(cmd.db_conf, cmd.db_profile, "thick")
+        secret_config, secret_signer = create_secret_signer(cmd)
+        dbpass = get_secret_password(secret_config, secret_signer, cmd.proxy, cmd.dsecret_id)
 
     ############################################
-    # Identity extract compartments
+    # Identity tenancy and home region
+    # compartments are loaded only if there are files to load
     ############################################
-    compartments = []
+    identity = None
     tenancy = None
     tenant_id = ""
     short_tenant_id = ""
@@ -1385,113 +3716,62 @@ def main_process():
         signer.region = tenancy_home_region
         config['region'] = tenancy_home_region
 
-        # Extract compartments
-        compartments = identity_read_compartments(identity, tenancy)
-
     except Exception as e:
         print("\nError extracting compartments section - " + str(e) + "\n")
         raise SystemExit
 
+    ############################################
+    # dry run - load to local files
+    ############################################
+    if cmd.dry_run_folder:
+        compartments = identity_read_compartments(identity, tenancy)
+        dry_run_process(cmd, config, signer, tenancy, compartments, file_run_prefixes, costusage_namespace_name, costusage_bucket_name)
+        print("\nCompleted at " + get_current_date_time())
+        return
+
+    ############################################
+    # clients kept between the daemon cycles
+    ############################################
+    clients = {'identity': identity, 'object_storage': None, 'compartments': None, 'compartments_time': 0, 'maintenance_time': 0}
+
+    if cmd.daemon:
+        daemon_process(cmd, dbpass, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients)
+        print("\nCompleted at " + get_current_date_time())
+        return
+
     ############################################
     # connect to database
     ############################################
-    max_cost_file_name = ""
-    total_files_loaded = 0
+    run_success = 0
 
     try:
         print("\nConnecting to database " + cmd.dname)
-        with oracledb.connect(user=cmd.duser, password=dbpass, dsn=cmd.dname) as connection:
+        with create_db_connection(cmd.duser, dbpass, cmd.dname) as connection:
             print("   Connected")
 
-            # Check tables structure
-            print("\nChecking Database Structure...")
-            check_database_table_structure(connection, cmd.load_subscription)
-
-            # Loop on prefixes, internal may have 2 or more prefixes to scan for cost files
-            for prefix in file_run_prefixes:
-                print_header("Running on Billing File with Prefix: '" + prefix + "'", 0)
-
-                # Open Cursor
-                with connection.cursor() as cursor:
-
-                    ###############################
-                    # enable hints
-                    ###############################
-                    sql = "ALTER SESSION SET OPTIMIZER_IGNORE_HINTS=FALSE"
-                    cursor.execute(sql)
-                    sql = "ALTER SESSION SET OPTIMIZER_IGNORE_PARALLEL_HINTS=FALSE"
-                    cursor.execute(sql)
-
-                    ###############################
-                    # fetch max file id processed
-                    ###############################
-                    print("\nChecking Last Loaded Files... started at " + get_current_date_time() + " for prefix: '" + prefix + "'")
-
-                    sql = "select nvl(max(file_name),'0') as max_file_name from OCI_LOAD_STATUS a where TENANT_NAME=:tenant_name and file_name like '" + prefix + "%'"
-                    if DEBUG:
-                        print("   DEBUG SQL = " + sql)
-
-                    cursor.execute(sql, tenant_name=str(tenancy.name))
-                    max_cost_file_name, = cursor.fetchone()
-                    print("   Max Cost File Name Processed = " + str(max_cost_file_name))
+            # merges on their own service if -dnmerge specified
+            merge_connection = None
+            if cmd.dname_merge:
+                print("\nConnecting to database " + cmd.dname_merge + " for the merges")
+                merge_connection = create_db_connection(cmd.duser, dbpass, cmd.dname_merge)
+                print("   Connected")
 
-                    print("Completed Checking at " + get_current_date_time())
+            with (merge_connection if merge_connection else contextlib.nullcontext(connection)) as merge_connection:
 
-                ############################################
-                # Download Cost Files and insert to database
-                ############################################
+                # Check tables structure
+                print("\nChecking Database Structure...")
+                check_database_table_structure(connection, cmd.load_subscription, cmd.tags_json, cmd.load_queue)
+                if cost_star_schema:
+                    cmd.tags_json = False
 
-                print("\nConnecting to Object Storage Service...")
+                if cmd.event_file or cmd.event_port:
+                    event_process(connection, merge_connection, cmd, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients)
+                else:
+                    load_tenant_files(connection, merge_connection, cmd, config, signer, tenancy, short_tenant_id, file_run_prefixes, costusage_namespace_name, costusage_bucket_name, clients)
 
-                object_storage = oci.object_storage.ObjectStorageClient(config, signer=signer)
-                if cmd.proxy:
-                    object_storage.base_client.session.proxies = {'https': cmd.proxy}
-                print("   Connected")
-
-                #############################
-                # Handle Cost Files
-                #############################
-                cost_num = 0
-                if not cmd.skip_cost:
-                    print("\nHandling Cost Report... started at " + get_current_date_time())
-                    objects = oci.pagination.list_call_get_all_results(
-                        object_storage.list_objects,
-                        costusage_namespace_name,
-                        costusage_bucket_name,
-                        fields="timeCreated,size",
-                        prefix=prefix,
-                        start=max_cost_file_name + "-next"
-                    ).data
-
-                    total_files = len(objects.objects)
-                    print("Total " + str(total_files) + " cost files found to scan...")
-                    for index, object_file in enumerate(objects.objects, start=1):
-                        cost_num += load_cost_file(connection, object_storage, object_file, max_cost_file_name, cmd, tenancy, compartments, index, total_files, costusage_namespace_name, costusage_bucket_name)
-                    print("\n   Total " + str(cost_num) + " Cost Files Loaded, completed at " + get_current_date_time())
-
-                    total_files_loaded += cost_num
-
-            # end of prefix loop
-            print("Total overall " + str(total_files_loaded) + " cost files loaded...")
-
-            #############################
-            # Update oci_cost_stats if
-            # there were files
-            #############################
-            if total_files_loaded > 0 or cmd.force:
-                update_cost_stats(connection, tenancy.name)
-                update_price_list(connection, tenancy.name)
-                update_cost_reference(connection, cmd.tagspecial, cmd.tagspecial2, cmd.tagspecial3, cmd.tagspecial4, cmd.tagspecial5, cmd.tagspecial6, cmd.tagspecial7, cmd.tagspecial8, tenancy.name)
-                update_oci_tenant_with_tenant_ids(connection, tenancy.name, short_tenant_id)
-                if not cmd.skip_rate:
-                    update_public_rates(connection, tenancy.name)
-
-            #############################
-            # if -loadsub specified
-            # load_subscription
-            #############################
-            if cmd.load_subscription:
-                load_subscription_data(connection, config, signer, cmd, tenancy)
+                if cmd.metrics_file:
+                    set_metric('data_lag_seconds', get_data_lag_seconds(connection, str(tenancy.name)))
+                run_success = 1
 
     except oracledb.DatabaseError as e:
         print("\nError manipulating database - " + str(e) + "\n")
@@ -1499,6 +3779,12 @@ def main_process():
     except Exception as e:
         print("\nError appeared - " + str(e))
 
+    finally:
+        if cmd.metrics_file:
+            set_metric('run_success', run_success)
+            set_metric('run_seconds', round(time.time() - run_start_time, 3))
+            write_metrics_file(cmd.metrics_file, str(tenancy.name))
+
     ############################################
     # print completed
     ############################################
@@ -1508,4 +3794,5 @@ def main_process():
 ##########################################################################
 # Execute Main Process
 ##########################################################################
-main_process()
+if __name__ == "__main__":
+    main_process()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_benchmark.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Benchmark the file load path of usage2adw.py and focus2adw.py without
+# tenancy or database:
+#   - Generate synthetic reports with usage2adw_generate_reports.py
+#   - Serve them from a local folder that mimics the Object Storage client
+#   - Record the database calls with a fake oracledb connection
+#   - Call load_cost_file / load_focus_file of the loader as is
+#
+# Reports rows/sec, MB/sec, peak RSS and time per phase as recorded by
+# the loader to OCI_LOAD_STATUS / OCI_FOCUS_LOAD_STATUS:
+#   download, decompress, transform, insert, commit, tag_merge
+#
+# The oci python sdk must be installed, oracledb is not required
+#
+# Example:
+#   python3 usage2adw_benchmark.py -type cost -files 4 -rows 200000
+#   python3 usage2adw_benchmark.py -type focus -folder /tmp/bench -keep
+#   python3 usage2adw_benchmark.py -type cost -star
+##########################################################################
+import sys
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+import types
+
+import usage2adw_generate_reports
+
+version = "26.10.19"
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+##########################################################################
+# Fake oracledb module - records statements, does not store rows
+##########################################################################
+class FakeDatabaseError(Exception):
+    pass
+
+
+class FakeCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.arraysize = 100
+        self.prefetchrows = 2
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        pass
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def execute(self, sql, parameters=None, **kwargs):
+        self.connection.record(sql, 1)
+        if "LOAD_STATUS" in sql and kwargs:
+            self.connection.load_status.append(kwargs)
+        self.rowcount = 0
+
+    def executemany(self, sql, data, **kwargs):
+        self.connection.record(sql, len(data))
+        self.rowcount = len(data)
+
+    def getbatcherrors(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def __iter__(self):
+        return iter([])
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.statements = {}
+        self.load_status = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        pass
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def record(self, sql, num_rows):
+        key = " ".join(str(sql).split())[0:60]
+        stat = self.statements.setdefault(key, {'calls': 0, 'rows': 0})
+        stat['calls'] += 1
+        stat['rows'] += num_rows
+
+
+def create_fake_oracledb():
+    module = types.ModuleType("oracledb")
+    module.DatabaseError = FakeDatabaseError
+    module.DB_TYPE_JSON = "DB_TYPE_JSON"
+    module.DB_TYPE_CLOB = "DB_TYPE_CLOB"
+    module.DB_TYPE_VARCHAR = "DB_TYPE_VARCHAR"
+    module.init_oracle_client = lambda *args, **kwargs: None
+    module.connect = lambda *args, **kwargs: FakeConnection()
+    return module
+
+
+##########################################################################
+# Fake Object Storage client - serve files from local folder
+##########################################################################
+class LocalObjectStorage(object):
+    def __init__(self, folder):
+        self.folder = folder
+
+    def list_objects(self, object_names):
+        objects = []
+        for object_name in object_names:
+            path_filename = os.path.join(self.folder, object_name)
+            stat = os.stat(path_filename)
+            objects.append(types.SimpleNamespace(
+                name=object_name,
+                size=stat.st_size,
+                time_created=datetime.datetime.fromtimestamp(stat.st_mtime),
+                etag=str(int(stat.st_mtime)) + "-" + str(stat.st_size)
+            ))
+        return objects
+
+    def get_object(self, namespace_name, bucket_name, object_name, range=None, if_match=None):
+        path_filename = os.path.join(self.folder, object_name)
+        start = 0
+        end = os.path.getsize(path_filename) - 1
+        if range:
+            start, end = [int(x) for x in range.replace("bytes=", "").split("-")]
+
+        def stream(chunk_size, decode_content=False):
+            with open(path_filename, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+        return types.SimpleNamespace(data=types.SimpleNamespace(raw=types.SimpleNamespace(stream=stream)))
+
+
+##########################################################################
+# Import loader from path with the fake oracledb
+##########################################################################
+def import_loader(module_name, path_filename):
+    sys.modules['oracledb'] = create_fake_oracledb()
+    spec = importlib.util.spec_from_file_location(module_name, path_filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+##########################################################################
+# Loader command line defaults
+##########################################################################
+def get_loader_cmd(cmd):
+    return argparse.Namespace(
+        fileid="", filedate="", file_name_full="",
+        tagspecial=cmd.tagspecial, tagspecial1=cmd.tagspecial, tagspecial2="", tagspecial3="", tagspecial4="",
+        tagspecial5="", tagspecial6="", tagspecial7="", tagspecial8="",
+        download_threads=cmd.download_threads, download_part_mb=cmd.download_part_mb, tags_json=cmd.tags_json
+    )
+
+
+##########################################################################
+# Run Benchmark
+##########################################################################
+def run_benchmark(cmd):
+    report_folder = os.path.abspath(cmd.folder)
+    work_folder = tempfile.mkdtemp(prefix="usage2adw_bench_")
+    current_dir = os.getcwd()
+
+    try:
+        print("\nGenerating synthetic " + cmd.report_type + " reports to " + report_folder)
+        object_names = usage2adw_generate_reports.generate_reports(cmd)
+        with open(os.path.join(report_folder, "compartments_" + cmd.report_type + ".json")) as f:
+            compartments = json.load(f)
+
+        # loaders create work_report_dir under the current folder
+        os.chdir(work_folder)
+        if cmd.report_type == "cost":
+            loader = import_loader("usage2adw", os.path.join(script_dir, "usage2adw.py"))
+            load_file = loader.load_cost_file
+            loader.cost_star_schema = cmd.star
+        else:
+            loader = import_loader("focus2adw", os.path.join(script_dir, "focus2adw", "focus2adw.py"))
+            load_file = loader.load_focus_file
+
+        connection = FakeConnection()
+        object_storage = LocalObjectStorage(report_folder)
+        objects = object_storage.list_objects(object_names)
+        tenancy = types.SimpleNamespace(id=usage2adw_generate_reports.bench_tenant_id, name=usage2adw_generate_reports.bench_tenant_name)
+        loader_cmd = get_loader_cmd(cmd)
+
+        total_bytes = sum(o.size for o in objects)
+
+        print("\nLoading " + str(len(objects)) + " files with " + loader.__name__ + ".py")
+        start_time = time.time()
+        for index, o in enumerate(objects, start=1):
+            load_file(connection, object_storage, o, "", loader_cmd, tenancy, compartments, index, len(objects), "bench", "bench")
+        total_secs = time.time() - start_time
+
+    finally:
+        os.chdir(current_dir)
+        shutil.rmtree(work_folder, ignore_errors=True)
+        # only the temporary folder is removed, never a -folder of the user
+        if cmd.temp_folder and not cmd.keep:
+            shutil.rmtree(report_folder, ignore_errors=True)
+
+    ############################################
+    # print results
+    ############################################
+    total_rows = cmd.rows * cmd.files
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if sys.platform == "darwin":
+        peak_rss_mb = peak_rss_mb / 1024
+
+    # phases as recorded by the loader to the load status table
+    phases = {}
+    for phase in ['download', 'decompress', 'transform', 'insert', 'commit', 'tag_merge']:
+        phases[phase] = sum(stat.get(phase + "_secs") or 0.0 for stat in connection.load_status)
+    phases['other'] = max(0.0, total_secs - sum(phases.values()))
+    data_bytes = sum(stat.get("data_bytes") or 0 for stat in connection.load_status)
+
+    print("\n" + "#" * 90)
+    print("# Benchmark Results - " + cmd.report_type)
+    print("#" * 90)
+    print("   Files          : " + str(cmd.files))
+    print("   Rows           : " + str(total_rows))
+    print("   Compressed MB  : " + str(round(total_bytes / 1024 / 1024, 2)))
+    print("   CSV MB         : " + str(round(data_bytes / 1024 / 1024, 2)))
+    print("   Total Seconds  : " + str(round(total_secs, 2)))
+    print("   Rows/sec       : " + str(round(total_rows / total_secs)) if total_secs else "")
+    print("   MB/sec         : " + str(round(total_bytes / 1024 / 1024 / total_secs, 2)) if total_secs else "")
+    print("   Peak RSS MB    : " + str(round(peak_rss_mb, 1)))
+    print("\n   Phase breakdown:")
+    for phase in phases:
+        pct = round(phases[phase] / total_secs * 100, 1) if total_secs else 0
+        print("   " + phase.ljust(16) + ": " + str(round(phases[phase], 3)).rjust(10) + " sec, " + str(pct).rjust(5) + "%")
+    print("\n   Database calls recorded:")
+    for key, stat in connection.statements.items():
+        print("   " + str(stat['calls']).rjust(8) + " calls, " + str(stat['rows']).rjust(10) + " rows - " + key)
+
+    return phases
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-type', default="cost", dest='report_type', choices=['cost', 'focus'], help='Report type to benchmark (default=cost)')
+    parser.add_argument('-folder', default="", dest='folder', help='Folder for generated reports (default=temporary folder)')
+    parser.add_argument('-keep', action='store_true', default=False, dest='keep', help='Keep generated reports of the temporary folder, -folder is always kept')
+    parser.add_argument('-files', default=2, type=int, dest='files', help='Number of files (default=2)')
+    parser.add_argument('-rows', default=100000, type=int, dest='rows', help='Rows per file (default=100000)')
+    parser.add_argument('-tags', default=8, type=int, dest='tags', help='Number of tag columns (default=8)')
+    parser.add_argument('-compartments', default=200, type=int, dest='compartments', help='Number of compartments (default=200)')
+    parser.add_argument('-skus', default=150, type=int, dest='skus', help='Number of SKUs (default=150)')
+    parser.add_argument('-resources', default=5000, type=int, dest='resources', help='Number of resources (default=5000)')
+    parser.add_argument('-currency', default="USD", dest='currency', help='Currency code (default=USD)')
+    parser.add_argument('-start', default="2025-01-01", dest='start_date', help='First usage date (default=2025-01-01)')
+    parser.add_argument('-seed', default=1, type=int, dest='seed', help='Random seed (default=1)')
+    parser.add_argument('-ts', default="Oracle-Tags.CreatedBy", dest='tagspecial', help='Tag special key passed to the loader (default=Oracle-Tags.CreatedBy)')
+    parser.add_argument('-dlthreads', default=4, type=int, dest='download_threads', help='Number of parallel ranges to download large files (default=4, 1=disable)')
+    parser.add_argument('-dlpartmb', default=32, type=int, dest='download_part_mb', help='Download range size in MB (default=32)')
+    parser.add_argument('-tagsjson', action='store_true', default=False, dest='tags_json', help='Load the tags to TAGS_JSON as well')
+    parser.add_argument('-star', action='store_true', default=False, dest='star', help='Load cost to the star schema OCI_COST_FACT with dimension keys')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+
+    result = parser.parse_args()
+    result.temp_folder = not result.folder
+    if result.temp_folder:
+        result.folder = tempfile.mkdtemp(prefix="usage2adw_reports_")
+    return result
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    run_benchmark(cmd)
+    print("\nCompleted at " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_db_benchmark.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Compare the database connection profiles of usage2adw_dbprofile.ini
+# against the Usage2ADW database:
+#   - connect  - seconds to open the session
+#   - ping     - connection.ping() round trip, average and p95 ms
+#   - query    - select from dual round trip, average and p95 ms
+#   - insert   - executemany rows per second into a private temporary
+#                table, batches of -batch rows as the loaders
+#   - fetch    - rows per second reading the table back with the
+#                arraysize and prefetchrows of the profile
+#
+# Each profile runs in a child process, thick and thin modes cannot be
+# mixed in one process, the password is passed to the child in the
+# environment variable USAGE2ADW_DB_BENCH_PASSWORD
+#
+# Nothing is written to the Usage2ADW tables
+#
+# Example:
+#   python3 usage2adw_db_benchmark.py -du USAGE -ds ocid1.vaultsecret... -dn adwcusg_low -dbconf usage2adw_dbprofile.ini -dbprofile DEFAULT,load,thin
+#   python3 usage2adw_db_benchmark.py -du USAGE -ds ocid1.vaultsecret... -dn adwcusg_low -dbconf usage2adw_dbprofile.ini -dbprofile load -rows 200000 -batch 5000
+##########################################################################
+import sys
+import argparse
+import datetime
+import configparser
+import json
+import os
+import subprocess
+import time
+import base64
+
+version = "26.10.19"
+password_env = "USAGE2ADW_DB_BENCH_PASSWORD"
+result_prefix = "BENCH_RESULT "
+bench_table = "ORA$PTT_USAGE2ADW_BENCH"
+
+# database connection profile of -dbconf / -dbprofile, key: type
+db_profile_keys = {
+    'mode': str,
+    'sdu': int,
+    'stmtcachesize': int,
+    'arraysize': int,
+    'prefetchrows': int,
+    'expire_time': int,
+    'tcp_connect_timeout': float,
+    'config_dir': str,
+    'wallet_location': str,
+    'pool_min': int,
+    'pool_max': int
+}
+db_profile = {}
+
+
+##########################################################################
+# Print header centered
+##########################################################################
+def print_header(name, category):
+    options = {0: 90, 1: 60, 2: 30}
+    chars = int(options[category])
+    print("")
+    print('#' * chars)
+    print("#" + name.center(chars - 2, " ") + "#")
+    print('#' * chars)
+
+
+##########################################################################
+# Create signer for Secret
+##########################################################################
+def create_secret_signer(cmd):
+    import oci.config
+    import oci.signer
+    import oci.auth.signers
+
+    # assign default values
+    config_file = oci.config.DEFAULT_LOCATION
+    config_section = oci.config.DEFAULT_PROFILE
+    instant_principle = True
+
+    if cmd.config:
+        if cmd.config.name:
+            config_file = cmd.config.name
+
+    if cmd.dsecret_profile:
+        instant_principle = (cmd.dsecret_profile == 'local')
+        config_section = cmd.dsecret_profile
+
+    if instant_principle:
+        try:
+            signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
+            config = {'region': signer.region, 'tenancy': signer.tenancy_id}
+            return config, signer
+        except Exception:
+            print_header("Error obtaining instance principals certificate, for secret, aborting", 0)
+            raise SystemExit
+    else:
+        config = oci.config.from_file(config_file, config_section)
+        signer = oci.signer.Signer(
+            tenancy=config["tenancy"],
+            user=config["user"],
+            fingerprint=config["fingerprint"],
+            private_key_file_location=config.get("key_file"),
+            pass_phrase=oci.config.get_config_value_or_default(config, "pass_phrase"),
+            private_key_content=config.get("key_content")
+        )
+        return config, signer
+
+
+##########################################################################
+# get_secret_password
+##########################################################################
+def get_secret_password(config, signer, proxy, secret_id):
+    import oci.exceptions
+    import oci.secrets
+
+    try:
+        print("\nConnecting to Secret Client Service...")
+        secret_client = oci.secrets.SecretsClient(config, signer=signer)
+        if proxy:
+            secret_client.base_client.session.proxies = {'https': proxy}
+        print("Connected.")
+
+        secret_data = secret_client.get_secret_bundle(secret_id).data
+
+        print("Secret Retrieved.")
+        secret_bundle_content = secret_data.secret_bundle_content
+        secret_base64 = secret_bundle_content.content
+        secret_text_bytes = base64.b64decode(secret_base64)
+        secret_text = secret_text_bytes.decode('ASCII')
+        return secret_text
+
+    except oci.exceptions.ServiceError as e:
+        print("\nServiceError retrieving secret at get_secret_password !")
+        print("\n" + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        print("\nException retrieving secret at get_secret_password !")
+        print("\n" + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Database connection profile - section -dbprofile of the -dbconf ini file
+# same as the loaders, see usage2adw_dbprofile.ini
+##########################################################################
+def load_db_profile(db_conf, db_profile_name, default_mode):
+    import oracledb
+    global db_profile
+    db_profile = {'mode': default_mode}
+
+    if db_conf:
+        parser = configparser.ConfigParser()
+        if not parser.read(db_conf):
+            print("\nError reading database profile file " + db_conf + ", aborting")
+            raise SystemExit
+
+        if not parser.has_section(db_profile_name) and db_profile_name != configparser.DEFAULTSECT:
+            print("\nDatabase profile " + db_profile_name + " not found in " + db_conf + ", aborting")
+            raise SystemExit
+
+        section = parser[db_profile_name]
+        for key in section:
+            if key not in db_profile_keys:
+                print("   Database profile key " + key + " ignored")
+            elif section[key].strip():
+                try:
+                    db_profile[key] = db_profile_keys[key](section[key].strip())
+                except ValueError:
+                    print("\nDatabase profile key " + key + " value " + section[key] + " is not valid, aborting")
+                    raise SystemExit
+
+    if db_profile['mode'] not in ('thick', 'thin'):
+        print("\nDatabase profile mode must be thick or thin, aborting")
+        raise SystemExit
+
+    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
+    if db_profile['mode'] == 'thick':
+        oracledb.init_oracle_client()
+
+    if 'arraysize' in db_profile:
+        oracledb.defaults.arraysize = db_profile['arraysize']
+    if 'prefetchrows' in db_profile:
+        oracledb.defaults.prefetchrows = db_profile['prefetchrows']
+
+
+##########################################################################
+# Connect parameters of the profile, parameters passed override it
+##########################################################################
+def get_db_connect_params(**kwargs):
+    params = {key: db_profile[key] for key in ('sdu', 'stmtcachesize', 'expire_time', 'tcp_connect_timeout', 'config_dir', 'wallet_location') if key in db_profile}
+    params.update({key: value for key, value in kwargs.items() if value})
+    return params
+
+
+##########################################################################
+# Average and p95 in ms
+##########################################################################
+def get_latency(times):
+    times = sorted(times)
+    if not times:
+        return 0, 0
+    return round(sum(times) / len(times) * 1000, 3), round(times[min(int(len(times) * 0.95), len(times) - 1)] * 1000, 3)
+
+
+##########################################################################
+# Run one profile - child process, prints the result as json line
+##########################################################################
+def run_profile(cmd):
+    import oracledb
+
+    load_db_profile(cmd.db_conf, cmd.child_profile, "thick")
+    result = {'profile': cmd.child_profile, 'mode': db_profile['mode']}
+
+    start_time = time.perf_counter()
+    connection = oracledb.connect(user=cmd.duser, password=os.environ.get(password_env, ""), dsn=cmd.dname, **get_db_connect_params())
+    result['connect_secs'] = round(time.perf_counter() - start_time, 3)
+
+    try:
+        ############################################
+        # round trips
+        ############################################
+        times = []
+        for _ in range(cmd.roundtrips):
+            start_time = time.perf_counter()
+            connection.ping()
+            times.append(time.perf_counter() - start_time)
+        result['ping_avg_ms'], result['ping_p95_ms'] = get_latency(times)
+
+        times = []
+        with connection.cursor() as cursor:
+            for _ in range(cmd.roundtrips):
+                start_time = time.perf_counter()
+                cursor.execute("select 1 from dual")
+                cursor.fetchone()
+                times.append(time.perf_counter() - start_time)
+        result['query_avg_ms'], result['query_p95_ms'] = get_latency(times)
+
+        ############################################
+        # insert and fetch throughput
+        ############################################
+        with connection.cursor() as cursor:
+            cursor.execute("create private temporary table " + bench_table + " (ID number, TENANT_NAME varchar2(100), PRD_SERVICE varchar2(100), COST_MY_COST number, USAGE_INTERVAL_START date) on commit preserve definition")
+
+            now = datetime.datetime.now().replace(microsecond=0)
+            rows = [(index, "tenant_" + str(index % 10), "COMPUTE_" + str(index % 50), index * 0.0001, now) for index in range(cmd.rows)]
+
+            start_time = time.perf_counter()
+            sql = "insert into " + bench_table + " (ID, TENANT_NAME, PRD_SERVICE, COST_MY_COST, USAGE_INTERVAL_START) values (:1, :2, :3, :4, :5)"
+            for index in range(0, len(rows), cmd.batch):
+                cursor.executemany(sql, rows[index:index + cmd.batch])
+            connection.commit()
+            insert_secs = time.perf_counter() - start_time
+            result['insert_rows_sec'] = round(len(rows) / insert_secs) if insert_secs else 0
+
+            start_time = time.perf_counter()
+            fetched = 0
+            cursor.execute("select ID, TENANT_NAME, PRD_SERVICE, COST_MY_COST, USAGE_INTERVAL_START from " + bench_table)
+            for _ in cursor:
+                fetched += 1
+            fetch_secs = time.perf_counter() - start_time
+            result['fetch_rows_sec'] = round(fetched / fetch_secs) if fetch_secs else 0
+
+            cursor.execute("drop table " + bench_table)
+
+    finally:
+        connection.close()
+
+    print(result_prefix + json.dumps(result))
+    return result
+
+
+##########################################################################
+# Run Benchmark - each profile in child process
+##########################################################################
+def run_benchmark(cmd, dbpass):
+    profiles = [x.strip() for x in cmd.db_profile.split(",") if x.strip()]
+    env = dict(os.environ)
+    env[password_env] = dbpass
+
+    child_args = [sys.executable, os.path.abspath(__file__), '-du', cmd.duser, '-dn', cmd.dname, '-rows', str(cmd.rows), '-batch', str(cmd.batch), '-roundtrips', str(cmd.roundtrips)]
+    if cmd.db_conf:
+        child_args += ['-dbconf', cmd.db_conf]
+
+    results = []
+    for profile in profiles:
+        print("\nRunning profile " + profile + "...")
+        child = subprocess.run(child_args + ['-child', profile], env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+
+        result = {'profile': profile, 'returncode': child.returncode}
+        for line in child.stdout.splitlines():
+            if line.startswith(result_prefix):
+                result.update(json.loads(line[len(result_prefix):]))
+            else:
+                print("   " + line)
+        results.append(result)
+
+    ############################################
+    # print results
+    ############################################
+    print("\n" + "#" * 110)
+    print("# Database Benchmark Results - " + cmd.dname + ", " + str(cmd.rows) + " rows, batch " + str(cmd.batch) + ", " + str(cmd.roundtrips) + " round trips")
+    print("#" * 110)
+    print("   " + "Profile".ljust(16) + "Mode".ljust(7) + "Connect s".rjust(10) + "Ping ms".rjust(10) + "Ping p95".rjust(10) + "Query ms".rjust(10) + "Query p95".rjust(10) + "Insert r/s".rjust(12) + "Fetch r/s".rjust(12) + "RC".rjust(5))
+    for r in results:
+        print(
+            "   " + r['profile'].ljust(16) + r.get('mode', '').ljust(7) +
+            str(r.get('connect_secs', '-')).rjust(10) +
+            str(r.get('ping_avg_ms', '-')).rjust(10) +
+            str(r.get('ping_p95_ms', '-')).rjust(10) +
+            str(r.get('query_avg_ms', '-')).rjust(10) +
+            str(r.get('query_p95_ms', '-')).rjust(10) +
+            str(r.get('insert_rows_sec', '-')).rjust(12) +
+            str(r.get('fetch_rows_sec', '-')).rjust(12) +
+            str(r['returncode']).rjust(5)
+        )
+
+    return results
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-c', type=argparse.FileType('r'), dest='config', help="Config File")
+    parser.add_argument('-p', default="", dest='proxy', help='Set Proxy (i.e. www-proxy-server.com:80) ')
+    parser.add_argument('-du', default="", dest='duser', help='ADB User')
+    parser.add_argument('-dn', default="", dest='dname', help='ADB Name')
+    parser.add_argument('-ds', default="", dest='dsecret_id', help='ADB Secret Id')
+    parser.add_argument('-dst', default="", dest='dsecret_profile', help='ADB Secret tenancy profile (local or blank = instant principle)')
+    parser.add_argument('-dbconf', default="", dest='db_conf', help='Database connection profile ini file')
+    parser.add_argument('-dbprofile', default=configparser.DEFAULTSECT, dest='db_profile', help='Database connection profiles to compare, comma separated (default=DEFAULT)')
+    parser.add_argument('-rows', default=100000, type=int, dest='rows', help='Rows inserted and fetched per profile (default=100000)')
+    parser.add_argument('-batch', default=5000, type=int, dest='batch', help='Rows per executemany (default=5000)')
+    parser.add_argument('-roundtrips', default=100, type=int, dest='roundtrips', help='Ping and query round trips per profile (default=100)')
+    parser.add_argument('-child', default="", dest='child_profile', help=argparse.SUPPRESS)
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+
+    result = parser.parse_args()
+
+    if not (result.duser and result.dname and (result.dsecret_id or result.child_profile)):
+        parser.print_help()
+        print("\nYou must specify database credentials!!\n")
+        return None
+
+    if result.rows < 1 or result.batch < 1 or result.roundtrips < 1:
+        print("\n-rows, -batch and -roundtrips must be positive\n")
+        return None
+
+    return result
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    if cmd is None:
+        exit()
+
+    if cmd.child_profile:
+        run_profile(cmd)
+        return
+
+    print_header("Running Usage2ADW Database Benchmark", 0)
+    secret_config, secret_signer = create_secret_signer(cmd)
+    dbpass = get_secret_password(secret_config, secret_signer, cmd.proxy, cmd.dsecret_id)
+
+    run_benchmark(cmd, dbpass)
+    print("\nCompleted at " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_download_test.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Test the ranged download of usage2adw.py and focus2adw.py without
+# tenancy or database:
+#   - A local http.server stands in for Object Storage, it serves Range
+#     requests with Content-Range and ETag and answers 412 to If-Match
+#     of an older version
+#   - download_ranged of the loader is called as is with a fetch_range
+#     over http, the same contract as the get_object call of the loader
+#
+# Cases:
+#   - reassembly - the ranges are written to the right offsets
+#   - resume     - a range interrupted by the server fails the download,
+#                  the next download fetches only the missing ranges
+#   - etag       - the object changed after the interrupted download,
+#                  the download restarts from the first range
+#   - size       - the object size changed, the download restarts
+#
+# The oci python sdk must be installed, oracledb is not required
+#
+# Example:
+#   python3 usage2adw_download_test.py
+#   python3 usage2adw_download_test.py -loader usage -size 9 -partkb 128 -threads 8
+##########################################################################
+import argparse
+import datetime
+import hashlib
+import http.server
+import os
+import random
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+import usage2adw_benchmark
+
+version = "26.10.19"
+script_dir = os.path.dirname(os.path.abspath(__file__))
+loaders = {
+    'usage': os.path.join(script_dir, "usage2adw.py"),
+    'focus': os.path.join(script_dir, "focus2adw", "focus2adw.py")
+}
+
+
+##########################################################################
+# Object served by the local server, the range starting at fail_start is
+# cut after half of its bytes to simulate an interrupted connection
+##########################################################################
+class ServedObject:
+    def __init__(self, data, etag):
+        self.lock = threading.Lock()
+        self.set_version(data, etag)
+
+    def set_version(self, data, etag):
+        with self.lock:
+            self.data = data
+            self.etag = etag
+            self.fail_start = None
+            self.requests = []
+
+
+##########################################################################
+# Range request handler - GET with Range: bytes=start-end and If-Match
+##########################################################################
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        served = self.server.served
+        with served.lock:
+            data = served.data
+            etag = served.etag
+            fail_start = served.fail_start
+
+        if_match = self.headers.get('If-Match')
+        if if_match and if_match != etag:
+            self.send_error(412, "Precondition Failed")
+            return
+
+        start, end = 0, len(data) - 1
+        range_header = self.headers.get('Range')
+        if range_header:
+            start, end = [int(value) for value in range_header.split("=", 1)[1].split("-")]
+            end = min(end, len(data) - 1)
+        with served.lock:
+            served.requests.append(start)
+
+        body = data[start:end + 1]
+        self.send_response(206 if range_header else 200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        if range_header:
+            self.send_header('Content-Range', "bytes " + str(start) + "-" + str(end) + "/" + str(len(data)))
+        self.end_headers()
+
+        # interrupted range - half of the body and the connection is closed
+        if start == fail_start:
+            self.wfile.write(body[0:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+##########################################################################
+# fetch_range over http, the chunks of the inclusive range
+##########################################################################
+def create_fetch_range(url, etag):
+    def fetch_range(start, end):
+        request = urllib.request.Request(url, headers={'Range': "bytes=" + str(start) + "-" + str(end), 'If-Match': etag})
+        response = urllib.request.urlopen(request, timeout=30)
+
+        def chunks():
+            with response:
+                while True:
+                    chunk = response.read(65536)
+                    if not chunk:
+                        break
+                    yield chunk
+        return chunks()
+    return fetch_range
+
+
+##########################################################################
+# Compare the downloaded file with the served object, no state files left
+##########################################################################
+def check_file(path_filename, data):
+    with open(path_filename, 'rb') as f:
+        downloaded = f.read()
+    if hashlib.sha256(downloaded).digest() != hashlib.sha256(data).digest():
+        raise Exception("downloaded file differs from the object, " + str(len(downloaded)) + " of " + str(len(data)) + " bytes")
+    for suffix in (".part", ".parts"):
+        if os.path.exists(path_filename + suffix):
+            raise Exception(path_filename + suffix + " left after the download")
+
+
+##########################################################################
+# Interrupted download, the range in the middle of the object fails
+##########################################################################
+def interrupt_download(loader, served, url, path_filename, part_size, cmd):
+    ranges = list(range(0, len(served.data), part_size))
+    served.fail_start = ranges[len(ranges) // 2]
+    try:
+        loader.download_ranged(create_fetch_range(url, served.etag), len(served.data), served.etag, path_filename, part_size, cmd.threads)
+    except Exception as e:
+        print("      Interrupted at range " + str(served.fail_start) + " - " + str(e).splitlines()[0][0:80])
+    else:
+        raise Exception("interrupted range did not fail the download")
+    finally:
+        served.fail_start = None
+
+    if not os.path.exists(path_filename + ".part") or not os.path.exists(path_filename + ".parts"):
+        raise Exception("interrupted download did not keep the .part and .parts files")
+
+
+##########################################################################
+# Test cases, each returns a description of the result
+##########################################################################
+def case_reassembly(loader, served, url, path_filename, part_size, cmd):
+    downloaded, resumed = loader.download_ranged(create_fetch_range(url, served.etag), len(served.data), served.etag, path_filename, part_size, cmd.threads)
+    check_file(path_filename, served.data)
+    if resumed or downloaded != len(served.requests):
+        raise Exception("expected " + str(len(served.requests)) + " ranges downloaded, got " + str(downloaded) + " downloaded and " + str(resumed) + " resumed")
+    return str(downloaded) + " ranges reassembled"
+
+
+def case_resume(loader, served, url, path_filename, part_size, cmd):
+    interrupt_download(loader, served, url, path_filename, part_size, cmd)
+    with open(path_filename + ".parts", 'r') as f:
+        completed = set(int(line) * part_size for line in f.read().splitlines()[1:] if line)
+
+    served.requests = []
+    downloaded, resumed = loader.download_ranged(create_fetch_range(url, served.etag), len(served.data), served.etag, path_filename, part_size, cmd.threads)
+    check_file(path_filename, served.data)
+    if not resumed or resumed != len(completed):
+        raise Exception("expected " + str(len(completed)) + " ranges resumed, got " + str(resumed))
+    if completed & set(served.requests):
+        raise Exception("completed ranges downloaded again: " + str(sorted(completed & set(served.requests))))
+    return str(resumed) + " ranges resumed, " + str(downloaded) + " ranges downloaded"
+
+
+def case_etag(loader, served, url, path_filename, part_size, cmd):
+    interrupt_download(loader, served, url, path_filename, part_size, cmd)
+
+    # same size, new content and etag
+    served.set_version(random.Random(cmd.seed + 1).randbytes(len(served.data)), '"etag-v2"')
+    downloaded, resumed = loader.download_ranged(create_fetch_range(url, served.etag), len(served.data), served.etag, path_filename, part_size, cmd.threads)
+    check_file(path_filename, served.data)
+    if resumed:
+        raise Exception(str(resumed) + " ranges of the previous etag resumed")
+    return "restarted, " + str(downloaded) + " ranges downloaded"
+
+
+def case_size(loader, served, url, path_filename, part_size, cmd):
+    interrupt_download(loader, served, url, path_filename, part_size, cmd)
+
+    # same etag, the object grew by half a range
+    served.set_version(served.data + random.Random(cmd.seed + 2).randbytes(part_size // 2), served.etag)
+    downloaded, resumed = loader.download_ranged(create_fetch_range(url, served.etag), len(served.data), served.etag, path_filename, part_size, cmd.threads)
+    check_file(path_filename, served.data)
+    if resumed:
+        raise Exception(str(resumed) + " ranges of the previous size resumed")
+    return "restarted, " + str(downloaded) + " ranges downloaded"
+
+
+cases = [
+    ('reassembly', case_reassembly),
+    ('resume', case_resume),
+    ('etag', case_etag),
+    ('size', case_size)
+]
+
+
+##########################################################################
+# Run the cases on each loader with a new object and folder per case
+##########################################################################
+def run_tests(cmd):
+    served = ServedObject(b"", '"etag-v1"')
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.daemon_threads = True
+    server.served = served
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:" + str(server.server_address[1]) + "/report.csv.gz"
+    print("\nServing Range requests at " + url)
+
+    part_size = cmd.part_kb * 1024
+    object_size = int(cmd.size_mb * 1048576) + part_size // 3
+    folder = tempfile.mkdtemp(prefix="usage2adw_download_")
+
+    failed = 0
+    try:
+        for loader_name in (sorted(loaders) if cmd.loader == "all" else [cmd.loader]):
+            loader = usage2adw_benchmark.import_loader("download_" + loader_name, loaders[loader_name])
+            print("\nTesting download_ranged of " + os.path.basename(loaders[loader_name]) + " - " + str(object_size) + " bytes, " + str(cmd.part_kb) + " KB ranges, " + str(cmd.threads) + " threads")
+
+            for case_name, case_func in cases:
+                served.set_version(random.Random(cmd.seed).randbytes(object_size), '"etag-v1"')
+                path_filename = os.path.join(folder, loader_name + "_" + case_name + ".csv.gz")
+                try:
+                    result = case_func(loader, served, url, path_filename, part_size, cmd)
+                    print("   PASS   " + case_name.ljust(12) + result)
+                except Exception as e:
+                    failed += 1
+                    print("   FAIL   " + case_name.ljust(12) + str(e))
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return failed
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-loader', default="all", dest='loader', choices=['all'] + sorted(loaders), help='Loader to test (default=all)')
+    parser.add_argument('-size', default=4.0, type=float, dest='size_mb', help='Object size in MB (default=4)')
+    parser.add_argument('-partkb', default=256, type=int, dest='part_kb', help='Range size in KB (default=256)')
+    parser.add_argument('-threads', default=4, type=int, dest='threads', help='Parallel ranges (default=4)')
+    parser.add_argument('-seed', default=1, type=int, dest='seed', help='Random seed (default=1)')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+    return parser.parse_args()
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    failed = run_tests(cmd)
+    print("\n" + (str(failed) + " cases failed" if failed else "All cases passed") + ", completed at " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    if failed:
+        raise SystemExit(1)
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_event_emitter.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Local stand-in for Object Storage "object create" events, to test the
+# event ingest of usage2adw.py and focus2adw.py (-event / -eventport)
+# without the Events service
+#
+# Emits com.oraclecloud.objectstorage.createobject events (or the flat
+# format with size) for the object names given or for sample names, each
+# event -dup times to test the deduplication
+#
+# Output to stdout as json lines, or POST to the loader event listener
+#
+# Example:
+#   python3 usage2adw_event_emitter.py -files 3 | python3 usage2adw.py -ip -du USAGE -dn ADWCUSG_LOW -ds ocid1.vaultsecret... -event -
+#   python3 usage2adw_event_emitter.py -objects reports/cost-csv/0001000001234567.csv.gz -url http://127.0.0.1:8090/
+#   python3 usage2adw_event_emitter.py -type focus -flat -size 1048576 -dup 3
+##########################################################################
+import sys
+import argparse
+import datetime
+import json
+import uuid
+import urllib.request
+
+version = "26.10.19"
+sample_prefixes = {
+    'cost': "reports/cost-csv/",
+    'focus': "FOCUS Reports/"
+}
+
+
+##########################################################################
+# Sample object names
+##########################################################################
+def get_sample_objects(cmd):
+    names = []
+    now = datetime.datetime.utcnow()
+    for index in range(cmd.files):
+        if cmd.report_type == "cost":
+            names.append(sample_prefixes['cost'] + "00010000012" + str(34567 + index).zfill(5) + ".csv.gz")
+        else:
+            day = now - datetime.timedelta(days=cmd.files - index)
+            names.append(sample_prefixes['focus'] + day.strftime("%Y/%m/%d") + "/00010000012" + str(34567 + index).zfill(5) + ".csv.gz")
+    return names
+
+
+##########################################################################
+# Create event for object
+##########################################################################
+def create_event(cmd, object_name):
+    event_time = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    etag = str(uuid.uuid5(uuid.NAMESPACE_URL, cmd.namespace_name + "/" + cmd.bucket_name + "/" + object_name))
+
+    if cmd.flat:
+        event = {'namespace': cmd.namespace_name, 'bucket': cmd.bucket_name, 'object': object_name, 'etag': etag, 'timeCreated': event_time}
+        if cmd.size:
+            event['size'] = cmd.size
+        return event
+
+    return {
+        'eventType': "com.oraclecloud.objectstorage.createobject",
+        'cloudEventsVersion': "0.1",
+        'eventTypeVersion': "2.0",
+        'source': "ObjectStorage",
+        'eventTime': event_time,
+        'contentType': "application/json",
+        'data': {
+            'compartmentId': cmd.compartment_id,
+            'compartmentName': "",
+            'resourceName': object_name,
+            'resourceId': "/n/" + cmd.namespace_name + "/b/" + cmd.bucket_name + "/o/" + object_name,
+            'availabilityDomain': "",
+            'additionalDetails': {
+                'bucketName': cmd.bucket_name,
+                'versionId': None,
+                'archivalState': "Available",
+                'namespace': cmd.namespace_name,
+                'bucketId': "",
+                'eTag': etag
+            }
+        },
+        'eventID': str(uuid.uuid4()),
+        'extensions': {'compartmentId': cmd.compartment_id}
+    }
+
+
+##########################################################################
+# Emit events
+##########################################################################
+def emit_events(cmd):
+    object_names = cmd.objects if cmd.objects else get_sample_objects(cmd)
+
+    events = []
+    for object_name in object_names:
+        event = create_event(cmd, object_name)
+        events += [event] * max(cmd.dup, 1)
+
+    if not cmd.url:
+        for event in events:
+            print(json.dumps(event))
+        return events
+
+    for event in events:
+        request = urllib.request.Request(cmd.url, data=json.dumps(event).encode('utf-8'), headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=30) as response:
+            print("   Posted " + event.get('object', event.get('data', {}).get('resourceName', '')) + " - " + str(response.status), file=sys.stderr)
+    return events
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-type', default="cost", dest='report_type', choices=sorted(sample_prefixes), help='Sample report type (default=cost)')
+    parser.add_argument('-objects', nargs='+', default=[], dest='objects', help='Object names, default sample names')
+    parser.add_argument('-files', default=3, type=int, dest='files', help='Number of sample object names (default=3)')
+    parser.add_argument('-ns', default="bling", dest='namespace_name', help='Namespace of the events (default=bling)')
+    parser.add_argument('-bn', default="ocid1.tenancy.oc1..sample", dest='bucket_name', help='Bucket of the events (default=ocid1.tenancy.oc1..sample)')
+    parser.add_argument('-cid', default="ocid1.tenancy.oc1..sample", dest='compartment_id', help='Compartment id of the events')
+    parser.add_argument('-dup', default=2, type=int, dest='dup', help='Times each event is emitted (default=2)')
+    parser.add_argument('-flat', action='store_true', default=False, dest='flat', help='Flat event format - namespace, bucket, object, size, etag, timeCreated')
+    parser.add_argument('-size', default=0, type=int, dest='size', help='Object size for the flat format, default read by the loader with head_object')
+    parser.add_argument('-url', default="", dest='url', help='POST to loader event listener (i.e. http://127.0.0.1:8090/), default stdout')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+    return parser.parse_args()
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    emit_events(cmd)
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_export.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Export reports from the Usage2ADW tables to gzipped CSV files:
+#   - Report definitions are SQL with :tenant_name and :date_from binds
+#   - One query per tenant, tenants run concurrently over a session pool
+#   - Rows are streamed from the cursor to the gzip file with large
+#     arraysize and prefetchrows, the result is never held in memory
+#   - -incremental exports only from the last day exported per tenant,
+#     kept at usage2adw_export_state.json in the output folder
+#
+# Output file - <report file>_<yyyymmdd>.csv.gz, one header line and the
+# rows of each tenant ordered by tenant name
+#
+# Example:
+#   python3 usage2adw_export.py -du USAGE -ds ocid1.vaultsecret... -dn adwcusg_low -report compart_service -out report/daily
+#   python3 usage2adw_export.py -du USAGE -ds ocid1.vaultsecret... -dn adwcusg_low -report compart_service compart_service_sku -incremental
+##########################################################################
+import sys
+import argparse
+import datetime
+import oracledb
+import configparser
+import oci
+import base64
+import csv
+import gzip
+import json
+import os
+import shutil
+import time
+import concurrent.futures
+
+version = "26.10.19"
+state_file_name = "usage2adw_export_state.json"
+
+# database connection profile of -dbconf / -dbprofile, key: type
+db_profile_keys = {
+    'mode': str,
+    'sdu': int,
+    'stmtcachesize': int,
+    'arraysize': int,
+    'prefetchrows': int,
+    'expire_time': int,
+    'tcp_connect_timeout': float,
+    'config_dir': str,
+    'wallet_location': str,
+    'pool_min': int,
+    'pool_max': int
+}
+db_profile = {}
+
+# keep the NUMBER values as in the database
+oracledb.defaults.fetch_decimals = True
+
+##########################################################################
+# Report definitions
+# sql       - binds :tenant_name and :date_from (YYYY-MM-DD), the second
+#             column must be the usage day for -incremental
+# sql_daily - same report from the OCI_COST_DAILY summary of usage2adw.py,
+#             used for the tenants summarized in it
+# file      - output file prefix
+# header    - csv header
+##########################################################################
+export_reports = {
+    'compart_service': {
+        'file': 'daily_compartment_service',
+        'header': ['tenant', 'date', 'compartment', 'service', 'total'],
+        'sql': """
+            select
+                TENANT_NAME,
+                to_char(USAGE_INTERVAL_START,'YYYY-MM-DD') as USAGE_DAY,
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' ') PRD_SERVICE,
+                sum(COST_MY_COST) as TOTAL
+            from OCI_COST
+            where TENANT_NAME = :tenant_name and USAGE_INTERVAL_START >= to_date(:date_from,'YYYY-MM-DD')
+            group by
+                TENANT_NAME,
+                to_char(USAGE_INTERVAL_START,'YYYY-MM-DD'),
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' ')
+            order by 1,2,3
+        """,
+        'sql_daily': """
+            select
+                TENANT_NAME,
+                to_char(USAGE_DAY,'YYYY-MM-DD') as USAGE_DAY,
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' ') PRD_SERVICE,
+                sum(COST_MY_COST) as TOTAL
+            from OCI_COST_DAILY
+            where TENANT_NAME = :tenant_name and USAGE_DAY >= to_date(:date_from,'YYYY-MM-DD')
+            group by
+                TENANT_NAME,
+                to_char(USAGE_DAY,'YYYY-MM-DD'),
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' ')
+            order by 1,2,3
+        """
+    },
+    'compart_service_sku': {
+        'file': 'daily_compartment_service_sku',
+        'header': ['tenant', 'date', 'compartment', 'service', 'sku', 'desc', 'total'],
+        'sql': """
+            select
+                TENANT_NAME,
+                to_char(USAGE_INTERVAL_START,'YYYY-MM-DD') as USAGE_DAY,
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' ') PRD_SERVICE,
+                COST_PRODUCT_SKU PRD_SKU,
+                min(PRD_DESCRIPTION) PRD_DESC,
+                sum(COST_MY_COST) as TOTAL
+            from OCI_COST
+            where TENANT_NAME = :tenant_name and USAGE_INTERVAL_START >= to_date(:date_from,'YYYY-MM-DD')
+            group by
+                TENANT_NAME,
+                to_char(USAGE_INTERVAL_START,'YYYY-MM-DD'),
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' '),
+                COST_PRODUCT_SKU
+            order by 1,2,3
+        """,
+        'sql_daily': """
+            select
+                TENANT_NAME,
+                to_char(USAGE_DAY,'YYYY-MM-DD') as USAGE_DAY,
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' ') PRD_SERVICE,
+                COST_PRODUCT_SKU PRD_SKU,
+                min(PRD_DESCRIPTION) PRD_DESC,
+                sum(COST_MY_COST) as TOTAL
+            from OCI_COST_DAILY
+            where TENANT_NAME = :tenant_name and USAGE_DAY >= to_date(:date_from,'YYYY-MM-DD')
+            group by
+                TENANT_NAME,
+                to_char(USAGE_DAY,'YYYY-MM-DD'),
+                PRD_COMPARTMENT_NAME,
+                replace(nvl(PRD_SERVICE,COST_PRODUCT_SKU),'_',' '),
+                COST_PRODUCT_SKU
+            order by 1,2,3
+        """
+    }
+}
+
+
+##########################################################################
+# Print header centered
+##########################################################################
+def print_header(name, category):
+    options = {0: 90, 1: 60, 2: 30}
+    chars = int(options[category])
+    print("")
+    print('#' * chars)
+    print("#" + name.center(chars - 2, " ") + "#")
+    print('#' * chars)
+
+
+##########################################################################
+# Get Currnet Date Time
+##########################################################################
+def get_current_date_time():
+    return str(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+##########################################################################
+# get time elapsed
+##########################################################################
+def get_time_elapsed(start_time):
+    et = time.time() - start_time
+    return ", Process Time " + str('{:02d}:{:02d}:{:02d}'.format(round(et // 3600), (round(et % 3600 // 60)), round(et % 60)))
+
+
+##########################################################################
+# Create signer for Secret
+##########################################################################
+def create_secret_signer(cmd):
+
+    # assign default values
+    config_file = oci.config.DEFAULT_LOCATION
+    config_section = oci.config.DEFAULT_PROFILE
+    instant_principle = True
+
+    if cmd.config:
+        if cmd.config.name:
+            config_file = cmd.config.name
+
+    if cmd.dsecret_profile:
+        instant_principle = (cmd.dsecret_profile == 'local')
+        config_section = cmd.dsecret_profile
+
+    if instant_principle:
+        try:
+            signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
+            config = {'region': signer.region, 'tenancy': signer.tenancy_id}
+            return config, signer
+        except Exception:
+            print_header("Error obtaining instance principals certificate, for secret, aborting", 0)
+            raise SystemExit
+    else:
+        config = oci.config.from_file(config_file, config_section)
+        signer = oci.signer.Signer(
+            tenancy=config["tenancy"],
+            user=config["user"],
+            fingerprint=config["fingerprint"],
+            private_key_file_location=config.get("key_file"),
+            pass_phrase=oci.config.get_config_value_or_default(config, "pass_phrase"),
+            private_key_content=config.get("key_content")
+        )
+        return config, signer
+
+
+##########################################################################
+# get_secret_password
+##########################################################################
+def get_secret_password(config, signer, proxy, secret_id):
+
+    try:
+        print("\nConnecting to Secret Client Service...")
+        secret_client = oci.secrets.SecretsClient(config, signer=signer)
+        if proxy:
+            secret_client.base_client.session.proxies = {'https': proxy}
+        print("Connected.")
+
+        secret_data = secret_client.get_secret_bundle(secret_id).data
+
+        print("Secret Retrieved.")
+        secret_bundle_content = secret_data.secret_bundle_content
+        secret_base64 = secret_bundle_content.content
+        secret_text_bytes = base64.b64decode(secret_base64)
+        secret_text = secret_text_bytes.decode('ASCII')
+        return secret_text
+
+    except oci.exceptions.ServiceError as e:
+        print("\nServiceError retrieving secret at get_secret_password !")
+        print("\n" + str(e) + "\n")
+        raise SystemExit
+
+    except Exception as e:
+        print("\nException retrieving secret at get_secret_password !")
+        print("\n" + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Incremental state - last usage day exported per report and tenant
+##########################################################################
+def load_export_state(output_folder):
+    path_filename = os.path.join(output_folder, state_file_name)
+    if not os.path.exists(path_filename):
+        return {}
+    with open(path_filename) as f:
+        return json.load(f)
+
+
+def save_export_state(output_folder, state):
+    path_filename = os.path.join(output_folder, state_file_name)
+    with open(path_filename + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(path_filename + ".tmp", path_filename)
+
+
+##########################################################################
+# Get tenants to export
+##########################################################################
+def get_tenants(pool, tenants):
+    try:
+        with pool.acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("select distinct TENANT_NAME from OCI_COST_STATS order by 1")
+                all_tenants = [row[0] for row in cursor]
+
+        if not tenants:
+            return all_tenants
+
+        for tenant_name in tenants:
+            if tenant_name not in all_tenants:
+                print("   Tenant " + tenant_name + " not found at OCI_COST_STATS, skipped")
+        return [t for t in all_tenants if t in tenants]
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at get_tenants() - " + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Get tenants summarized at OCI_COST_DAILY, the table is created by
+# usage2adw.py and filled at the end of the run which created it
+##########################################################################
+def get_daily_tenants(pool):
+    try:
+        with pool.acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("select count(*) from user_tables where table_name = 'OCI_COST_DAILY'")
+                val, = cursor.fetchone()
+                if val == 0:
+                    return set()
+
+                cursor.execute("select distinct TENANT_NAME from OCI_COST_DAILY")
+                return set(row[0] for row in cursor)
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at get_daily_tenants() - " + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Export one tenant of a report to part file
+# returns rows written and the last usage day
+##########################################################################
+def export_tenant(pool, sql, tenant_name, date_from, part_filename, compress, arraysize):
+    start_time = time.time()
+    num_rows = 0
+    last_day = ""
+
+    with pool.acquire() as connection:
+        with connection.cursor() as cursor:
+
+            # fetch arraysize rows per round trip, first batch with the execute
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = arraysize + 1
+            cursor.execute(sql, tenant_name=tenant_name, date_from=date_from)
+
+            opener = gzip.open if compress else open
+            with opener(part_filename, 'wt', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                for row in cursor:
+                    writer.writerow(row)
+                    num_rows += 1
+                    if row[1] and row[1] > last_day:
+                        last_day = row[1]
+
+    print("   " + tenant_name.ljust(30) + " " + str(num_rows).rjust(10) + " rows from " + date_from + get_time_elapsed(start_time))
+    return num_rows, last_day
+
+
+##########################################################################
+# Export report - tenants in parallel, parts concatenated by tenant
+# concatenated gzip members are a valid gzip file
+##########################################################################
+def export_report(pool, cmd, report_name, tenants, daily_tenants, state):
+    report = export_reports[report_name]
+    start_time = time.time()
+    extension = ".csv.gz" if cmd.compress else ".csv"
+    output_filename = os.path.join(cmd.output_folder, report['file'] + "_" + datetime.datetime.now().strftime("%Y%m%d") + extension)
+    report_state = state.setdefault(report_name, {})
+
+    print_header("Report " + report_name + " to " + output_filename, 1)
+
+    # header part
+    part_files = [output_filename + ".part0"]
+    opener = gzip.open if cmd.compress else open
+    with opener(part_files[0], 'wt', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(report['header'])
+
+    # tenant parts, incremental starts at the last day exported which may have been partial
+    futures = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=cmd.threads) as executor:
+        for index, tenant_name in enumerate(tenants, start=1):
+            date_from = report_state.get(tenant_name, cmd.date_from) if cmd.incremental else cmd.date_from
+            part_filename = output_filename + ".part" + str(index)
+            part_files.append(part_filename)
+            sql = report['sql_daily'] if tenant_name in daily_tenants else report['sql']
+            futures[tenant_name] = executor.submit(export_tenant, pool, sql, tenant_name, date_from, part_filename, cmd.compress, cmd.arraysize)
+
+    total_rows = 0
+    try:
+        last_days = {}
+        for tenant_name, future in futures.items():
+            num_rows, last_day = future.result()
+            total_rows += num_rows
+            if last_day:
+                last_days[tenant_name] = last_day
+
+        with open(output_filename, 'wb') as f:
+            for part_filename in part_files:
+                with open(part_filename, 'rb') as part:
+                    shutil.copyfileobj(part, f, 1024 * 1024)
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at export_report() - " + str(e) + "\n")
+        raise SystemExit
+
+    finally:
+        for part_filename in part_files:
+            if os.path.exists(part_filename):
+                os.remove(part_filename)
+
+    report_state.update(last_days)
+    print("   Completed " + str(total_rows) + " rows to " + output_filename + get_time_elapsed(start_time))
+    return output_filename
+
+
+##########################################################################
+# Database connection profile - section -dbprofile of the -dbconf ini file
+#   mode                 thick or thin driver
+#   sdu                  session data unit in bytes
+#   stmtcachesize        statements cached per session
+#   arraysize            default cursor fetch array size
+#   prefetchrows         default cursor prefetch rows
+#   expire_time          minutes between tcp keepalive probes
+#   tcp_connect_timeout  seconds to establish the connection
+#   config_dir           tnsnames.ora folder for thin mode
+#   wallet_location      ewallet.pem folder for thin mode
+#   pool_min, pool_max   session pool size
+# thick mode reads sdu and keepalive from sqlnet.ora
+##########################################################################
+def load_db_profile(db_conf, db_profile_name, default_mode):
+    global db_profile
+    db_profile = {'mode': default_mode}
+
+    if db_conf:
+        parser = configparser.ConfigParser()
+        if not parser.read(db_conf):
+            print("\nError reading database profile file " + db_conf + ", aborting")
+            raise SystemExit
+
+        if not parser.has_section(db_profile_name) and db_profile_name != configparser.DEFAULTSECT:
+            print("\nDatabase profile " + db_profile_name + " not found in " + db_conf + ", aborting")
+            raise SystemExit
+
+        section = parser[db_profile_name]
+        for key in section:
+            if key not in db_profile_keys:
+                print("   Database profile key " + key + " ignored")
+            elif section[key].strip():
+                try:
+                    db_profile[key] = db_profile_keys[key](section[key].strip())
+                except ValueError:
+                    print("\nDatabase profile key " + key + " value " + section[key] + " is not valid, aborting")
+                    raise SystemExit
+
+    if db_profile['mode'] not in ('thick', 'thin'):
+        print("\nDatabase profile mode must be thick or thin, aborting")
+        raise SystemExit
+
+    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
+    if db_profile['mode'] == 'thick':
+        oracledb.init_oracle_client()
+
+    if 'arraysize' in db_profile:
+        oracledb.defaults.arraysize = db_profile['arraysize']
+    if 'prefetchrows' in db_profile:
+        oracledb.defaults.prefetchrows = db_profile['prefetchrows']
+
+    if db_conf:
+        print("DB Profile   : " + db_profile_name + " - " + ", ".join(key + "=" + str(value) for key, value in db_profile.items()))
+
+
+##########################################################################
+# Connect parameters of the profile, parameters passed override it
+##########################################################################
+def get_db_connect_params(**kwargs):
+    params = {key: db_profile[key] for key in ('sdu', 'stmtcachesize', 'expire_time', 'tcp_connect_timeout', 'config_dir', 'wallet_location') if key in db_profile}
+    params.update({key: value for key, value in kwargs.items() if value})
+    return params
+
+
+##########################################################################
+# Create session pool with the profile, pool_min and pool_max of the
+# profile override the defaults of the caller
+##########################################################################
+def create_db_pool(user, password, dsn, pool_min, pool_max, ping_interval=60):
+    pool_max = max(db_profile.get('pool_max', pool_max), 1)
+    pool_min = min(db_profile.get('pool_min', pool_min), pool_max)
+    increment = 0 if pool_min == pool_max else 1
+    return oracledb.create_pool(user=user, password=password, dsn=dsn, min=pool_min, max=pool_max, increment=increment, ping_interval=ping_interval, **get_db_connect_params())
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-c', type=argparse.FileType('r'), dest='config', help="Config File")
+    parser.add_argument('-p', default="", dest='proxy', help='Set Proxy (i.e. www-proxy-server.com:80) ')
+    parser.add_argument('-du', default="", dest='duser', help='ADB User')
+    parser.add_argument('-dn', default="", dest='dname', help='ADB Name')
+    parser.add_argument('-ds', default="", dest='dsecret_id', help='ADB Secret Id')
+    parser.add_argument('-dst', default="", dest='dsecret_profile', help='ADB Secret tenancy profile (local or blank = instant principle)')
+    parser.add_argument('-report', nargs='+', default=['compart_service'], dest='reports', choices=sorted(export_reports), help='Reports to export (default=compart_service)')
+    parser.add_argument('-tenant', nargs='+', default=[], dest='tenants', help='Tenant names to export (default=all)')
+    parser.add_argument('-out', default="report/daily", dest='output_folder', help='Output folder (default=report/daily)')
+    parser.add_argument('-from', default="2000-01-01", dest='date_from', help='Export usage from date yyyy-mm-dd (default=all)')
+    parser.add_argument('-incremental', action='store_true', default=False, dest='incremental', help='Export from the last day exported per tenant')
+    parser.add_argument('-threads', default=4, type=int, dest='threads', help='Tenants exported concurrently (default=4)')
+    parser.add_argument('-arraysize', default=5000, type=int, dest='arraysize', help='Rows fetched per round trip (default=5000)')
+    parser.add_argument('-nogzip', action='store_false', default=True, dest='compress', help='Write plain csv instead of gzip')
+    parser.add_argument('-dbconf', default="", dest='db_conf', help='Database connection profile ini file - sdu, stmtcachesize, arraysize, prefetchrows, keepalive, mode, pool')
+    parser.add_argument('-dbprofile', default=configparser.DEFAULTSECT, dest='db_profile', help='Database connection profile section (default=DEFAULT)')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+
+    result = parser.parse_args()
+
+    if not (result.duser and result.dsecret_id and result.dname):
+        parser.print_help()
+        print("\nYou must specify database credentials!!\n")
+        return None
+
+    return result
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    if cmd is None:
+        exit()
+
+    start_time = time.time()
+    print_header("Running Usage2ADW Export", 0)
+    print("Starts at " + get_current_date_time())
+    print("Command Line : " + ' '.join(x for x in sys.argv[1:] if x != cmd.dsecret_id))
+
+    load_db_profile(cmd.db_conf, cmd.db_profile, "thick")
+    secret_config, secret_signer = create_secret_signer(cmd)
+    dbpass = get_secret_password(secret_config, secret_signer, cmd.proxy, cmd.dsecret_id)
+
+    os.makedirs(cmd.output_folder, exist_ok=True)
+    state = load_export_state(cmd.output_folder)
+
+    pool = None
+    try:
+        print("\nConnecting to database " + cmd.dname)
+        pool = create_db_pool(cmd.duser, dbpass, cmd.dname, 1, cmd.threads)
+        print("   Connected")
+
+        tenants = get_tenants(pool, cmd.tenants)
+        print("   " + str(len(tenants)) + " tenants to export")
+
+        daily_tenants = get_daily_tenants(pool)
+        print("   " + str(len([t for t in tenants if t in daily_tenants])) + " tenants read from OCI_COST_DAILY, " + str(len([t for t in tenants if t not in daily_tenants])) + " from OCI_COST")
+
+        for report_name in cmd.reports:
+            export_report(pool, cmd, report_name, tenants, daily_tenants, state)
+            save_export_state(cmd.output_folder, state)
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database - " + str(e) + "\n")
+        raise SystemExit
+
+    finally:
+        if pool:
+            pool.close()
+
+    print("\nCompleted at " + get_current_date_time() + get_time_elapsed(start_time))
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_generate_reports.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Generate synthetic gzipped cost and FOCUS report files with the same
+# layout as the files in the OCI billing bucket, used to benchmark
+# usage2adw.py and focus2adw.py without a tenancy
+#
+# Output folder layout:
+#   <folder>/reports/cost-csv/0001000000xxxxxx.csv.gz
+#   <folder>/FOCUS Reports/YYYY/MM/DD/0001000000xxxxxx.csv.gz
+#
+# Example:
+#   python3 usage2adw_generate_reports.py -type cost -files 4 -rows 200000 -folder /tmp/bench
+##########################################################################
+import argparse
+import csv
+import datetime
+import gzip
+import json
+import os
+import random
+
+version = "26.10.19"
+
+bench_tenant_id = "ocid1.tenancy.oc1..aaaaaaaabenchmarktenant000000000000000000000000000000"
+bench_tenant_name = "benchmark"
+
+services = [
+    ("COMPUTE", "Compute"), ("BLOCK_STORAGE", "Storage"), ("OBJECT_STORAGE", "Storage"), ("DATABASE", "Databases"),
+    ("NETWORK", "Networking"), ("LOAD_BALANCER", "Networking"), ("LOGGING", "Management and Governance"),
+    ("MONITORING", "Management and Governance"), ("OKE", "Compute"), ("ANALYTICS", "Analytics")
+]
+regions = ["us-ashburn-1", "us-phoenix-1", "uk-london-1", "eu-frankfurt-1", "ap-tokyo-1", "ca-toronto-1"]
+billing_units = ["OCPU Per Hour", "Gigabyte Storage Capacity Per Month", "Gigabyte Per Hour", "Load Balancer Hour", "Requests"]
+
+
+##########################################################################
+# Build the random domain model - compartments, skus, resources, tags
+##########################################################################
+def build_model(cmd):
+    rnd = random.Random(cmd.seed)
+
+    compartments = []
+    for index in range(cmd.compartments):
+        compartments.append({
+            'id': "ocid1.compartment.oc1..aaaaaaaabench" + str(index).zfill(40),
+            'name': "compartment_" + str(index),
+            'path': "/ " + bench_tenant_name + " (root) / department_" + str(index % 7) + " / compartment_" + str(index)
+        })
+
+    skus = []
+    for index in range(cmd.skus):
+        service = services[index % len(services)]
+        skus.append({
+            'sku': "B" + str(90000 + index),
+            'service': service[0],
+            'category': service[1],
+            'description': "Oracle Cloud Infrastructure - " + service[0].replace("_", " ").title() + " - Product " + str(index),
+            'unit': billing_units[index % len(billing_units)],
+            'price': round(rnd.uniform(0.0001, 2.5), 6)
+        })
+
+    tag_keys = ["Oracle-Tags.CreatedBy", "Oracle-Tags.CreatedOn", "Core.Project", "Core.Budget"]
+    tag_keys += ["Custom.Tag" + str(index) for index in range(max(0, cmd.tags - len(tag_keys)))]
+    tag_keys = tag_keys[0:cmd.tags]
+
+    resources = []
+    for index in range(cmd.resources):
+        sku = skus[index % len(skus)]
+        resources.append({
+            'id': "ocid1." + sku['service'].lower() + ".oc1." + regions[index % len(regions)] + ".aaaaaaaabench" + str(index).zfill(40),
+            'compartment': compartments[rnd.randrange(len(compartments))],
+            'region': regions[index % len(regions)],
+            'sku': sku,
+            'tags': {key: value_for_tag(rnd, key, index) for key in tag_keys if rnd.random() < 0.7}
+        })
+
+    return rnd, compartments, skus, tag_keys, resources
+
+
+##########################################################################
+# Tag value
+##########################################################################
+def value_for_tag(rnd, key, index):
+    if key == "Oracle-Tags.CreatedBy":
+        return "oracleidentitycloudservice/user" + str(rnd.randrange(50)) + "@example.com"
+    if key == "Oracle-Tags.CreatedOn":
+        return "2025-01-" + str(1 + index % 28).zfill(2) + "T10:00:00.000Z"
+    return key.split(".")[-1].lower() + "_" + str(rnd.randrange(20))
+
+
+##########################################################################
+# Write cost report file
+##########################################################################
+def write_cost_file(path_filename, cmd, rnd, tag_keys, resources, interval_start):
+    header = [
+        "lineItem/referenceNo", "lineItem/tenantId", "lineItem/intervalUsageStart", "lineItem/intervalUsageEnd",
+        "product/service", "product/resource", "product/compartmentId", "product/compartmentName", "product/region",
+        "product/availabilityDomain", "product/resourceId", "usage/billedQuantity", "usage/billedQuantityOverage",
+        "cost/subscriptionId", "cost/productSku", "product/Description", "cost/unitPrice", "cost/unitPriceOverage",
+        "cost/myCost", "cost/myCostOverage", "cost/currencyCode", "cost/skuUnitDescription", "cost/overageFlag",
+        "lineItem/isCorrection", "lineItem/backreferenceNo", "cost/attributedCost", "usage/attributedUsage"
+    ]
+    header += ["tags/" + key for key in tag_keys]
+
+    with gzip.open(path_filename, 'wt', newline='') as file_out:
+        writer = csv.writer(file_out)
+        writer.writerow(header)
+
+        for index in range(cmd.rows):
+            resource = resources[rnd.randrange(len(resources))]
+            sku = resource['sku']
+            start = interval_start + datetime.timedelta(hours=index % 24)
+            quantity = round(rnd.uniform(0.01, 64), 6)
+            cost = round(quantity * sku['price'], 6)
+
+            row = [
+                str(index), bench_tenant_id,
+                start.strftime("%Y-%m-%dT%H:%MZ"), (start + datetime.timedelta(hours=1)).strftime("%Y-%m-%dT%H:%MZ"),
+                sku['service'], sku['service'] + "_RESOURCE", resource['compartment']['id'], resource['compartment']['name'],
+                resource['region'], resource['region'][0:2].upper() + "-AD-1", resource['id'], quantity, "",
+                "12345678", sku['sku'], sku['description'], sku['price'], "",
+                cost, "", cmd.currency, sku['unit'], "",
+                "false", "", cost, quantity
+            ]
+            row += [resource['tags'].get(key, "") for key in tag_keys]
+            writer.writerow(row)
+
+
+##########################################################################
+# Write FOCUS report file
+##########################################################################
+def write_focus_file(path_filename, cmd, rnd, resources, interval_start):
+    header = [
+        "AvailabilityZone", "BilledCost", "BillingAccountId", "BillingAccountName", "BillingCurrency",
+        "BillingPeriodEnd", "BillingPeriodStart", "ChargeCategory", "ChargeDescription", "ChargeFrequency",
+        "ChargePeriodEnd", "ChargePeriodStart", "ChargeSubcategory", "CommitmentDiscountCategory", "CommitmentDiscountId",
+        "CommitmentDiscountName", "CommitmentDiscountType", "EffectiveCost", "InvoiceIssuer", "ListCost",
+        "ListUnitPrice", "PricingCategory", "PricingQuantity", "PricingUnit", "Provider",
+        "Publisher", "Region", "ResourceId", "ResourceName", "ResourceType",
+        "ServiceCategory", "ServiceName", "SkuId", "SkuPriceId", "SubAccountId",
+        "SubAccountName", "Tags", "UsageQuantity", "UsageUnit", "oci_ReferenceNumber",
+        "oci_CompartmentId", "oci_CompartmentName", "oci_OverageFlag", "oci_UnitPriceOverage", "oci_BilledQuantityOverage",
+        "oci_CostOverage", "oci_AttributedUsage", "oci_AttributedCost", "oci_BackReferenceNumber"
+    ]
+    period_start = interval_start.replace(day=1)
+
+    with gzip.open(path_filename, 'wt', newline='') as file_out:
+        writer = csv.writer(file_out)
+        writer.writerow(header)
+
+        for index in range(cmd.rows):
+            resource = resources[rnd.randrange(len(resources))]
+            sku = resource['sku']
+            start = interval_start + datetime.timedelta(hours=index % 24)
+            quantity = round(rnd.uniform(0.01, 64), 6)
+            cost = round(quantity * sku['price'], 6)
+
+            writer.writerow([
+                resource['region'][0:2].upper() + "-AD-1", cost, "12345678", "", cmd.currency,
+                (period_start + datetime.timedelta(days=32)).replace(day=1).strftime("%Y-%m-%dT%H:%MZ"), period_start.strftime("%Y-%m-%dT%H:%MZ"), "Usage", sku['description'], "UsageBased",
+                (start + datetime.timedelta(hours=1)).strftime("%Y-%m-%dT%H:%MZ"), start.strftime("%Y-%m-%dT%H:%MZ"), "", "", "",
+                "", "", cost, "", cost,
+                sku['price'], "", quantity, sku['unit'], "Oracle",
+                "Oracle", resource['region'], resource['id'], "", sku['service'] + "_RESOURCE",
+                sku['category'], sku['service'], sku['sku'], "", bench_tenant_id,
+                bench_tenant_name, json.dumps(resource['tags']) if resource['tags'] else "", quantity, sku['unit'], str(index),
+                resource['compartment']['id'], resource['compartment']['name'], "", "", "",
+                "", quantity, cost, ""
+            ])
+
+
+##########################################################################
+# Generate files
+# returns list of generated object names relative to the folder
+##########################################################################
+def generate_reports(cmd):
+    rnd, compartments, skus, tag_keys, resources = build_model(cmd)
+    interval_start = datetime.datetime.strptime(cmd.start_date, "%Y-%m-%d")
+    object_names = []
+
+    for file_index in range(cmd.files):
+        file_id = "0001000000" + str(100000 + file_index)
+        day = interval_start + datetime.timedelta(days=file_index)
+
+        if cmd.report_type == "cost":
+            object_name = "reports/cost-csv/" + file_id + ".csv.gz"
+        else:
+            object_name = "FOCUS Reports/" + day.strftime("%Y/%m/%d") + "/" + file_id + ".csv.gz"
+
+        path_filename = os.path.join(cmd.folder, object_name)
+        os.makedirs(os.path.dirname(path_filename), exist_ok=True)
+
+        if cmd.report_type == "cost":
+            write_cost_file(path_filename, cmd, rnd, tag_keys, resources, day)
+        else:
+            write_focus_file(path_filename, cmd, rnd, resources, day)
+
+        print("   Generated " + object_name + " - " + str(cmd.rows) + " rows, " + str(round(os.path.getsize(path_filename) / 1024 / 1024, 2)) + " MB")
+        object_names.append(object_name)
+
+    # compartments are needed by the loader to build the compartment path
+    with open(os.path.join(cmd.folder, "compartments_" + cmd.report_type + ".json"), 'w') as f:
+        json.dump(compartments, f)
+
+    return object_names
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-type', default="cost", dest='report_type', choices=['cost', 'focus'], help='Report type to generate (default=cost)')
+    parser.add_argument('-folder', default="bench_reports", dest='folder', help='Output folder (default=bench_reports)')
+    parser.add_argument('-files', default=1, type=int, dest='files', help='Number of files (default=1)')
+    parser.add_argument('-rows', default=100000, type=int, dest='rows', help='Rows per file (default=100000)')
+    parser.add_argument('-tags', default=8, type=int, dest='tags', help='Number of tag columns (default=8)')
+    parser.add_argument('-compartments', default=200, type=int, dest='compartments', help='Number of compartments (default=200)')
+    parser.add_argument('-skus', default=150, type=int, dest='skus', help='Number of SKUs (default=150)')
+    parser.add_argument('-resources', default=5000, type=int, dest='resources', help='Number of resources (default=5000)')
+    parser.add_argument('-currency', default="USD", dest='currency', help='Currency code (default=USD)')
+    parser.add_argument('-start', default="2025-01-01", dest='start_date', help='First usage date (default=2025-01-01)')
+    parser.add_argument('-seed', default=1, type=int, dest='seed', help='Random seed (default=1)')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+    return parser.parse_args(args)
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    print("Generating " + str(cmd.files) + " " + cmd.report_type + " files to " + cmd.folder)
+    generate_reports(cmd)
+    print("Completed.")
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
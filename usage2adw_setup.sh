@@ -38,7 +38,7 @@ export LD_LIBRARY_PATH=$CLIENT_HOME/lib
 export PATH=$PATH:$CLIENT_HOME/bin
 export TNS_ADMIN=$HOME/ADWCUSG
 export PYTHONUNBUFFERED=TRUE
-export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true
+export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=false
 
 ###########################################
 # Usage
@@ -54,6 +54,11 @@ Usage()
    echo "    -create_tables      | Create Usage2ADW Tables"
    echo "    -drop_tables        | Drop Usage2ADW Tables"
    echo "    -truncate_tables    | Truncate Usage2ADW Tables"
+   echo "    -create_tables_partitioned | Create Usage2ADW Tables with OCI_COST interval partitioned by month"
+   echo "    -partition_cost_table      | Convert existing OCI_COST to interval partitioned by month (online)"
+   echo "                        | Set COST_TENANT_SUBPARTITIONS=n to hash subpartition OCI_COST by tenant"
+   echo "    -create_tables_star | Create Usage2ADW Tables with OCI_COST as star schema view over OCI_COST_FACT"
+   echo "    -convert_star       | Convert existing OCI_COST to star schema, OCI_COST renamed to OCI_COST_PRE_STAR"
    echo "    -setup_credential   | Setup Usage2ADW Credentials"
    echo "    -setup_ol9_packages | Setup Oracle Linux 9 Packages - for manual installation"
    echo "    -setup_full         | Setup Oracle Linux 9 Packages + Setup Application"
@@ -463,8 +468,26 @@ UpgradeApp()
    DownloadFileFromGit ${APPDIR} . usage2adw_download_adb_wallet.py
    DownloadFileFromGit ${APPDIR} . usage2adw_retrieve_secret.py
    DownloadFileFromGit ${APPDIR} . usage2adw_check_connectivity.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_generate_reports.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_export.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_startup_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_event_emitter.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_db_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_showoci_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_download_test.py
+   # keep the connection profiles edited by the user
+   if [ ! -f ${APPDIR}/usage2adw_dbprofile.ini ]; then
+      DownloadFileFromGit ${APPDIR} . usage2adw_dbprofile.ini
+   fi
    DownloadFileFromGit ${APPDIR} . usage2adw_setup.sh
 
+   # the SDK lazy imports load only the OCI modules used by the loaders
+   if grep -q "OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true" $HOME/.bashrc; then
+      echo "   Enable OCI SDK lazy imports in .bashrc" | tee -a $LOG
+      sed -i 's/OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true/OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=false/' $HOME/.bashrc
+   fi
+
    echo "   Download shell files from Git" | tee -a $LOG
    mkdir -p ${APPDIR}/shell_scripts
    DownloadFileFromGit ${APPDIR} shell_scripts run_daily_report.sh
@@ -474,6 +497,7 @@ UpgradeApp()
    DownloadFileFromGit ${APPDIR} shell_scripts run_report_compart_service_daily_to_csv.sh
    DownloadFileFromGit ${APPDIR} shell_scripts run_report_compart_service_sku_daily_to_csv.sh
    DownloadFileFromGit ${APPDIR} shell_scripts run_sqlplus_usage.sh
+   DownloadFileFromGit ${APPDIR} shell_scripts run_summary_timing.sh
    DownloadFileFromGit ${APPDIR} shell_scripts run_table_size_info.sh
 
    ###########################################
@@ -494,6 +518,18 @@ UpgradeApp()
    echo "" | tee -a $LOG
 }
 
+########################################################################################################
+# OCI_COST Partition Clause - monthly interval partitions, optional hash subpartitions by tenant
+########################################################################################################
+SetCostPartitionClause()
+{
+   COST_PARTITION_CLAUSE="PARTITION BY RANGE (USAGE_INTERVAL_START) INTERVAL (NUMTOYMINTERVAL(1,'MONTH'))"
+   if [ -n "${COST_TENANT_SUBPARTITIONS}" ] && [ "${COST_TENANT_SUBPARTITIONS}" -gt 1 ]; then
+      COST_PARTITION_CLAUSE="${COST_PARTITION_CLAUSE} SUBPARTITION BY HASH (TENANT_NAME) SUBPARTITIONS ${COST_TENANT_SUBPARTITIONS}"
+   fi
+   COST_PARTITION_CLAUSE="${COST_PARTITION_CLAUSE} (PARTITION OCI_COST_P0 VALUES LESS THAN (DATE '2019-01-01'))"
+}
+
 ########################################################################################################
 # Create Tables
 ########################################################################################################
@@ -506,6 +542,15 @@ CreateTables()
    number=$1
    echo "" | tee -a $LOG
 
+   # OCI_COST partitioned if requested
+   COST_PARTITION_CLAUSE=""
+   COST_INDEX_LOCAL=""
+   if [ "${COST_PARTITIONED}" = "Y" ]; then
+      SetCostPartitionClause
+      COST_INDEX_LOCAL="LOCAL"
+      echo "OCI_COST will be created with ${COST_PARTITION_CLAUSE}" | tee -a $LOG
+   fi
+
    ###########################################
    # create usage2adw tables
    ###########################################
@@ -570,10 +615,11 @@ CreateTables()
       TAG_SPECIAL5            VARCHAR2(4000),
       TAG_SPECIAL6            VARCHAR2(4000),
       TAG_SPECIAL7            VARCHAR2(4000),
-      TAG_SPECIAL8            VARCHAR2(4000)
-   ) COMPRESS;
+      TAG_SPECIAL8            VARCHAR2(4000),
+      TAGS_JSON               JSON
+   ) COMPRESS ${COST_PARTITION_CLAUSE};
 
-   CREATE INDEX OCI_COST_1IX ON OCI_COST (TENANT_NAME,USAGE_INTERVAL_START);
+   CREATE INDEX OCI_COST_1IX ON OCI_COST (TENANT_NAME,USAGE_INTERVAL_START) ${COST_INDEX_LOCAL};
 
    -------------------------------
    -- OCI_COST_TAG_KEYS
@@ -602,6 +648,37 @@ CreateTables()
       CONSTRAINT OCI_COST_STATS_PK PRIMARY KEY (TENANT_NAME,FILE_ID,USAGE_INTERVAL_START)
    );
 
+   -------------------------------
+   -- OCI_COST_DAILY
+   -------------------------------
+   prompt Creating Table OCI_COST_DAILY
+
+   create table OCI_COST_DAILY (
+      TENANT_NAME             VARCHAR2(100),
+      TENANT_ID               VARCHAR2(100),
+      USAGE_DAY               DATE,
+      PRD_SERVICE             VARCHAR2(100),
+      PRD_REGION              VARCHAR2(100),
+      PRD_COMPARTMENT_NAME    VARCHAR2(100),
+      PRD_COMPARTMENT_PATH    VARCHAR2(1000),
+      COST_PRODUCT_SKU        VARCHAR2(10),
+      PRD_DESCRIPTION         VARCHAR2(1000),
+      COST_BILLING_UNIT       VARCHAR2(1000),
+      COST_CURRENCY_CODE      VARCHAR2(10),
+      TAG_SPECIAL             VARCHAR2(4000),
+      TAG_SPECIAL2            VARCHAR2(4000),
+      TAG_SPECIAL3            VARCHAR2(4000),
+      TAG_SPECIAL4            VARCHAR2(4000),
+      NUM_ROWS                NUMBER,
+      USG_BILLED_QUANTITY     NUMBER,
+      COST_MY_COST            NUMBER,
+      COST_MY_COST_OVERAGE    NUMBER,
+      UPDATE_DATE             DATE,
+      AGENT_VERSION           VARCHAR2(30)
+   ) COMPRESS;
+
+   CREATE INDEX OCI_COST_DAILY_1IX ON OCI_COST_DAILY (TENANT_NAME,USAGE_DAY);
+
    -------------------------------
    -- OCI_COST_REFERENCE
    -------------------------------
@@ -635,6 +712,21 @@ CreateTables()
       CONSTRAINT OCI_PRICE_LIST_PK PRIMARY KEY (TENANT_NAME,TENANT_ID,COST_PRODUCT_SKU)
    );
 
+   -------------------------------
+   -- OCI_PUBLIC_RATE_CACHE
+   -------------------------------
+   prompt Creating Table OCI_PUBLIC_RATE_CACHE
+
+   create table OCI_PUBLIC_RATE_CACHE (
+      COST_PRODUCT_SKU        VARCHAR2(10) NOT NULL,
+      COST_CURRENCY_CODE      VARCHAR2(10) NOT NULL,
+      RATE_DESCRIPTION        VARCHAR2(1000),
+      RATE_PAYGO_PRICE        NUMBER,
+      RATE_UNIT_FULL          JSON,
+      FETCH_DATE              DATE,
+      CONSTRAINT OCI_PUBLIC_RATE_CACHE_PK PRIMARY KEY (COST_PRODUCT_SKU, COST_CURRENCY_CODE) USING INDEX
+   );
+
    -------------------------------
    -- OCI_LOAD_STATUS
    -------------------------------
@@ -653,9 +745,65 @@ CreateTables()
       AGENT_VERSION    varchar2(100),
       BATCH_ID         number,
       BATCH_TOTAL      number,
+      LIST_SECS        number,
+      DOWNLOAD_SECS    number,
+      DECOMPRESS_SECS  number,
+      TRANSFORM_SECS   number,
+      INSERT_SECS      number,
+      COMMIT_SECS      number,
+      TAG_MERGE_SECS   number,
+      FILE_BYTES       number,
+      DATA_BYTES       number,
+      REJECTED_ROWS    number,
+      FILE_STATUS      varchar2(20),
       CONSTRAINT OCI_LOAD_STATUS PRIMARY KEY (TENANT_NAME, FILE_NAME) USING INDEX ENABLE
    );
 
+   -------------------------------
+   -- OCI_LOAD_REJECTS
+   -------------------------------
+   prompt Creating Table OCI_LOAD_REJECTS
+
+   create table OCI_LOAD_REJECTS (
+      TENANT_NAME      varchar2(100) NOT NULL,
+      FILE_TYPE        varchar2(100),
+      FILE_ID          varchar2(1000),
+      FILE_NAME        varchar2(1000) NOT NULL,
+      LINE_NUMBER      number,
+      ERROR_CODE       number,
+      ERROR_MESSAGE    varchar2(1000),
+      ROW_DATA         varchar2(4000),
+      REJECT_TIME      DATE DEFAULT SYSDATE,
+      AGENT_VERSION    varchar2(30)
+   );
+
+   CREATE INDEX OCI_LOAD_REJECTS_1IX ON OCI_LOAD_REJECTS (TENANT_NAME, FILE_NAME);
+
+   -------------------------------
+   -- OCI_LOAD_QUEUE
+   -------------------------------
+   prompt Creating Table OCI_LOAD_QUEUE
+
+   create table OCI_LOAD_QUEUE (
+      TENANT_NAME       varchar2(100) NOT NULL,
+      FILE_NAME         varchar2(1000) NOT NULL,
+      NAMESPACE_NAME    varchar2(100),
+      BUCKET_NAME       varchar2(200),
+      FILE_SIZE         number,
+      FILE_ETAG         varchar2(200),
+      FILE_TIME_CREATED DATE,
+      STATUS            varchar2(20) DEFAULT 'NEW' NOT NULL,
+      CLAIMED_BY        varchar2(200),
+      CLAIM_EXPIRES     DATE,
+      ATTEMPTS          number DEFAULT 0,
+      ENQUEUED_TIME     DATE DEFAULT SYSDATE,
+      COMPLETED_TIME    DATE,
+      LAST_ERROR        varchar2(1000),
+      CONSTRAINT OCI_LOAD_QUEUE_PK PRIMARY KEY (TENANT_NAME, FILE_NAME) USING INDEX
+   );
+
+   CREATE INDEX OCI_LOAD_QUEUE_1IX ON OCI_LOAD_QUEUE (TENANT_NAME, STATUS, CLAIM_EXPIRES);
+
    -------------------------------
    -- OCI_RESOURCES
    -------------------------------
@@ -800,11 +948,13 @@ SetupApp()
    echo "   sqlplus ${DATABASE_ADMIN}/xxxxxxxx@${db_db_name}" | tee -a $LOG
    echo "   create user ${database_user} identified by xxxxxxxxx;" | tee -a $LOG
    echo "   grant create dimension, connect, resource, dwrole, unlimited tablespace to ${database_user};" | tee -a $LOG
+   echo "   grant execute on dbms_lock to ${database_user};" | tee -a $LOG
    echo "   exec apex_instance_admin.add_workspace(p_workspace => '${database_user}', p_primary_schema => '${database_user}');" | tee -a $LOG
    
    echo "set lines 199 trimsp on pages 0 feed on serveroutput on
    create user ${database_user} identified by ${db_app_password};
    grant create dimension, connect, resource, dwrole, unlimited tablespace to ${database_user};
+   grant execute on dbms_lock to ${database_user};
    exec apex_instance_admin.add_workspace(p_workspace => '${database_user}', p_primary_schema => '${database_user}');
 
    DECLARE
@@ -840,7 +990,7 @@ SetupApp()
    # Setup Crontab
    ###########################################
    echo "" | tee -a $LOG
-   echo "7. Setup Crontab to run every 4 hours and gather stats every week" | tee -a $LOG
+   echo "7. Setup Crontab to run every 4 hours" | tee -a $LOG
    echo " 
 ###############################################################################
 # Crontab to run every 4 hours
@@ -848,9 +998,10 @@ SetupApp()
 0 */4 * * * timeout 6h /home/opc/usage_reports_to_adw/shell_scripts/run_multi_daily_usage2adw.sh > /home/opc/usage_reports_to_adw/log/run_multi_daily_usage2adw_crontab_run.txt 2>&1
 
 ###############################################################################
-# Gather stats every weekend
+# Full schema gather stats every weekend - not required, the load gathers the
+# changed tables with -gatherstats
 ###############################################################################
-30 0   * * 0 timeout 6h /home/opc/usage_reports_to_adw/shell_scripts/run_gather_stats.sh > /home/opc/usage_reports_to_adw/log/run_gather_stats_run.txt 2>&1
+# 30 0   * * 0 timeout 6h /home/opc/usage_reports_to_adw/shell_scripts/run_gather_stats.sh > /home/opc/usage_reports_to_adw/log/run_gather_stats_run.txt 2>&1
 
 " | crontab -
    echo "   Setup Crontab Completed" | tee -a $LOG
@@ -913,12 +1064,23 @@ DropTables()
    prompt Dropping Table OCI_TENANT
    drop table OCI_TENANT ;
 
-   prompt Dropping Table OCI_COST
-   drop table OCI_COST;
+   prompt Dropping Table OCI_COST and Star Schema Tables
+   begin
+      for o in (select object_type, object_name from user_objects
+                where object_type in ('VIEW','TABLE') and object_name in ('OCI_COST','OCI_COST_PRE_STAR','OCI_COST_FACT','OCI_DIM_COMPARTMENT','OCI_DIM_PRODUCT','OCI_DIM_RESOURCE','OCI_DIM_TAGSET')
+                order by decode(object_type,'VIEW',1,2))
+      loop
+         execute immediate 'drop ' || o.object_type || ' ' || o.object_name;
+      end loop;
+   end;
+   /
 
    prompt Dropping Table OCI_COST_STATS
    drop table OCI_COST_STATS;
 
+   prompt Dropping Table OCI_COST_DAILY
+   drop table OCI_COST_DAILY;
+
    prompt Dropping Table OCI_COST_TAG_KEYS
    drop table OCI_COST_TAG_KEYS ;
 
@@ -928,9 +1090,18 @@ DropTables()
    prompt Dropping Table OCI_PRICE_LIST
    drop table OCI_PRICE_LIST;
 
+   prompt Dropping Table OCI_PUBLIC_RATE_CACHE
+   drop table OCI_PUBLIC_RATE_CACHE;
+
    prompt Dropping Table OCI_LOAD_STATUS
    drop table OCI_LOAD_STATUS; 
 
+   prompt Dropping Table OCI_LOAD_REJECTS
+   drop table OCI_LOAD_REJECTS;
+
+   prompt Dropping Table OCI_LOAD_QUEUE
+   drop table OCI_LOAD_QUEUE; 
+
    prompt Dropping Table OCI_RESOURCES
    drop table OCI_RESOURCES; 
 
@@ -980,12 +1151,22 @@ TruncateTables()
    prompt Truncating Table OCI_TENANT
    truncate table OCI_TENANT ;
 
-   prompt Truncating Table OCI_COST
-   truncate table OCI_COST;
+   prompt Truncating Table OCI_COST and Star Schema Tables
+   begin
+      for t in (select table_name from user_tables
+                where table_name in ('OCI_COST','OCI_COST_FACT','OCI_DIM_COMPARTMENT','OCI_DIM_PRODUCT','OCI_DIM_RESOURCE','OCI_DIM_TAGSET'))
+      loop
+         execute immediate 'truncate table ' || t.table_name;
+      end loop;
+   end;
+   /
 
    prompt Truncating Table OCI_COST_STATS
    truncate table OCI_COST_STATS;
 
+   prompt Truncating Table OCI_COST_DAILY
+   truncate table OCI_COST_DAILY;
+
    prompt Truncating Table OCI_COST_TAG_KEYS
    truncate table OCI_COST_TAG_KEYS ;
 
@@ -995,9 +1176,18 @@ TruncateTables()
    prompt Truncating Table OCI_PRICE_LIST
    truncate table OCI_PRICE_LIST;
 
+   prompt Truncating Table OCI_PUBLIC_RATE_CACHE
+   truncate table OCI_PUBLIC_RATE_CACHE;
+
    prompt Truncating Table OCI_LOAD_STATUS
    truncate table OCI_LOAD_STATUS; 
 
+   prompt Truncating Table OCI_LOAD_REJECTS
+   truncate table OCI_LOAD_REJECTS;
+
+   prompt Truncating Table OCI_LOAD_QUEUE
+   truncate table OCI_LOAD_QUEUE; 
+
    prompt Truncating Table OCI_RESOURCES
    truncate table OCI_RESOURCES; 
 
@@ -1012,6 +1202,330 @@ TruncateTables()
    exit 0
 }
 
+########################################################################################################
+# Partition OCI_COST - convert existing table online to monthly interval partitions
+########################################################################################################
+PartitionCostTable()
+{
+   echo "###########################################################################" >> $LOG
+   echo "# Partition OCI_COST at `date`" >> $LOG
+   echo "###########################################################################" >> $LOG
+
+   ReadVariablesFromCredfile 1
+   SetCostPartitionClause
+
+   echo "OCI_COST will be converted to ${COST_PARTITION_CLAUSE}" | tee -a $LOG
+   printf "Conversion runs online but rewrites the table, continue for USAGE/xxxxx@${db_db_name} (y/n) ? "; read ANSWER
+
+   if [ "$ANSWER" = 'y' ]; then
+      echo ""
+   else
+      exit 0
+   fi
+
+   echo "" | tee -a $LOG
+
+   slog=$LOGDIR/partition_cost_table_${DATE}.log
+   echo "Partitioning OCI_COST Table." | tee -a $LOG
+   echo "Internal LOG=$slog" | tee -a $LOG
+   echo "set echo on serveroutput on time on lines 199 trimsp on pages 1000 verify off
+   select to_char(sysdate,'YYYY-MM-DD HH24:MI') current_date from dual;
+
+   prompt Partitioning Table OCI_COST
+   declare
+      v_cnt number;
+   begin
+      select count(*) into v_cnt from user_part_tables where table_name='OCI_COST';
+      if v_cnt > 0 then
+         dbms_output.put_line('OCI_COST already partitioned, skipped.');
+      else
+         execute immediate q'[alter table OCI_COST modify ${COST_PARTITION_CLAUSE} ONLINE UPDATE INDEXES (OCI_COST_1IX LOCAL)]';
+         dbms_output.put_line('OCI_COST partitioned.');
+      end if;
+   end;
+   /
+
+   select partitioning_type, subpartitioning_type, interval from user_part_tables where table_name='OCI_COST';
+   select locality from user_part_indexes where index_name='OCI_COST_1IX';
+
+" | sqlplus -s ${database_user}/${db_app_password}@${db_db_name} | tee -a $slog | tee -a $LOG
+
+   if (( `egrep 'ORA-|SP2-' $slog | egrep -v 'ORA-06512' | wc -l` > 0 )); then
+      egrep 'ORA-|SP2-' $slog | egrep -v 'ORA-06512'
+      echo "Error partitioning OCI_COST table, please check log $slog ." | tee -a $LOG
+   else
+      echo "Completed." | tee -a $LOG
+   fi
+   exit 0
+}
+
+########################################################################################################
+# Convert OCI_COST to Star Schema - dimension tables with surrogate keys, OCI_COST_FACT and OCI_COST
+# view with the same column shape, keys are SHA1 hash of the natural values as calculated by usage2adw.py
+########################################################################################################
+ConvertStar()
+{
+   echo "###########################################################################" >> $LOG
+   echo "# Convert OCI_COST to Star Schema at `date`" >> $LOG
+   echo "###########################################################################" >> $LOG
+
+   number=$1
+   if [ "$2" = "ask" ]; then
+      printf "Conversion copies OCI_COST to OCI_COST_FACT and renames OCI_COST to OCI_COST_PRE_STAR, continue for USAGE/xxxxx@${db_db_name} (y/n) ? "; read ANSWER
+
+      if [ "$ANSWER" = 'y' ]; then
+         echo ""
+      else
+         exit 0
+      fi
+   fi
+
+   # OCI_COST_FACT partitioned if requested
+   COST_PARTITION_CLAUSE=""
+   COST_INDEX_LOCAL=""
+   if [ "${COST_PARTITIONED}" = "Y" ]; then
+      SetCostPartitionClause
+      COST_PARTITION_CLAUSE=`echo "${COST_PARTITION_CLAUSE}" | sed 's/OCI_COST_P0/OCI_COST_FACT_P0/'`
+      COST_INDEX_LOCAL="LOCAL"
+      echo "OCI_COST_FACT will be created with ${COST_PARTITION_CLAUSE}" | tee -a $LOG
+   fi
+
+   # dimension key - same as get_star_key() at usage2adw.py
+   KEY1="to_number(substr(rawtohex(standard_hash("
+   KEY2=",'SHA1')),1,15),'XXXXXXXXXXXXXXX')"
+
+   echo "" | tee -a $LOG
+   slog=$LOGDIR/convert_star_${DATE}.log
+   echo "$number. Convert OCI_COST to Star Schema" | tee -a $LOG
+   echo "   Internal LOG=$slog" | tee -a $LOG
+   echo "set echo on serveroutput on time on lines 199 trimsp on pages 1000 verify off
+   whenever sqlerror exit failure
+   select to_char(sysdate,'YYYY-MM-DD HH24:MI') current_date from dual;
+
+   declare
+      v_cnt number;
+   begin
+      select count(*) into v_cnt from user_views where view_name='OCI_COST';
+      if v_cnt > 0 then
+         raise_application_error(-20001, 'OCI_COST is already a star schema view.');
+      end if;
+   end;
+   /
+
+   -------------------------------
+   -- Dimensions
+   -------------------------------
+   prompt Creating Table OCI_DIM_COMPARTMENT
+   create table OCI_DIM_COMPARTMENT (
+      COMPARTMENT_KEY              NUMBER NOT NULL,
+      PRD_COMPARTMENT_ID           VARCHAR2(100),
+      PRD_COMPARTMENT_NAME         VARCHAR2(100),
+      PRD_COMPARTMENT_PATH         VARCHAR2(1000),
+      CONSTRAINT OCI_DIM_COMPARTMENT_PK PRIMARY KEY (COMPARTMENT_KEY) USING INDEX
+   );
+
+   prompt Creating Table OCI_DIM_PRODUCT
+   create table OCI_DIM_PRODUCT (
+      PRODUCT_KEY                  NUMBER NOT NULL,
+      COST_PRODUCT_SKU             VARCHAR2(10),
+      PRD_DESCRIPTION              VARCHAR2(1000),
+      COST_BILLING_UNIT            VARCHAR2(1000),
+      CONSTRAINT OCI_DIM_PRODUCT_PK PRIMARY KEY (PRODUCT_KEY) USING INDEX
+   );
+
+   prompt Creating Table OCI_DIM_RESOURCE
+   create table OCI_DIM_RESOURCE (
+      RESOURCE_KEY                 NUMBER NOT NULL,
+      USG_RESOURCE_ID              VARCHAR2(1000),
+      CONSTRAINT OCI_DIM_RESOURCE_PK PRIMARY KEY (RESOURCE_KEY) USING INDEX
+   ) COMPRESS;
+
+   prompt Creating Table OCI_DIM_TAGSET
+   create table OCI_DIM_TAGSET (
+      TAGSET_KEY                   NUMBER NOT NULL,
+      TAGS_DATA                    VARCHAR2(4000),
+      CONSTRAINT OCI_DIM_TAGSET_PK PRIMARY KEY (TAGSET_KEY) USING INDEX
+   ) COMPRESS;
+
+   -------------------------------
+   -- OCI_COST_FACT
+   -------------------------------
+   prompt Creating Table OCI_COST_FACT
+   create table OCI_COST_FACT (
+      TENANT_NAME                  VARCHAR2(100),
+      TENANT_ID                    VARCHAR2(100),
+      FILE_ID                      VARCHAR2(30),
+      USAGE_INTERVAL_START         DATE,
+      USAGE_INTERVAL_END           DATE,
+      PRD_SERVICE                  VARCHAR2(100),
+      PRD_REGION                   VARCHAR2(100),
+      PRD_AVAILABILITY_DOMAIN      VARCHAR2(100),
+      COMPARTMENT_KEY              NUMBER,
+      PRODUCT_KEY                  NUMBER,
+      RESOURCE_KEY                 NUMBER,
+      TAGSET_KEY                   NUMBER,
+      USG_BILLED_QUANTITY          NUMBER,
+      USG_BILLED_QUANTITY_OVERAGE  NUMBER,
+      COST_SUBSCRIPTION_ID         NUMBER,
+      COST_UNIT_PRICE              NUMBER,
+      COST_UNIT_PRICE_OVERAGE      NUMBER,
+      COST_MY_COST                 NUMBER,
+      COST_MY_COST_OVERAGE         NUMBER,
+      COST_ATTRIBUTED_COST         NUMBER,
+      USG_ATTRIBUTED_USAGE         NUMBER,
+      COST_CURRENCY_CODE           VARCHAR2(10),
+      COST_OVERAGE_FLAG            VARCHAR2(10),
+      IS_CORRECTION                VARCHAR2(10),
+      TAG_SPECIAL                  VARCHAR2(4000),
+      TAG_SPECIAL2                 VARCHAR2(4000),
+      TAG_SPECIAL3                 VARCHAR2(4000),
+      TAG_SPECIAL4                 VARCHAR2(4000),
+      TAG_SPECIAL5                 VARCHAR2(4000),
+      TAG_SPECIAL6                 VARCHAR2(4000),
+      TAG_SPECIAL7                 VARCHAR2(4000),
+      TAG_SPECIAL8                 VARCHAR2(4000)
+   ) COMPRESS ${COST_PARTITION_CLAUSE};
+
+   CREATE INDEX OCI_COST_FACT_1IX ON OCI_COST_FACT(TENANT_NAME,USAGE_INTERVAL_START) ${COST_INDEX_LOCAL};
+
+   -------------------------------
+   -- Copy OCI_COST
+   -------------------------------
+   alter session enable parallel dml;
+
+   prompt Populating OCI_DIM_COMPARTMENT
+   insert into OCI_DIM_COMPARTMENT (COMPARTMENT_KEY, PRD_COMPARTMENT_ID, PRD_COMPARTMENT_NAME, PRD_COMPARTMENT_PATH)
+   select ${KEY1}PRD_COMPARTMENT_ID||chr(31)||PRD_COMPARTMENT_NAME||chr(31)||PRD_COMPARTMENT_PATH${KEY2}, PRD_COMPARTMENT_ID, PRD_COMPARTMENT_NAME, PRD_COMPARTMENT_PATH
+   from (select /*+ parallel(oci_cost,8) full(oci_cost) */ distinct PRD_COMPARTMENT_ID, PRD_COMPARTMENT_NAME, PRD_COMPARTMENT_PATH from OCI_COST
+         where coalesce(PRD_COMPARTMENT_ID, PRD_COMPARTMENT_NAME, PRD_COMPARTMENT_PATH) is not null);
+   commit;
+
+   prompt Populating OCI_DIM_PRODUCT
+   insert into OCI_DIM_PRODUCT (PRODUCT_KEY, COST_PRODUCT_SKU, PRD_DESCRIPTION, COST_BILLING_UNIT)
+   select ${KEY1}COST_PRODUCT_SKU||chr(31)||PRD_DESCRIPTION||chr(31)||COST_BILLING_UNIT${KEY2}, COST_PRODUCT_SKU, PRD_DESCRIPTION, COST_BILLING_UNIT
+   from (select /*+ parallel(oci_cost,8) full(oci_cost) */ distinct COST_PRODUCT_SKU, PRD_DESCRIPTION, COST_BILLING_UNIT from OCI_COST
+         where coalesce(COST_PRODUCT_SKU, PRD_DESCRIPTION, COST_BILLING_UNIT) is not null);
+   commit;
+
+   prompt Populating OCI_DIM_RESOURCE
+   insert into OCI_DIM_RESOURCE (RESOURCE_KEY, USG_RESOURCE_ID)
+   select ${KEY1}USG_RESOURCE_ID${KEY2}, USG_RESOURCE_ID
+   from (select /*+ parallel(oci_cost,8) full(oci_cost) */ distinct USG_RESOURCE_ID from OCI_COST where USG_RESOURCE_ID is not null);
+   commit;
+
+   prompt Populating OCI_DIM_TAGSET
+   insert into OCI_DIM_TAGSET (TAGSET_KEY, TAGS_DATA)
+   select ${KEY1}TAGS_DATA${KEY2}, TAGS_DATA
+   from (select /*+ parallel(oci_cost,8) full(oci_cost) */ distinct TAGS_DATA from OCI_COST where TAGS_DATA is not null);
+   commit;
+
+   prompt Populating OCI_COST_FACT
+   insert /*+ append parallel(OCI_COST_FACT,8) */ into OCI_COST_FACT (
+      TENANT_NAME, TENANT_ID, FILE_ID, USAGE_INTERVAL_START, USAGE_INTERVAL_END, PRD_SERVICE, PRD_REGION, PRD_AVAILABILITY_DOMAIN,
+      COMPARTMENT_KEY, PRODUCT_KEY, RESOURCE_KEY, TAGSET_KEY,
+      USG_BILLED_QUANTITY, USG_BILLED_QUANTITY_OVERAGE, COST_SUBSCRIPTION_ID, COST_UNIT_PRICE, COST_UNIT_PRICE_OVERAGE,
+      COST_MY_COST, COST_MY_COST_OVERAGE, COST_ATTRIBUTED_COST, USG_ATTRIBUTED_USAGE, COST_CURRENCY_CODE, COST_OVERAGE_FLAG, IS_CORRECTION,
+      TAG_SPECIAL, TAG_SPECIAL2, TAG_SPECIAL3, TAG_SPECIAL4, TAG_SPECIAL5, TAG_SPECIAL6, TAG_SPECIAL7, TAG_SPECIAL8
+   )
+   select /*+ parallel(oci_cost,8) full(oci_cost) */
+      TENANT_NAME, TENANT_ID, FILE_ID, USAGE_INTERVAL_START, USAGE_INTERVAL_END, PRD_SERVICE, PRD_REGION, PRD_AVAILABILITY_DOMAIN,
+      case when coalesce(PRD_COMPARTMENT_ID, PRD_COMPARTMENT_NAME, PRD_COMPARTMENT_PATH) is not null then ${KEY1}PRD_COMPARTMENT_ID||chr(31)||PRD_COMPARTMENT_NAME||chr(31)||PRD_COMPARTMENT_PATH${KEY2} end,
+      case when coalesce(COST_PRODUCT_SKU, PRD_DESCRIPTION, COST_BILLING_UNIT) is not null then ${KEY1}COST_PRODUCT_SKU||chr(31)||PRD_DESCRIPTION||chr(31)||COST_BILLING_UNIT${KEY2} end,
+      case when USG_RESOURCE_ID is not null then ${KEY1}USG_RESOURCE_ID${KEY2} end,
+      case when TAGS_DATA is not null then ${KEY1}TAGS_DATA${KEY2} end,
+      USG_BILLED_QUANTITY, USG_BILLED_QUANTITY_OVERAGE, COST_SUBSCRIPTION_ID, COST_UNIT_PRICE, COST_UNIT_PRICE_OVERAGE,
+      COST_MY_COST, COST_MY_COST_OVERAGE, COST_ATTRIBUTED_COST, USG_ATTRIBUTED_USAGE, COST_CURRENCY_CODE, COST_OVERAGE_FLAG, IS_CORRECTION,
+      TAG_SPECIAL, TAG_SPECIAL2, TAG_SPECIAL3, TAG_SPECIAL4, TAG_SPECIAL5, TAG_SPECIAL6, TAG_SPECIAL7, TAG_SPECIAL8
+   from OCI_COST;
+   commit;
+
+   -------------------------------
+   -- OCI_COST View
+   -------------------------------
+   prompt Renaming OCI_COST to OCI_COST_PRE_STAR
+   rename OCI_COST to OCI_COST_PRE_STAR;
+
+   prompt Creating View OCI_COST
+   create or replace view OCI_COST as
+   select
+      f.TENANT_NAME,
+      f.TENANT_ID,
+      f.FILE_ID,
+      f.USAGE_INTERVAL_START,
+      f.USAGE_INTERVAL_END,
+      f.PRD_SERVICE,
+      cast(null as varchar2(100)) PRD_RESOURCE,
+      c.PRD_COMPARTMENT_ID,
+      c.PRD_COMPARTMENT_NAME,
+      c.PRD_COMPARTMENT_PATH,
+      f.PRD_REGION,
+      f.PRD_AVAILABILITY_DOMAIN,
+      r.USG_RESOURCE_ID,
+      f.USG_BILLED_QUANTITY,
+      f.USG_BILLED_QUANTITY_OVERAGE,
+      f.COST_SUBSCRIPTION_ID,
+      p.COST_PRODUCT_SKU,
+      p.PRD_DESCRIPTION,
+      f.COST_UNIT_PRICE,
+      f.COST_UNIT_PRICE_OVERAGE,
+      f.COST_MY_COST,
+      f.COST_MY_COST_OVERAGE,
+      f.COST_ATTRIBUTED_COST,
+      f.USG_ATTRIBUTED_USAGE,
+      f.COST_CURRENCY_CODE,
+      p.COST_BILLING_UNIT,
+      f.COST_OVERAGE_FLAG,
+      f.IS_CORRECTION,
+      t.TAGS_DATA,
+      f.TAG_SPECIAL,
+      f.TAG_SPECIAL2,
+      f.TAG_SPECIAL3,
+      f.TAG_SPECIAL4,
+      f.TAG_SPECIAL5,
+      f.TAG_SPECIAL6,
+      f.TAG_SPECIAL7,
+      f.TAG_SPECIAL8
+   from
+      OCI_COST_FACT f,
+      OCI_DIM_COMPARTMENT c,
+      OCI_DIM_PRODUCT p,
+      OCI_DIM_RESOURCE r,
+      OCI_DIM_TAGSET t
+   where
+      f.COMPARTMENT_KEY = c.COMPARTMENT_KEY (+) and
+      f.PRODUCT_KEY = p.PRODUCT_KEY (+) and
+      f.RESOURCE_KEY = r.RESOURCE_KEY (+) and
+      f.TAGSET_KEY = t.TAGSET_KEY (+);
+
+   -- drop the renamed table if it was empty
+   declare
+      v_cnt number;
+   begin
+      select count(*) into v_cnt from OCI_COST_PRE_STAR where rownum = 1;
+      if v_cnt = 0 then
+         execute immediate 'drop table OCI_COST_PRE_STAR purge';
+         dbms_output.put_line('OCI_COST_PRE_STAR was empty, dropped.');
+      else
+         dbms_output.put_line('OCI_COST_PRE_STAR kept, drop it after validating the star schema.');
+      end if;
+   end;
+   /
+
+   select table_name, round(sum(bytes)/1024/1024) mb from (
+      select segment_name table_name, bytes from user_segments where segment_name in ('OCI_COST_PRE_STAR','OCI_COST_FACT','OCI_DIM_COMPARTMENT','OCI_DIM_PRODUCT','OCI_DIM_RESOURCE','OCI_DIM_TAGSET')
+   ) group by table_name order by 1;
+
+" | sqlplus -s ${database_user}/${db_app_password}@${db_db_name} | tee -a $slog >> $LOG
+
+   if (( `egrep 'ORA-|SP2-' $slog | egrep -v 'ORA-06512' | wc -l` > 0 )); then
+      egrep 'ORA-|SP2-' $slog | egrep -v 'ORA-06512'
+      echo "   Error converting OCI_COST to star schema, please check log $slog, aborting." | tee -a $LOG
+      exit 1
+   else
+      echo "   Okay." | tee -a $LOG
+   fi
+}
+
 ########################################################################################################
 # SetupOL9Packages
 ########################################################################################################
@@ -1068,7 +1582,7 @@ SetupOL9Packages()
    echo "export PATH=$PATH:$CLIENT_HOME/bin" >>$HOME/.bashrc
    echo "export TNS_ADMIN=$HOME/ADWCUSG" >>$HOME/.bashrc
    echo "export PYTHONUNBUFFERED=TRUE" >>$HOME/.bashrc
-   echo "export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true" >>$HOME/.bashrc
+   echo "export OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=false" >>$HOME/.bashrc
    echo "alias cdu='cd $HOME/usage_reports_to_adw'">>$HOME/.bashrc
    echo "alias cdr='cd $HOME/showoci/report'">>$HOME/.bashrc
    echo "export LS_COLORS='rs=0:di=01;34:ln=01;36:mh=00:pi=40;33:so=01;35:do=01;35:bd=40;33;01:cd=40;33;01:or=40;31;01:su=37;41:sg=30;43:ca=30;41:tw=30;42:ow=34;42:st=37;44:ex=01;32:*.tar=01;31:*.tgz=01;31:*.arj=01;31:*.taz=01;31:*.lzh=01;31:*.lzma=01;31:*.tlz=01;31:*.txz=01;31:*.zip=01;31:*.z=01;31:*.Z=01;31:*.dz=01;31:*.gz=01;31:*.lz=01;31:*.xz=01;31:*.bz2=01;31:*.bz=01;31:*.tbz=01;31:*.tbz2=01;31:*.tz=01;31:*.deb=01;31:*.rpm=01;31:*.jar=01;31:*.rar=01;31:*.ace=01;31:*.zoo=01;31:*.cpio=01;31:*.7z=01;31:*.rz=01;31:*.jpg=01;35:*.jpeg=01;35:*.gif=01;35:*.bmp=01;35:*.pbm=01;35:*.pgm=01;35:*.ppm=01;35:*.tga=01;35:*.xbm=01;35:*.xpm=01;35:*.tif=01;35:*.tiff=01;35:*.png=01;35:*.svg=01;35:*.svgz=01;35:*.mng=01;35:*.pcx=01;35:*.mov=01;35:*.mpg=01;35:*.mpeg=01;35:*.m2v=01;35:*.mkv=01;35:*.ogm=01;35:*.mp4=01;35:*.m4v=01;35:*.mp4v=01;35:*.vob=01;35:*.qt=01;35:*.nuv=01;35:*.wmv=01;35:*.asf=01;35:*.rm=01;35:*.rmvb=01;35:*.flc=01;35:*.avi=01;35:*.fli=01;35:*.flv=01;35:*.gl=01;35:*.dl=01;35:*.xcf=01;35:*.xwd=01;35:*.yuv=01;35:*.cgm=01;35:*.emf=01;35:*.axv=01;35:*.anx=01;35:*.ogv=01;35:*.ogx=01;35:*.aac=00;36:*.au=00;36:*.flac=00;36:*.mid=00;36:*.midi=00;36:*.mka=00;36:*.mp3=00;36:*.mpc=00;36:*.ogg=00;36:*.ra=00;36:*.wav=00;36:*.axa=00;36:*.oga=00;36:*.spx=00;36:*.xspf=00;36:';" >>$HOME/.bashrc
@@ -1093,6 +1607,15 @@ SetupOL9Packages()
    DownloadFileFromGit ${APPDIR} . usage2adw.py
    DownloadFileFromGit ${APPDIR} . usage2adw_showoci_csv2adw.py
    DownloadFileFromGit ${APPDIR} . usage2adw_check_connectivity.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_generate_reports.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_export.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_startup_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_event_emitter.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_db_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_showoci_benchmark.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_download_test.py
+   DownloadFileFromGit ${APPDIR} . usage2adw_dbprofile.ini
    DownloadFileFromGit ${APPDIR} . usage2adw_demo_apex_app.sql
    DownloadFileFromGit ${APPDIR} . usage2adw_download_adb_wallet.py
    DownloadFileFromGit ${APPDIR} . usage2adw_retrieve_secret.py
@@ -1110,6 +1633,7 @@ SetupOL9Packages()
    DownloadFileFromGit ${APPDIR} shell_scripts run_report_compart_service_daily_to_csv.sh
    DownloadFileFromGit ${APPDIR} shell_scripts run_report_compart_service_sku_daily_to_csv.sh
    DownloadFileFromGit ${APPDIR} shell_scripts run_sqlplus_usage.sh
+   DownloadFileFromGit ${APPDIR} shell_scripts run_summary_timing.sh
    DownloadFileFromGit ${APPDIR} shell_scripts run_table_size_info.sh
 
    mkdir -p ${APPDIR}/log | tee -a $LOG
@@ -1180,6 +1704,10 @@ case $usage2adw_param in
     -create_tables      ) ReadVariablesFromCredfile 1; CreateTables 2 ;;
     -drop_tables        ) DropTables ;;
     -truncate_tables    ) TruncateTables ;;
+    -create_tables_partitioned ) export COST_PARTITIONED=Y; ReadVariablesFromCredfile 1; CreateTables 2 ;;
+    -partition_cost_table      ) PartitionCostTable ;;
+    -create_tables_star ) ReadVariablesFromCredfile 1; CreateTables 2; ConvertStar 3 ;;
+    -convert_star       ) ReadVariablesFromCredfile 1; ConvertStar 2 ask ;;
     -setup_credential   ) SetupCredential ;;
     -setup_ol9_packages ) SetupOL9Packages ;;
     -setup_full         ) SetupFull ;;
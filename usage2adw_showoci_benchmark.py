@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_showoci_benchmark.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Benchmark the CSV load of usage2adw_showoci_csv2adw.py without tenancy
+# or database:
+#   - Generate a large showoci CSV file with the columns of the table
+#     definition (identity domain users or subnet private ips)
+#   - Record the database calls with the fake oracledb connection of
+#     usage2adw_benchmark.py
+#   - Call handle_table of the loader as is, best of -runs
+#
+# -missing removes columns from the CSV header to measure the load with
+# columns not found. -compare loads the same file with other versions of
+# the loader, i.e. the version before the column plan:
+#   git show <commit>:usage2adw_showoci_csv2adw.py > /tmp/showoci_prev.py
+#
+# Reports rows/sec, seconds and lines printed by each loader, and the
+# speed-up of the current loader compared to each loader
+#
+# The oci python sdk must be installed, oracledb is not required
+#
+# Example:
+#   python3 usage2adw_showoci_benchmark.py -table users -rows 50000
+#   python3 usage2adw_showoci_benchmark.py -table privateips -rows 500000 -missing 2 -compare /tmp/showoci_prev.py
+##########################################################################
+import argparse
+import contextlib
+import csv
+import datetime
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import usage2adw_benchmark
+
+version = "26.10.19"
+script_dir = os.path.dirname(os.path.abspath(__file__))
+tables = {
+    'users': "handle_identity_domains_users",
+    'privateips': "handle_network_subnet_private_ips"
+}
+
+
+##########################################################################
+# Fake cursor - count queries return zeros for each select column
+##########################################################################
+class ShowociCursor(usage2adw_benchmark.FakeCursor):
+    def execute(self, sql, parameters=None, **kwargs):
+        super(ShowociCursor, self).execute(sql, parameters, **kwargs)
+        sql = str(sql).lower()
+        self.counts = len(sql.split(" from ")[0].split(",")) if sql.startswith("select") and "count(" in sql else 0
+
+    def fetchone(self):
+        return tuple([0] * self.counts) if self.counts else None
+
+
+class ShowociConnection(usage2adw_benchmark.FakeConnection):
+    def cursor(self):
+        return ShowociCursor(self)
+
+
+##########################################################################
+# Table definition of the handler, handle_table is called with it
+##########################################################################
+def get_table_definition(loader, handler_name):
+    definitions = []
+    handle_table = loader.handle_table
+    loader.handle_table = lambda connection, inputdata, *args: definitions.append(inputdata)
+    try:
+        getattr(loader, handler_name)(None)
+    finally:
+        loader.handle_table = handle_table
+    return definitions[0]
+
+
+##########################################################################
+# Generate CSV file with the columns of the definition
+##########################################################################
+def generate_csv(cmd, definition, path_filename):
+    rand = random.Random(cmd.seed)
+
+    # one CSV column per name, items may read the same column
+    columns = []
+    types = {}
+    primary_key = set()
+    for item in definition['items']:
+        column = str(item['csv']).strip() or str(item['col']).strip()
+        if column not in types:
+            columns.append(column)
+            types[column] = item['type']
+        if item['pk'] == 'y':
+            primary_key.add(column)
+
+    # missing columns are removed from the header, never the primary key
+    removed = [column for column in columns if column not in primary_key][-cmd.missing:] if cmd.missing else []
+    keep = [column for column in columns if column not in removed]
+
+    with open(path_filename, 'w', newline='') as file_out:
+        writer = csv.writer(file_out)
+        writer.writerow(keep)
+
+        for row_num in range(cmd.rows):
+            row = []
+            for column in keep:
+                if column in primary_key:
+                    row.append("ocid1.resource.oc1..bench" + str(row_num).zfill(10))
+                elif 'date' in types[column]:
+                    row.append("2026-10-" + str(1 + row_num % 28).zfill(2) + " 0" + str(row_num % 10) + ":00")
+                elif 'number' in types[column]:
+                    row.append(str(rand.randint(0, 100000)))
+                elif rand.random() < 0.2:
+                    row.append("None")
+                else:
+                    row.append("value" + str(rand.randint(0, 10 ** 8)) + "x" * rand.randint(0, 40))
+            writer.writerow(row)
+
+    return removed
+
+
+##########################################################################
+# Count lines printed by the loader
+##########################################################################
+class LineCounter(io.TextIOBase):
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += text.count("\n")
+        return len(text)
+
+
+##########################################################################
+# Load the CSV file with the loader, best of runs
+##########################################################################
+def run_loader(cmd, loader, definition, csv_prefix):
+    loader.cmd = argparse.Namespace(csv_location=csv_prefix, drop=False, verbose=False, metrics_file="", reject_pct=cmd.reject_pct, parallel=1)
+
+    best = None
+    for _ in range(cmd.runs):
+        counter = LineCounter()
+        connection = ShowociConnection()
+        if hasattr(loader, 'db_catalog'):
+            loader.db_catalog.clear()
+
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(counter):
+            loader.handle_table(connection, definition)
+        seconds = time.perf_counter() - start_time
+
+        inserted = sum(stat['rows'] for key, stat in connection.statements.items() if key.startswith("INSERT"))
+        if best is None or seconds < best['seconds']:
+            best = {'seconds': seconds, 'rows': inserted, 'lines': counter.lines}
+    return best
+
+
+##########################################################################
+# Run Benchmark
+##########################################################################
+def run_benchmark(cmd):
+    loader_files = [os.path.join(script_dir, "usage2adw_showoci_csv2adw.py")] + cmd.compare
+    loaders = [usage2adw_benchmark.import_loader("showoci_" + str(index), path_filename) for index, path_filename in enumerate(loader_files)]
+
+    definition = get_table_definition(loaders[0], tables[cmd.table])
+    csv_prefix = os.path.join(cmd.folder, "bench")
+    path_filename = csv_prefix + "_" + definition['csv_file']
+
+    print("\nGenerating " + path_filename + " - " + str(cmd.rows) + " rows, " + str(len(definition['items'])) + " columns")
+    start_time = time.perf_counter()
+    removed = generate_csv(cmd, definition, path_filename)
+    print("   Generated " + str(round(os.path.getsize(path_filename) / 1048576, 1)) + " MB in " + str(round(time.perf_counter() - start_time, 2)) + " seconds")
+    if removed:
+        print("   Columns removed from the header: " + ", ".join(removed))
+
+    results = []
+    for path_filename_loader, loader in zip(loader_files, loaders):
+        print("\nLoading with " + path_filename_loader + " - best of " + str(cmd.runs) + " runs")
+        result = run_loader(cmd, loader, definition, csv_prefix)
+        result['loader'] = os.path.basename(path_filename_loader)
+        results.append(result)
+        print("   " + str(result['rows']) + " rows in " + str(round(result['seconds'], 2)) + " seconds, " + str(result['lines']) + " lines printed")
+
+    print("\n" + "Loader".ljust(40) + "Rows".rjust(12) + "Seconds".rjust(10) + "Rows/sec".rjust(12) + "Lines".rjust(12) + "Speed-up".rjust(10))
+    print("-" * 96)
+    for result in results:
+        rows_per_sec = result['rows'] / result['seconds'] if result['seconds'] else 0
+        speed_up = str(round(result['seconds'] / results[0]['seconds'], 2)) + "x" if results[0]['seconds'] else ""
+        print(result['loader'][0:39].ljust(40) + str(result['rows']).rjust(12) + str(round(result['seconds'], 2)).rjust(10) + str(int(rows_per_sec)).rjust(12) + str(result['lines']).rjust(12) + speed_up.rjust(10))
+
+    # only the temporary folder is removed, never a -folder of the user
+    if cmd.temp_folder and not cmd.keep:
+        shutil.rmtree(cmd.folder, ignore_errors=True)
+    return results
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-table', default="users", dest='table', choices=sorted(tables), help='showoci table to benchmark (default=users)')
+    parser.add_argument('-rows', default=50000, type=int, dest='rows', help='Rows of the CSV file (default=50000)')
+    parser.add_argument('-missing', default=0, type=int, dest='missing', help='Columns removed from the CSV header (default=0)')
+    parser.add_argument('-runs', default=3, type=int, dest='runs', help='Runs per loader, best is reported (default=3)')
+    parser.add_argument('-compare', nargs='+', default=[], dest='compare', help='Other versions of usage2adw_showoci_csv2adw.py to compare')
+    parser.add_argument('-rejectpct', default=0.0, type=float, dest='reject_pct', help='-rejectpct passed to the loader (default=0)')
+    parser.add_argument('-folder', default="", dest='folder', help='Folder for the generated CSV (default=temporary folder)')
+    parser.add_argument('-keep', action='store_true', default=False, dest='keep', help='Keep the generated CSV of the temporary folder, -folder is always kept')
+    parser.add_argument('-seed', default=1, type=int, dest='seed', help='Random seed (default=1)')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+
+    result = parser.parse_args()
+    result.temp_folder = not result.folder
+    if result.temp_folder:
+        result.folder = tempfile.mkdtemp(prefix="usage2adw_showoci_")
+    os.makedirs(result.folder, exist_ok=True)
+    return result
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    run_benchmark(cmd)
+    print("\nCompleted at " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()
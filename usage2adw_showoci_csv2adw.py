@@ -117,15 +117,142 @@ import argparse
 import datetime
 import csv
 import oracledb
+import configparser
 import time
 import os
 import oci
 import base64
+import threading
+import concurrent.futures
+import json
+import hashlib
 
-version = "25.10.01"
+version = "26.10.19"
 cmd = None
 file_num = 0
 
+# -parallel jobs - output buffer and file number of the job thread, the
+# merges to OCI_RESOURCES are serialized to avoid row lock waits
+job_local = threading.local()
+resource_merge_lock = threading.Lock()
+
+# tables and columns of the schema read once at the start, table: columns
+# kept current by the create, drop and alter of the run
+db_catalog = {}
+db_catalog_lock = threading.Lock()
+
+# database connection profile of -dbconf / -dbprofile, key: type
+db_profile_keys = {
+    'mode': str,
+    'sdu': int,
+    'stmtcachesize': int,
+    'arraysize': int,
+    'prefetchrows': int,
+    'expire_time': int,
+    'tcp_connect_timeout': float,
+    'config_dir': str,
+    'wallet_location': str,
+    'pool_min': int,
+    'pool_max': int
+}
+db_profile = {}
+
+# rows rejected by the database kept in OCI_SHOWOCI_REJECTS per file
+reject_store_max = 1000
+
+# tables failed with rejected rows above -rejectpct, not merged, the run continues
+tables_failed = []
+
+# row hash column added to every table, the merge updates only the rows
+# with a different hash, extract_date changes every run and is not hashed,
+# the last extract of each table is kept in OCI_SHOWOCI_EXTRACTS
+row_hash_item = {'col': 'row_hash', 'csv': '', 'type': 'varchar2(40)', 'pk': 'n'}
+row_hash_exclude = ['extract_date']
+
+# OpenMetrics textfile values, key = (name, labels)
+metrics_prefix = "showoci2adw"
+metrics_values = {}
+metrics_lock = threading.Lock()
+metrics_file_lock = threading.Lock()
+metrics_help = {
+    'files_loaded': 'CSV files loaded in the run',
+    'rows_loaded': 'Rows inserted to the temporary tables in the run',
+    'bytes_loaded': 'CSV bytes loaded in the run',
+    'load_seconds': 'Seconds spent loading files',
+    'rows_per_second': 'Rows inserted per second of file load',
+    'bytes_per_second': 'CSV bytes per second of file load',
+    'phase_seconds': 'Seconds per load phase',
+    'merge_seconds': 'Seconds per table merge',
+    'merge_rows': 'Rows merged (inserted or updated) and unchanged per table merge',
+    'api_calls': 'OCI API calls',
+    'data_lag_seconds': 'Seconds between now and the newest CSV file modification',
+    'last_file_modified_timestamp_seconds': 'Modification time of the newest CSV file loaded',
+    'last_update_timestamp_seconds': 'Time the metrics file was written',
+    'run_seconds': 'Run duration in seconds',
+    'run_success': 'Run completed without error (1) or failed (0)',
+    'rows_rejected': 'Rows rejected by the database per table',
+    'tables_failed': 'Tables failed with rejected rows above -rejectpct'
+}
+
+
+##########################################################################
+# Run metrics written as OpenMetrics textfile (-metrics)
+##########################################################################
+def set_metric(name, value, labels=None, add=False):
+    key = (name, tuple(sorted((labels if labels else {}).items())))
+    with metrics_lock:
+        metrics_values[key] = (metrics_values.get(key, 0) + value) if add else value
+
+
+##########################################################################
+# Call api and count it for the metrics
+##########################################################################
+def counted_api_call(api_name, func):
+    def call(*args, **kwargs):
+        set_metric('api_calls', 1, {'api': api_name}, add=True)
+        return func(*args, **kwargs)
+    return call
+
+
+##########################################################################
+# Write metrics textfile, folder will write <prefix>_<csv prefix>.prom
+##########################################################################
+def write_metrics_file(metrics_file, tenant_name):
+    try:
+        if os.path.isdir(metrics_file):
+            metrics_file = os.path.join(metrics_file, metrics_prefix + "_" + "".join(c if c.isalnum() else "_" for c in tenant_name) + ".prom")
+
+        with metrics_lock:
+            values = dict(metrics_values)
+
+        # derived throughput gauges
+        load_seconds = values.get(('load_seconds', ()), 0)
+        if load_seconds:
+            values[('rows_per_second', ())] = round(values.get(('rows_loaded', ()), 0) / load_seconds, 3)
+            values[('bytes_per_second', ())] = round(values.get(('bytes_loaded', ()), 0) / load_seconds, 3)
+        values[('last_update_timestamp_seconds', ())] = round(time.time(), 3)
+        if ('last_file_modified_timestamp_seconds', ()) in values:
+            values[('data_lag_seconds', ())] = round(time.time() - values[('last_file_modified_timestamp_seconds', ())], 3)
+
+        lines = []
+        for name in sorted(set(key[0] for key in values)):
+            lines.append("# HELP " + metrics_prefix + "_" + name + " " + metrics_help.get(name, name.replace("_", " ")))
+            lines.append("# TYPE " + metrics_prefix + "_" + name + " gauge")
+            for key in sorted(k for k in values if k[0] == name):
+                labels = (('tenant', tenant_name),) + key[1]
+                label_str = ",".join(label + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for label, value in labels)
+                lines.append(metrics_prefix + "_" + name + "{" + label_str + "} " + str(values[key]))
+        lines.append("# EOF")
+
+        # write to temp file and rename so the collector never reads a partial file
+        with metrics_file_lock:
+            with open(metrics_file + ".tmp", 'w') as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(metrics_file + ".tmp", metrics_file)
+
+    except Exception as e:
+        print("\nwrite_metrics_file() - Error writing metrics file " + metrics_file + " - " + str(e))
+
 
 ##########################################################################
 # Create signer
@@ -178,7 +305,7 @@ def get_secret_password(config, signer, proxy, secret_id):
             secret_client.base_client.session.proxies = {'https': proxy}
         print("Connected.")
 
-        secret_data = secret_client.get_secret_bundle(secret_id).data
+        secret_data = counted_api_call('get_secret_bundle', secret_client.get_secret_bundle)(secret_id).data
 
         print("Secret Retrieved.")
         secret_bundle_content = secret_data.secret_bundle_content
@@ -227,17 +354,75 @@ def get_command_line():
 
 
 ##########################################################################
-# Get Column from Array
+# executemany with batcherrors, the rows rejected by the database are
+# added to rejects as (line number, error code, error message, row)
 ##########################################################################
-def get_column_value_from_array(column, array, limit_size):
-    if column in array:
-        value = array[column][0:limit_size]
-        if value == "None":
-            value = ""
-        return value
-    else:
-        print("   Column not found in CSV --> " + column + " Please update showoci code")
-        return ""
+def execute_batch(cursor, sql, data, data_lines, rejects):
+    cursor.executemany(sql, data, batcherrors=True)
+    for error in cursor.getbatcherrors():
+        rejects.append((data_lines[error.offset], error.code, error.message, data[error.offset]))
+
+
+##########################################################################
+# Save rejected rows to OCI_SHOWOCI_REJECTS, committed by the caller
+##########################################################################
+def save_load_rejects(connection, table_name, file_name, rejects):
+    try:
+        data = []
+        for line_number, error_code, error_message, row in rejects[0:reject_store_max]:
+            data.append((table_name, file_name, line_number, error_code, str(error_message)[0:1000], json.dumps(row, default=str)[0:4000], version))
+
+        with connection.cursor() as cursor:
+            cursor.execute("delete from OCI_SHOWOCI_REJECTS where TABLE_NAME=:table_name and FILE_NAME=:file_name", table_name=table_name, file_name=file_name)
+            sql = """INSERT INTO OCI_SHOWOCI_REJECTS (TABLE_NAME, FILE_NAME, LINE_NUMBER, ERROR_CODE, ERROR_MESSAGE, ROW_DATA, AGENT_VERSION)
+                     VALUES (:1, :2, :3, :4, :5, :6, :7)"""
+            cursor.executemany(sql, data)
+
+    except oracledb.DatabaseError as e:
+        print("\nsave_load_rejects() - Error manipulating database - " + str(e) + "\n")
+
+
+##########################################################################
+# Check the rejected rows of a file against -rejectpct, above it the rows
+# of the file are rolled back and True is returned, the rejects are kept
+##########################################################################
+def check_file_rejects(connection, table_name, file_name, rejects, num_rows):
+    reject_pct = len(rejects) * 100 / num_rows if num_rows else 100
+    line_number, error_code, error_message, row = rejects[0]
+    print(" Rejected = " + str(len(rejects)) + " (" + str(round(reject_pct, 3)) + "%, line " + str(line_number) + " - " + str(error_message) + ")", end="")
+    set_metric('rows_rejected', len(rejects), {'table': table_name}, add=True)
+
+    if reject_pct > cmd.reject_pct:
+        connection.rollback()
+        save_load_rejects(connection, table_name, file_name, rejects)
+        connection.commit()
+        print(" Failed, rejected rows above -rejectpct " + str(cmd.reject_pct) + "%, rows rolled back, see OCI_SHOWOCI_REJECTS")
+        return True
+
+    save_load_rejects(connection, table_name, file_name, rejects)
+    return False
+
+
+##########################################################################
+# Column plan of the CSV file, built once from the header
+# per item: (csv index or None if missing, limit size, primary key)
+##########################################################################
+def get_column_plan(header, items):
+    header_index = {column: index for index, column in enumerate(header)}
+
+    column_plan = []
+    for item in items:
+        column = str(item['csv']).strip()
+        if not column:
+            column = str(item['col']).strip()
+
+        index = header_index.get(column)
+        if index is None:
+            print("   Column not found in CSV --> " + column + " Please update showoci code")
+
+        limit_size = 16 if 'date' in item['type'] else 3999
+        column_plan.append((index, limit_size, item['pk'] == 'y'))
+    return column_plan
 
 
 ##########################################################################
@@ -255,6 +440,89 @@ def get_time_elapsed(start_time):
     return ", Process Time " + str('{:02d}:{:02d}:{:02d}'.format(round(et // 3600), (round(et % 3600 // 60)), round(et % 60)))
 
 
+##########################################################################
+# Database connection profile - section -dbprofile of the -dbconf ini file
+#   mode                 thick or thin driver
+#   sdu                  session data unit in bytes
+#   stmtcachesize        statements cached per session
+#   arraysize            default cursor fetch array size
+#   prefetchrows         default cursor prefetch rows
+#   expire_time          minutes between tcp keepalive probes
+#   tcp_connect_timeout  seconds to establish the connection
+#   config_dir           tnsnames.ora folder for thin mode
+#   wallet_location      ewallet.pem folder for thin mode
+#   pool_min, pool_max   session pool size
+# thick mode reads sdu and keepalive from sqlnet.ora
+##########################################################################
+def load_db_profile(db_conf, db_profile_name, default_mode):
+    global db_profile
+    db_profile = {'mode': default_mode}
+
+    if db_conf:
+        parser = configparser.ConfigParser()
+        if not parser.read(db_conf):
+            print("\nError reading database profile file " + db_conf + ", aborting")
+            raise SystemExit
+
+        if not parser.has_section(db_profile_name) and db_profile_name != configparser.DEFAULTSECT:
+            print("\nDatabase profile " + db_profile_name + " not found in " + db_conf + ", aborting")
+            raise SystemExit
+
+        section = parser[db_profile_name]
+        for key in section:
+            if key not in db_profile_keys:
+                print("   Database profile key " + key + " ignored")
+            elif section[key].strip():
+                try:
+                    db_profile[key] = db_profile_keys[key](section[key].strip())
+                except ValueError:
+                    print("\nDatabase profile key " + key + " value " + section[key] + " is not valid, aborting")
+                    raise SystemExit
+
+    if db_profile['mode'] not in ('thick', 'thin'):
+        print("\nDatabase profile mode must be thick or thin, aborting")
+        raise SystemExit
+
+    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
+    if db_profile['mode'] == 'thick':
+        oracledb.init_oracle_client()
+
+    if 'arraysize' in db_profile:
+        oracledb.defaults.arraysize = db_profile['arraysize']
+    if 'prefetchrows' in db_profile:
+        oracledb.defaults.prefetchrows = db_profile['prefetchrows']
+
+    if db_conf:
+        print("DB Profile   : " + db_profile_name + " - " + ", ".join(key + "=" + str(value) for key, value in db_profile.items()))
+
+
+##########################################################################
+# Connect parameters of the profile, parameters passed override it
+##########################################################################
+def get_db_connect_params(**kwargs):
+    params = {key: db_profile[key] for key in ('sdu', 'stmtcachesize', 'expire_time', 'tcp_connect_timeout', 'config_dir', 'wallet_location') if key in db_profile}
+    params.update({key: value for key, value in kwargs.items() if value})
+    return params
+
+
+##########################################################################
+# Create connection with the profile
+##########################################################################
+def create_db_connection(user, password, dsn, **kwargs):
+    return oracledb.connect(user=user, password=password, dsn=dsn, **get_db_connect_params(**kwargs))
+
+
+##########################################################################
+# Create session pool with the profile, pool_min and pool_max of the
+# profile override the defaults of the caller
+##########################################################################
+def create_db_pool(user, password, dsn, pool_min, pool_max, ping_interval=60, **kwargs):
+    pool_max = max(db_profile.get('pool_max', pool_max), 1)
+    pool_min = min(db_profile.get('pool_min', pool_min), pool_max)
+    increment = 0 if pool_min == pool_max else 1
+    return oracledb.create_pool(user=user, password=password, dsn=dsn, min=pool_min, max=pool_max, increment=increment, ping_interval=ping_interval, **get_db_connect_params(**kwargs))
+
+
 ##########################################################################
 # set parser
 ##########################################################################
@@ -277,7 +545,12 @@ def set_parser_arguments():
 
     parser.add_argument('-drop', action='store_true', default=False, dest='drop', help='Drop Tables before Load')
     parser.add_argument('-verbose', action='store_true', default=False, dest='verbose', help='Print more details')
+    parser.add_argument('-metrics', default="", dest='metrics_file', help='Write OpenMetrics textfile for node_exporter, folder writes showoci2adw_<csv prefix>.prom')
+    parser.add_argument('-parallel', default=1, type=int, dest='parallel', help='Tables loaded concurrently over a session pool, errors are reported at the end (default=1)')
+    parser.add_argument('-rejectpct', default=0.0, type=float, dest='reject_pct', help='Rejected rows percent of a file allowed before the table is not merged, rejects kept in OCI_SHOWOCI_REJECTS (default=0, any reject fails the table)')
 
+    parser.add_argument('-dbconf', default="", dest='db_conf', help='Database connection profile ini file - sdu, stmtcachesize, arraysize, prefetchrows, keepalive, mode, pool')
+    parser.add_argument('-dbprofile', default=configparser.DEFAULTSECT, dest='db_profile', help='Database connection profile section (default=DEFAULT)')
     parser.add_argument('--version', action='version', version='%(prog)s ' + version)
 
     result = parser.parse_args()
@@ -287,6 +560,10 @@ def set_parser_arguments():
         print_header("You must specify database credentials and csv location!!", 0)
         return None
 
+    if result.parallel < 1:
+        print_header("-parallel must be 1 or more!!", 0)
+        return None
+
     return result
 
 
@@ -3190,6 +3467,75 @@ def handle_advisor_resource_action(connection):
         raise Exception("\nError at procedure: handle_advisor_resource_action - " + str(e))
 
 
+##########################################################################
+# Load the catalog - user_tables and user_tab_columns in two queries
+##########################################################################
+def load_db_catalog(connection):
+    global db_catalog
+    try:
+        start_time = time.time()
+        with connection.cursor() as cursor:
+            cursor.arraysize = 5000
+            cursor.prefetchrows = 5000
+
+            cursor.execute("select table_name from user_tables")
+            catalog = {table_name: set() for table_name, in cursor}
+
+            cursor.execute("select table_name, column_name from user_tab_columns")
+            for table_name, column_name in cursor:
+                if table_name in catalog:
+                    catalog[table_name].add(column_name)
+
+        with db_catalog_lock:
+            db_catalog = catalog
+        print("Catalog      : " + str(len(catalog)) + " tables, " + str(sum(len(x) for x in catalog.values())) + " columns" + get_time_elapsed(start_time))
+
+    except oracledb.DatabaseError as e:
+        print("\nError manipulating database at load_db_catalog() - " + str(e) + "\n")
+        raise SystemExit
+
+
+##########################################################################
+# Catalog lookups and updates, the -parallel jobs share the catalog
+##########################################################################
+def catalog_table_exists(table_name):
+    with db_catalog_lock:
+        return table_name in db_catalog
+
+
+def catalog_set_table(table_name, columns):
+    with db_catalog_lock:
+        db_catalog[table_name] = set(str(column).strip().upper() for column in columns)
+
+
+def catalog_drop_table(table_name):
+    with db_catalog_lock:
+        db_catalog.pop(table_name, None)
+
+
+##########################################################################
+# Add the columns of the definition missing from an existing table,
+# new columns of the CSV are added without -drop
+##########################################################################
+def add_missing_columns(cursor, table_name, items, verbose):
+    with db_catalog_lock:
+        columns = set(db_catalog.get(table_name, set()))
+
+    missing = [x for x in items if x['col'].strip().upper() not in columns]
+    if not missing:
+        return 0
+
+    sql = "alter table " + table_name + " add (" + ", ".join(x['col'].strip() + " " + x['type'].strip() for x in missing) + ")"
+    cursor.execute(sql)
+
+    with db_catalog_lock:
+        db_catalog.setdefault(table_name, set()).update(x['col'].strip().upper() for x in missing)
+
+    if verbose:
+        print("   Table " + table_name + " added columns " + ", ".join(x['col'].strip() for x in missing))
+    return len(missing)
+
+
 ##########################################################################
 # Check Table Structure for Compute
 ##########################################################################
@@ -3216,14 +3562,11 @@ def handle_old_structure(connection):
                                "OCI_SHOWOCI_SECURITY_CLOUDGUARD_TMP",
                                "OCI_SHOWOCI_SECURITY_CLOUDGUARD"]:
 
-                sql = "select count(*) from user_tables where table_name = :table_name"
-                cursor.execute(sql, table_name=table_name)
-                val, = cursor.fetchone()
-
                 # if table exist drop
-                if val > 0:
+                if catalog_table_exists(table_name):
                     sql = "drop table " + table_name
                     cursor.execute(sql)
+                    catalog_drop_table(table_name)
 
     except oracledb.DatabaseError as e:
         print("\nDatabaseError at procedure: handle_table() - handle_old_structure " + str(e) + "\n")
@@ -3244,13 +3587,8 @@ def check_database_table_structure_resource(connection):
         # open cursor
         with connection.cursor() as cursor:
 
-            # check if OCI_USAGE table exist, if not create
-            sql = "select count(*) from user_tables where table_name = 'OCI_RESOURCES'"
-            cursor.execute(sql)
-            val, = cursor.fetchone()
-
-            # if table not exist, create it
-            if val == 0:
+            # check if OCI_RESOURCES table exist, if not create
+            if not catalog_table_exists('OCI_RESOURCES'):
                 if verbose:
                     print("   Table OCI_RESOURCES was not exist, creating")
 
@@ -3263,9 +3601,51 @@ def check_database_table_structure_resource(connection):
                     CONSTRAINT OCI_RESOURCES_PK PRIMARY KEY (RESOURCE_ID) USING INDEX)"""
 
                 cursor.execute(sql)
+                catalog_set_table('OCI_RESOURCES', ['RESOURCE_ID', 'RESOURCE_NAME', 'SOURCE_TENANT', 'SOURCE_TABLE', 'LAST_LOADED'])
                 if verbose:
                     print("   Table OCI_RESOURCES created")
 
+            # check if OCI_SHOWOCI_REJECTS table exist, if not create
+            if not catalog_table_exists('OCI_SHOWOCI_REJECTS'):
+                if verbose:
+                    print("   Table OCI_SHOWOCI_REJECTS was not exist, creating")
+
+                sql = """create table OCI_SHOWOCI_REJECTS (
+                    TABLE_NAME              VARCHAR2(100) NOT NULL,
+                    FILE_NAME               VARCHAR2(1000) NOT NULL,
+                    LINE_NUMBER             NUMBER,
+                    ERROR_CODE              NUMBER,
+                    ERROR_MESSAGE           VARCHAR2(1000),
+                    ROW_DATA                VARCHAR2(4000),
+                    REJECT_TIME             DATE DEFAULT SYSDATE,
+                    AGENT_VERSION           VARCHAR2(30))"""
+
+                cursor.execute(sql)
+                cursor.execute("CREATE INDEX OCI_SHOWOCI_REJECTS_1IX ON OCI_SHOWOCI_REJECTS (TABLE_NAME, FILE_NAME)")
+                catalog_set_table('OCI_SHOWOCI_REJECTS', ['TABLE_NAME', 'FILE_NAME', 'LINE_NUMBER', 'ERROR_CODE', 'ERROR_MESSAGE', 'ROW_DATA', 'REJECT_TIME', 'AGENT_VERSION'])
+                if verbose:
+                    print("   Table OCI_SHOWOCI_REJECTS created")
+
+            # check if OCI_SHOWOCI_EXTRACTS table exist, if not create
+            if not catalog_table_exists('OCI_SHOWOCI_EXTRACTS'):
+                if verbose:
+                    print("   Table OCI_SHOWOCI_EXTRACTS was not exist, creating")
+
+                sql = """create table OCI_SHOWOCI_EXTRACTS (
+                    TABLE_NAME              VARCHAR2(100) NOT NULL,
+                    EXTRACT_DATE            DATE,
+                    FILE_NAME               VARCHAR2(1000),
+                    ROWS_EXTRACTED          NUMBER,
+                    ROWS_MERGED             NUMBER,
+                    LOAD_TIME               DATE,
+                    AGENT_VERSION           VARCHAR2(30),
+                    CONSTRAINT OCI_SHOWOCI_EXTRACTS_PK PRIMARY KEY (TABLE_NAME) USING INDEX)"""
+
+                cursor.execute(sql)
+                catalog_set_table('OCI_SHOWOCI_EXTRACTS', ['TABLE_NAME', 'EXTRACT_DATE', 'FILE_NAME', 'ROWS_EXTRACTED', 'ROWS_MERGED', 'LOAD_TIME', 'AGENT_VERSION'])
+                if verbose:
+                    print("   Table OCI_SHOWOCI_EXTRACTS created")
+
     except oracledb.DatabaseError as e:
         print("\nError manipulating database at check_database_table_structure_resource() - " + str(e) + "\n")
         raise SystemExit
@@ -3283,8 +3663,13 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
     process_location = "Start"
     try:
         start_time = time.time()
-        file_num += 1
-        file_num_str = str(str(file_num) + ".   ")[0:4]
+
+        # -parallel jobs are numbered in the order of the handlers
+        if getattr(job_local, 'file_num', None):
+            file_num_str = str(str(job_local.file_num) + ".   ")[0:4]
+        else:
+            file_num += 1
+            file_num_str = str(str(file_num) + ".   ")[0:4]
 
         # Input Parameters from CMD
         csv_location = cmd.csv_location
@@ -3297,12 +3682,15 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
         table_name = inputdata['table_name']
         csv_table_name_lpad = table_name.ljust(40) + " " + csv_file.ljust(35)
         tmp_table_name = table_name + "_TMP"
-        compute_sql_columns = str(',\n '.join(x['col'] + " " + x['type'] for x in inputdata['items']))
-        merge_sql_columns = str(', '.join("a." + x['col'] + " = b." + x['col'] for x in inputdata['items'] if x['pk'] != "y"))
-        insert_def_sql_columns = str(', '.join(x['col'] for x in inputdata['items']))
-        insert_val_sql_columns = str(', '.join("b." + x['col'] for x in inputdata['items']))
+        table_items = inputdata['items'] + [row_hash_item]
+        compute_sql_columns = str(',\n '.join(x['col'] + " " + x['type'] for x in table_items))
+        merge_sql_columns = str(', '.join("a." + x['col'] + " = b." + x['col'] for x in table_items if x['pk'] != "y"))
+        insert_def_sql_columns = str(', '.join(x['col'] for x in table_items))
+        insert_val_sql_columns = str(', '.join("b." + x['col'] for x in table_items))
         primary_key = next((col for col in inputdata['items'] if col['pk'] == "y"), None)['col']
-        insert_bulk_func = str(', '.join(variable_generation(x, index) for index, x in enumerate(inputdata['items'], start=1)))
+        insert_bulk_func = str(', '.join(variable_generation(x, index) for index, x in enumerate(table_items, start=1)))
+        hash_index = [index for index, x in enumerate(inputdata['items']) if x['col'].strip() not in row_hash_exclude]
+        extract_date_exist = any(x['col'].strip() == 'extract_date' for x in inputdata['items'])
 
         # Check if file exist
         if not os.path.isfile(path_filename):
@@ -3322,15 +3710,13 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
         ################################################
         process_location = "Checking Table Structure"
 
-        # check if tables exist
+        # check if tables exist in the catalog read at the start
         with connection.cursor() as cursor:
 
-            sql = "select count(*) from user_tables where table_name = :table_name"
-            cursor.execute(sql, table_name=table_name)
-            val, = cursor.fetchone()
+            table_exists = catalog_table_exists(table_name)
 
             # if main table exist and drop before load
-            if val > 0 and drop_before_load:
+            if table_exists and drop_before_load:
                 if verbose:
                     print("   Table " + table_name + " exist, but drop flag enabled, dropping..")
                 else:
@@ -3338,38 +3724,46 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
 
                 sql = "drop table " + table_name
                 cursor.execute(sql)
-                val = 0
+                catalog_drop_table(table_name)
+                table_exists = False
 
-            # if main table not exist, create it
-            if val == 0:
+            # if main table not exist, create it, else add the new columns
+            if not table_exists:
                 if verbose:
                     print("   Table " + table_name + " was not exist, creating, ", end="")
                 sql = "create table " + table_name + " ( " + compute_sql_columns + " ,CONSTRAINT " + table_name + "_PK PRIMARY KEY (" + primary_key + ") USING INDEX) "
                 cursor.execute(sql)
+                catalog_set_table(table_name, [x['col'] for x in table_items])
                 if verbose:
                     print("Table " + table_name + " created")
+            else:
+                columns_added = add_missing_columns(cursor, table_name, table_items, verbose)
+                if columns_added and not verbose:
+                    print(" +" + str(columns_added) + " Columns,", end="")
 
             # check if temp table exist, if not create
-            sql = "select count(*) from user_tables where table_name = :table_name"
-            cursor.execute(sql, table_name=tmp_table_name)
-            val, = cursor.fetchone()
+            table_exists = catalog_table_exists(tmp_table_name)
 
             # if temp table exist and drop before load
-            if val > 0 and drop_before_load:
+            if table_exists and drop_before_load:
                 if verbose:
                     print("   Table " + tmp_table_name + " exist, but drop flag enabled, dropping..")
                 sql = "drop table " + tmp_table_name
                 cursor.execute(sql)
-                val = 0
+                catalog_drop_table(tmp_table_name)
+                table_exists = False
 
-            # if table not exist, create it
-            if val == 0:
+            # if table not exist, create it, else add the new columns
+            if not table_exists:
                 if verbose:
                     print("   Table " + tmp_table_name + " was not exist, creating, ", end="")
                 sql = "create GLOBAL TEMPORARY TABLE " + tmp_table_name + " ( " + compute_sql_columns + " ) ON COMMIT PRESERVE ROWS "
                 cursor.execute(sql)
+                catalog_set_table(tmp_table_name, [x['col'] for x in table_items])
                 if verbose:
                     print("Table " + tmp_table_name + " created")
+            else:
+                add_missing_columns(cursor, tmp_table_name, table_items, verbose)
 
         ################################################
         # Load Data
@@ -3377,9 +3771,12 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
         num_rows = 0
         process_location = "Before Load Data"
         csv.field_size_limit(sys.maxsize)
+        phase_time = time.time()
 
         with open(path_filename, 'rt') as file_in:
-            csv_reader = csv.DictReader(file_in)
+            csv_reader = csv.reader(file_in)
+            header = next(csv_reader, None)
+            column_plan = get_column_plan(header, inputdata['items']) if header else []
 
             # Adjust the batch size to meet memory and performance requirements for oracledb
             batch_size = 5000
@@ -3398,19 +3795,23 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
                 process_location = "before CSV load"
 
                 data = []
+                data_lines = []
+                rejects = []
                 for row in csv_reader:
+                    if not row:
+                        continue
+
                     primary_key_has_data = True
                     rowarray = []
+                    row_size = len(row)
 
-                    for item in inputdata['items']:
-                        column = str(item['csv']).strip()
-                        if not column:
-                            column = str(item['col']).strip()
-                        limit_size = 16 if 'date' in item['type'] else 3999
-                        value = get_column_value_from_array(column, row, limit_size)
+                    for index, limit_size, is_pk in column_plan:
+                        value = row[index][0:limit_size] if index is not None and index < row_size else ""
+                        if value == "None":
+                            value = ""
 
                         # check if primary key is null
-                        if item['pk'] == 'y' and not value:
+                        if is_pk and not value:
                             primary_key_has_data = False
 
                         # Add col data to the collection
@@ -3418,7 +3819,9 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
 
                     # add row only if pk is  not null
                     if primary_key_has_data:
+                        rowarray.append(hashlib.sha1(chr(31).join(rowarray[index] for index in hash_index).encode('utf-8')).hexdigest())
                         data.append(tuple(rowarray))
+                        data_lines.append(csv_reader.line_num)
                         num_rows += 1
 
                     # executemany every batch size
@@ -3428,12 +3831,22 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
                     if data:
                         if len(data) % batch_size == 0:
                             # print("\ndata" + str(data), "batchsize: " + str(batch_size))
-                            cursor.executemany(sql, data)
+                            execute_batch(cursor, sql, data, data_lines, rejects)
                             data = []
+                            data_lines = []
 
                 # if data exist final execute
                 if data:
-                    cursor.executemany(sql, data)
+                    execute_batch(cursor, sql, data, data_lines, rejects)
+
+                # rows rejected by the database, the table is not merged above -rejectpct
+                if rejects:
+                    process_location = "check rejected rows"
+                    if check_file_rejects(connection, table_name, path_filename, rejects, num_rows):
+                        tables_failed.append(table_name)
+                        set_metric('tables_failed', 1, add=True)
+                        return
+                    num_rows -= len(rejects)
 
                 if verbose:
                     print("   Loading data to tmp  table... Insert Completed, " + str(num_rows) + " Rows Inserted")
@@ -3442,39 +3855,67 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
 
                 connection.commit()
 
+        set_metric('phase_seconds', round(time.time() - phase_time, 3), {'phase': 'insert'}, add=True)
+
         ################################################
         # Merge data from tmp to main table
         ################################################
         process_location = "before Merge"
+        phase_time = time.time()
 
         with connection.cursor() as cursor:
 
             if verbose:
                 print("   Merging data to main table... ", end="")
 
-            # run merge to oci_update_stats
+            # run merge, matched rows are updated only if the hash changed
             sql = "merge into " + table_name + " a using " + tmp_table_name + " b "
             sql += "on (a." + primary_key + " = b." + primary_key + ")"
             sql += "when matched then update set "
             sql += merge_sql_columns
+            sql += " where lnnvl(a.row_hash = b.row_hash) "
             sql += "when not matched then insert ("
             sql += insert_def_sql_columns
             sql += ") values ("
             sql += insert_val_sql_columns + ")"
 
             cursor.execute(sql)
+            rows_merged = cursor.rowcount
+
+            # unchanged rows keep the extract date of their last change, the
+            # extract date of the run is kept once per table
+            sql = "select count(*), " + ("max(extract_date)" if extract_date_exist else "sysdate") + " from " + tmp_table_name
+            cursor.execute(sql)
+            rows_extracted, extract_date = cursor.fetchone()
+
+            sql = """merge into OCI_SHOWOCI_EXTRACTS a
+                     using (select :table_name as TABLE_NAME from dual) b on (a.TABLE_NAME = b.TABLE_NAME)
+                     when matched then update set a.EXTRACT_DATE = :extract_date, a.FILE_NAME = :file_name, a.ROWS_EXTRACTED = :rows_extracted,
+                          a.ROWS_MERGED = :rows_merged, a.LOAD_TIME = sysdate, a.AGENT_VERSION = :agent_version
+                     when not matched then insert (TABLE_NAME, EXTRACT_DATE, FILE_NAME, ROWS_EXTRACTED, ROWS_MERGED, LOAD_TIME, AGENT_VERSION)
+                          values (:table_name, :extract_date, :file_name, :rows_extracted, :rows_merged, sysdate, :agent_version)"""
+            cursor.execute(sql, table_name=table_name, extract_date=extract_date, file_name=path_filename, rows_extracted=rows_extracted, rows_merged=rows_merged, agent_version=version)
+
             connection.commit()
 
+            rows_unchanged = max(rows_extracted - rows_merged, 0)
+            set_metric('merge_rows', rows_merged, {'table': table_name, 'action': 'merged'})
+            set_metric('merge_rows', rows_unchanged, {'table': table_name, 'action': 'unchanged'})
+
             if verbose:
-                print("Merge  Completed, " + str(cursor.rowcount) + " rows merged" + get_time_elapsed(start_time))
+                print("Merge  Completed, " + str(rows_merged) + " rows inserted or updated, " + str(rows_unchanged) + " rows unchanged" + get_time_elapsed(start_time))
             else:
-                print(" Merged = " + str(cursor.rowcount).ljust(7), end="")
+                print(" Merged = " + str(rows_merged).ljust(7) + " Unchanged = " + str(rows_unchanged).ljust(7), end="")
+
+        set_metric('phase_seconds', round(time.time() - phase_time, 3), {'phase': 'merge'}, add=True)
+        set_metric('merge_seconds', round(time.time() - phase_time, 3), {'table': table_name})
 
         if resource_id:
             ################################################
             # Merge data from tmp to resource table
             ################################################
             process_location = "before Resrouce Merge"
+            phase_time = time.time()
 
             with connection.cursor() as cursor:
 
@@ -3496,19 +3937,33 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
                           values
                           (b.ID,b.NAME,b.TABLE_NAME,b.TENANT_NAME,SYSDATE)"""
 
-                cursor.execute(sql)
-                connection.commit()
+                with resource_merge_lock:
+                    cursor.execute(sql)
+                    connection.commit()
 
                 if verbose:
                     print("Merge  Completed, " + str(cursor.rowcount) + " rows merged" + get_time_elapsed(start_time))
                 else:
                     print(" OCIDs = " + str(cursor.rowcount))
 
+            set_metric('phase_seconds', round(time.time() - phase_time, 3), {'phase': 'resource_merge'}, add=True)
+
         # if no resource id
         else:
             if not verbose:
                 print("")
 
+        ################################################
+        # Metrics
+        ################################################
+        set_metric('files_loaded', 1, add=True)
+        set_metric('rows_loaded', num_rows, add=True)
+        set_metric('bytes_loaded', os.path.getsize(path_filename), add=True)
+        set_metric('load_seconds', round(time.time() - start_time, 3), add=True)
+        set_metric('last_file_modified_timestamp_seconds', max(os.path.getmtime(path_filename), metrics_values.get(('last_file_modified_timestamp_seconds', ()), 0)))
+        if cmd.metrics_file:
+            write_metrics_file(cmd.metrics_file, os.path.basename(cmd.csv_location))
+
     except oracledb.DatabaseError as e:
         print("\nDatabaseError at procedure: handle_table() - " + process_location + " - " + str(e) + "\n")
         raise SystemExit
@@ -3517,6 +3972,154 @@ def handle_table(connection, inputdata, resource_id="", resource_name="", resour
         raise Exception("\nError at Procedure: handle_table() - " + process_location + " - " + str(e))
 
 
+##########################################################################
+# CSV handlers in load order
+##########################################################################
+showoci_handlers = [
+    handle_compute,
+    handle_compute_reservations,
+    handle_block_volume,
+    handle_block_volume_backups,
+    handle_database_all,
+    handle_database,
+    handle_database_pdbs,
+    handle_database_backups,
+    handle_database_exa_cs_vms,
+    handle_database_exa_cc_vms,
+    handle_database_exa_infra,
+    handle_database_autonomous,
+    handle_database_vm_bm,
+    handle_database_goldengate_deployments,
+    handle_database_nosql,
+    handle_database_mysql,
+    handle_file_storage,
+    handle_object_storage,
+    handle_load_balancer_listeners,
+    handle_load_balancer_backendset,
+    handle_paas_oac,
+    handle_paas_oic,
+    handle_paas_oce,
+    handle_paas_visual_builder,
+    handle_paas_devops,
+    handle_paas_open_search,
+    handle_containers,
+    handle_containers_nodepools,
+    handle_apigw,
+    handle_network_vcn,
+    handle_network_drg,
+    handle_network_subnet,
+    handle_network_subnet_private_ips,
+    handle_network_security_groups,
+    handle_network_security_list,
+    handle_network_dhcp_options,
+    handle_network_routes,
+    handle_network_drg_virtual_circuit,
+    handle_network_drg_ipsec,
+    handle_network_firewall,
+    handle_data_digital_assistance,
+    handle_big_data_service,
+    handle_data_flow,
+    handle_data_catalog,
+    handle_data_conn_registry,
+    handle_data_science,
+    handle_data_integration,
+    handle_streams_queues,
+    handle_edge_web_application_firewall,
+    handle_edge_healthchecks,
+    handle_edge_dns_steering_policies,
+    handle_identity_compartments,
+    handle_security_bastions,
+    handle_security_cloud_guard,
+    handle_security_kms_vaults,
+    handle_security_logging,
+    handle_limits,
+    handle_quotas,
+    handle_monitor_agents,
+    handle_monitor_events,
+    handle_monitor_db_management,
+    handle_monitor_alarms,
+    handle_monitor_notifications,
+    handle_identity_domains,
+    handle_identity_domains_dyngroup,
+    handle_identity_domains_groups,
+    handle_identity_domains_users,
+    handle_identity_policies,
+    handle_advisor_resource_action,
+    handle_advisor_recommendations
+]
+
+
+##########################################################################
+# stdout of the -parallel jobs, each job writes to its own buffer that is
+# printed in the order of the handlers, other threads write to stdout
+##########################################################################
+class JobOutput(object):
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = getattr(job_local, 'buffer', None)
+        if buffer is None:
+            return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(job_local, 'buffer', None) is None:
+            self.stream.flush()
+
+
+##########################################################################
+# Run one handler on a pool session, returns output and error
+##########################################################################
+def run_handler_job(pool, handler, index):
+    job_local.buffer = []
+    job_local.file_num = index
+    error = ""
+    try:
+        with pool.acquire() as connection:
+            handler(connection)
+
+    except (Exception, SystemExit) as e:
+        # SystemExit of handle_table is raised after its error is printed
+        printed = [line.strip() for line in "".join(job_local.buffer).splitlines() if line.strip()]
+        error = str(e).strip() if str(e).strip() else (printed[-1] if printed else type(e).__name__)
+        if str(e).strip():
+            print("\nError at " + handler.__name__ + " - " + error)
+
+    finally:
+        output = "".join(job_local.buffer)
+        job_local.buffer = None
+        job_local.file_num = None
+
+    return output, error
+
+
+##########################################################################
+# Run the handlers over the session pool, the output is printed in the
+# order of the handlers and the errors are returned instead of aborting
+##########################################################################
+def run_handlers_parallel(pool, handlers, parallel):
+    global file_num
+    job_output = JobOutput(sys.stdout)
+    sys.stdout = job_output
+    errors = []
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = [executor.submit(run_handler_job, pool, handler, index) for index, handler in enumerate(handlers, start=file_num + 1)]
+            for handler, future in zip(handlers, futures):
+                output, error = future.result()
+                print(output, end="")
+                if error:
+                    errors.append((handler.__name__, error))
+
+    finally:
+        sys.stdout = job_output.stream
+        file_num += len(handlers)
+
+    return errors
+
+
 ##########################################################################
 # Main
 ##########################################################################
@@ -3532,16 +4135,15 @@ def main_process():
     # Start
     ############################################
     print_header("Running ShowOCI_CSV2ADW", 0)
+    run_start_time = time.time()
+    run_success = 0
     print("Starts at " + get_current_date_time())
     print("Command Line : " + get_command_line())
     print("Version      : " + version)
 
-    # Init the Oracle Thick Client Library in order to use sqlnet.ora and instant client
-    if cmd.usethick:
-        oracledb.init_oracle_client()
-        print("OracleDB     : Thick Drivers")
-    else:
-        print("OracleDB     : Thin Drivers")
+    # Init the Oracle Thick Client Library if -usethick or thick profile
+    load_db_profile(cmd.db_conf, cmd.db_profile, "thick" if cmd.usethick else "thin")
+    print("OracleDB     : " + db_profile['mode'].capitalize() + " Drivers")
 
     dpass = get_secret_password(config, signer, cmd.proxy, cmd.dsecret)
 
@@ -3554,85 +4156,37 @@ def main_process():
     ############################################
     try:
         print("\nConnecting to database " + cmd.dname, end="")
-        with oracledb.connect(user=cmd.duser, password=dpass, dsn=cmd.dname, config_dir=cmd.wallet_location, wallet_location=cmd.wallet_location, wallet_password=wallet_password) as connection:
+        with create_db_connection(cmd.duser, dpass, cmd.dname, config_dir=cmd.wallet_location, wallet_location=cmd.wallet_location, wallet_password=wallet_password) as connection:
 
             print("...Connected\n")
 
             # Checking structure of tables
+            load_db_catalog(connection)
             handle_old_structure(connection)
             check_database_table_structure_resource(connection)
 
             # Handling CSVs
-            handle_compute(connection)
-            handle_compute_reservations(connection)
-            handle_block_volume(connection)
-            handle_block_volume_backups(connection)
-            handle_database_all(connection)
-            handle_database(connection)
-            handle_database_pdbs(connection)
-            handle_database_backups(connection)
-            handle_database_exa_cs_vms(connection)
-            handle_database_exa_cc_vms(connection)
-            handle_database_exa_infra(connection)
-            handle_database_autonomous(connection)
-            handle_database_vm_bm(connection)
-            handle_database_goldengate_deployments(connection)
-            handle_database_nosql(connection)
-            handle_database_mysql(connection)
-            handle_file_storage(connection)
-            handle_object_storage(connection)
-            handle_load_balancer_listeners(connection)
-            handle_load_balancer_backendset(connection)
-            handle_paas_oac(connection)
-            handle_paas_oic(connection)
-            handle_paas_oce(connection)
-            handle_paas_visual_builder(connection)
-            handle_paas_devops(connection)
-            handle_paas_open_search(connection)
-            handle_containers(connection)
-            handle_containers_nodepools(connection)
-            handle_apigw(connection)
-            handle_network_vcn(connection)
-            handle_network_drg(connection)
-            handle_network_subnet(connection)
-            handle_network_subnet_private_ips(connection)
-            handle_network_security_groups(connection)
-            handle_network_security_list(connection)
-            handle_network_dhcp_options(connection)
-            handle_network_routes(connection)
-            handle_network_drg_virtual_circuit(connection)
-            handle_network_drg_ipsec(connection)
-            handle_network_firewall(connection)
-            handle_data_digital_assistance(connection)
-            handle_big_data_service(connection)
-            handle_data_flow(connection)
-            handle_data_catalog(connection)
-            handle_data_conn_registry(connection)
-            handle_data_science(connection)
-            handle_data_integration(connection)
-            handle_streams_queues(connection)
-            handle_edge_web_application_firewall(connection)
-            handle_edge_healthchecks(connection)
-            handle_edge_dns_steering_policies(connection)
-            handle_identity_compartments(connection)
-            handle_security_bastions(connection)
-            handle_security_cloud_guard(connection)
-            handle_security_kms_vaults(connection)
-            handle_security_logging(connection)
-            handle_limits(connection)
-            handle_quotas(connection)
-            handle_monitor_agents(connection)
-            handle_monitor_events(connection)
-            handle_monitor_db_management(connection)
-            handle_monitor_alarms(connection)
-            handle_monitor_notifications(connection)
-            handle_identity_domains(connection)
-            handle_identity_domains_dyngroup(connection)
-            handle_identity_domains_groups(connection)
-            handle_identity_domains_users(connection)
-            handle_identity_policies(connection)
-            handle_advisor_resource_action(connection)
-            handle_advisor_recommendations(connection)
+            if cmd.parallel > 1:
+                print("Loading tables with " + str(cmd.parallel) + " parallel sessions\n")
+                pool = create_db_pool(cmd.duser, dpass, cmd.dname, cmd.parallel, cmd.parallel, config_dir=cmd.wallet_location, wallet_location=cmd.wallet_location, wallet_password=wallet_password)
+                try:
+                    errors = run_handlers_parallel(pool, showoci_handlers, cmd.parallel)
+                finally:
+                    pool.close()
+                if errors:
+                    print("\n" + str(len(errors)) + " tables failed:")
+                    for handler_name, error in errors:
+                        print("   " + handler_name + " - " + error)
+                    raise Exception(str(len(errors)) + " tables failed to load")
+            else:
+                for handler in showoci_handlers:
+                    handler(connection)
+            run_success = 1
+
+            if tables_failed:
+                print("\n" + str(len(tables_failed)) + " tables failed with rejected rows and not merged, see OCI_SHOWOCI_REJECTS:")
+                for table_name in tables_failed:
+                    print("   " + table_name)
 
     except oracledb.DatabaseError as e:
         print("\nError manipulating database - " + str(e) + "\n")
@@ -3640,6 +4194,12 @@ def main_process():
     except Exception as e:
         print("\nError appeared - " + str(e))
 
+    finally:
+        if cmd.metrics_file:
+            set_metric('run_success', run_success)
+            set_metric('run_seconds', round(time.time() - run_start_time, 3))
+            write_metrics_file(cmd.metrics_file, os.path.basename(cmd.csv_location))
+
     ############################################
     # print completed
     ############################################
@@ -3649,4 +4209,5 @@ def main_process():
 ##########################################################################
 # Execute Main Process
 ##########################################################################
-main_process()
+if __name__ == "__main__":
+    main_process()
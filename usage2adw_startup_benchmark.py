@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+##########################################################################
+# Copyright (c) 2026, Oracle and/or its affiliates.
+# Licensed under the Universal Permissive License v 1.0 as shown at  https://oss.oracle.com/licenses/upl/
+#
+# DISCLAIMER This is not an official Oracle application,  It does not supported by Oracle Support.
+#
+# usage2adw_startup_benchmark.py
+#
+# @author: Adi Zohar
+#
+# Supports Python 3 and above
+#
+# coding: utf-8
+##########################################################################
+# Measure the startup of usage2adw.py and focus2adw.py with
+# python -X importtime, without tenancy or database:
+#   - full   - import oci with OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED=true,
+#              the whole SDK as loaded by the previous versions
+#   - loader - <loader> --version, the imports and module initialization
+#              of the loader before any API call
+#
+# Reports wall seconds (best of runs), import seconds, number of modules
+# and oci modules loaded, and the slowest imports by cumulative time
+#
+# oci and oracledb must be installed, the loader initializes the Oracle
+# client library at import
+#
+# Example:
+#   python3 usage2adw_startup_benchmark.py
+#   python3 usage2adw_startup_benchmark.py -loader focus -runs 5 -top 20
+##########################################################################
+import sys
+import argparse
+import datetime
+import os
+import subprocess
+import time
+
+version = "26.10.19"
+script_dir = os.path.dirname(os.path.abspath(__file__))
+loaders = {
+    'usage': os.path.join(script_dir, "usage2adw.py"),
+    'focus': os.path.join(script_dir, "focus2adw", "focus2adw.py")
+}
+
+
+##########################################################################
+# Run python -X importtime, return wall seconds, return code and imports
+# importtime line: import time: self [us] | cumulative | imported package
+##########################################################################
+def run_importtime(args, env):
+    start_time = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, env=env, cwd=script_dir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    wall_secs = time.perf_counter() - start_time
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, package = line[len("import time:"):].split("|")
+        name = package.rstrip()
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append({'name': name.strip(), 'level': level, 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+
+    return wall_secs, result.returncode, imports
+
+
+##########################################################################
+# Measure best of runs
+##########################################################################
+def measure(name, args, env, runs):
+    best = None
+    for _ in range(runs):
+        wall_secs, returncode, imports = run_importtime(args, env)
+        if best is None or wall_secs < best['wall_secs']:
+            best = {'name': name, 'wall_secs': wall_secs, 'returncode': returncode, 'imports': imports}
+
+    imports = best['imports']
+    best['import_secs'] = sum(i['cumulative_us'] for i in imports if i['level'] == 0) / 1000000
+    best['modules'] = len(imports)
+    best['oci_modules'] = len([i for i in imports if i['name'] == 'oci' or i['name'].startswith('oci.')])
+    return best
+
+
+##########################################################################
+# Run Benchmark
+##########################################################################
+def run_benchmark(cmd):
+    loader_path = loaders[cmd.loader]
+
+    env_full = dict(os.environ, OCI_PYTHON_SDK_LAZY_IMPORTS_DISABLED="true")
+    env_loader = dict(os.environ)
+
+    print("\nMeasuring startup, best of " + str(cmd.runs) + " runs...")
+    results = [
+        measure("full (import oci)", ["-c", "import oci"], env_full, cmd.runs),
+        measure("loader (" + os.path.basename(loader_path) + ")", [loader_path, "--version"], env_loader, cmd.runs)
+    ]
+
+    ############################################
+    # print results
+    ############################################
+    print("\n" + "#" * 90)
+    print("# Startup Benchmark Results - " + cmd.loader)
+    print("#" * 90)
+    print("   " + "Run".ljust(30) + "Wall sec".rjust(10) + "Import sec".rjust(12) + "Modules".rjust(10) + "OCI Mods".rjust(10) + "RC".rjust(5))
+    for r in results:
+        print("   " + r['name'].ljust(30) + str(round(r['wall_secs'], 3)).rjust(10) + str(round(r['import_secs'], 3)).rjust(12) + str(r['modules']).rjust(10) + str(r['oci_modules']).rjust(10) + str(r['returncode']).rjust(5))
+
+    for r in results:
+        print("\n   Slowest imports - " + r['name'] + ":")
+        for i in sorted(r['imports'], key=lambda k: k['cumulative_us'], reverse=True)[0:cmd.top]:
+            print("   " + str(round(i['cumulative_us'] / 1000, 1)).rjust(10) + " ms - " + i['name'])
+
+    return results
+
+
+##########################################################################
+# set parser
+##########################################################################
+def set_parser_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-loader', default="usage", dest='loader', choices=sorted(loaders), help='Loader to measure (default=usage)')
+    parser.add_argument('-runs', default=3, type=int, dest='runs', help='Runs per measure, best is reported (default=3)')
+    parser.add_argument('-top', default=15, type=int, dest='top', help='Number of slowest imports to print (default=15)')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + version)
+    return parser.parse_args()
+
+
+##########################################################################
+# Main
+##########################################################################
+def main_process():
+    cmd = set_parser_arguments()
+    run_benchmark(cmd)
+    print("\nCompleted at " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+##########################################################################
+# Execute Main Process
+##########################################################################
+if __name__ == "__main__":
+    main_process()